@@ -0,0 +1,128 @@
+"""Benchmark hot-path lookups against a large synthetic scans database.
+
+Builds (or reuses) a database with the production schema, fills scan_results
+with blobs until it reaches ``--size-gb``, then times the queries the API
+issues most often, with and without the composite indexes from schema
+migration 4 (``NOT INDEXED`` forces the table-scan plan on the same file)::
+
+    cd CLI && python -m benchmarks.bench_db_lookup --db /tmp/bench.db --size-gb 10
+
+Use a smaller ``--size-gb`` for a quick run; the database is kept between runs
+so repeated measurements skip the (slow) fill step.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import time
+import uuid
+
+from multivol.api_server.database import MIGRATIONS
+
+MODULES = [f"windows.plugin{i}.Plugin{i}" for i in range(40)]
+
+QUERIES = {
+    "scan_results (scan_id, module)": (
+        "SELECT id FROM scan_results {hint} WHERE scan_id = ? AND module = ?",
+        lambda scan, module: (scan, module),
+    ),
+    "scan_results (scan_id)": (
+        "SELECT module FROM scan_results {hint} WHERE scan_id = ?",
+        lambda scan, module: (scan,),
+    ),
+    "dump_tasks (scan_id)": (
+        "SELECT task_id FROM dump_tasks {hint} WHERE scan_id = ?",
+        lambda scan, module: (scan,),
+    ),
+    "scans (status, created_at)": (
+        "SELECT uuid FROM scans {hint} WHERE status = ? ORDER BY created_at DESC LIMIT 50",
+        lambda scan, module: ("completed",),
+    ),
+}
+
+
+def _blob(size: int) -> str:
+    """Return a JSON array of roughly *size* bytes."""
+    row = {"PID": 4, "ImageFileName": "svchost.exe", "Args": "x" * 200}
+    count = max(size // len(json.dumps(row)), 1)
+    return json.dumps([row] * count)
+
+
+def build(conn: sqlite3.Connection, size_gb: float, blob_kb: int) -> list[str]:
+    """Apply the schema and fill the database up to *size_gb*; return the scan ids."""
+    c = conn.cursor()
+    for _version, _description, migrate in MIGRATIONS:
+        migrate(c)
+    conn.commit()
+
+    scans = [r[0] for r in c.execute("SELECT uuid FROM scans")]
+    target = int(size_gb * 1024**3)
+    page_size = c.execute("PRAGMA page_size").fetchone()[0]
+    blob = _blob(blob_kb * 1024)
+    started = time.perf_counter()
+    while c.execute("PRAGMA page_count").fetchone()[0] * page_size < target:
+        scan_id = str(uuid.uuid4())
+        now = time.time()
+        c.execute(
+            "INSERT INTO scans (uuid, name, status, os, created_at) VALUES (?, ?, ?, ?, ?)",
+            (
+                scan_id,
+                scan_id[:8],
+                random.choice(["completed", "failed", "running"]),
+                "windows",
+                now,
+            ),
+        )
+        c.executemany(
+            "INSERT INTO scan_results (scan_id, module, content, created_at, size)"
+            " VALUES (?, ?, ?, ?, ?)",
+            ((scan_id, m, blob, now, len(blob)) for m in MODULES),
+        )
+        c.executemany(
+            "INSERT INTO dump_tasks (task_id, scan_id, status, created_at) VALUES (?, ?, ?, ?)",
+            ((str(uuid.uuid4()), scan_id, "completed", now) for _ in range(3)),
+        )
+        conn.commit()
+        scans.append(scan_id)
+    print(f"database ready: {len(scans)} scans ({time.perf_counter() - started:.1f}s fill)")
+    return scans
+
+
+def measure(conn: sqlite3.Connection, scans: list[str], iterations: int) -> None:
+    """Print median/p95 latency of each query with and without its index."""
+    print(f"{'query':34} {'plan':10} {'median ms':>10} {'p95 ms':>10}")
+    for label, (sql, make_params) in QUERIES.items():
+        for plan, hint in (("indexed", ""), ("scan", "NOT INDEXED")):
+            samples = []
+            for _ in range(iterations):
+                params = make_params(random.choice(scans), random.choice(MODULES))
+                start = time.perf_counter()
+                conn.execute(sql.format(hint=hint), params).fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{label:34} {plan:10} {statistics.median(samples):10.3f} {p95:10.3f}")
+
+
+def main() -> None:
+    """Parse arguments, build the database if needed and run the measurements."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bench_scans.db", help="Database file to create or reuse")
+    parser.add_argument("--size-gb", type=float, default=10.0, help="Target database size")
+    parser.add_argument("--blob-kb", type=int, default=256, help="Size of each result blob")
+    parser.add_argument("--iterations", type=int, default=50, help="Samples per query and plan")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    scans = build(conn, args.size_gb, args.blob_kb)
+    print(f"database size: {os.path.getsize(args.db) / 1024**3:.2f} GB")
+    measure(conn, scans, args.iterations)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark the RecoverFs tree builder on synthetic 1M- and 5M-entry outputs.
+
+Writes a ``linux.pagecache.RecoverFs_output.json`` with ``--entries`` rows
+shaped like real page-cache recoveries (a few very wide directories such as
+``/usr/lib/x86_64-linux-gnu`` plus deep package trees), runs
+``process_recover_fs`` on it and reports parse, build and write times, the
+peak RSS and the size of the compact tree.  ``--compare`` also times the
+previous dict-based builder (linear child scan) on a prefix of the rows::
+
+    cd CLI && python -m benchmarks.bench_recoverfs_tree --entries 1000000 5000000
+
+Inputs are kept in ``--workdir`` between runs; only the tree is rebuilt.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import time
+
+from multivol.api_server.fs_trie import build_recoverfs_trie
+from multivol.api_server.utils import clean_and_parse_json, process_recover_fs
+
+OUTPUT = "linux.pagecache.RecoverFs_output.json"
+WIDE_DIRS = ["/usr/lib/x86_64-linux-gnu", "/usr/share/doc", "/var/cache/apt/archives", "/etc"]
+
+
+def _rows(count: int) -> list[dict]:
+    rnd = random.Random(count)
+    rows = []
+    for inode in range(count):
+        if rnd.random() < 0.4:
+            path = f"{rnd.choice(WIDE_DIRS)}/lib{inode}.so.{inode % 7}"
+        else:
+            depth = rnd.randint(2, 8)
+            path = "/" + "/".join(f"d{rnd.randint(0, 30)}" for _ in range(depth)) + f"/f{inode}"
+        rows.append({"FilePath": path, "Inode": inode, "FileSize": inode % 65536})
+    return rows
+
+
+def _prepare(workdir: str, count: int) -> str:
+    """Create (or reuse) the raw output for *count* entries; return its directory."""
+    output_dir = os.path.join(workdir, f"recoverfs_{count}")
+    raw = os.path.join(output_dir, f"{OUTPUT}.raw")
+    if not os.path.exists(raw):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(raw, "w", encoding="utf-8") as f:
+            json.dump(_rows(count), f)
+    with open(raw, "rb") as src, open(os.path.join(output_dir, OUTPUT), "wb") as dst:
+        while chunk := src.read(1 << 20):
+            dst.write(chunk)
+    return output_dir
+
+
+def _legacy_build(rows: list[dict]) -> dict:
+    """The previous builder: a linear scan over siblings for every path component."""
+    tree: dict = {"name": "/", "path": "/", "type": "directory", "children": []}
+    for item in rows:
+        parts = item["FilePath"].strip("/").split("/")
+        node, path = tree, ""
+        for i, part in enumerate(parts):
+            path = f"{path}/{part}"
+            found = next((c for c in node.get("children", []) if c["name"] == part), None)
+            if found is None:
+                found = {"name": part, "path": path, "type": "directory", "children": []}
+                if i == len(parts) - 1:
+                    found = {"name": part, "path": path, "type": "file", "inode": item["Inode"]}
+                node.setdefault("children", []).append(found)
+            node = found
+    return tree
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(workdir: str, count: int, compare: int) -> None:
+    """Time one build of *count* entries and print a result line."""
+    output_dir = _prepare(workdir, count)
+    json_path = os.path.join(output_dir, OUTPUT)
+    raw_size = os.path.getsize(json_path)
+
+    start = time.perf_counter()
+    rows = clean_and_parse_json(json_path)
+    parsed = time.perf_counter()
+    trie = build_recoverfs_trie(rows, {})
+    built = time.perf_counter()
+    nodes = len(trie)
+    del trie
+    print(
+        f"{count:>9} entries  parse {parsed - start:6.2f}s  build {built - parsed:6.2f}s"
+        f"  ({nodes / (built - parsed) / 1e6:.2f}M nodes/s)"
+    )
+
+    if compare:
+        sample = rows[:compare]
+        start = time.perf_counter()
+        build_recoverfs_trie(sample, {})
+        trie_s = time.perf_counter() - start
+        start = time.perf_counter()
+        _legacy_build(sample)
+        legacy_s = time.perf_counter() - start
+        print(f"{'':>9} first {compare} rows: trie {trie_s:.3f}s, legacy {legacy_s:.3f}s")
+    del rows
+
+    start = time.perf_counter()
+    process_recover_fs(output_dir)
+    total = time.perf_counter() - start
+    print(
+        f"{'':>9} process_recover_fs {total:6.2f}s  input {raw_size / 1e6:7.1f} MB"
+        f"  tree {os.path.getsize(json_path) / 1e6:7.1f} MB  peak RSS {_peak_rss_mb():7.0f} MB"
+    )
+
+
+def main() -> None:
+    """Parse arguments and benchmark each requested size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--workdir", default="bench_recoverfs", help="Where inputs are kept")
+    parser.add_argument(
+        "--compare", type=int, default=20000, help="Rows to time the legacy builder on (0: skip)"
+    )
+    args = parser.parse_args()
+    for count in args.entries:
+        run(args.workdir, count, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Columnar export of module outputs and read-only analytical SQL over them.
+
+At ingestion every list-shaped module output is also written as a Parquet
+file, ``<ANALYTICS_DIR>/scan_id=<uuid>/<module>.parquet``, with column types
+inferred from the Volatility JSON (integers, unsigned 64-bit addresses,
+floats, booleans, timestamps, everything else as text).  ``run_query``
+exposes every module as a DuckDB view over those files, so ad-hoc hunts can
+join modules across one or many scans while reading only the columns and
+row groups their predicates touch.
+
+Both ``pyarrow`` (export) and ``duckdb`` (queries) are optional; without them
+nothing is exported and ``/query`` answers 501.
+
+Scans ingested before the export existed are converted on first query, or in
+one go with::
+
+    python -m multivol.api_server.analytics
+"""
+
+import datetime
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.utils import iter_tree_rows
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency: no columnar export
+    pyarrow = None
+
+try:
+    import duckdb
+except ImportError:  # optional dependency: /query is unavailable
+    duckdb = None
+
+ANALYTICS_DIR = os.environ.get("ANALYTICS_DIR", os.path.join(STORAGE_DIR, "parquet"))
+QUERY_TIMEOUT = float(os.environ.get("QUERY_TIMEOUT", "60"))
+QUERY_MEMORY_LIMIT = os.environ.get("QUERY_MEMORY_LIMIT", "1GB")
+QUERY_THREADS = int(os.environ.get("QUERY_THREADS", "4"))
+ROW_GROUP_SIZE = 65536
+MAX_QUERY_ROWS = 10000
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.\-]+$")
+_ISO_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}")
+# DuckDB statement types a hunt may run; everything else (COPY, ATTACH, SET, DDL...) is refused
+_READ_ONLY_STATEMENTS = ("SELECT", "EXPLAIN")
+
+_export_lock = threading.Lock()
+
+
+class QueryError(ValueError):
+    """Raised for SQL that is not allowed or fails to run."""
+
+
+def export_available() -> bool:
+    """True when module outputs can be written as Parquet."""
+    return pyarrow is not None and os.environ.get("ANALYTICS_EXPORT", "1") != "0"
+
+
+def query_available() -> bool:
+    """True when /query can run (DuckDB installed and export enabled)."""
+    return duckdb is not None and export_available()
+
+
+def _scan_dir(scan_id: str) -> str:
+    return os.path.join(ANALYTICS_DIR, f"scan_id={scan_id}")
+
+
+def _export_path(scan_id: str, module: str) -> str:
+    return os.path.join(_scan_dir(scan_id), f"{module}.parquet")
+
+
+# ──────────────────────────────────────────────
+# Export
+# ──────────────────────────────────────────────
+
+
+def _parse_datetime(value: str) -> Optional[datetime.datetime]:
+    if not _ISO_DATETIME.match(value):
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+
+def _infer_column(values: list[Any]) -> tuple[Any, list[Any]]:
+    """Return ``(arrow_type, converted_values)`` for one column of Volatility JSON."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return pyarrow.string(), values
+    if all(isinstance(v, bool) for v in present):
+        return pyarrow.bool_(), values
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        low, high = min(present), max(present)
+        if -(2**63) <= low and high < 2**63:
+            return pyarrow.int64(), values
+        if low >= 0 and high < 2**64:  # kernel addresses
+            return pyarrow.uint64(), values
+    elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return pyarrow.float64(), [None if v is None else float(v) for v in values]
+    elif all(isinstance(v, str) for v in present):
+        parsed = [None if v is None else _parse_datetime(v) for v in values]
+        if all(p is not None for p, v in zip(parsed, values) if v is not None):
+            return pyarrow.timestamp("us", tz="UTC"), parsed
+        return pyarrow.string(), values
+    return pyarrow.string(), [_as_text(v) for v in values]
+
+
+def build_table(data: Any) -> Optional[Any]:
+    """Convert a module's JSON output into a pyarrow Table (None unless it is a row list)."""
+    if not isinstance(data, list):
+        return None
+    rows = list(iter_tree_rows(data))
+    if not rows:
+        return None
+    columns: dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    arrays, fields = [], []
+    for name in columns:
+        arrow_type, values = _infer_column([row.get(name) for row in rows])
+        arrays.append(pyarrow.array(values, type=arrow_type))
+        fields.append(pyarrow.field(name, arrow_type))
+    return pyarrow.Table.from_arrays(arrays, schema=pyarrow.schema(fields))
+
+
+def export_module_result(scan_id: str, module: str, data: Any) -> Optional[str]:
+    """Write *data* as the Parquet file of (scan_id, module); returns its path if written."""
+    if not export_available() or not (_SAFE_NAME.match(scan_id) and _SAFE_NAME.match(module)):
+        return None
+    table = build_table(data)
+    if table is None:
+        return None
+    path = _export_path(scan_id, module)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pyarrow.parquet.write_table(
+        table, tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE, write_statistics=True
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def delete_scan_exports(scan_id: str) -> None:
+    """Remove the Parquet files of *scan_id*."""
+    if _SAFE_NAME.match(scan_id):
+        shutil.rmtree(_scan_dir(scan_id), ignore_errors=True)
+
+
+def ensure_exported(scan_ids: Optional[list[str]] = None) -> int:
+    """Export stored results that have no Parquet file yet; returns how many were written.
+
+    Limited to *scan_ids* when given, otherwise every scan in the database.
+    """
+    if not export_available():
+        return 0
+    # pylint: disable=import-outside-toplevel
+    from multivol.api_server.compression import decode_content
+    from multivol.api_server.database import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        sql = "SELECT id, scan_id, module FROM scan_results WHERE is_error = 0"
+        params: list[Any] = []
+        if scan_ids:
+            sql += f" AND scan_id IN ({', '.join('?' * len(scan_ids))})"
+            params = list(scan_ids)
+        candidates = [
+            (result_id, scan_id, module)
+            for result_id, scan_id, module in conn.execute(sql, params).fetchall()
+            if not os.path.exists(_export_path(scan_id, module))
+        ]
+        written = 0
+        with _export_lock:
+            for result_id, scan_id, module in candidates:
+                if os.path.exists(_export_path(scan_id, module)):
+                    continue
+                row = conn.execute(
+                    "SELECT content, encoding, dict_id FROM scan_results WHERE id = ?",
+                    (result_id,),
+                ).fetchone()
+                try:
+                    data = json.loads(decode_content(*row))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    continue
+                if export_module_result(scan_id, module, data):
+                    written += 1
+        return written
+    finally:
+        conn.close()
+
+
+# ──────────────────────────────────────────────
+# Queries
+# ──────────────────────────────────────────────
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def list_tables(scan_ids: Optional[list[str]] = None) -> dict[str, list[str]]:
+    """Map each exported module to the scans that have it (restricted to *scan_ids*)."""
+    tables: dict[str, list[str]] = {}
+    pattern = os.path.join(ANALYTICS_DIR, "scan_id=*", "*.parquet")
+    for path in sorted(glob.glob(pattern)):
+        scan_id = os.path.basename(os.path.dirname(path))[len("scan_id=") :]
+        if scan_ids and scan_id not in scan_ids:
+            continue
+        tables.setdefault(os.path.basename(path)[: -len(".parquet")], []).append(scan_id)
+    return tables
+
+
+def _view_names(modules: Iterable[str]) -> dict[str, str]:
+    """Map view name -> module: the full plugin name plus its unambiguous short class name."""
+    views = {module: module for module in modules}
+    short: dict[str, list[str]] = {}
+    for module in views:
+        short.setdefault(module.rsplit(".", 1)[-1].lower(), []).append(module)
+    for name, owners in short.items():
+        if len(owners) == 1 and name not in views:
+            views[name] = owners[0]
+    return views
+
+
+def _check_read_only(sql: str) -> None:
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as e:
+        raise QueryError(str(e)) from e
+    if len(statements) != 1:
+        raise QueryError("Exactly one SQL statement is allowed")
+    if statements[0].type.name not in _READ_ONLY_STATEMENTS:
+        raise QueryError("Only SELECT queries are allowed")
+
+
+def _connect(tables: dict[str, list[str]]) -> Any:
+    """In-memory DuckDB with one view per module, file access confined to ANALYTICS_DIR."""
+    conn = duckdb.connect(
+        config={"autoinstall_known_extensions": False, "autoload_known_extensions": False}
+    )
+    conn.execute(f"SET memory_limit = {_quote_literal(QUERY_MEMORY_LIMIT)}")
+    conn.execute(f"SET threads = {QUERY_THREADS}")
+    conn.execute(f"SET allowed_directories = [{_quote_literal(ANALYTICS_DIR + os.sep)}]")
+    conn.execute("SET enable_external_access = false")
+    for view, module in _view_names(tables).items():
+        files = ", ".join(_quote_literal(_export_path(s, module)) for s in tables[module])
+        conn.execute(
+            f"CREATE VIEW {_quote_ident(view)} AS SELECT * FROM read_parquet([{files}],"
+            " hive_partitioning = true, union_by_name = true)"
+        )
+    conn.execute("SET lock_configuration = true")
+    return conn
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return str(value)
+
+
+def run_query(sql: str, scan_ids: Optional[list[str]] = None, limit: int = 1000) -> dict[str, Any]:
+    """Run a read-only SQL query over the exported module outputs.
+
+    Every module is a view named after the plugin (``"windows.netscan.NetScan"``)
+    and, when unambiguous, its lower-cased class name (``netscan``); each view
+    has a ``scan_id`` column.  *scan_ids* restricts the views to those scans.
+    Returns columns, at most *limit* rows, a truncation flag and the elapsed time.
+    """
+    _check_read_only(sql)
+    if scan_ids:
+        ensure_exported(scan_ids)
+    limit = max(1, min(limit, MAX_QUERY_ROWS))
+    tables = list_tables(scan_ids)
+    started = time.monotonic()
+    conn = _connect(tables)
+    timer = threading.Timer(QUERY_TIMEOUT, conn.interrupt)
+    timer.start()
+    try:
+        cursor = conn.execute(sql)
+        columns = [d[0] for d in cursor.description or []]
+        rows = cursor.fetchmany(limit + 1)
+    except duckdb.InterruptException as e:
+        raise QueryError(f"Query exceeded the {QUERY_TIMEOUT:g}s time limit") from e
+    except duckdb.Error as e:
+        raise QueryError(str(e)) from e
+    finally:
+        timer.cancel()
+        conn.close()
+    return {
+        "columns": columns,
+        "rows": [[_jsonable(v) for v in row] for row in rows[:limit]],
+        "truncated": len(rows) > limit,
+        "tables": sorted(_view_names(tables)),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+
+
+def main() -> None:
+    """Command-line entry point: export every stored result that has no Parquet file."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if not export_available():
+        raise SystemExit("pyarrow is required for the columnar export")
+    # pylint: disable=import-outside-toplevel
+    from multivol.api_server.database import init_db
+
+    init_db()
+    print(f"Exported {ensure_exported()} module results to {ANALYTICS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
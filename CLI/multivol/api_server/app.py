@@ -7,14 +7,19 @@ import os
 import time
 import logging
 import sys
-from typing import Callable
+import threading
+from typing import Callable, Optional
 
-from flask import Flask, jsonify, Response
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
+from multivol.api_server.asgi import STREAMING_UPLOADS_KEY
 from multivol.api_server.auth_middleware import check_authorization
 from multivol.api_server.utils import cleanup_timeouts
 from multivol.api_server.database import init_db
-from multivol.api_server.config import ensure_dirs, check_env_warnings
+from multivol.api_server.http_compression import compress_response
+from multivol.api_server.config import ensure_dirs, check_env_warnings, UPLOAD_FOLDER
+from multivol.api_server.ioc import backfill_iocs
+from multivol.api_server.evidence import start_evidence_reconciler
 
 # Import Blueprints
 from multivol.api_server.routes.files import files_bp
@@ -23,6 +28,10 @@ from multivol.api_server.routes.scan import scan_bp, init_runner
 from multivol.api_server.routes.dump import dump_bp
 from multivol.api_server.routes.memprocfs import memprocfs_bp
 from multivol.api_server.routes.auth import auth_bp
+from multivol.api_server.routes.ioc import ioc_bp
+from multivol.api_server.routes.query import query_bp
+from multivol.api_server.routes.metrics import metrics_bp
+from multivol.api_server.routes.artifacts import artifacts_bp
 
 app = Flask(__name__)
 # Large dump uploads — set limit to 50 GB and stream to disk quickly.
@@ -40,7 +49,20 @@ CORS(
     resources={
         r"/*": {
             "origins": _cors_origins,
-            "allow_headers": ["Authorization", "Content-Type"],
+            "allow_headers": [
+                "Authorization",
+                "Content-Type",
+                "If-None-Match",
+                "Range",
+                "X-Chunk-SHA256",
+            ],
+            "expose_headers": [
+                "X-Total-Count",
+                "X-Next-Cursor",
+                "ETag",
+                "Accept-Ranges",
+                "Content-Range",
+            ],
         }
     },
 )
@@ -48,11 +70,23 @@ CORS(
 
 @app.route("/health", methods=["GET"])
 def health_check() -> Response:
-    """Return service liveness status and current timestamp."""
-    return jsonify({"status": "ok", "timestamp": time.time()})
+    """Return service liveness status, current timestamp and server capabilities.
+
+    ``streaming_uploads`` is true under the async server only: elsewhere the
+    body of ``PUT /upload/stream`` is buffered whole before extraction, and
+    clients should keep the resumable chunked upload.
+    """
+    return jsonify(
+        {
+            "status": "ok",
+            "timestamp": time.time(),
+            "streaming_uploads": bool(request.environ.get(STREAMING_UPLOADS_KEY)),
+        }
+    )
 
 
 app.before_request(check_authorization)
+app.after_request(compress_response)
 
 # Register Blueprints
 app.register_blueprint(files_bp)
@@ -61,10 +95,22 @@ app.register_blueprint(scan_bp)
 app.register_blueprint(dump_bp)
 app.register_blueprint(memprocfs_bp)
 app.register_blueprint(auth_bp)
-
-
-def run_api(runner_cb: Callable[[argparse.Namespace], None], debug_mode: bool = False) -> None:
-    """Start the API server. Binds runner_cb as the scan executor for /scan routes."""
+app.register_blueprint(ioc_bp)
+app.register_blueprint(query_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(artifacts_bp)
+
+
+def run_api(
+    runner_cb: Callable[[argparse.Namespace], None],
+    debug_mode: bool = False,
+    server: Optional[str] = None,
+) -> None:
+    """Start the API server. Binds runner_cb as the scan executor for /scan routes.
+
+    ``server`` selects the production server: "waitress" (default) or "async"
+    (see ``asgi``); it falls back to the API_SERVER environment variable.
+    """
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(message)s",
@@ -82,10 +128,18 @@ def run_api(runner_cb: Callable[[argparse.Namespace], None], debug_mode: bool =
 
     init_runner(runner_cb)
     cleanup_timeouts()  # Clean up stale tasks on startup
+    # Index indicators of results ingested before the IOC index existed
+    threading.Thread(target=backfill_iocs, daemon=True).start()
+    start_evidence_reconciler()
 
     if debug_mode:
         logging.info("Starting Flask in DEBUG mode...")
         app.run(host="0.0.0.0", port=5001, debug=True)  # nosec B201
+    elif (server or os.environ.get("API_SERVER", "waitress")) == "async":
+        from multivol.api_server.asgi import serve_async  # pylint: disable=import-outside-toplevel
+
+        logging.info("Starting async server (uvicorn) on port 5001...")
+        serve_async(app, host="0.0.0.0", port=5001, spool_dir=UPLOAD_FOLDER)  # nosec B104
     else:
         from waitress import serve  # pylint: disable=import-outside-toplevel
 
@@ -0,0 +1,386 @@
+"""SHA-256 of every recovered or dumped file, with content-addressed deduplication.
+
+RecoverFs trees, ``windows.dumpfiles`` outputs and the ``<case>_extracted``
+directories of file dumps often hold the same binaries many times over, both
+within a case and across cases.  ``submit_artifact_hashing`` hashes them in a
+pool of worker processes and records each one in the ``artifacts`` table,
+indexed by hash so a binary can be looked up across every case at once.
+
+File dumps are then deduplicated: the first copy of some content is
+hardlinked into ``ARTIFACT_STORE`` (``<sha256[:2]>/<sha256>``) and made
+read-only, and every later copy is replaced by a hardlink to that object.
+Only files whose writers replace them atomically (``os.replace``) may be
+linked, since writing through one name would change every copy; scan output
+directories are written in place by the Volatility containers (as root, so
+read-only modes do not stop them), and their files are hashed but not linked.
+Members of ``recovered_fs.zip`` are read straight at their offsets
+(``MemberReader``) and stay in the archive.  Files on another filesystem
+than the store are hashed and left as they are.
+"""
+
+import functools
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Optional
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.database import get_db_connection, run_write
+from multivol.api_server.recovered_archive import ARCHIVE_NAME, TARBALL_NAME, MemberReader
+from multivol.api_server.utils import StatKey, is_partial, partial_path, stat_key
+
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+ARTIFACT_STORE = os.environ.get("ARTIFACT_STORE", os.path.join(STORAGE_DIR, "cas"))
+HASH_BLOCK = 1 << 20
+# Rows queued per write transaction
+_WRITE_BATCH = 500
+# Scan outputs that are not artifacts (module results, logs, the RecoverFs archives)
+_OUTPUT_SKIP = (ARCHIVE_NAME, TARBALL_NAME, "scan.log")
+_OUTPUT_SKIP_SUFFIXES = ("_output.json", "_output.txt", ".sha256", ".tmp")
+
+# Sources whose files are only ever replaced atomically, so they can share an inode
+LINKABLE_SOURCES = ("dump",)
+STORE_MODE = 0o444
+
+# (path, member): member is the name inside recovered_fs.zip, '' for a loose file
+ArtifactKey = tuple[str, str]
+# Where a member's data lies: (header_offset, compress_size, file_size, compress_type)
+MemberLocation = tuple[int, int, int, int]
+# (path, member, source, location of the member or None)
+ArtifactJob = tuple[str, str, str, Optional[MemberLocation]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_running: set[str] = set()
+_running_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the shared hashing pool, (re)creating it when needed."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs waitress threads is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died so the next run starts a new one."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False)
+
+
+def _digest(stream) -> tuple[str, int]:
+    sha256 = hashlib.sha256()
+    size = 0
+    while block := stream.read(HASH_BLOCK):
+        sha256.update(block)
+        size += len(block)
+    return sha256.hexdigest(), size
+
+
+def hash_artifact(
+    path: str, member: str = "", location: Optional[MemberLocation] = None
+) -> Optional[tuple[str, int]]:
+    """Worker process: SHA-256 and size of a file or of an archive *member*; None if unreadable.
+
+    A member with a *location* is read at its offset, without parsing the
+    archive's central directory again.
+    """
+    try:
+        if member and location and location[3] in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            with MemberReader(path, *location) as f:
+                return _digest(f)
+        if member:
+            with zipfile.ZipFile(path) as zf, zf.open(member) as f:
+                return _digest(f)
+        with open(path, "rb") as f:
+            return _digest(f)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile, zlib.error) as e:
+        logging.warning("Cannot hash %s%s: %s", path, f"!{member}" if member else "", e)
+        return None
+
+
+def _walk_files(root: str) -> list[str]:
+    files = []
+    for dir_path, _, names in os.walk(root):
+        files.extend(os.path.join(dir_path, name) for name in names)
+    return files
+
+
+def collect_artifacts(output_dir: Optional[str], case_name: Optional[str]) -> list[ArtifactJob]:
+    """Every artifact of a scan: its dumped files, recovered files and file dumps."""
+    jobs: list[ArtifactJob] = []
+    if output_dir and os.path.isdir(output_dir):
+        for entry in os.scandir(output_dir):
+            if entry.is_file(follow_symlinks=False) and not (
+                entry.name in _OUTPUT_SKIP or entry.name.endswith(_OUTPUT_SKIP_SUFFIXES)
+            ):
+                jobs.append((entry.path, "", "output", None))
+        extract_dir = os.path.join(output_dir, "recovered_fs")
+        jobs.extend((path, "", "recovered_fs", None) for path in _walk_files(extract_dir))
+        zip_path = os.path.join(output_dir, ARCHIVE_NAME)
+        if os.path.isfile(zip_path):
+            try:
+                with zipfile.ZipFile(zip_path) as zf:
+                    jobs.extend(
+                        (
+                            zip_path,
+                            info.filename,
+                            "recovered_fs",
+                            (
+                                info.header_offset,
+                                info.compress_size,
+                                info.file_size,
+                                info.compress_type,
+                            ),
+                        )
+                        for info in zf.infolist()
+                        if not info.is_dir()
+                    )
+            except (OSError, zipfile.BadZipFile):
+                logging.warning("Cannot list %s", zip_path)
+    if case_name:
+        dump_dir = os.path.join(STORAGE_DIR, f"{case_name}_extracted")
+        jobs.extend(
+            (path, "", "dump", None)
+            for path in _walk_files(dump_dir)
+            if not (path.endswith(".sha256") or is_partial(os.path.basename(path)))
+        )
+    return jobs
+
+
+def store_path(sha256: str) -> str:
+    """Location of the content-addressed object for *sha256*."""
+    return os.path.join(ARTIFACT_STORE, sha256[:2], sha256)
+
+
+def deduplicate(path: str, sha256: str, expected: Optional[StatKey] = None) -> bool:
+    """Share *path*'s content with the store object of *sha256* through a hardlink.
+
+    The first copy becomes the store object and is made read-only (a mode
+    shared by every link); any other copy is atomically replaced by a link to
+    it.  Only call this for files that are never rewritten in place.
+
+    *expected* is the ``StatKey`` *path* had when it was hashed: the inode is
+    pinned under a partial name and compared with it, and nothing is linked
+    when *path* was replaced or modified since.  Returns True when *path* is
+    linked to the store.
+    """
+    target = store_path(sha256)
+    tmp = partial_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.link(path, tmp)
+        if expected is not None and stat_key(tmp) != expected:
+            logging.info("%s changed since it was hashed; not deduplicating", path)
+            return False
+        try:
+            os.link(tmp, target)
+            os.chmod(target, STORE_MODE)
+            return True
+        except FileExistsError:
+            pass
+        if os.path.samefile(tmp, target):
+            return True
+        if os.path.getsize(tmp) != os.path.getsize(target):
+            logging.warning("Size mismatch between %s and store object %s", path, target)
+            return False
+        os.remove(tmp)
+        os.link(target, tmp)
+        if expected is not None and stat_key(path) != expected:
+            logging.info("%s changed since it was hashed; not deduplicating", path)
+            return False
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        # EXDEV (another filesystem), EPERM (no hardlinks), ...
+        logging.debug("Not deduplicating %s: %s", path, e)
+        return False
+    finally:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+
+
+def prune_store(hashes: Optional[Iterable[str]] = None) -> int:
+    """Remove store objects no file links to any more; returns how many.
+
+    Only the objects of *hashes* are checked when given, else the whole store.
+    """
+    if hashes is None:
+        paths: Iterable[str] = _walk_files(ARTIFACT_STORE)
+    else:
+        paths = (store_path(sha256) for sha256 in hashes)
+    removed = 0
+    for path in paths:
+        try:
+            if os.stat(path).st_nlink == 1:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _write_sidecar(path: str, sha256: str) -> None:
+    try:
+        with open(path + ".sha256", "w", encoding="utf-8") as f:
+            f.write(sha256)
+    except OSError as e:
+        logging.warning("Could not write hash cache for %s: %s", path, e)
+
+
+def _store_rows(c: sqlite3.Cursor, rows: list[tuple]) -> None:
+    """Queued write: upsert hashed artifacts."""
+    c.executemany(
+        "INSERT OR REPLACE INTO artifacts"
+        " (path, member, scan_id, source, sha256, size, mtime, stored, hashed_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _forget(c: sqlite3.Cursor, scan_id: str, keys: list[ArtifactKey]) -> None:
+    """Queued write: drop artifacts of *scan_id* that no longer exist."""
+    c.executemany(
+        "DELETE FROM artifacts WHERE scan_id = ? AND path = ? AND member = ?",
+        ((scan_id, path, member) for path, member in keys),
+    )
+
+
+def hash_scan_artifacts(scan_id: str) -> int:
+    """Hash, record and deduplicate the new or changed artifacts of *scan_id*.
+
+    Blocks until done; returns the number of artifacts hashed.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT output_dir, name FROM scans WHERE uuid = ?", (scan_id,))
+        scan = c.fetchone()
+        if not scan:
+            return 0
+        c.execute("SELECT path, member, size, mtime FROM artifacts WHERE scan_id = ?", (scan_id,))
+        known = {(path, member): (size, mtime) for path, member, size, mtime in c.fetchall()}
+    finally:
+        conn.close()
+
+    jobs = collect_artifacts(scan[0], scan[1])
+    pending: list[ArtifactJob] = []
+    keys: dict[ArtifactKey, StatKey] = {}
+    stats: dict[str, os.stat_result] = {}
+    for path, member, source, location in jobs:
+        try:
+            st = stats[path] if path in stats else os.stat(path)
+        except OSError:
+            continue
+        if member:
+            stats[path] = st  # one stat per archive
+        # Unchanged since the last run: same mtime, and same size for loose files
+        previous = known.get((path, member))
+        if previous and previous[1] == st.st_mtime and (member or previous[0] == st.st_size):
+            continue
+        pending.append((path, member, source, location))
+        keys[path, member] = (st.st_ino, st.st_size, st.st_mtime)
+    gone = set(known) - {(path, member) for path, member, _, _ in jobs}
+    if gone:
+        run_write(functools.partial(_forget, scan_id=scan_id, keys=sorted(gone)))
+    if not pending:
+        return 0
+
+    started = time.perf_counter()
+    executor = _get_executor()
+    rows: list[tuple] = []
+    linked = reclaimed = 0
+    try:
+        digests = executor.map(
+            hash_artifact,
+            [path for path, _, _, _ in pending],
+            [member for _, member, _, _ in pending],
+            [location for _, _, _, location in pending],
+            chunksize=64,
+        )
+        for (path, member, source, _), digest in zip(pending, digests):
+            if digest is None:
+                continue
+            sha256, size = digest
+            stored = False
+            before = keys[path, member]
+            mtime = before[2]
+            if not member:
+                # Replaced, modified or deleted while it was hashed: retried next run
+                if stat_key(path) != before:
+                    logging.debug("%s changed while being hashed; skipped", path)
+                    continue
+                if source in LINKABLE_SOURCES:
+                    stored = deduplicate(path, sha256, before)
+                    if stored:
+                        # Lets evidence deletes find the store object once the scan is gone
+                        _write_sidecar(path, sha256)
+                    after = stat_key(path)
+                    if after is None:
+                        continue
+                    if after[0] != before[0]:
+                        linked += 1
+                        reclaimed += size
+                    mtime = after[2]
+            rows.append((path, member, scan_id, source, sha256, size, mtime, stored, time.time()))
+            if len(rows) >= _WRITE_BATCH:
+                run_write(functools.partial(_store_rows, rows=rows))
+                rows = []
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+    finally:
+        if rows:
+            run_write(functools.partial(_store_rows, rows=rows))
+    logging.info(
+        "Hashed %d artifacts of scan %s in %.1fs; %d duplicates linked (%d bytes reclaimed)",
+        len(pending),
+        scan_id,
+        time.perf_counter() - started,
+        linked,
+        reclaimed,
+    )
+    return len(pending)
+
+
+def _run(scan_id: str) -> None:
+    try:
+        hash_scan_artifacts(scan_id)
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("Artifact hashing failed for scan %s", scan_id)
+    finally:
+        with _running_lock:
+            _running.discard(scan_id)
+
+
+def submit_artifact_hashing(scan_id: str) -> bool:
+    """Hash the artifacts of *scan_id* in the background; False if a run is in progress."""
+    with _running_lock:
+        if scan_id in _running:
+            return False
+        _running.add(scan_id)
+    threading.Thread(target=_run, args=(scan_id,), daemon=True).start()
+    return True
+
+
+def is_hashing(scan_id: str) -> bool:
+    """Whether a hashing run for *scan_id* is in progress."""
+    with _running_lock:
+        return scan_id in _running
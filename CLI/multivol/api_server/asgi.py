@@ -0,0 +1,336 @@
+"""Async server mode: the Flask app behind an ASGI adapter that does not pin threads.
+
+Under waitress every connection holds one of its ten threads for as long as
+it lasts, so a few multi-GB uploads, slow downloads or sidecar proxies can
+starve ``/health`` and the fast JSON routes.  ``AsyncWSGIAdapter`` runs on an
+asyncio server (uvicorn) and only borrows a worker thread while Flask is
+actually computing:
+
+* request bodies are received asynchronously (spooled to disk above
+  ``SPOOL_THRESHOLD``, in ``SPOOL_WRITE_SIZE`` writes made from the pool, never
+  from the event loop) before the view runs, so an upload trickling in over
+  a VPN holds no thread.  Routes under ``STREAMED_PATHS`` are the exception:
+  their view reads the body while it arrives (streaming archive extraction),
+  holding its thread for the length of the upload;
+* response bodies are pulled one chunk at a time from a bounded pool and
+  written by the event loop, so a slow client holds no thread between chunks
+  (ZIP and NDJSON streams, ``send_file`` downloads, the MemProcFS proxy).
+
+Bulk requests (uploads, downloads, streams, the MemProcFS proxy and ad-hoc
+queries, see ``_is_bulk``) run in a pool of ``WSGI_WORKERS`` threads; every
+other route, ``/health`` included, in a separate pool of ``FAST_WORKERS``, so
+saturating the first never delays the second.
+
+Every request's environ carries ``STREAMING_UPLOADS_KEY``, which ``/health``
+reports so clients only use the streamed upload routes under this server.
+Route code is otherwise unchanged.  Start it with ``multivol --api --server async`` (or
+``API_SERVER=async``); it needs the optional ``uvicorn`` package.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+try:
+    import uvicorn
+except ImportError:  # optional dependency: only needed for --server async
+    uvicorn = None
+
+WSGI_WORKERS = int(os.environ.get("WSGI_WORKERS", "16"))
+# Threads serving the routes that are not bulk transfers
+FAST_WORKERS = int(os.environ.get("WSGI_FAST_WORKERS", "4"))
+# Request bodies larger than this are spooled to a temp file instead of memory
+SPOOL_THRESHOLD = 1024 * 1024
+# Received body data is written to the spool file in pieces of about this size
+SPOOL_WRITE_SIZE = 1024 * 1024
+FILE_BLOCK_SIZE = 256 * 1024
+MAX_BODY_SIZE = 53_687_091_200  # 50 GB, as under waitress
+# Views that consume their request body as it is received instead of after it
+STREAMED_PATHS = ("/upload/stream/",)
+# Routes served from the bulk pool, besides streamed paths and spooled request bodies
+BULK_PREFIXES = ("/memprocfs/", "/query")
+BULK_SUFFIXES = ("/download", "/stream", "/fs/view")
+# WSGI environ key set by the adapter: request bodies under STREAMED_PATHS arrive live
+STREAMING_UPLOADS_KEY = "multivol.streaming_uploads"
+
+_END = object()
+
+
+class _BodyTooLarge(Exception):
+    """A request body without Content-Length outgrew ``max_body``."""
+
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class _StreamingBody(io.RawIOBase):
+    """``wsgi.input`` fed by the event loop's ``receive`` while the view reads it."""
+
+    def __init__(self, receive: Receive, loop: asyncio.AbstractEventLoop, max_body: int) -> None:
+        super().__init__()
+        self._receive = receive
+        self._loop = loop
+        self._max_body = max_body
+        self._buffer = b""
+        self._received = 0
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next_message(self) -> dict[str, Any]:
+        return await self._receive()
+
+    def readinto(self, b: Any) -> int:
+        while not self._buffer and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._next_message(), self._loop).result()
+            if message["type"] == "http.disconnect":
+                raise ConnectionError("Client disconnected during the request body")
+            self._buffer = message.get("body", b"")
+            self._received += len(self._buffer)
+            if self._received > self._max_body:
+                raise OSError("Request body too large")
+            self._done = not message.get("more_body", False)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class _FileWrapper:
+    """``wsgi.file_wrapper`` reading large blocks, so downloads need fewer pool hops."""
+
+    def __init__(self, filelike: Any, block_size: int = FILE_BLOCK_SIZE) -> None:
+        self.filelike = filelike
+        self.block_size = max(block_size, FILE_BLOCK_SIZE)
+
+    def __iter__(self) -> "_FileWrapper":
+        return self
+
+    def __next__(self) -> bytes:
+        data = self.filelike.read(self.block_size)
+        if not data:
+            raise StopIteration
+        return data
+
+    def close(self) -> None:
+        """Close the wrapped file."""
+        self.filelike.close()
+
+
+def _is_bulk(path: str, length: int) -> bool:
+    """Whether a request may hold its thread long: a large body, a download or a stream."""
+    return (
+        length > SPOOL_THRESHOLD
+        or path.startswith(STREAMED_PATHS + BULK_PREFIXES)
+        or path.endswith(BULK_SUFFIXES)
+    )
+
+
+class AsyncWSGIAdapter:
+    """ASGI application serving a WSGI app from two bounded thread pools (bulk and fast)."""
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        workers: int = WSGI_WORKERS,
+        spool_dir: Optional[str] = None,
+        max_body: int = MAX_BODY_SIZE,
+        fast_workers: int = FAST_WORKERS,
+    ) -> None:
+        self.wsgi_app = wsgi_app
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wsgi")
+        self.fast_pool = ThreadPoolExecutor(
+            max_workers=fast_workers, thread_name_prefix="wsgi-fast"
+        )
+        self.spool_dir = spool_dir
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.pool.shutdown(wait=False)
+                self.fast_pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _spool_file(self) -> Any:
+        return tempfile.TemporaryFile(dir=self.spool_dir)  # pylint: disable=consider-using-with
+
+    async def _read_body(self, receive: Receive, length: int) -> Optional[Any]:
+        """Receive the whole request body; returns a readable file, or None on disconnect.
+
+        Chunks are kept in memory until SPOOL_THRESHOLD; past it they are
+        written to a temp file from the bulk pool, SPOOL_WRITE_SIZE at a time.
+        """
+        loop = asyncio.get_running_loop()
+        pending: list[bytes] = []
+        buffered = received = 0
+        spooled: Any = None
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    if spooled is not None:
+                        spooled.close()
+                    return None
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                if received > self.max_body:
+                    raise _BodyTooLarge
+                if chunk:
+                    pending.append(chunk)
+                    buffered += len(chunk)
+                more = message.get("more_body", False)
+                if spooled is None and max(length, buffered) > SPOOL_THRESHOLD:
+                    spooled = await loop.run_in_executor(self.pool, self._spool_file)
+                if spooled is not None and pending and (buffered >= SPOOL_WRITE_SIZE or not more):
+                    data = b"".join(pending)
+                    pending.clear()
+                    buffered = 0
+                    await loop.run_in_executor(self.pool, spooled.write, data)
+                if not more:
+                    break
+        except BaseException:
+            if spooled is not None:
+                spooled.close()
+            raise
+        if spooled is None:
+            return io.BytesIO(b"".join(pending))
+        await loop.run_in_executor(self.pool, spooled.seek, 0)
+        return spooled
+
+    def _environ(self, scope: Scope, body: Any) -> dict[str, Any]:
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "wsgi.file_wrapper": _FileWrapper,
+            STREAMING_UPLOADS_KEY: True,
+        }
+        for raw_name, raw_value in scope["headers"]:
+            name = raw_name.decode("latin-1").upper().replace("-", "_")
+            value = raw_value.decode("latin-1")
+            if name in ("CONTENT_LENGTH", "CONTENT_TYPE"):
+                environ[name] = value
+                continue
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _start(self, environ: dict[str, Any]) -> tuple[int, list, Iterable[bytes]]:
+        """Worker thread: run the view and return status, headers and the body iterable."""
+        started: dict[str, Any] = {}
+
+        def start_response(status: str, headers: list, exc_info: Any = None) -> Callable:
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers
+            ]
+            return lambda data: None  # legacy write() callable is not supported
+
+        body = self.wsgi_app(environ, start_response)
+        return started["status"], started["headers"], body
+
+    async def _simple(self, send: Send, status: int, text: bytes) -> None:
+        headers = [(b"content-type", b"text/plain"), (b"content-length", str(len(text)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": text})
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        length = 0
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit():
+                length = int(value)
+        loop = asyncio.get_running_loop()
+        streamed = scope["path"].startswith(STREAMED_PATHS)
+        pool = self.pool if _is_bulk(scope["path"], length) else self.fast_pool
+        try:
+            if length > self.max_body:
+                raise _BodyTooLarge
+            if streamed:
+                body = io.BufferedReader(
+                    _StreamingBody(receive, loop, self.max_body), FILE_BLOCK_SIZE
+                )
+            else:
+                body = await self._read_body(receive, length)
+        except _BodyTooLarge:
+            await self._simple(send, 413, b"Request Entity Too Large")
+            return
+        if body is None:
+            return
+        environ = self._environ(scope, body)
+        if streamed:
+            environ["wsgi.input_terminated"] = True
+        try:
+            status, headers, iterable = await loop.run_in_executor(pool, self._start, environ)
+        except Exception:  # pylint: disable=broad-except
+            body.close()
+            logging.exception("Unhandled error in %s %s", scope["method"], scope["path"])
+            await self._simple(send, 500, b"Internal Server Error")
+            return
+
+        chunks = iter(iterable)
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            if scope["method"] != "HEAD":
+                while True:
+                    chunk = await loop.run_in_executor(pool, next, chunks, _END)
+                    if chunk is _END:
+                        break
+                    if chunk:
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        except OSError:
+            logging.debug("Client went away during %s %s", scope["method"], scope["path"])
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                await loop.run_in_executor(pool, close)
+            body.close()
+
+
+def serve_async(wsgi_app: Callable, host: str, port: int, spool_dir: Optional[str] = None) -> None:
+    """Serve *wsgi_app* through AsyncWSGIAdapter on uvicorn."""
+    if uvicorn is None:
+        raise RuntimeError("The async server mode needs the optional 'uvicorn' package")
+    uvicorn.run(
+        AsyncWSGIAdapter(wsgi_app, spool_dir=spool_dir),
+        host=host,
+        port=port,
+        timeout_keep_alive=75,
+        log_level="info",
+    )
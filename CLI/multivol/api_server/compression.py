@@ -0,0 +1,305 @@
+"""Compressed storage of module results (zstd with per-plugin dictionaries).
+
+Module outputs repeat the same keys, offsets and paths row after row, so
+``scan_results.content`` is stored zstd-compressed when the optional
+``zstandard`` package is available.  Each plugin gets its own trained
+dictionary (table ``zstd_dictionaries``); a result records the ``encoding``
+and ``dict_id`` it was written with, and plain JSON rows (``encoding`` NULL)
+remain readable forever.
+
+Readers decode with ``decode_content`` in Python, or in SQL through the
+``result_json(content, encoding, dict_id)`` function that every pooled
+connection registers, so JSON1 queries keep working on compressed rows.
+
+Existing databases are converted with the one-shot job::
+
+    python -m multivol.api_server.compression [--vacuum]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional dependency: results are then stored as plain JSON
+    zstandard = None
+
+ENCODING_ZSTD = "zstd"
+COMPRESSION_LEVEL = int(os.environ.get("RESULT_ZSTD_LEVEL", "3"))
+# Results smaller than this are stored as plain JSON (frame overhead outweighs the gain)
+MIN_COMPRESS_SIZE = 1024
+DICT_SIZE = 112640  # zstd's default dictionary size (110 KiB)
+# Training input per plugin: at most this many results and bytes of sample rows
+TRAIN_MAX_RESULTS = 200
+TRAIN_MAX_BYTES = 100 * DICT_SIZE
+# How long a "no dictionary for this plugin" lookup is cached
+_MISS_TTL = 60.0
+
+_local = threading.local()
+_dictionaries: dict[int, Any] = {}
+_plugin_dicts: dict[str, tuple[Optional[int], float]] = {}
+_cache_lock = threading.Lock()
+
+
+def compression_enabled() -> bool:
+    """True when new results should be stored compressed."""
+    return zstandard is not None and os.environ.get("RESULT_COMPRESSION", "1") != "0"
+
+
+def _load_dictionary(dict_id: int) -> Any:
+    """Return the ZstdCompressionDict with id *dict_id* (cached; dictionaries never change)."""
+    found = _dictionaries.get(dict_id)
+    if found is not None:
+        return found
+    from multivol.api_server.database import get_db_connection  # pylint: disable=import-outside-toplevel
+
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT data FROM zstd_dictionaries WHERE id = ?", (dict_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise ValueError(f"zstd dictionary {dict_id} is missing")
+    found = zstandard.ZstdCompressionDict(row[0])
+    with _cache_lock:
+        _dictionaries[dict_id] = found
+    return found
+
+
+def dictionary_for(plugin: str) -> Optional[int]:
+    """Return the id of the newest dictionary trained for *plugin*, if any."""
+    cached = _plugin_dicts.get(plugin)
+    if cached and (cached[0] is not None or cached[1] > time.monotonic()):
+        return cached[0]
+    from multivol.api_server.database import get_db_connection  # pylint: disable=import-outside-toplevel
+
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT MAX(id) FROM zstd_dictionaries WHERE plugin = ?", (plugin,)
+        ).fetchone()
+    finally:
+        conn.close()
+    dict_id = row[0] if row else None
+    with _cache_lock:
+        _plugin_dicts[plugin] = (dict_id, time.monotonic() + _MISS_TTL)
+    return dict_id
+
+
+def _compressor(dict_id: Optional[int]) -> Any:
+    """Per-thread compressor for *dict_id* (zstd contexts are not thread-safe)."""
+    cache = _local.__dict__.setdefault("compressors", {})
+    cctx = cache.get(dict_id)
+    if cctx is None:
+        dict_data = _load_dictionary(dict_id) if dict_id else None
+        cctx = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dict_data)
+        cache[dict_id] = cctx
+    return cctx
+
+
+def _decompressor(dict_id: Optional[int]) -> Any:
+    """Per-thread decompressor for *dict_id*."""
+    cache = _local.__dict__.setdefault("decompressors", {})
+    dctx = cache.get(dict_id)
+    if dctx is None:
+        dict_data = _load_dictionary(dict_id) if dict_id else None
+        dctx = zstandard.ZstdDecompressor(dict_data=dict_data)
+        cache[dict_id] = dctx
+    return dctx
+
+
+def encode_content(
+    plugin: str, content: str
+) -> tuple[Union[str, bytes], Optional[str], Optional[int]]:
+    """Return ``(stored_value, encoding, dict_id)`` for a serialised result.
+
+    Falls back to the plain JSON text when compression is disabled or the
+    result is too small to benefit.
+    """
+    if not compression_enabled() or len(content) < MIN_COMPRESS_SIZE:
+        return content, None, None
+    dict_id = dictionary_for(plugin)
+    return _compressor(dict_id).compress(content.encode("utf-8")), ENCODING_ZSTD, dict_id
+
+
+def decode_content(
+    content: Union[str, bytes, None], encoding: Optional[str], dict_id: Optional[int]
+) -> Optional[str]:
+    """Return the JSON text of a stored result, decompressing when needed.
+
+    Raises ValueError for an unknown encoding or a corrupt compressed blob.
+    """
+    if content is None or not encoding:
+        return content.decode("utf-8") if isinstance(content, bytes) else content
+    if encoding != ENCODING_ZSTD:
+        raise ValueError(f"Unknown result encoding {encoding!r}")
+    if zstandard is None:
+        raise RuntimeError("The zstandard package is required to read compressed results")
+    try:
+        return _decompressor(dict_id).decompress(content).decode("utf-8")
+    except zstandard.ZstdError as e:
+        raise ValueError(f"Corrupt compressed result: {e}") from e
+
+
+def load_result(row: Any) -> Optional[str]:
+    """Decode the ``content, encoding, dict_id`` columns of a scan_results row."""
+    return decode_content(row["content"], row["encoding"], row["dict_id"])
+
+
+def register_sql_functions(conn: sqlite3.Connection) -> None:
+    """Expose ``result_json(content, encoding, dict_id)`` to SQL on *conn*."""
+    conn.create_function("result_json", 3, decode_content, deterministic=True)
+
+
+# ──────────────────────────────────────────────
+# One-shot dictionary training and recompression
+# ──────────────────────────────────────────────
+
+
+def _training_samples(conn: sqlite3.Connection, plugin: str) -> list[bytes]:
+    """Collect per-row JSON samples from stored results of *plugin*."""
+    samples: list[bytes] = []
+    total = 0
+    rows = conn.execute(
+        "SELECT content, encoding, dict_id FROM scan_results WHERE module = ?"
+        " ORDER BY id DESC LIMIT ?",
+        (plugin, TRAIN_MAX_RESULTS),
+    )
+    for content, encoding, dict_id in rows:
+        try:
+            data = json.loads(decode_content(content, encoding, dict_id) or "null")
+        except (json.JSONDecodeError, ValueError):
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            sample = json.dumps(item).encode("utf-8")
+            samples.append(sample)
+            total += len(sample)
+            if total >= TRAIN_MAX_BYTES:
+                return samples
+    return samples
+
+
+def train_dictionary(conn: sqlite3.Connection, plugin: str) -> Optional[int]:
+    """Train and store a dictionary for *plugin*; returns its id, or None if too little data."""
+    samples = _training_samples(conn, plugin)
+    try:
+        trained = zstandard.train_dictionary(DICT_SIZE, samples)
+    except zstandard.ZstdError as e:
+        logging.info("Not enough samples to train a dictionary for %s: %s", plugin, e)
+        return None
+    cur = conn.execute(
+        "INSERT INTO zstd_dictionaries (plugin, data, sample_count, created_at)"
+        " VALUES (?, ?, ?, ?)",
+        (plugin, trained.as_bytes(), len(samples), time.time()),
+    )
+    conn.commit()
+    with _cache_lock:
+        _plugin_dicts.pop(plugin, None)
+    return cur.lastrowid
+
+
+def recompress_database(train: bool = True) -> dict[str, dict[str, Any]]:
+    """Re-encode every stored result with its plugin's current dictionary.
+
+    Trains a dictionary per plugin first (when *train* is set), then rewrites
+    each result whose encoding or dictionary is out of date.  Returns a per
+    plugin report of result count, uncompressed and stored bytes and ratio.
+    """
+    if zstandard is None:
+        raise RuntimeError("The zstandard package is required to compress results")
+    from multivol.api_server.database import get_db_connection  # pylint: disable=import-outside-toplevel
+
+    conn = get_db_connection()
+    try:
+        plugins = [r[0] for r in conn.execute("SELECT DISTINCT module FROM scan_results")]
+        for plugin in plugins:
+            dict_id = train_dictionary(conn, plugin) if train else dictionary_for(plugin)
+            if dict_id is None:
+                dict_id = dictionary_for(plugin)
+            pending = conn.execute(
+                "SELECT id FROM scan_results WHERE module = ?"
+                " AND (encoding IS NULL OR dict_id IS NOT ?)",
+                (plugin, dict_id),
+            ).fetchall()
+            for (result_id,) in pending:
+                row = conn.execute(
+                    "SELECT content, encoding, dict_id FROM scan_results WHERE id = ?",
+                    (result_id,),
+                ).fetchone()
+                text = decode_content(*row)
+                if text is None or len(text) < MIN_COMPRESS_SIZE:
+                    continue
+                blob = _compressor(dict_id).compress(text.encode("utf-8"))
+                conn.execute(
+                    "UPDATE scan_results SET content = ?, encoding = ?, dict_id = ?, size = ?"
+                    " WHERE id = ?",
+                    (blob, ENCODING_ZSTD, dict_id, len(text), result_id),
+                )
+                conn.commit()
+        return compression_report(conn)
+    finally:
+        conn.close()
+
+
+def compression_report(conn: sqlite3.Connection) -> dict[str, dict[str, Any]]:
+    """Per-plugin result count, uncompressed bytes, stored bytes and compression ratio."""
+    report = {}
+    rows = conn.execute(
+        "SELECT module, COUNT(*), SUM(IFNULL(size, length(content))),"
+        " SUM(length(CAST(content AS BLOB)))"
+        " FROM scan_results GROUP BY module ORDER BY module"
+    )
+    for module, count, raw, stored in rows:
+        raw, stored = raw or 0, stored or 0
+        report[module] = {
+            "results": count,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "ratio": round(raw / stored, 2) if stored else None,
+        }
+    return report
+
+
+def main() -> None:
+    """Command-line entry point for the recompression job."""
+    parser = argparse.ArgumentParser(description="Recompress stored scan results with zstd.")
+    parser.add_argument(
+        "--no-train", action="store_true", help="Reuse existing dictionaries instead of training"
+    )
+    parser.add_argument(
+        "--vacuum", action="store_true", help="VACUUM afterwards to return freed pages to the OS"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    from multivol.api_server.database import get_db_connection, init_db  # pylint: disable=import-outside-toplevel
+
+    init_db()
+    report = recompress_database(train=not args.no_train)
+    total_raw = sum(r["raw_bytes"] for r in report.values())
+    total_stored = sum(r["stored_bytes"] for r in report.values())
+    print(f"{'module':48} {'results':>8} {'raw MB':>10} {'stored MB':>10} {'ratio':>7}")
+    for module, r in report.items():
+        print(
+            f"{module:48} {r['results']:8} {r['raw_bytes'] / 1e6:10.1f}"
+            f" {r['stored_bytes'] / 1e6:10.1f} {r['ratio'] or 0:7.2f}"
+        )
+    if total_stored:
+        print(
+            f"{'total':48} {'':8} {total_raw / 1e6:10.1f} {total_stored / 1e6:10.1f}"
+            f" {total_raw / total_stored:7.2f}"
+        )
+    if args.vacuum:
+        conn = get_db_connection()
+        conn.execute("VACUUM")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,243 @@
-"""SQLite database connection and schema initialisation."""
+"""SQLite database connection and schema initialisation.
 
+Connections come from a small per-database pool; ``close()`` returns them to
+the pool.  Writes that must not contend for the SQLite write lock on request
+or worker threads go through ``submit_write``, which hands them to a single
+writer thread that applies them in batched transactions.
+"""
+
+import atexit
 import sqlite3
 import os
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
 from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.compression import register_sql_functions
+
+# Idle connections kept per database file (waitress runs 10 threads plus workers)
+POOL_SIZE = 16
+# Maximum number of queued writes applied in one transaction
+WRITE_BATCH_SIZE = 256
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",  # durable across application crashes under WAL
+    "PRAGMA busy_timeout=30000",
+    "PRAGMA mmap_size=268435456",  # 256 MiB of the file mapped for readers
+    "PRAGMA cache_size=-16384",  # 16 MiB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Connection whose ``close()`` hands it back to its pool."""
+
+    pool: Optional["_ConnectionPool"] = None
+    idle = False
+
+    def close(self) -> None:
+        if self.pool is None:
+            super().close()
+        elif not self.idle:
+            self.pool.release(self)
+
+
+class _ConnectionPool:
+    """LIFO pool of open connections to one database file."""
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+
+    def _connect(self) -> _PooledConnection:
+        conn = sqlite3.connect(
+            self.path, timeout=30.0, check_same_thread=False, factory=_PooledConnection
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        register_sql_functions(conn)
+        conn.pool = self
+        return conn
+
+    def acquire(self) -> _PooledConnection:
+        """Return an idle connection, opening a new one when none is available."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+        conn.idle = False
+        return conn
+
+    def release(self, conn: _PooledConnection) -> None:
+        """Reset *conn* and keep it for reuse, or close it when the pool is full."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            sqlite3.Connection.close(conn)
+            return
+        conn.row_factory = None
+        if self._idle.qsize() >= self.size:
+            sqlite3.Connection.close(conn)
+            return
+        conn.idle = True
+        self._idle.put(conn)
+
+
+_pools: dict[str, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
 
 
 def get_db_connection() -> sqlite3.Connection:
-    """Open and return a SQLite connection to the scans database."""
+    """Return a pooled SQLite connection to the scans database.
+
+    Call ``close()`` when done; uncommitted changes are rolled back and the
+    connection is returned to the pool.
+    """
     db_path = os.path.join(STORAGE_DIR, "scans.db")
-    conn = sqlite3.connect(db_path, timeout=30.0)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(db_path, _ConnectionPool(db_path, POOL_SIZE))
+    return pool.acquire()
 
 
-def init_db() -> None:
-    """Create all required tables and run schema migrations."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    # Create tables
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    """True when *exc* means another connection holds the lock (worth retrying)."""
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+class _Writer:
+    """Single background thread applying queued writes in batched transactions.
+
+    Each write is a callable receiving a cursor; it runs inside its own
+    savepoint so a failing write only rolls back itself.  When the database is
+    busy the whole batch is retried, so a queued write is never dropped; any
+    other error fails the batch's futures.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.SimpleQueue[tuple[Callable[[sqlite3.Cursor], Any], Future]]" = (
+            queue.SimpleQueue()
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        """True once the writer thread has been started."""
+        return self._thread is not None
+
+    def submit(self, op: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """Queue *op* and return a Future resolving to its return value."""
+        future: Future = Future()
+        self._queue.put((op, future))
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                    self._thread.start()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+
+    def _apply(self, batch: list[tuple[Callable[[sqlite3.Cursor], Any], Future]]) -> None:
+        delay = 0.05
+        while True:
+            conn = get_db_connection()
+            try:
+                outcomes = self._apply_once(conn, batch)
+                break
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    # Disk full, I/O or schema errors: retrying would stall every writer
+                    logging.exception("Could not apply %d queued writes", len(batch))
+                    outcomes = [(False, e)] * len(batch)
+                    break
+                logging.warning("Database busy, retrying %d queued writes: %s", len(batch), e)
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+            except Exception as e:  # pylint: disable=broad-except
+                logging.exception("Could not apply %d queued writes", len(batch))
+                outcomes = [(False, e)] * len(batch)
+                break
+            finally:
+                conn.close()
+        for (_op, future), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    def _apply_once(
+        conn: sqlite3.Connection, batch: list[tuple[Callable[[sqlite3.Cursor], Any], Future]]
+    ) -> list[tuple[bool, Any]]:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        outcomes: list[tuple[bool, Any]] = []
+        for op, _future in batch:
+            c.execute("SAVEPOINT queued_write")
+            try:
+                value = op(c)
+            except sqlite3.OperationalError as e:
+                if _is_busy(e):
+                    raise
+                c.execute("ROLLBACK TO queued_write")
+                outcomes.append((False, e))
+            except Exception as e:  # pylint: disable=broad-except
+                c.execute("ROLLBACK TO queued_write")
+                logging.exception("Queued database write failed")
+                outcomes.append((False, e))
+            else:
+                outcomes.append((True, value))
+            c.execute("RELEASE queued_write")
+        conn.commit()
+        return outcomes
+
+
+_writer = _Writer()
+
+
+def submit_write(op: Callable[[sqlite3.Cursor], Any]) -> Future:
+    """Queue a write for the writer thread without waiting for it.
+
+    *op* receives a cursor inside the writer's transaction and must not
+    commit.  Writes are applied in submission order.
+    """
+    return _writer.submit(op)
+
+
+def run_write(op: Callable[[sqlite3.Cursor], Any]) -> Any:
+    """Queue a write and wait for it; returns *op*'s result or raises its error."""
+    return _writer.submit(op).result()
+
+
+def flush_writes(timeout: Optional[float] = None) -> None:
+    """Block until every write queued so far has been applied."""
+    if _writer.started:
+        _writer.submit(lambda c: None).result(timeout)
+
+
+atexit.register(flush_writes, 30.0)
+
+
+def _create_base_schema(c: sqlite3.Cursor) -> None:
+    """Core tables plus the column fix-ups that predate versioned migrations."""
     c.execute("""
         CREATE TABLE IF NOT EXISTS scans (
             uuid TEXT PRIMARY KEY,
@@ -76,11 +295,6 @@ def init_db() -> None:
         )
     """)
 
-    # ---------------------------------------------------------
-    # Schema Migration Logic
-    # (If adding columns to existing tables where they might not exist)
-    # ---------------------------------------------------------
-
     # 1. Add dump_path to scans if missing (from previous updates)
     c.execute("PRAGMA table_info(scans)")
     columns = [col[1] for col in c.fetchall()]
@@ -118,5 +332,419 @@ def init_db() -> None:
         logging.info("Adding 'mode' column to 'scans' table.")
         c.execute("ALTER TABLE scans ADD COLUMN mode TEXT DEFAULT 'full'")
 
-    conn.commit()
-    conn.close()
+
+def _create_search_indexes(c: sqlite3.Cursor) -> None:
+    """Full-text and IOC indexes over result rows, with per-result backfill flags."""
+    # Full-text index over the string fields of every result row (one document per row)
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS result_fts USING fts5(
+            text,
+            scan_id UNINDEXED,
+            module UNINDEXED,
+            row_idx UNINDEXED
+        )
+    """)
+    # Global inverted index of typed indicators (IPs, domains, hashes, paths, processes)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS ioc_index (
+            indicator TEXT,
+            kind TEXT,
+            scan_id TEXT,
+            module TEXT,
+            row_idx INTEGER
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ioc_indicator ON ioc_index(indicator, kind)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ioc_scan ON ioc_index(scan_id)")
+
+    # Track which stored results have been added to the full-text and IOC indexes
+    result_columns = _table_columns(c, "scan_results")
+    for column in ("fts_indexed", "ioc_indexed"):
+        if column not in result_columns:
+            logging.info("Adding '%s' column to 'scan_results' table.", column)
+            c.execute(f"ALTER TABLE scan_results ADD COLUMN {column} INTEGER DEFAULT 0")
+
+
+def _create_scan_summaries(c: sqlite3.Cursor) -> None:
+    """Per-scan summary columns maintained by triggers (see _SUMMARY_TRIGGERS)."""
+    columns = _table_columns(c, "scans")
+    added_summary = False
+    for column, ddl in _SCAN_SUMMARY_COLUMNS:
+        if column not in columns:
+            logging.info("Adding '%s' column to 'scans' table.", column)
+            c.execute(f"ALTER TABLE scans ADD COLUMN {column} {ddl}")
+            added_summary = True
+
+    # Per-result metadata so summaries never have to read content blobs
+    result_columns = _table_columns(c, "scan_results")
+    for column, ddl in _RESULT_META_COLUMNS:
+        if column not in result_columns:
+            logging.info("Adding '%s' column to 'scan_results' table.", column)
+            c.execute(f"ALTER TABLE scan_results ADD COLUMN {column} {ddl}")
+            if column == "size":
+                c.execute("UPDATE scan_results SET size = length(content)")
+            elif column == "is_error":
+                c.execute(
+                    "UPDATE scan_results SET is_error = 1"
+                    ' WHERE content LIKE \'%"error": "Invalid JSON output"%\''
+                )
+            elif column == "row_count":
+                c.execute(
+                    "UPDATE scan_results SET row_count = json_array_length(content)"
+                    " WHERE json_valid(content) AND json_type(content) = 'array'"
+                )
+
+    for trigger in _SUMMARY_TRIGGERS:
+        c.execute(trigger)
+    if added_summary:
+        refresh_scan_summaries(c)
+
+
+def _create_lookup_indexes(c: sqlite3.Cursor) -> None:
+    """Composite indexes for the hot lookup paths.
+
+    Result reads, ingestion duplicate checks and the MemProcFS cache all
+    filter scan_results on (scan_id, module); without an index each of those
+    walks every stored blob.  Not UNIQUE because older databases may hold
+    duplicate rows from before ingestion checked for existing results.
+    """
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_scan_results_scan_module ON scan_results(scan_id, module)"
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_dump_tasks_scan ON dump_tasks(scan_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scans_status_created ON scans(status, created_at)")
+    # Keyset pagination order of GET /scans
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scans_created ON scans(created_at, uuid)")
+
+
+def _create_compressed_storage(c: sqlite3.Cursor) -> None:
+    """Per-plugin zstd dictionaries and the encoding of each stored result."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS zstd_dictionaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            plugin TEXT NOT NULL,
+            data BLOB NOT NULL,
+            sample_count INTEGER,
+            created_at REAL
+        )
+    """)
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_zstd_dictionaries_plugin ON zstd_dictionaries(plugin)"
+    )
+    # NULL encoding means plain JSON text in content
+    c.execute("ALTER TABLE scan_results ADD COLUMN encoding TEXT")
+    c.execute("ALTER TABLE scan_results ADD COLUMN dict_id INTEGER")
+
+
+def _create_fs_index(c: sqlite3.Cursor) -> None:
+    """Persisted path index of each scan's extracted RecoverFs tree."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS fs_entries (
+            scan_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            parent TEXT NOT NULL,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            size INTEGER NOT NULL DEFAULT 0,
+            child_count INTEGER NOT NULL DEFAULT 0,
+            mtime REAL,
+            PRIMARY KEY (scan_id, path)
+        ) WITHOUT ROWID
+    """)
+    # One directory level in listing order: folders first, then by name
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fs_entries_parent"
+        " ON fs_entries(scan_id, parent, type, name)"
+    )
+
+
+def _add_fs_archive_members(c: sqlite3.Cursor) -> None:
+    """Location of each indexed file inside recovered_fs.zip (NULL when extracted)."""
+    c.execute("ALTER TABLE fs_entries ADD COLUMN archive_offset INTEGER")
+    c.execute("ALTER TABLE fs_entries ADD COLUMN archive_size INTEGER")
+    c.execute("ALTER TABLE fs_entries ADD COLUMN archive_method INTEGER")
+
+
+def _create_fs_search(c: sqlite3.Cursor) -> None:
+    """Extension column and trigram path index for filtering recovered files."""
+    # Lower-cased extension with its dot ('' when none); NULL for directories
+    c.execute("ALTER TABLE fs_entries ADD COLUMN ext TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_fs_entries_ext ON fs_entries(scan_id, ext, size)")
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS fs_path_fts USING fts5(
+            path,
+            scan_id UNINDEXED,
+            tokenize = 'trigram'
+        )
+    """)
+    c.execute("SELECT scan_id, path, name FROM fs_entries WHERE type = 'file'")
+    files = c.fetchall()
+    c.executemany(
+        "UPDATE fs_entries SET ext = ? WHERE scan_id = ? AND path = ?",
+        ((os.path.splitext(name)[1].lower(), scan_id, path) for scan_id, path, name in files),
+    )
+    c.executemany(
+        "INSERT INTO fs_path_fts (path, scan_id) VALUES (?, ?)",
+        ((path, scan_id) for scan_id, path, _ in files),
+    )
+
+
+def _create_artifacts(c: sqlite3.Cursor) -> None:
+    """Content hashes of recovered and dumped files (see artifacts)."""
+    # member: name inside recovered_fs.zip, '' for a file on disk
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS artifacts (
+            path TEXT NOT NULL,
+            member TEXT NOT NULL DEFAULT '',
+            scan_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL,
+            stored INTEGER NOT NULL DEFAULT 0,
+            hashed_at REAL,
+            PRIMARY KEY (path, member)
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_sha256 ON artifacts(sha256)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_scan ON artifacts(scan_id)")
+
+
+def _create_upload_sessions(c: sqlite3.Cursor) -> None:
+    """Chunked upload sessions and the chunks received so far (see uploads)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            upload_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            sha256 TEXT,
+            created_at REAL,
+            updated_at REAL
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS upload_chunks (
+            upload_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            PRIMARY KEY (upload_id, idx)
+        ) WITHOUT ROWID
+    """)
+
+
+def _create_evidence_catalog(c: sqlite3.Cursor) -> None:
+    """Catalog of the dumps and extracted files in STORAGE_DIR (see evidence).
+
+    ``name`` is relative to STORAGE_DIR; ``parent`` is the extracted group of
+    a file inside one, '' for top-level items.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS evidence (
+            name TEXT PRIMARY KEY,
+            parent TEXT NOT NULL DEFAULT '',
+            kind TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL,
+            sha256 TEXT,
+            updated_at REAL
+        ) WITHOUT ROWID
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_evidence_parent ON evidence(parent, name)")
+
+
+def _reindex_ioc_paths(c: sqlite3.Cursor) -> None:
+    """Re-extract indicators so path columns are indexed whole (backfill_iocs redoes it)."""
+    c.execute("DELETE FROM ioc_index")
+    c.execute("UPDATE scan_results SET ioc_indexed = 0")
+
+
+def _backfill_scan_created_at(c: sqlite3.Cursor) -> None:
+    """Give legacy scans without a creation time one, so the /scans keyset cursor reaches them."""
+    c.execute("UPDATE scans SET created_at = 0 WHERE created_at IS NULL")
+
+
+# Ordered schema migrations as (version, description, function).  Each runs
+# once, in its own transaction, and is recorded in schema_version.  Versions
+# 1-3 replace the old unversioned init_db and are written to be idempotent,
+# because a database created before schema_version existed may already
+# contain any subset of them.  Append new steps; never renumber.
+MIGRATIONS: tuple[tuple[int, str, Callable[[sqlite3.Cursor], None]], ...] = (
+    (1, "base schema", _create_base_schema),
+    (2, "full-text and IOC indexes", _create_search_indexes),
+    (3, "materialised scan summaries", _create_scan_summaries),
+    (4, "hot-path lookup indexes", _create_lookup_indexes),
+    (5, "compressed result storage", _create_compressed_storage),
+    (6, "recovered filesystem index", _create_fs_index),
+    (7, "recovered filesystem archive members", _add_fs_archive_members),
+    (8, "recovered filesystem path search", _create_fs_search),
+    (9, "artifact hashes", _create_artifacts),
+    (10, "chunked upload sessions", _create_upload_sessions),
+    (11, "evidence catalog", _create_evidence_catalog),
+    (12, "whole-path IOC re-index", _reindex_ioc_paths),
+    (13, "scan creation time backfill", _backfill_scan_created_at),
+)
+
+
+def _table_columns(c: sqlite3.Cursor, table: str) -> list[str]:
+    """Return the column names of *table*."""
+    c.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in c.fetchall()]
+
+
+def get_schema_version(c: sqlite3.Cursor) -> int:
+    """Return the highest applied migration version (0 for a new or legacy database)."""
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at REAL
+        )
+    """)
+    c.execute("SELECT MAX(version) FROM schema_version")
+    return c.fetchone()[0] or 0
+
+
+def init_db() -> None:
+    """Create all required tables and apply pending schema migrations."""
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        current = get_schema_version(c)
+        conn.commit()
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            logging.info("Applying schema migration %d: %s", version, description)
+            c.execute("BEGIN")
+            try:
+                migrate(c)
+                c.execute(
+                    "INSERT INTO schema_version (version, description, applied_at)"
+                    " VALUES (?, ?, ?)",
+                    (version, description, time.time()),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logging.exception("Schema migration %d failed", version)
+                raise
+    finally:
+        conn.close()
+
+
+_SCAN_SUMMARY_COLUMNS = (
+    ("modules_pending", "INTEGER NOT NULL DEFAULT 0"),
+    ("modules_running", "INTEGER NOT NULL DEFAULT 0"),
+    ("modules_completed", "INTEGER NOT NULL DEFAULT 0"),
+    ("modules_failed", "INTEGER NOT NULL DEFAULT 0"),
+    ("result_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("result_rows", "INTEGER NOT NULL DEFAULT 0"),
+    ("result_bytes", "INTEGER NOT NULL DEFAULT 0"),
+    ("finished_at", "REAL"),
+)
+
+_RESULT_META_COLUMNS = (
+    ("row_count", "INTEGER DEFAULT 0"),
+    ("size", "INTEGER DEFAULT 0"),
+    ("is_error", "INTEGER DEFAULT 0"),
+)
+
+
+def _status_deltas(row: str, sign: str) -> str:
+    """SQL assignments adding (sign='+') or removing (sign='-') *row*'s status bucket."""
+    status = f"IFNULL({row}.status, '')"
+    return (
+        f"modules_completed = modules_completed {sign} ({status} = 'COMPLETED'),"
+        f" modules_failed = modules_failed {sign} ({status} = 'FAILED'),"
+        f" modules_running = modules_running {sign} ({status} = 'RUNNING'),"
+        f" modules_pending = modules_pending {sign}"
+        f" ({status} NOT IN ('COMPLETED', 'FAILED', 'RUNNING'))"
+    )
+
+
+def _result_deltas(row: str, sign: str) -> str:
+    """SQL assignments adding or removing a scan_results row from its scan's totals."""
+    return (
+        f"result_count = result_count {sign} (IFNULL({row}.is_error, 0) = 0),"
+        f" result_rows = result_rows {sign} IFNULL({row}.row_count, 0),"
+        f" result_bytes = result_bytes {sign} IFNULL({row}.size, length({row}.content))"
+    )
+
+
+# Incremental maintenance of the scans summary columns: every status change or
+# result insert/delete adjusts its scan's counters in the same transaction, so
+# listing scans never has to aggregate scan_module_status or scan_results.
+_SUMMARY_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_module_status_insert
+    AFTER INSERT ON scan_module_status BEGIN
+        UPDATE scans SET {_status_deltas("NEW", "+")} WHERE uuid = NEW.scan_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_module_status_update
+    AFTER UPDATE OF status ON scan_module_status
+    WHEN OLD.status IS NOT NEW.status BEGIN
+        UPDATE scans SET {_status_deltas("OLD", "-")} WHERE uuid = OLD.scan_id;
+        UPDATE scans SET {_status_deltas("NEW", "+")} WHERE uuid = NEW.scan_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_module_status_delete
+    AFTER DELETE ON scan_module_status BEGIN
+        UPDATE scans SET {_status_deltas("OLD", "-")} WHERE uuid = OLD.scan_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_scan_results_insert
+    AFTER INSERT ON scan_results BEGIN
+        UPDATE scans SET {_result_deltas("NEW", "+")} WHERE uuid = NEW.scan_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_scan_results_delete
+    AFTER DELETE ON scan_results BEGIN
+        UPDATE scans SET {_result_deltas("OLD", "-")} WHERE uuid = OLD.scan_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_scans_finished
+    AFTER UPDATE OF status ON scans
+    WHEN NEW.status IN ('completed', 'failed') AND NEW.finished_at IS NULL BEGIN
+        UPDATE scans SET finished_at = (julianday('now') - 2440587.5) * 86400.0
+        WHERE uuid = NEW.uuid;
+    END
+    """,
+)
+
+
+def refresh_scan_summaries(c: sqlite3.Cursor, scan_id: Optional[str] = None) -> None:
+    """Recompute the summary columns from scratch (all scans, or just *scan_id*).
+
+    Only needed once after the columns are added or to repair drift; normal
+    operation keeps them current through _SUMMARY_TRIGGERS.
+    """
+    where, params = ("WHERE uuid = ?", (scan_id,)) if scan_id else ("", ())
+    c.execute(
+        f"""
+        UPDATE scans SET
+            modules_completed = (SELECT COUNT(*) FROM scan_module_status m
+                WHERE m.scan_id = scans.uuid AND m.status = 'COMPLETED'),
+            modules_failed = (SELECT COUNT(*) FROM scan_module_status m
+                WHERE m.scan_id = scans.uuid AND m.status = 'FAILED'),
+            modules_running = (SELECT COUNT(*) FROM scan_module_status m
+                WHERE m.scan_id = scans.uuid AND m.status = 'RUNNING'),
+            modules_pending = (SELECT COUNT(*) FROM scan_module_status m
+                WHERE m.scan_id = scans.uuid
+                AND IFNULL(m.status, '') NOT IN ('COMPLETED', 'FAILED', 'RUNNING')),
+            result_count = (SELECT COUNT(*) FROM scan_results r
+                WHERE r.scan_id = scans.uuid AND IFNULL(r.is_error, 0) = 0),
+            result_rows = (SELECT IFNULL(SUM(r.row_count), 0) FROM scan_results r
+                WHERE r.scan_id = scans.uuid),
+            result_bytes = (SELECT IFNULL(SUM(IFNULL(r.size, length(r.content))), 0)
+                FROM scan_results r WHERE r.scan_id = scans.uuid)
+        {where}
+        """,  # nosec B608
+        params,
+    )
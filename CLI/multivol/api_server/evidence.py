@@ -0,0 +1,250 @@
+"""Catalog of the evidence held in STORAGE_DIR (the ``evidence`` table).
+
+``GET /evidences`` used to stat every dump, walk every ``<case>_extracted``
+directory and, when a ``.sha256`` sidecar was missing, hash a multi-GB dump
+inside the request.  The catalog records each top-level dump, each
+extracted group and the files directly inside it, with their size, mtime and
+cached hash, so the listing is a database query.
+
+Rows are refreshed by the code that changes the storage directory (uploads,
+archive extraction, dump tasks, deletes) through ``refresh_evidence``.
+``reconcile_evidence`` rescans the whole directory, catching files copied in
+by hand, and runs at startup and then every RECONCILE_INTERVAL seconds.
+Dumps without a cached hash are hashed in a background thread, never in a
+request.  Hidden names (partial files of uploads and extractions still being
+written, and their temp directories) are never catalogued, and the rescan
+only hashes files left unmodified for HASH_SETTLE seconds, so a dump still
+being copied in by hand is not given a sidecar for half of its content.
+
+Evidence is content-addressed: once hashed, a file is hardlinked into the
+artifact store under its SHA-256 (``artifacts.deduplicate``), and a file
+whose content is already stored is replaced by a link to it.  A dump
+uploaded again under another name, or recovered from a zip, therefore takes
+no extra space; filenames are references, and ``delete_evidence`` prunes the
+stored data once its last reference is gone.  Only freshly computed hashes
+collapse files, never a possibly stale ``.sha256`` sidecar.
+"""
+
+import functools
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional
+from multivol.api_server.artifacts import deduplicate
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.database import get_db_connection, run_write
+from multivol.api_server.utils import get_file_hash, stat_key
+
+# Seconds between two full rescans of STORAGE_DIR
+RECONCILE_INTERVAL = int(os.environ.get("EVIDENCE_RECONCILE_INTERVAL", "300"))
+# Seconds a file must stay unmodified before the rescan hashes it
+HASH_SETTLE = int(os.environ.get("EVIDENCE_HASH_SETTLE", "60"))
+EXTRACTED_SUFFIX = "_extracted"
+
+# Refreshes are numbered when they start reading the disk; the writer drops
+# an item's rows read before those it already applied
+_generations = itertools.count(1)
+_applied: dict[str, int] = {}  # only touched by the writer thread
+_hashing: set[str] = set()
+_hashing_lock = threading.Lock()
+_reconciled = threading.Event()
+
+
+def _listed(name: str) -> bool:
+    return not (name.startswith((".", "scans.db")) or name.endswith(".sha256"))
+
+
+def _cached_hash(path: str) -> Optional[str]:
+    """The digest in *path*'s ``.sha256`` sidecar, or None; never reads *path* itself."""
+    try:
+        with open(path + ".sha256", "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _dir_size(start_path: str) -> int:
+    """Return total byte size of all files under start_path."""
+    total = 0
+    for dirpath, _, filenames in os.walk(start_path):
+        for f in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, f))
+            except OSError:
+                pass
+    return total
+
+
+def _item_rows(name: str) -> list[tuple[Any, ...]]:
+    """Catalog rows (name, parent, kind, size, mtime, sha256) for a top-level item."""
+    path = os.path.join(STORAGE_DIR, name)
+    try:
+        st = os.stat(path)
+        if os.path.isfile(path):
+            if not _listed(name):
+                return []
+            return [(name, "", "dump", st.st_size, st.st_mtime, _cached_hash(path))]
+        if not (os.path.isdir(path) and name.endswith(EXTRACTED_SUFFIX)):
+            return []
+        rows = [(name, "", "group", _dir_size(path), st.st_mtime, None)]
+        for entry in os.scandir(path):
+            if not _listed(entry.name) or not entry.is_file():
+                continue
+            est = entry.stat()
+            rows.append(
+                (
+                    f"{name}/{entry.name}",
+                    name,
+                    "extracted",
+                    est.st_size,
+                    est.st_mtime,
+                    _cached_hash(entry.path),
+                )
+            )
+        return rows
+    except OSError:  # deleted meanwhile
+        return []
+
+
+def _replace_items(
+    c: sqlite3.Cursor, names: list[str], rows: list[tuple[Any, ...]], generation: int
+) -> None:
+    """Queued write: replace the catalog rows of top-level items *names* with *rows*.
+
+    Items already refreshed from a later read of the disk (a higher
+    *generation*) are left alone, so rows read before a delete cannot be
+    written after it.
+    """
+    stale = {name for name in names if _applied.get(name, 0) > generation}
+    names = [name for name in names if name not in stale]
+    rows = [row for row in rows if (row[1] or row[0]) not in stale]
+    for name in names:
+        _applied[name] = generation
+        c.execute("DELETE FROM evidence WHERE name = ? OR parent = ?", (name, name))
+    now = time.time()
+    c.executemany(
+        "INSERT OR REPLACE INTO evidence (name, parent, kind, size, mtime, sha256, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(*row, now) for row in rows],
+    )
+
+
+def top_level(path: str) -> str:
+    """The STORAGE_DIR entry *path* lives in (a dump, or an extracted directory)."""
+    return os.path.relpath(path, STORAGE_DIR).split(os.sep, 1)[0]
+
+
+def refresh_evidence(*names: str) -> None:
+    """Re-read top-level STORAGE_DIR items *names* into the catalog (gone ones are removed).
+
+    Stats files and reads hash sidecars only, outside the writer.
+    """
+    names = tuple(dict.fromkeys(n for n in names if n and n not in (".", "..")))
+    if not names:
+        return
+    generation = next(_generations)
+    rows = [row for name in names for row in _item_rows(name)]
+    run_write(
+        functools.partial(_replace_items, names=list(names), rows=rows, generation=generation)
+    )
+
+
+def _hash_and_refresh(paths: list[str]) -> None:
+    try:
+        for path in paths:
+            fresh = not os.path.exists(path + ".sha256")
+            before = stat_key(path)
+            sha256 = get_file_hash(path)
+            if fresh and sha256 and before != stat_key(path):
+                # Written to while it was read: the digest matches neither version
+                logging.info("%s changed while being hashed; will retry later", path)
+                try:
+                    os.remove(path + ".sha256")
+                except OSError:
+                    pass
+                continue
+            if fresh and sha256 and os.path.isfile(path):
+                deduplicate(path, sha256, before)
+        refresh_evidence(*(top_level(p) for p in paths))
+    finally:
+        with _hashing_lock:
+            _hashing.difference_update(paths)
+
+
+def submit_evidence_hashing(paths: Iterable[str]) -> None:
+    """Hash *paths* in a background thread, store them by content, then refresh their rows."""
+    with _hashing_lock:
+        todo = [p for p in dict.fromkeys(paths) if p not in _hashing]
+        _hashing.update(todo)
+    if todo:
+        threading.Thread(target=_hash_and_refresh, args=(todo,), daemon=True).start()
+
+
+def evidence_hashes(path: str) -> set[str]:
+    """Cached SHA-256 of the file *path*, or of every file under the directory *path*."""
+    if not os.path.isdir(path):
+        sha256 = _cached_hash(path)
+        return {sha256} if sha256 else set()
+    hashes = set()
+    for dirpath, _, filenames in os.walk(path):
+        for f in filenames:
+            if not f.endswith(".sha256"):
+                sha256 = _cached_hash(os.path.join(dirpath, f))
+                if sha256:
+                    hashes.add(sha256)
+    return hashes
+
+
+def reconcile_evidence() -> int:
+    """Rescan STORAGE_DIR into the catalog; returns the number of top-level items.
+
+    Queues hashing of dumps that have no cached hash yet and have not been
+    modified for HASH_SETTLE seconds.
+    """
+    try:
+        on_disk = [n for n in os.listdir(STORAGE_DIR) if _listed(n)]
+    except FileNotFoundError:
+        logging.error("Storage dir not found: %s", STORAGE_DIR)
+        on_disk = []
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT name FROM evidence WHERE parent = ''")
+        known = [row[0] for row in c.fetchall()]
+    finally:
+        conn.close()
+    names = list(dict.fromkeys(on_disk + known))
+    generation = next(_generations)
+    rows = [row for name in names for row in _item_rows(name)]
+    run_write(functools.partial(_replace_items, names=names, rows=rows, generation=generation))
+    _reconciled.set()
+    settled = time.time() - HASH_SETTLE
+    submit_evidence_hashing(
+        os.path.join(STORAGE_DIR, row[0])
+        for row in rows
+        if row[2] == "dump" and not row[5] and row[4] <= settled
+    )
+    return sum(1 for row in rows if not row[1])
+
+
+def ensure_reconciled() -> None:
+    """Build the catalog once per process, before the first listing."""
+    if not _reconciled.is_set():
+        reconcile_evidence()
+
+
+def _reconcile_forever() -> None:
+    while True:
+        try:
+            reconcile_evidence()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Evidence catalog reconcile failed")
+        time.sleep(RECONCILE_INTERVAL)
+
+
+def start_evidence_reconciler() -> None:
+    """Reconcile the catalog now and every RECONCILE_INTERVAL seconds, in a daemon thread."""
+    threading.Thread(target=_reconcile_forever, name="evidence-reconcile", daemon=True).start()
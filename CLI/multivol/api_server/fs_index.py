@@ -0,0 +1,300 @@
+"""Persisted path index of the recovered RecoverFs tree (``fs_entries``).
+
+The tree is read once, from the central directory of ``recovered_fs.zip``
+(see ``recovered_archive``) or, for scans extracted before it existed, by
+walking ``recovered_fs/``.  Every file and directory is stored with its
+parent path, size (recursive for directories) and child count, plus the
+member's location in the archive.  Tree requests then read one directory
+level with an indexed lookup, files are opened without listing anything,
+and file listings are filtered (path prefix or trigram substring, extension,
+size) and paged in SQL.
+Older scans are indexed on first access.
+"""
+
+import functools
+import logging
+import os
+import sqlite3
+import time
+import zipfile
+from typing import Any, Optional
+from multivol.api_server.database import run_write
+from multivol.api_server.recovered_archive import ARCHIVE_NAME
+
+# (path, parent, name, type, size, child_count, mtime,
+#  archive_offset, archive_size, archive_method)
+FsRow = tuple[
+    str, str, str, str, int, int, Optional[float], Optional[int], Optional[int], Optional[int]
+]
+
+_COLUMNS = (
+    "path, parent, name, type, size, child_count, mtime,"
+    " archive_offset, archive_size, archive_method"
+)
+_NO_MEMBER = (None, None, None)
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}{name}" if parent == "/" else f"{parent}/{name}"
+
+
+def _walk(dir_path: str, rel: str, rows: list[FsRow]) -> tuple[int, int]:
+    """Append rows for everything under *dir_path* (shown as *rel*).
+
+    Returns the total size and the number of direct children.
+    """
+    total = count = 0
+    try:
+        entries = list(os.scandir(dir_path))
+    except OSError:
+        logging.warning("Cannot list %s", dir_path)
+        return 0, 0
+    for entry in entries:
+        child = _join(rel, entry.name)
+        try:
+            st = entry.stat(follow_symlinks=False)
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir:
+            index = len(rows)
+            rows.append((child, rel, entry.name, "directory", 0, 0, st.st_mtime, *_NO_MEMBER))
+            size, children = _walk(entry.path, child, rows)
+            rows[index] = (
+                child,
+                rel,
+                entry.name,
+                "directory",
+                size,
+                children,
+                st.st_mtime,
+                *_NO_MEMBER,
+            )
+        else:
+            size = st.st_size
+            rows.append((child, rel, entry.name, "file", size, 0, st.st_mtime, *_NO_MEMBER))
+        total += size
+        count += 1
+    return total, count
+
+
+def scan_tree(extract_dir: str) -> list[FsRow]:
+    """Walk *extract_dir* and return its index rows, root ("/") first."""
+    rows: list[FsRow] = [("/", "", "/", "directory", 0, 0, None, *_NO_MEMBER)]
+    size, children = _walk(extract_dir, "/", rows)
+    mtime = os.stat(extract_dir).st_mtime
+    rows[0] = ("/", "", "/", "directory", size, children, mtime, *_NO_MEMBER)
+    return rows
+
+
+def _directory(dirs: dict[str, list[Any]], path: str) -> list[Any]:
+    """The mutable row of directory *path*, created (with its parents) when missing."""
+    row = dirs.get(path)
+    if row is None:
+        parent, _, name = path.rpartition("/")
+        parent = parent or "/"
+        _directory(dirs, parent)[5] += 1
+        row = dirs[path] = [path, parent, name, "directory", 0, 0, None, *_NO_MEMBER]
+    return row
+
+
+def scan_archive(zip_path: str) -> list[FsRow]:
+    """Index rows for every member of *zip_path*, root ("/") first.
+
+    Directories without an entry of their own are implied by member paths.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = zf.infolist()
+    root = ["/", "", "/", "directory", 0, 0, os.stat(zip_path).st_mtime, *_NO_MEMBER]
+    dirs: dict[str, list[Any]] = {"/": root}
+    files: list[FsRow] = []
+    for info in infos:
+        path = "/" + info.filename.rstrip("/")
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+        if info.is_dir():
+            _directory(dirs, path)[6] = mtime
+            continue
+        parent, _, name = path.rpartition("/")
+        parent = parent or "/"
+        _directory(dirs, parent)[5] += 1
+        ancestor = parent
+        while ancestor:
+            dirs[ancestor][4] += info.file_size
+            ancestor = dirs[ancestor][1]
+        files.append(
+            (
+                path,
+                parent,
+                name,
+                "file",
+                info.file_size,
+                0,
+                mtime,
+                info.header_offset,
+                info.compress_size,
+                info.compress_type,
+            )
+        )
+    return [tuple(row) for row in dirs.values()] + files
+
+
+def _ext(row: FsRow) -> Optional[str]:
+    return os.path.splitext(row[2])[1].lower() if row[3] == "file" else None
+
+
+def _replace_index(c: sqlite3.Cursor, scan_id: str, rows: list[FsRow]) -> None:
+    """Queued write: swap the stored index of *scan_id* for *rows*."""
+    c.execute("DELETE FROM fs_entries WHERE scan_id = ?", (scan_id,))
+    c.execute("DELETE FROM fs_path_fts WHERE scan_id = ?", (scan_id,))
+    c.executemany(
+        f"INSERT INTO fs_entries (scan_id, {_COLUMNS}, ext) VALUES ({', '.join('?' * 12)})",
+        ((scan_id, *row, _ext(row)) for row in rows),
+    )
+    c.executemany(
+        "INSERT INTO fs_path_fts (path, scan_id) VALUES (?, ?)",
+        ((row[0], scan_id) for row in rows if row[3] == "file"),
+    )
+
+
+def index_recovered_fs(scan_id: str, output_dir: str) -> bool:
+    """(Re)build the index of the scan's recovered files; False when there are none.
+
+    ``recovered_fs.zip`` is preferred; ``recovered_fs/`` is the layout of
+    scans extracted before the archive existed.
+    """
+    if not output_dir:
+        return False
+    zip_path = os.path.join(output_dir, ARCHIVE_NAME)
+    extract_dir = os.path.join(output_dir, "recovered_fs")
+    if not os.path.isfile(zip_path) and not os.path.isdir(extract_dir):
+        return False
+    try:
+        rows = scan_archive(zip_path) if os.path.isfile(zip_path) else scan_tree(extract_dir)
+        run_write(functools.partial(_replace_index, scan_id=scan_id, rows=rows))
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("Failed to index recovered filesystem of scan %s", scan_id)
+        return False
+    logging.info("Indexed %d recovered filesystem entries for scan %s", len(rows) - 1, scan_id)
+    return True
+
+
+def ensure_indexed(c: sqlite3.Cursor, scan_id: str, output_dir: str) -> bool:
+    """True when *scan_id* has an index, building it first for older scans."""
+    c.execute("SELECT 1 FROM fs_entries WHERE scan_id = ? AND path = '/'", (scan_id,))
+    if c.fetchone():
+        return True
+    return index_recovered_fs(scan_id, output_dir)
+
+
+def _entry(row: sqlite3.Row) -> dict[str, Any]:
+    entry = {"name": row["name"], "path": row["path"], "type": row["type"], "size": row["size"]}
+    if row["type"] == "directory":
+        entry["child_count"] = row["child_count"]
+    if row["mtime"] is not None:
+        entry["mtime"] = row["mtime"]
+    return entry
+
+
+def get_member(c: sqlite3.Cursor, scan_id: str, path: str) -> Optional[sqlite3.Row]:
+    """The raw index row at *path*, including its archive location, or None."""
+    c.execute(f"SELECT {_COLUMNS} FROM fs_entries WHERE scan_id = ? AND path = ?", (scan_id, path))
+    return c.fetchone()
+
+
+def get_entry(c: sqlite3.Cursor, scan_id: str, path: str) -> Optional[dict[str, Any]]:
+    """The indexed entry at *path*, or None."""
+    row = get_member(c, scan_id, path)
+    return _entry(row) if row else None
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_files(
+    c: sqlite3.Cursor,
+    scan_id: str,
+    search: str = "",
+    exts: tuple[str, ...] = (),
+    min_size: int = 0,
+    limit: int = -1,
+    offset: int = 0,
+) -> tuple[int, list[str]]:
+    """Matching file paths (relative to the recovered root, in path order) and their total.
+
+    A *search* starting with "/" is a case-sensitive path prefix (a range
+    scan of the primary key); anything else matches a case-insensitive
+    substring of the path, through the trigram index (``fs_path_fts``) when
+    it is at least three characters long.  *exts* are lower-cased
+    extensions with their dot.
+    """
+    source = "fs_entries e"
+    where = ["e.scan_id = ?", "e.type = 'file'"]
+    params: list[Any] = [scan_id]
+    if search.startswith("/"):
+        prefix = search.replace("\\", "/")
+        where.append("e.path >= ? AND e.path < ?")
+        params += [prefix, f"{prefix}\U0010ffff"]
+    elif len(search) >= 3:
+        source = "fs_path_fts f JOIN fs_entries e ON e.scan_id = f.scan_id AND e.path = f.path"
+        where += ["fs_path_fts MATCH ?", "f.scan_id = ?"]
+        params += ['"' + search.replace('"', '""') + '"', scan_id]
+    elif search:
+        where.append("e.path LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(search))
+    if exts:
+        where.append(f"e.ext IN ({', '.join('?' * len(exts))})")
+        params += exts
+    if min_size > 0:
+        where.append("e.size >= ?")
+        params.append(min_size)
+
+    clause = " AND ".join(where)
+    c.execute(f"SELECT COUNT(*) FROM {source} WHERE {clause}", params)  # nosec B608
+    total = c.fetchone()[0]
+    c.execute(
+        f"SELECT e.path FROM {source} WHERE {clause}"  # nosec B608
+        " ORDER BY e.path LIMIT ? OFFSET ?",
+        [*params, limit, offset],
+    )
+    return total, [row[0][1:] for row in c.fetchall()]
+
+
+def list_directory(
+    c: sqlite3.Cursor, scan_id: str, path: str, limit: int = -1, offset: int = 0
+) -> list[dict[str, Any]]:
+    """One directory level under *path*: folders first, then files, each by name."""
+    c.execute(
+        f"SELECT {_COLUMNS} FROM fs_entries WHERE scan_id = ? AND parent = ?"
+        " ORDER BY type, name LIMIT ? OFFSET ?",
+        (scan_id, path, limit, offset),
+    )
+    return [_entry(row) for row in c.fetchall()]
+
+
+def nested_tree(c: sqlite3.Cursor, scan_id: str) -> list[dict[str, Any]]:
+    """The whole indexed tree in the nested ``build_fs_tree`` shape."""
+    c.execute(
+        f"SELECT {_COLUMNS} FROM fs_entries WHERE scan_id = ? ORDER BY parent, type, name",
+        (scan_id,),
+    )
+    root: Optional[dict[str, Any]] = None
+    children: dict[str, list[dict[str, Any]]] = {}
+    for row in c:
+        node: dict[str, Any] = {"name": row["name"], "path": row["path"], "type": row["type"]}
+        if row["type"] == "directory":
+            node["children"] = children.setdefault(row["path"], [])
+        else:
+            node["size"] = row["size"]
+        if row["parent"]:
+            children.setdefault(row["parent"], []).append(node)
+        else:
+            root = node
+    return [root] if root else []
+
+
+def normalise_path(path: Optional[str]) -> str:
+    """Canonical index path ("/a/b") for a user-supplied path."""
+    parts = [p for p in (path or "").replace("\\", "/").split("/") if p and p != "."]
+    return "/" + "/".join(parts)
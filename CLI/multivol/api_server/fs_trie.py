@@ -0,0 +1,174 @@
+"""Compact path trie for the RecoverFs tree (millions of nodes, linear time).
+
+``linux.pagecache.RecoverFs`` emits one flat row per recovered path.  The
+trie stores each node as a handful of integers in parallel arrays: an
+interned name id, its first and last child and its next sibling.
+Children are looked up through a single ``dict`` keyed by
+``parent << 32 | name_id``, so inserting a path costs O(components)
+whatever the directory width.  The nested tree is never materialised as
+Python dicts; ``write_json`` streams it as compact JSON straight from the
+arrays, so memory stays proportional to the number of nodes, not to the
+serialised size.
+"""
+
+import json
+from array import array
+from typing import Any, Iterable, Optional, TextIO
+
+_NONE = -1
+# Inode slot of nodes without an integer inode (directories, or see FsTrie.inode_json)
+_NO_INODE = -(2**63)
+# Pieces buffered before each write to the output file
+_WRITE_BATCH = 65536
+
+
+class FsTrie:
+    """Append-only path trie with interned names and array-backed child links."""
+
+    def __init__(self) -> None:
+        self._name_ids: dict[str, int] = {}
+        self._names: list[str] = []  # JSON-escaped name, by name id
+        self.name_id = array("l", [self._intern("/")])
+        self.first_child = array("l", [_NONE])
+        self.last_child = array("l", [_NONE])
+        self.next_sibling = array("l", [_NONE])
+        self.is_dir = bytearray(b"\x01")
+        self._children: dict[int, int] = {}
+        # Leaf metadata by node id; inodes that are not 64-bit ints go to inode_json
+        self.inode = array("q", [_NO_INODE])
+        self.inode_json: dict[int, str] = {}
+        self.extracted: dict[int, tuple[str, Optional[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.first_child)
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(json.dumps(name)[1:-1])
+        return name_id
+
+    def insert(self, parts: list[str]) -> Optional[int]:
+        """Add the path *parts* (missing parents become directories).
+
+        Returns the id of the newly created leaf, or None when the path was
+        already present (the first occurrence wins).
+        """
+        # Hot loop: interning and child linking are inlined, lookups hoisted
+        name_ids, children = self._name_ids, self._children
+        first_child, last_child, next_sibling = self.first_child, self.last_child, self.next_sibling
+        node = 0
+        last = len(parts) - 1
+        for i, part in enumerate(parts):
+            name_id = name_ids.get(part)
+            if name_id is None:
+                name_id = self._intern(part)
+            key = node << 32 | name_id
+            child = children.get(key)
+            if child is not None:
+                node = child
+                continue
+            child = children[key] = len(first_child)
+            self.name_id.append(name_id)
+            first_child.append(_NONE)
+            last_child.append(_NONE)
+            next_sibling.append(_NONE)
+            self.is_dir.append(i != last)
+            self.inode.append(_NO_INODE)
+            prev = last_child[node]
+            if prev == _NONE:
+                first_child[node] = child
+            else:
+                next_sibling[prev] = child
+            last_child[node] = child
+            if i == last:
+                return child
+            node = child
+        return None
+
+    def set_inode(self, node: int, inode: Any) -> None:
+        """Record the inode of leaf *node* (any JSON value)."""
+        if isinstance(inode, int) and not isinstance(inode, bool) and _NO_INODE < inode < 2**63:
+            self.inode[node] = inode
+        else:
+            self.inode_json[node] = json.dumps(inode)
+
+    def _node_head(self, node: int, path: str) -> str:
+        kind = "directory" if self.is_dir[node] else "file"
+        return f'{{"name":"{self._names[self.name_id[node]]}","path":"{path}","type":"{kind}"'
+
+    def _leaf_fields(self, node: int) -> str:
+        inode = self.inode[node]
+        fields = f',"inode":{inode if inode != _NO_INODE else self.inode_json[node]}'
+        if node in self.extracted:
+            fname, size = self.extracted[node]
+            fields += f',"extracted_file":{json.dumps(fname)}'
+            if size is not None:
+                fields += f',"size":{size}'
+        return fields
+
+    def iter_json(self) -> Iterable[str]:
+        """Yield the tree as compact JSON, ``[{root}]``, children in insertion order."""
+        yield "["
+        # (node, escaped path, separator); node None closes the enclosing object
+        stack: list[tuple[Optional[int], str, str]] = [(0, "/", "")]
+        while stack:
+            node, path, sep = stack.pop()
+            if node is None:
+                yield "]}"
+                continue
+            yield sep
+            yield self._node_head(node, path)
+            if not self.is_dir[node]:
+                yield self._leaf_fields(node)
+            child = self.first_child[node]
+            if child == _NONE and not self.is_dir[node]:
+                yield "}"
+                continue
+            yield ',"children":['
+            stack.append((None, "", ""))
+            prefix = "" if node == 0 else path
+            pending = []
+            while child != _NONE:
+                pending.append((child, f"{prefix}/{self._names[self.name_id[child]]}", ","))
+                child = self.next_sibling[child]
+            if pending:
+                pending[0] = (pending[0][0], pending[0][1], "")
+            stack.extend(reversed(pending))
+        yield "]"
+
+    def write_json(self, f: TextIO) -> None:
+        """Write ``iter_json`` to *f* in large batches."""
+        buf: list[str] = []
+        for piece in self.iter_json():
+            buf.append(piece)
+            if len(buf) >= _WRITE_BATCH:
+                f.write("".join(buf))
+                buf.clear()
+        f.write("".join(buf))
+
+
+def build_recoverfs_trie(
+    rows: Iterable[dict[str, Any]], extracted_files: dict[str, tuple[str, Optional[int]]]
+) -> FsTrie:
+    """Insert every ``FilePath`` of the RecoverFs *rows* into a new trie.
+
+    *extracted_files* maps ``str(inode)`` to ``(filename, size)`` of the
+    files Volatility extracted next to the output (see
+    ``utils._build_extracted_files_map``).
+    """
+    trie = FsTrie()
+    for item in rows:
+        file_path = item.get("FilePath")
+        if not file_path or file_path == "/":
+            continue
+        leaf = trie.insert(file_path.strip("/").split("/"))
+        if leaf is None:
+            continue
+        inode = item.get("Inode")
+        trie.set_inode(leaf, inode)
+        extracted = extracted_files.get(str(inode))
+        if extracted is not None:
+            trie.extracted[leaf] = extracted
+    return trie
@@ -0,0 +1,81 @@
+"""HTTP validators for immutable results and downloads (ETag, 304, Range).
+
+Completed module results and output files do not change once written, so
+responses carry a strong ETag derived from what identifies the content
+(scan, module, stored row or file mtime and size).  Clients revalidate with
+``If-None-Match`` and get ``304 Not Modified``; downloads also honour
+``Range``/``If-Range`` so interrupted transfers can resume.
+"""
+
+import hashlib
+import os
+from typing import Any, BinaryIO
+from flask import Response, make_response, request, send_file
+from multivol.api_server.http_compression import encoded_etag
+
+# Cache but always revalidate: a result is replaced when its module is re-run
+_CACHE_CONTROL = "private, no-cache"
+
+
+def strong_etag(*parts: Any) -> str:
+    """Return an opaque strong ETag value for the given identifying parts."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def request_args_key() -> str:
+    """Canonical form of the query string (minus the auth token) for use in an ETag."""
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k != "token")
+    return "&".join(f"{k}={v}" for k, v in args)
+
+
+def etag_matches(etag: str) -> bool:
+    """True when the request's If-None-Match names *etag* or one of its encoded variants."""
+    tags = request.if_none_match
+    if tags.star_tag or tags.contains(etag):
+        return True
+    return any(tags.contains(encoded_etag(etag, coding)) for coding in ("gzip", "zstd"))
+
+
+def not_modified(etag: str) -> Response:
+    """Return an empty 304 response for *etag*."""
+    resp = Response(status=304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = _CACHE_CONTROL
+    return resp
+
+
+def cacheable(rv: Any, etag: str) -> Response:
+    """Attach *etag* to a successful buffered response and apply If-None-Match and Range."""
+    resp = make_response(rv)
+    if resp.status_code != 200 or resp.is_streamed:
+        return resp
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = _CACHE_CONTROL
+    return resp.make_conditional(
+        request, accept_ranges=True, complete_length=resp.calculate_content_length()
+    )
+
+
+def send_cached_file(path: str, *key: Any, **kwargs: Any) -> Response:
+    """``send_file`` with a strong ETag built from *key* and the file's mtime and size.
+
+    Werkzeug then answers If-None-Match with 304 and serves Range requests
+    (honouring If-Range) straight from the file.
+    """
+    st = os.stat(path)
+    etag = strong_etag(*key, st.st_mtime_ns, st.st_size)
+    resp = send_file(path, etag=etag, conditional=True, **kwargs)
+    resp.headers["Cache-Control"] = _CACHE_CONTROL
+    return resp
+
+
+def send_cached_stream(
+    stream: BinaryIO, size: int, mtime: float, download_name: str, *key: Any, **kwargs: Any
+) -> Response:
+    """``send_cached_file`` for a seekable stream of known *size* (an archive member)."""
+    etag = strong_etag(*key, mtime, size)
+    resp = send_file(stream, download_name=download_name, etag=etag, conditional=False, **kwargs)
+    resp.content_length = size
+    resp.last_modified = mtime
+    resp.headers["Cache-Control"] = _CACHE_CONTROL
+    return resp.make_conditional(request, accept_ranges=True, complete_length=size)
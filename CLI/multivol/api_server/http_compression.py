@@ -0,0 +1,152 @@
+"""Negotiated compression of large JSON responses (gzip, or zstd when available).
+
+Registered as an ``after_request`` hook.  JSON bodies above
+``COMPRESS_MIN_SIZE`` are encoded with the best coding the client accepts;
+streamed JSON is compressed chunk by chunk as it is generated.  Compression
+work is bounded by a semaphore: when every slot is busy a buffered response
+goes out uncompressed instead of queueing behind other requests, and a
+streamed one waits for a slot between chunks.  Responses that carry
+a strong ETag are immutable (see ``http_cache``), so their encoded bytes are
+kept in a byte-bounded LRU and each result is compressed only once.
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+from flask import Response, request
+
+try:
+    import zstandard
+except ImportError:  # optional dependency: gzip only
+    zstandard = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "8192"))
+COMPRESS_SLOTS = int(os.environ.get("COMPRESS_SLOTS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+# How long a response waits for a free compression slot before going out uncompressed
+COMPRESS_WAIT = 0.05
+COMPRESS_CACHE_BYTES = int(os.environ.get("COMPRESS_CACHE_MB", "128")) * 1024 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_COMPRESSIBLE = ("application/json", "application/x-ndjson")
+_slots = threading.BoundedSemaphore(COMPRESS_SLOTS)
+_cache: "OrderedDict[tuple[str, str], bytes]" = OrderedDict()
+_cache_size = 0
+_cache_lock = threading.Lock()
+
+
+def _codings() -> list[str]:
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Return the content coding to use for this request, or None."""
+    return request.accept_encodings.best_match(_codings())
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of the *encoding* representation of a resource tagged *etag*."""
+    return f"{etag}-{encoding}"
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    cobj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return cobj.compress(data) + cobj.flush()
+
+
+def _cached(key: tuple[str, str]) -> Optional[bytes]:
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+        return body
+
+
+def _remember(key: tuple[str, str], body: bytes) -> None:
+    global _cache_size  # pylint: disable=global-statement
+    if len(body) > COMPRESS_CACHE_BYTES // 4:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = body
+        _cache_size += len(body)
+        while _cache_size > COMPRESS_CACHE_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _cache_size -= len(evicted)
+
+
+def cache_stats() -> dict[str, int]:
+    """Entries and bytes held by the compressed-response cache."""
+    with _cache_lock:
+        return {"entries": len(_cache), "bytes": _cache_size}
+
+
+def _iter_compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, taking a compression slot per chunk."""
+    if encoding == "zstd":
+        cobj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    else:
+        cobj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            with _slots:
+                out = cobj.compress(chunk)
+            if out:
+                yield out
+        yield cobj.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(resp: Response) -> Response:
+    """``after_request`` hook: encode eligible JSON responses."""
+    etag, weak = resp.get_etag()
+    if resp.status_code == 304:
+        # Echo the validator of the encoded representation the client revalidated
+        for coding in _codings():
+            if etag and not weak and encoded_etag(etag, coding) in request.if_none_match:
+                resp.set_etag(encoded_etag(etag, coding))
+                resp.vary.add("Accept-Encoding")
+        return resp
+    if resp.mimetype not in _COMPRESSIBLE or "Content-Encoding" in resp.headers:
+        return resp
+    resp.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return resp
+    if resp.status_code != 200 or "Range" in request.headers or resp.direct_passthrough:
+        return resp
+
+    if resp.is_streamed:
+        resp.response = _iter_compressed(resp.response, encoding)
+        resp.headers.pop("Content-Length", None)
+    else:
+        data = resp.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return resp
+        key = (etag, encoding) if etag and not weak else None
+        body = _cached(key) if key else None
+        if body is None:
+            if not _slots.acquire(timeout=COMPRESS_WAIT):
+                return resp
+            try:
+                body = _compress(data, encoding)
+            finally:
+                _slots.release()
+            if key:
+                _remember(key, body)
+        resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
+    resp.headers.pop("Accept-Ranges", None)  # ranges would address the encoded bytes
+    if etag and not weak:
+        resp.set_etag(encoded_etag(etag, encoding))
+    return resp
@@ -0,0 +1,160 @@
+"""Out-of-process ingestion of module output files.
+
+Parsing a plugin's ``*_output.json``, re-serialising it and building its
+search/IOC index rows is CPU-bound and, for outputs of hundreds of MB, long
+enough to starve every API thread of the GIL.  That work runs in a pool of
+worker processes; the API process only enqueues files and hands the prepared
+results to the database writer thread (see ``database.submit_write``).
+
+A worker returns its whole ``PreparedResult`` (stored content plus search
+and IOC rows) in one piece, so the API process briefly holds one prepared
+module result at a time per finished task; results are not streamed back.
+"""
+
+import functools
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from multivol.api_server.analytics import export_module_result
+from multivol.api_server.database import submit_write
+from multivol.api_server.result_store import (
+    PreparedResult,
+    prepare_module_result,
+    store_prepared_result,
+)
+from multivol.api_server.utils import clean_and_parse_json
+
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the shared worker pool, (re)creating it when needed."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs waitress threads is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=INGEST_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died (e.g. OOM-killed) so the next submit starts a new one."""
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False)
+
+
+def _prepare_file(
+    scan_id: str, module: str, path: str, keep_invalid: bool
+) -> Optional[PreparedResult]:
+    """Worker process: parse an output file into a PreparedResult.
+
+    The parsed rows are also exported for /query (see analytics).
+
+    Unparseable output yields None, or an empty ``{}`` result when *keep_invalid*
+    is set so the module still shows up as ingested.
+    """
+    data = clean_and_parse_json(path)
+    if data is None:
+        if not keep_invalid:
+            return None
+        data = {}
+    try:
+        export_module_result(scan_id, module, data)
+    except Exception as e:  # pylint: disable=broad-except
+        logging.warning("Parquet export of %s for scan %s failed: %s", module, scan_id, e)
+    return prepare_module_result(scan_id, module, data)
+
+
+def _store_ingested(
+    c: sqlite3.Cursor,
+    prepared: Optional[PreparedResult],
+    scan_id: str,
+    module: str,
+    mark_completed: bool,
+) -> bool:
+    """Queued write: insert a prepared result and optionally mark its module COMPLETED."""
+    if prepared is None:
+        return False
+    stored = store_prepared_result(c, prepared)
+    if mark_completed:
+        c.execute(
+            "UPDATE scan_module_status SET status = 'COMPLETED', updated_at = ?"
+            " WHERE scan_id = ? AND module = ?",
+            (time.time(), scan_id, module),
+        )
+    return stored
+
+
+def submit_ingest(
+    scan_id: str,
+    module: str,
+    path: str,
+    keep_invalid: bool = False,
+    mark_completed: bool = False,
+) -> Future:
+    """Parse *path* in a worker process and queue the result for storage.
+
+    Returns a Future resolving to True once a new scan_results row has been
+    committed (False when the module was already stored or the file could
+    not be parsed).  Callers may ignore it; nothing blocks the calling thread.
+    """
+    done: Future = Future()
+
+    def _on_parsed(parsed: Future, executor: ProcessPoolExecutor) -> None:
+        try:
+            prepared = parsed.result()
+        except Exception as e:  # pylint: disable=broad-except
+            if isinstance(e, BrokenProcessPool):
+                _discard_executor(executor)
+            logging.error("Failed to parse %s for scan %s: %s", module, scan_id, e)
+            done.set_exception(e)
+            return
+        write = submit_write(
+            functools.partial(
+                _store_ingested,
+                prepared=prepared,
+                scan_id=scan_id,
+                module=module,
+                mark_completed=mark_completed,
+            )
+        )
+        write.add_done_callback(functools.partial(_chain, target=done))
+
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            parsed = executor.submit(_prepare_file, scan_id, module, path, keep_invalid)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # The pool died (or was shut down by another thread) before this submit
+            _discard_executor(executor)
+            if attempt:
+                logging.error("Failed to queue %s for scan %s: %s", module, scan_id, e)
+                done.set_exception(e)
+                return done
+            continue
+        parsed.add_done_callback(functools.partial(_on_parsed, executor=executor))
+        break
+    return done
+
+
+def _chain(source: Future, target: Future) -> None:
+    """Copy the outcome of *source* onto *target*."""
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
@@ -0,0 +1,228 @@
+"""Typed indicator (IOC) extraction from module results for the cross-case index.
+
+Indicators are pulled from the string fields of rows produced by plugins that
+carry network, process, command-line and file information.  Each indicator is
+normalised (lower-cased, IPs canonicalised) and written to the global
+``ioc_index`` table so that ``/ioc/search`` can answer "which cases contain X"
+with a single indexed lookup.
+"""
+
+import functools
+import ipaddress
+import json
+import logging
+import re
+import sqlite3
+from typing import Any, Iterator
+from multivol.api_server.compression import decode_content
+from multivol.api_server.database import get_db_connection, submit_write
+from multivol.api_server.utils import iter_row_strings
+
+# Plugins whose output is worth indexing, matched against the lower-cased module name.
+IOC_MODULE_KEYWORDS = (
+    "netscan",
+    "netstat",
+    "sockstat",
+    "cmdline",
+    "filescan",
+    "dlllist",
+    "ldrmodules",
+    "pslist",
+    "psscan",
+    "pstree",
+    "psaux",
+    "bash",
+    "envars",
+    "handles",
+    "svcscan",
+    "malfind",
+    "pagecache.files",
+    "lsof",
+    "memprocfs.filelist",
+)
+
+IOC_KINDS = ("ipv4", "ipv6", "domain", "md5", "sha1", "sha256", "path", "process")
+
+# Columns that hold a process name rather than free text.
+_PROCESS_COLUMNS = {"ImageFileName", "Process", "COMM", "Comm", "Owner"}
+
+# Columns that hold one file path, indexed whole: the path regexes stop at
+# whitespace, which would cut "C:\Program Files\..." after "c:\program".
+_PATH_COLUMNS = {
+    "Name",
+    "Path",
+    "FullPath",
+    "FileName",
+    "File",
+    "MappedPath",
+    "Binary",
+    "ImagePath",
+    "File Path",
+}
+_PATH_VALUE_RE = re.compile(r"^(?:[A-Za-z]:\\|\\|/)")
+
+# File extensions that look like TLDs but almost always denote file names.
+_FILE_EXTENSIONS = frozenset(
+    (
+        "exe dll sys drv ocx cpl scr bat cmd ps1 vbs js lnk pf db dat log txt tmp ini inf cfg "
+        "conf xml json yaml yml mui cat manifest bin so ko py sh pdb etl evtx jpg png gif ico "
+        "zip gz rar 7z doc docx xls xlsx pdf html htm css node local lock"
+    ).split()
+)
+
+_IPV4_RE = re.compile(r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])")
+_IPV6_RE = re.compile(r"(?<![\w:])(?:[0-9A-Fa-f]{0,4}:){2,7}[0-9A-Fa-f]{0,4}(?![\w:])")
+_HASH_RE = re.compile(
+    r"(?<![0-9A-Fa-f])(?:[0-9A-Fa-f]{64}|[0-9A-Fa-f]{40}|[0-9A-Fa-f]{32})(?![0-9A-Fa-f])"
+)
+_DOMAIN_RE = re.compile(
+    r"(?<![\w.\\-])(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,24}(?![\w\\-])"
+)
+_WIN_PATH_RE = re.compile(r"(?:[A-Za-z]:|\\Device|\\SystemRoot|\\\?\?)\\[^\s\"'<>|*?]+")
+_UNIX_PATH_RE = re.compile(r"(?<![\w.:/\\])/(?:[\w.+@-]+/)*[\w.+@-]+")
+
+_HASH_KINDS = {32: "md5", 40: "sha1", 64: "sha256"}
+
+
+def should_index_module(module: str) -> bool:
+    """Return True when *module* is one of the plugins that carry indicators."""
+    lower = module.lower()
+    return any(k in lower for k in IOC_MODULE_KEYWORDS)
+
+
+def _ips(text: str) -> Iterator[tuple[str, str]]:
+    for match in _IPV4_RE.findall(text):
+        try:
+            addr = ipaddress.IPv4Address(match)
+        except ValueError:
+            continue
+        if not addr.is_unspecified:
+            yield "ipv4", str(addr)
+    if ":" in text:
+        for match in _IPV6_RE.findall(text):
+            try:
+                addr6 = ipaddress.IPv6Address(match)
+            except ValueError:
+                continue
+            if not (addr6.is_unspecified or addr6.is_loopback):
+                yield "ipv6", str(addr6)
+
+
+def extract_indicators(text: str) -> set[tuple[str, str]]:
+    """Return the normalised ``(kind, indicator)`` pairs found in a string."""
+    found: set[tuple[str, str]] = set(_ips(text))
+    for match in _HASH_RE.findall(text):
+        found.add((_HASH_KINDS[len(match)], match.lower()))
+    for match in _WIN_PATH_RE.findall(text):
+        found.add(("path", match.rstrip(".,;").lower()))
+    if "/" in text:
+        for match in _UNIX_PATH_RE.findall(text):
+            if len(match) > 1:
+                found.add(("path", match))
+    for m in _DOMAIN_RE.finditer(text):
+        start = m.start()
+        # A single leading slash means a path component, "//" a URL authority
+        if start and text[start - 1] == "/" and text[start - 2 : start] != "//":
+            continue
+        match = m.group(0)
+        tld = match.rsplit(".", 1)[-1].lower()
+        if tld not in _FILE_EXTENSIONS:
+            found.add(("domain", match.lower()))
+    return found
+
+
+def extract_row_indicators(row: Any) -> set[tuple[str, str]]:
+    """Collect indicators from every string field of a result row."""
+    found: set[tuple[str, str]] = set()
+    if isinstance(row, dict):
+        for column in _PROCESS_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str) and value and value != "N/A":
+                found.add(("process", value.lower()))
+        for column in _PATH_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str) and _PATH_VALUE_RE.match(value):
+                path = value.strip()
+                found.add(("path", path if path.startswith("/") else path.lower()))
+    for text in iter_row_strings(row):
+        found |= extract_indicators(text)
+    return found
+
+
+def ioc_index_rows(scan_id: str, module: str, data: Any) -> list[tuple[str, str, str, str, int]]:
+    """Return the ioc_index rows for every row of a module result."""
+    if not isinstance(data, list) or not should_index_module(module):
+        return []
+    return [
+        (indicator, kind, scan_id, module, idx)
+        for idx, row in enumerate(data)
+        for kind, indicator in extract_row_indicators(row)
+    ]
+
+
+def insert_ioc_rows(c: sqlite3.Cursor, rows: list[tuple[str, str, str, str, int]]) -> None:
+    """Write precomputed ioc_index rows (see ioc_index_rows)."""
+    c.executemany(
+        "INSERT INTO ioc_index (indicator, kind, scan_id, module, row_idx) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def normalize_query(value: str) -> str:
+    """Normalise a search term the same way indicators are stored."""
+    value = value.strip()
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        pass
+    return value if value.startswith("/") else value.lower()
+
+
+def backfill_iocs() -> None:
+    """Index indicators of results stored before the IOC index existed.
+
+    Runs once per result (tracked with ``scan_results.ioc_indexed``) and is
+    safe to call repeatedly; intended for a background thread at startup.
+    Extraction happens on the calling thread; only the inserts are queued on
+    the database writer.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT id, scan_id, module FROM scan_results WHERE ioc_indexed = 0")
+        pending = c.fetchall()
+        writes = []
+        for result_id, scan_id, module in pending:
+            rows: list[tuple[str, str, str, str, int]] = []
+            if should_index_module(module):
+                c.execute(
+                    "SELECT content, encoding, dict_id FROM scan_results WHERE id = ?",
+                    (result_id,),
+                )
+                try:
+                    data = json.loads(decode_content(*c.fetchone()))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    data = None
+                rows = ioc_index_rows(scan_id, module, data)
+            op = functools.partial(_mark_ioc_indexed, result_id=result_id, rows=rows)
+            writes.append(submit_write(op))
+        for future in writes:
+            future.result()
+        if pending:
+            logging.info("Backfilled IOC index for %d stored results", len(pending))
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("IOC backfill failed")
+    finally:
+        conn.close()
+
+
+def _mark_ioc_indexed(
+    c: sqlite3.Cursor, result_id: int, rows: list[tuple[str, str, str, str, int]]
+) -> None:
+    """Queued write: add a backfilled result's indicators and flag it as indexed."""
+    c.execute("SELECT ioc_indexed FROM scan_results WHERE id = ?", (result_id,))
+    flag = c.fetchone()
+    if flag is None or flag[0]:
+        return  # deleted or indexed concurrently
+    insert_ioc_rows(c, rows)
+    c.execute("UPDATE scan_results SET ioc_indexed = 1 WHERE id = ?", (result_id,))
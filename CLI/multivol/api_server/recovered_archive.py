@@ -0,0 +1,228 @@
+"""Seekable archive of the RecoverFs output (``recovered_fs.zip``).
+
+Volatility ships the recovered page cache as ``recovered_fs.tar.gz``, which
+can only be read front to back, so serving one file used to mean extracting
+everything (``tar -xzf``) and keeping a second, uncompressed copy on disk.
+``repack_tarball`` instead streams the tarball once into a ZIP in which every
+member is compressed on its own.  The offset of each member's local header is
+recorded in the path index (``fs_index``), and ``MemberReader`` seeks straight
+to it: reading a file costs the same whatever the size of the archive.
+Once the archive's central directory has been checked against what was
+written, the tarball is deleted, so the recovered files are stored once.
+"""
+
+import io
+import logging
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from typing import Optional
+
+from multivol.api_server.zipstream import PRECOMPRESSED
+
+ARCHIVE_NAME = "recovered_fs.zip"
+TARBALL_NAME = "recovered_fs.tar.gz"
+COPY_BUFFER = 1 << 20
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_EARLIEST_ZIP_TIME = time.mktime((1980, 1, 1, 0, 0, 0, 0, 0, -1))
+_output_locks: dict[str, threading.RLock] = {}
+_output_locks_lock = threading.Lock()
+
+
+def _member_name(name: str) -> Optional[str]:
+    """Normalised archive name of a tar member, or None when it escapes the root."""
+    parts = [p for p in name.replace("\\", "/").split("/") if p and p != "."]
+    if not parts or ".." in parts:
+        return None
+    return "/".join(parts)
+
+
+def _zip_info(name: str, member: tarfile.TarInfo) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, time.localtime(max(member.mtime, _EARLIEST_ZIP_TIME))[:6])
+    if member.isdir():
+        info.filename += "/"
+        info.external_attr = 0o40755 << 16 | 0x10
+        return info
+    info.file_size = member.size
+    info.external_attr = (member.mode & 0o7777 | 0o100000) << 16
+    stored = os.path.splitext(name)[1].lower() in PRECOMPRESSED or member.size == 0
+    info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+    return info
+
+
+def repack_tarball(output_dir: str) -> Optional[str]:
+    """Convert ``recovered_fs.tar.gz`` into ``recovered_fs.zip`` in one streaming pass.
+
+    Returns the archive path, or None when there is no tarball.  Regular files
+    and directories are kept; links and devices are skipped, and a path seen
+    twice keeps its first copy.  The tarball is removed once the archive is
+    verified; on failure it is kept and no archive is written.
+    """
+    zip_path = os.path.join(output_dir, ARCHIVE_NAME)
+    with output_dir_lock(output_dir):
+        if os.path.exists(zip_path):
+            return zip_path
+        if not os.path.exists(os.path.join(output_dir, TARBALL_NAME)):
+            return None
+        return _repack(output_dir, zip_path)
+
+
+def output_dir_lock(output_dir: str) -> threading.RLock:
+    """The lock serialising RecoverFs post-processing of *output_dir*.
+
+    Held while the tarball is repacked and while the tree is rebuilt, which
+    both run from scan completion and from status polls.  Reentrant, so a
+    holder can call ``repack_tarball``.
+    """
+    with _output_locks_lock:
+        return _output_locks.setdefault(os.path.abspath(output_dir), threading.RLock())
+
+
+def _repack(output_dir: str, zip_path: str) -> Optional[str]:
+    tar_path = os.path.join(output_dir, TARBALL_NAME)
+    # Unique name: another process may be repacking the same scan
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{ARCHIVE_NAME}.", suffix=".tmp", dir=output_dir)
+    os.fchmod(fd, 0o644)
+    os.close(fd)
+    sizes: dict[str, int] = {}
+    started = time.perf_counter()
+    try:
+        with (
+            tarfile.open(tar_path, "r|gz") as tar,
+            zipfile.ZipFile(tmp_path, "w", allowZip64=True) as zf,
+        ):
+            for member in tar:
+                name = _member_name(member.name)
+                if name is None or name in sizes or not (member.isfile() or member.isdir()):
+                    continue
+                info = _zip_info(name, member)
+                if member.isdir():
+                    zf.writestr(info, b"")
+                    sizes[name] = 0
+                    continue
+                sizes[name] = member.size
+                src = tar.extractfile(member)
+                with zf.open(info, "w", force_zip64=member.size >= zipfile.ZIP64_LIMIT) as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER)
+        _verify(tmp_path, sizes)
+        os.replace(tmp_path, zip_path)
+    except (OSError, tarfile.TarError, zlib.error, zipfile.BadZipFile):
+        logging.exception("Failed to repack %s", tar_path)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    try:
+        os.remove(tar_path)
+    except OSError as e:
+        logging.warning("Could not remove %s after repacking: %s", tar_path, e)
+    logging.info(
+        "Repacked %d recovered files into %s in %.1fs",
+        len(sizes),
+        zip_path,
+        time.perf_counter() - started,
+    )
+    return zip_path
+
+
+def _verify(zip_path: str, sizes: dict[str, int]) -> None:
+    """Check that the written archive lists every member with its size (``BadZipFile`` if not).
+
+    Member data was checksummed as it was written; this reads the central
+    directory back before the tarball, the only other copy, is deleted.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        listed = {info.filename.rstrip("/"): info.file_size for info in zf.infolist()}
+    if listed != {name.rstrip("/"): size for name, size in sizes.items()}:
+        raise zipfile.BadZipFile(f"{zip_path} does not match the tarball it was repacked from")
+
+
+class MemberReader(io.RawIOBase):
+    """Seekable reader of one ZIP member located by its local header offset.
+
+    Stored members seek in O(1); deflated ones seek forward by inflating and
+    backward by restarting from the member's first byte.
+    """
+
+    def __init__(
+        self, path: str, header_offset: int, compress_size: int, size: int, method: int
+    ) -> None:
+        super().__init__()
+        self.size = size
+        self.method = method
+        self._compress_size = compress_size
+        self._f = open(path, "rb")  # pylint: disable=consider-using-with
+        self._f.seek(header_offset)
+        signature, name_len, extra_len = _LOCAL_HEADER.unpack(self._f.read(_LOCAL_HEADER.size))
+        if signature != b"PK\x03\x04":
+            self._f.close()
+            raise ValueError(f"No ZIP member at offset {header_offset} of {path}")
+        self._data_start = header_offset + _LOCAL_HEADER.size + name_len + extra_len
+        self._restart()
+
+    def _restart(self) -> None:
+        self._pos = 0
+        self._raw_left = self._compress_size
+        self._pending = b""
+        self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._f.seek(self._data_start)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def _inflate(self, n: int) -> bytes:
+        """Up to *n* bytes of the deflated member at the current position."""
+        while not self._pending and (self._raw_left or self._inflater.unconsumed_tail):
+            data = self._inflater.unconsumed_tail
+            if not data:
+                data = self._f.read(min(COPY_BUFFER, self._raw_left))
+                self._raw_left -= len(data)
+                if not data:
+                    break
+            self._pending = self._inflater.decompress(data, COPY_BUFFER)
+        out, self._pending = self._pending[:n], self._pending[n:]
+        return out
+
+    def readinto(self, b: bytearray) -> int:  # type: ignore[override]
+        n = min(len(b), self.size - self._pos)
+        if n <= 0:
+            return 0
+        if self.method == zipfile.ZIP_STORED:
+            data = self._f.read(n)
+        else:
+            data = self._inflate(n)
+        b[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        target = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence] + offset
+        target = min(max(target, 0), self.size)
+        if self.method == zipfile.ZIP_STORED:
+            self._f.seek(self._data_start + target)
+            self._pos = target
+            return target
+        if target < self._pos:
+            self._restart()
+        while self._pos < target:
+            skipped = self._inflate(min(COPY_BUFFER, target - self._pos))
+            if not skipped:
+                break
+            self._pos += len(skipped)
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._f.close()
+        super().close()
@@ -0,0 +1,115 @@
+"""In-process LRU of serialised result responses, bounded by bytes.
+
+Completed module results are immutable, so the body ``/results/<uuid>``
+produces for a given (scan, module, query parameters) can be reused until the
+result is replaced.  Entries are keyed by the response's strong ETag (see
+``http_cache``), which already changes whenever the stored result or the
+output files do; ``invalidate_scan`` additionally frees a scan's entries as
+soon as a module is re-run or the scan is deleted.
+"""
+
+import dataclasses
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from flask import Response
+
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_MB", "256")) * 1024 * 1024
+# Bodies larger than this share of the budget are not worth evicting everything else for
+_MAX_ENTRY_SHARE = 4
+# Response headers that are part of the cached representation
+_KEPT_HEADERS = ("X-Total-Count",)
+
+
+@dataclasses.dataclass
+class CachedResponse:
+    """A serialised 200 response body plus the headers needed to replay it."""
+
+    scan_id: str
+    body: bytes
+    mimetype: str
+    headers: list[tuple[str, str]]
+
+    def to_response(self) -> Response:
+        """Build a fresh Response carrying the cached body."""
+        resp = Response(self.body, mimetype=self.mimetype)
+        for name, value in self.headers:
+            resp.headers[name] = value
+        return resp
+
+
+class ResponseCache:
+    """Thread-safe LRU of CachedResponse objects bounded by total body size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the entry stored under *key* (and mark it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, scan_id: str, resp: Response) -> None:
+        """Store a successful buffered response under *key*."""
+        if resp.status_code != 200 or resp.is_streamed:
+            return
+        body = resp.get_data()
+        if len(body) > self.max_bytes // _MAX_ENTRY_SHARE:
+            return
+        headers = [(h, resp.headers[h]) for h in _KEPT_HEADERS if h in resp.headers]
+        entry = CachedResponse(scan_id, body, resp.mimetype, headers)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+
+    def invalidate_scan(self, scan_id: str) -> int:
+        """Drop every entry of *scan_id*; returns how many were removed."""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e.scan_id == scan_id]
+            for key in stale:
+                self._size -= len(self._entries.pop(key).body)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, float]:
+        """Entry count, bytes used, hit/miss/eviction counters and hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+result_cache = ResponseCache(RESPONSE_CACHE_BYTES)
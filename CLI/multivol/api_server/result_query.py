@@ -0,0 +1,271 @@
+"""Server-side filtering, sorting and column projection for module results.
+
+Result rows live in ``scan_results.content`` as a JSON array.  Instead of
+loading the whole blob into Python, queries are compiled into SQLite JSON1
+expressions over ``json_each(content)`` (decoded through the ``result_json``
+SQL function when the blob is stored compressed) so that only the requested page of
+(optionally projected) rows ever leaves the storage layer.
+
+Query-string syntax accepted by ``/results/<uuid>``::
+
+    filter=<column>:<op>:<value>   (repeatable; ops: eq, ne, contains, gt, gte, lt, lte)
+    sort=<column>[,-<column>...]   (leading '-' sorts descending)
+    fields=<column>[,<column>...]  (projection; other keys are dropped)
+
+No index backs these filters: a module's rows are one JSON value, so every
+query walks that module's array inside SQLite.  That keeps the work and the
+memory out of Python, but its cost still grows with the module's row count.
+The web UI filters loaded rows itself and does not use these parameters;
+the MCP ``get_multivol_results`` tool does.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import re
+import sqlite3
+from typing import Any, Iterable, Iterator, Optional
+
+FILTER_OPS = ("eq", "ne", "contains", "gt", "gte", "lt", "lte")
+
+_COMPARISON_SQL = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+_INT_RE = re.compile(r"[+-]?\d+")
+_HEX_RE = re.compile(r"[+-]?0[xX][0-9a-fA-F]+")
+_DECIMAL_RE = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+)")
+
+
+@dataclasses.dataclass
+class ResultQuery:
+    """Parsed filter/sort/projection spec for a module result request."""
+
+    filters: list[tuple[str, str, Any]] = dataclasses.field(default_factory=list)
+    sort: list[tuple[str, bool]] = dataclasses.field(default_factory=list)
+    fields: list[str] = dataclasses.field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        """Return True when the request asks for no filtering, sorting or projection."""
+        return not (self.filters or self.sort or self.fields)
+
+
+def _coerce_value(raw: str) -> Any:
+    """Interpret a decimal or hex integer, or a plain decimal, as a number; else keep the string.
+
+    Words Python would also parse as floats ("nan", "inf", "1e5") stay strings.
+    """
+    if _INT_RE.fullmatch(raw):
+        return int(raw)
+    if _HEX_RE.fullmatch(raw):
+        return int(raw, 16)
+    if _DECIMAL_RE.fullmatch(raw):
+        return float(raw)
+    return raw
+
+
+def _check_column(column: str) -> str:
+    """Validate a column name so it can be embedded safely in a JSON path."""
+    column = column.strip()
+    if not column or '"' in column:
+        raise ValueError(f"Invalid column name: {column!r}")
+    return column
+
+
+def _json_path(column: str) -> str:
+    """Return the JSON1 path expression addressing *column* in a row object."""
+    return f'$."{column}"'
+
+
+def parse_result_query(
+    filters: Iterable[str], sort: Optional[str], fields: Optional[str]
+) -> ResultQuery:
+    """Build a ResultQuery from raw query-string values.
+
+    Raises ``ValueError`` with a user-facing message when a filter is malformed.
+    """
+    query = ResultQuery()
+    for raw in filters:
+        parts = raw.split(":", 2)
+        if len(parts) != 3:
+            raise ValueError(f"Invalid filter {raw!r}; expected <column>:<op>:<value>")
+        column, op, value = parts
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator {op!r}; use one of {FILTER_OPS}")
+        coerced = value if op == "contains" else _coerce_value(value)
+        query.filters.append((_check_column(column), op, coerced))
+
+    for key in (sort or "").split(","):
+        key = key.strip()
+        if not key:
+            continue
+        descending = key.startswith("-")
+        query.sort.append((_check_column(key.lstrip("-")), descending))
+
+    query.fields = [_check_column(f) for f in (fields or "").split(",") if f.strip()]
+    return query
+
+
+def _build_where(query: ResultQuery) -> tuple[str, list[Any]]:
+    """Compile the filter list into a SQL fragment (AND-joined) and its parameters."""
+    clauses: list[str] = []
+    params: list[Any] = []
+    for column, op, value in query.filters:
+        expr = "json_extract(je.value, ?)"
+        path = _json_path(column)
+        if op == "eq":
+            clauses.append(f"{expr} = ?")
+            params.extend([path, value])
+        elif op == "ne":
+            clauses.append(f"({expr} IS NULL OR {expr} != ?)")
+            params.extend([path, path, value])
+        elif op == "contains":
+            clauses.append(f"instr(lower(CAST({expr} AS TEXT)), lower(?)) > 0")
+            params.extend([path, value])
+        else:
+            clauses.append(f"{expr} {_COMPARISON_SQL[op]} ?")
+            params.extend([path, value])
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def _build_select(query: ResultQuery) -> tuple[str, list[Any]]:
+    """Return the SELECT expression producing each row's JSON text, plus its parameters."""
+    if not query.fields:
+        return (
+            "CASE WHEN je.type IN ('object', 'array') THEN je.value ELSE json_quote(je.value) END",
+            [],
+        )
+    pairs = ", ".join("?, json_extract(je.value, ?)" for _ in query.fields)
+    params: list[Any] = []
+    for column in query.fields:
+        params.extend([column, _json_path(column)])
+    return f"json_object({pairs})", params
+
+
+def _build_order(query: ResultQuery) -> tuple[str, list[Any]]:
+    """Return the ORDER BY clause; original row order is the final tie-breaker."""
+    terms: list[str] = []
+    params: list[Any] = []
+    for column, descending in query.sort:
+        terms.append(f"json_extract(je.value, ?) {'DESC' if descending else 'ASC'}")
+        params.append(_json_path(column))
+    terms.append("CAST(je.key AS INTEGER)")
+    return " ORDER BY " + ", ".join(terms), params
+
+
+# Decode (and, for compressed results, decompress) the blob once per statement
+_DOC = (
+    "WITH doc(j) AS MATERIALIZED (SELECT result_json(content, encoding, dict_id)"
+    " FROM scan_results WHERE scan_id = ? AND module = ?) "
+)
+_BASE = " FROM doc, json_each(doc.j) je WHERE json_type(doc.j) = 'array'"
+
+
+def query_module_rows(
+    c: sqlite3.Cursor,
+    scan_id: str,
+    module: str,
+    query: ResultQuery,
+    limit: int,
+    offset: int,
+) -> tuple[list[str], int]:
+    """Run *query* against the stored result of (scan_id, module).
+
+    Returns ``(rows, total)`` where *rows* holds the serialised JSON text of
+    each row on the requested page and *total* is the number of matching rows
+    before pagination.  Non-array results match nothing.
+    """
+    where, where_params = _build_where(query)
+    select, select_params = _build_select(query)
+    order, order_params = _build_order(query)
+
+    c.execute(f"{_DOC}SELECT COUNT(*){_BASE}{where}", [scan_id, module, *where_params])  # nosec B608
+    total = c.fetchone()[0]
+
+    page = " LIMIT ? OFFSET ?" if limit > 0 else " LIMIT -1 OFFSET ?"
+    page_params: list[Any] = [limit, offset] if limit > 0 else [offset]
+    c.execute(
+        f"{_DOC}SELECT {select}{_BASE}{where}{order}{page}",  # nosec B608
+        [scan_id, module, *select_params, *where_params, *order_params, *page_params],
+    )
+    return [r[0] for r in c.fetchall()], total
+
+
+def iter_module_rows(
+    c: sqlite3.Cursor, scan_id: str, module: str, query: ResultQuery, batch_size: int = 500
+) -> Iterator[str]:
+    """Yield the serialised JSON text of every row of (scan_id, module) matching *query*.
+
+    Rows are fetched from SQLite in batches, so memory stays bounded by
+    *batch_size* rows however large the result is.
+    """
+    where, where_params = _build_where(query)
+    select, select_params = _build_select(query)
+    # json_each already yields rows in order; only sort when asked to (sorting buffers)
+    order, order_params = _build_order(query) if query.sort else ("", [])
+    c.execute(
+        f"{_DOC}SELECT {select}{_BASE}{where}{order}",  # nosec B608
+        [scan_id, module, *select_params, *where_params, *order_params],
+    )
+    while batch := c.fetchmany(batch_size):
+        for row in batch:
+            yield row[0]
+
+
+def module_columns(c: sqlite3.Cursor, scan_id: str, module: str) -> list[str]:
+    """Return the keys of the row objects of (scan_id, module) in first-seen order."""
+    c.execute(
+        f"{_DOC}SELECT k.key FROM doc, json_each(doc.j) je, json_each(je.value) k"  # nosec B608
+        " WHERE json_type(doc.j) = 'array' AND je.type = 'object'"
+        " GROUP BY k.key ORDER BY MIN(CAST(je.key AS INTEGER) * 1000000 + k.id)",
+        [scan_id, module],
+    )
+    return [r[0] for r in c.fetchall()]
+
+
+def _matches(row: Any, column: str, op: str, value: Any) -> bool:
+    """Evaluate a single filter in Python (mirrors the SQL semantics)."""
+    actual = row.get(column) if isinstance(row, dict) else None
+    if op == "contains":
+        return actual is not None and str(value).lower() in str(actual).lower()
+    if op == "eq":
+        return actual == value
+    if op == "ne":
+        return actual is None or actual != value
+    if actual is None or isinstance(actual, (dict, list)):
+        return False
+    try:
+        if op == "gt":
+            return actual > value
+        if op == "gte":
+            return actual >= value
+        if op == "lt":
+            return actual < value
+        return actual <= value
+    except TypeError:
+        return False
+
+
+def _sort_key(row: Any, column: str) -> tuple[int, Any]:
+    """Order rows like SQLite: NULL < numbers < text, comparing within each class."""
+    value = row.get(column) if isinstance(row, dict) else None
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, bool):
+        return (1, int(value))
+    return (2, value if isinstance(value, str) else json.dumps(value))
+
+
+def apply_in_memory(
+    data: list[Any], query: ResultQuery, limit: int, offset: int
+) -> tuple[list[Any], int]:
+    """Apply *query* to an already-parsed result list (used for on-disk fallbacks)."""
+    rows = [r for r in data if all(_matches(r, *f) for f in query.filters)]
+    for column, descending in reversed(query.sort):
+        rows.sort(key=lambda r, col=column: _sort_key(r, col), reverse=descending)
+    total = len(rows)
+    rows = rows[offset : offset + limit] if limit > 0 else rows[offset:]
+    if query.fields:
+        rows = [{f: r.get(f) if isinstance(r, dict) else None for f in query.fields} for r in rows]
+    return rows, total
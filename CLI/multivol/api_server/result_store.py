@@ -0,0 +1,205 @@
+"""Persistence of module results into scan_results plus the derived search indexes.
+
+Every code path that stores a module's output (scan ingestion, per-module
+refresh, manual plugin execution, MemProcFS listing cache) goes through
+``store_module_result`` so that derived structures stay in sync with the
+canonical JSON blob.  These helpers take a cursor and never commit, so they
+can run as queued writes on the database writer thread (``submit_write``);
+``backfill_fts`` is the exception, decoding on its caller's thread and
+queueing only the inserts.
+"""
+
+import dataclasses
+import functools
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Optional, Union
+from multivol.api_server.compression import decode_content, encode_content
+from multivol.api_server.database import get_db_connection, submit_write
+from multivol.api_server.ioc import insert_ioc_rows, ioc_index_rows
+from multivol.api_server.utils import iter_row_strings
+
+
+@dataclasses.dataclass
+class PreparedResult:
+    """A module result already serialised and indexed, ready for a cheap insert.
+
+    Built by prepare_module_result, which is pure CPU work and picklable so it
+    can run in an ingestion worker process; store_prepared_result only writes.
+    """
+
+    scan_id: str
+    module: str
+    content: Union[str, bytes]  # as stored: JSON text, or compressed (see encoding)
+    encoding: Optional[str]
+    dict_id: Optional[int]
+    size: int  # length of the uncompressed JSON text
+    row_count: int
+    is_error: bool
+    fts_rows: list[tuple[str, str, str, int]]
+    ioc_rows: list[tuple[str, str, str, str, int]]
+
+
+def fts_index_rows(scan_id: str, module: str, data: Any) -> list[tuple[str, str, str, int]]:
+    """Return one result_fts document per top-level result row."""
+    if not isinstance(data, list):
+        return []
+    return [(" ".join(iter_row_strings(row)), scan_id, module, idx) for idx, row in enumerate(data)]
+
+
+def index_rows_fts(c: sqlite3.Cursor, scan_id: str, module: str, data: Any) -> None:
+    """Add one full-text document per top-level result row to result_fts."""
+    _insert_fts_rows(c, fts_index_rows(scan_id, module, data))
+
+
+def _insert_fts_rows(c: sqlite3.Cursor, rows: list[tuple[str, str, str, int]]) -> None:
+    c.executemany(
+        "INSERT INTO result_fts (text, scan_id, module, row_idx) VALUES (?, ?, ?, ?)", rows
+    )
+
+
+def is_error_result(data: Any) -> bool:
+    """Return True for the placeholder stored when a module's output could not be parsed."""
+    return isinstance(data, dict) and data.get("error") == "Invalid JSON output"
+
+
+def prepare_module_result(scan_id: str, module: str, data: Any) -> PreparedResult:
+    """Serialise and compress *data* and compute its search and IOC index rows."""
+    text = json.dumps(data)
+    content, encoding, dict_id = encode_content(module, text)
+    return PreparedResult(
+        scan_id=scan_id,
+        module=module,
+        content=content,
+        encoding=encoding,
+        dict_id=dict_id,
+        size=len(text),
+        row_count=len(data) if isinstance(data, list) else 0,
+        is_error=is_error_result(data),
+        fts_rows=fts_index_rows(scan_id, module, data),
+        ioc_rows=ioc_index_rows(scan_id, module, data),
+    )
+
+
+def _result_exists(c: sqlite3.Cursor, scan_id: str, module: str) -> bool:
+    c.execute(
+        "SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
+        (scan_id, module),
+    )
+    return c.fetchone() is not None
+
+
+def store_prepared_result(c: sqlite3.Cursor, prepared: PreparedResult) -> bool:
+    """Insert a prepared result unless (scan_id, module) already has one.
+
+    Returns True when a new row was written.  The caller owns the transaction.
+    """
+    if _result_exists(c, prepared.scan_id, prepared.module):
+        return False
+    c.execute(
+        "INSERT INTO scan_results (scan_id, module, content, encoding, dict_id, created_at,"
+        " fts_indexed, ioc_indexed, row_count, size, is_error)"
+        " VALUES (?, ?, ?, ?, ?, ?, 1, 1, ?, ?, ?)",
+        (
+            prepared.scan_id,
+            prepared.module,
+            prepared.content,
+            prepared.encoding,
+            prepared.dict_id,
+            time.time(),
+            prepared.row_count,
+            prepared.size,
+            int(prepared.is_error),
+        ),
+    )
+    _insert_fts_rows(c, prepared.fts_rows)
+    insert_ioc_rows(c, prepared.ioc_rows)
+    return True
+
+
+def store_module_result(c: sqlite3.Cursor, scan_id: str, module: str, data: Any) -> bool:
+    """Insert *data* as the result of (scan_id, module) unless one already exists.
+
+    Returns True when a new row was written.  The caller owns the transaction.
+    """
+    if _result_exists(c, scan_id, module):
+        return False
+    return store_prepared_result(c, prepare_module_result(scan_id, module, data))
+
+
+def upsert_module_status(
+    c: sqlite3.Cursor,
+    scan_id: str,
+    module: str,
+    status: str,
+    error: Optional[str] = None,
+) -> None:
+    """Insert or update the scan_module_status row of (scan_id, module)."""
+    c.execute(
+        "INSERT INTO scan_module_status (scan_id, module, status, error_message, updated_at)"
+        " VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT (scan_id, module) DO UPDATE SET status = excluded.status,"
+        " error_message = excluded.error_message, updated_at = excluded.updated_at",
+        (scan_id, module, status, error, time.time()),
+    )
+
+
+def backfill_fts(scan_id: str) -> None:
+    """Index results of *scan_id* that were stored before the search index existed.
+
+    Blocks until done.  Results are decoded and split into documents on the
+    calling thread; only the inserts are queued on the database writer.
+    """
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "SELECT id, module FROM scan_results WHERE scan_id = ? AND fts_indexed = 0",
+            (scan_id,),
+        )
+        pending = c.fetchall()
+        writes = []
+        for result_id, module in pending:
+            c.execute(
+                "SELECT content, encoding, dict_id FROM scan_results WHERE id = ?", (result_id,)
+            )
+            row = c.fetchone()
+            try:
+                data = json.loads(decode_content(*row)) if row else None
+            except (json.JSONDecodeError, TypeError, ValueError):
+                logging.warning(
+                    "Cannot decode result %d of scan %s for indexing", result_id, scan_id
+                )
+                data = None
+            rows = fts_index_rows(scan_id, module, data)
+            op = functools.partial(_mark_fts_indexed, result_id=result_id, rows=rows)
+            writes.append(submit_write(op))
+    finally:
+        conn.close()
+    for future in writes:
+        future.result()
+    if pending:
+        logging.info("Backfilled full-text index for %d results of scan %s", len(pending), scan_id)
+
+
+def _mark_fts_indexed(
+    c: sqlite3.Cursor, result_id: int, rows: list[tuple[str, str, str, int]]
+) -> None:
+    """Queued write: add a backfilled result's documents and flag it as indexed."""
+    c.execute("SELECT fts_indexed FROM scan_results WHERE id = ?", (result_id,))
+    flag = c.fetchone()
+    if flag is None or flag[0]:
+        return  # deleted or indexed concurrently
+    _insert_fts_rows(c, rows)
+    c.execute("UPDATE scan_results SET fts_indexed = 1 WHERE id = ?", (result_id,))
+
+
+def delete_scan_index(c: sqlite3.Cursor, scan_id: str) -> None:
+    """Remove every derived index entry belonging to *scan_id*."""
+    c.execute("DELETE FROM result_fts WHERE scan_id = ?", (scan_id,))
+    c.execute("DELETE FROM ioc_index WHERE scan_id = ?", (scan_id,))
+    c.execute("DELETE FROM fs_entries WHERE scan_id = ?", (scan_id,))
+    c.execute("DELETE FROM fs_path_fts WHERE scan_id = ?", (scan_id,))
+    c.execute("DELETE FROM artifacts WHERE scan_id = ?", (scan_id,))
@@ -0,0 +1,128 @@
+"""Artifact hash routes: per-scan listings and cross-case lookup by SHA-256."""
+
+import os
+import re
+import sqlite3
+from typing import Any
+from flask import Blueprint, request, jsonify, Response
+from multivol.api_server.artifacts import is_hashing, submit_artifact_hashing
+from multivol.api_server.database import get_db_connection
+
+artifacts_bp = Blueprint("artifacts_bp", __name__)
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _artifact(row: sqlite3.Row) -> dict[str, Any]:
+    """API shape of an artifacts row; ``name`` is the path users know it by."""
+    if row["member"]:
+        name = "/" + row["member"]
+    elif row["source"] == "recovered_fs" and row["output_dir"]:
+        name = "/" + os.path.relpath(row["path"], os.path.join(row["output_dir"], "recovered_fs"))
+    else:
+        name = os.path.basename(row["path"])
+    return {
+        "scan_id": row["scan_id"],
+        "source": row["source"],
+        "name": name,
+        "sha256": row["sha256"],
+        "size": row["size"],
+        "deduplicated": bool(row["stored"]),
+    }
+
+
+@artifacts_bp.route("/artifacts/<sha256>", methods=["GET"])
+def lookup_artifact(sha256: str) -> Response:
+    """Every recovered or dumped copy of a file, across all scans."""
+    sha256 = sha256.lower()
+    if not _SHA256.match(sha256):
+        return jsonify({"error": "Expected a SHA-256 hex digest"}), 400
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(
+        "SELECT a.*, s.name AS scan_name, s.output_dir FROM artifacts a"
+        " LEFT JOIN scans s ON s.uuid = a.scan_id WHERE a.sha256 = ?"
+        " ORDER BY a.scan_id, a.source, a.path, a.member",
+        (sha256,),
+    )
+    rows = c.fetchall()
+    conn.close()
+    if not rows:
+        return jsonify({"error": "Unknown hash"}), 404
+    return jsonify(
+        {
+            "sha256": sha256,
+            "size": rows[0]["size"],
+            "copies": len(rows),
+            "scans": len({row["scan_id"] for row in rows}),
+            "artifacts": [{**_artifact(row), "scan_name": row["scan_name"]} for row in rows],
+        }
+    )
+
+
+@artifacts_bp.route("/scans/<uuid>/artifacts", methods=["GET"])
+def list_scan_artifacts(uuid: str) -> Response:
+    """Hashed artifacts of a scan, paged by ``limit``/``offset``, optionally by ``source``.
+
+    Each artifact carries the number of copies of its content across all
+    scans, so files seen in other cases stand out.
+    """
+    limit = max(request.args.get("limit", 100, type=int), 1)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    source = request.args.get("source")
+    where = "a.scan_id = ?"
+    params: list[Any] = [uuid]
+    if source:
+        where += " AND a.source = ?"
+        params.append(source)
+
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
+    if not c.fetchone():
+        conn.close()
+        return jsonify({"error": "Scan not found"}), 404
+    c.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT a.sha256), COALESCE(SUM(a.size), 0)"
+        f" FROM artifacts a WHERE {where}",  # nosec B608
+        params,
+    )
+    total, unique, total_size = c.fetchone()
+    c.execute(
+        "SELECT a.*, s.output_dir,"
+        " (SELECT COUNT(*) FROM artifacts o WHERE o.sha256 = a.sha256) AS copies"
+        f" FROM artifacts a JOIN scans s ON s.uuid = a.scan_id WHERE {where}"  # nosec B608
+        " ORDER BY a.source, a.path, a.member LIMIT ? OFFSET ?",
+        [*params, limit, offset],
+    )
+    rows = c.fetchall()
+    conn.close()
+    return jsonify(
+        {
+            "total": total,
+            "unique": unique,
+            "total_size": total_size,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + limit < total,
+            "hashing": is_hashing(uuid),
+            "artifacts": [{**_artifact(row), "copies": row["copies"]} for row in rows],
+        }
+    )
+
+
+@artifacts_bp.route("/scans/<uuid>/artifacts/hash", methods=["POST"])
+def queue_artifact_hashing(uuid: str) -> Response:
+    """Queue hashing and deduplication of a scan's new or changed artifacts."""
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute("SELECT 1 FROM scans WHERE uuid = ?", (uuid,))
+    found = c.fetchone()
+    conn.close()
+    if not found:
+        return jsonify({"error": "Scan not found"}), 404
+    if not submit_artifact_hashing(uuid):
+        return jsonify({"status": "running"}), 200
+    return jsonify({"status": "queued"}), 202
@@ -11,9 +11,12 @@ import logging
 import threading
 from typing import Any, TypedDict
 import docker
-from flask import Blueprint, request, jsonify, send_file, Response
-from multivol.api_server.database import get_db_connection
-from multivol.api_server.utils import resolve_host_path
+from flask import Blueprint, request, jsonify, Response
+from multivol.api_server.artifacts import submit_artifact_hashing
+from multivol.api_server.database import get_db_connection, run_write, submit_write
+from multivol.api_server.evidence import refresh_evidence
+from multivol.api_server.http_cache import send_cached_file
+from multivol.api_server.utils import replace_file, resolve_host_path
 from multivol.api_server.config import STORAGE_DIR
 
 VOLATILITY3_SYMBOLS_BANNER_URL = (
@@ -101,7 +104,12 @@ def _move_task_output(task_out_dir: str, case_extract_dir: str) -> list[str]:
         raise RuntimeError("Volatility plugin produced no output files")
     created = []
     for f in files:
-        shutil.move(os.path.join(task_out_dir, f), os.path.join(case_extract_dir, f))
+        src, dst = os.path.join(task_out_dir, f), os.path.join(case_extract_dir, f)
+        if os.path.isdir(src):
+            shutil.move(src, dst)
+        else:
+            # Same filesystem: a rename, never a copy over a file that may be a store link
+            replace_file(src, dst)
         created.append(f)
     os.rmdir(task_out_dir)
     return created
@@ -114,22 +122,22 @@ def _persist_task_result(
     case_extract_dir: str,
     error_msg: str,
 ) -> None:
-    """Write the final dump task outcome to the database."""
-    conn = get_db_connection()
-    c = conn.cursor()
+    """Queue the final dump task outcome for the database writer."""
     if status == "completed" and created_files:
         output_path = os.path.join(case_extract_dir, created_files[0])
-        c.execute(
-            "UPDATE dump_tasks SET status = 'completed', output_path = ? WHERE task_id = ?",
-            (output_path, task_id),
+        submit_write(
+            lambda c: c.execute(
+                "UPDATE dump_tasks SET status = 'completed', output_path = ? WHERE task_id = ?",
+                (output_path, task_id),
+            )
         )
     else:
-        c.execute(
-            "UPDATE dump_tasks SET status = 'failed', error = ? WHERE task_id = ?",
-            (error_msg, task_id),
+        submit_write(
+            lambda c: c.execute(
+                "UPDATE dump_tasks SET status = 'failed', error = ? WHERE task_id = ?",
+                (error_msg, task_id),
+            )
         )
-    conn.commit()
-    conn.close()
 
 
 def background_dump_task(
@@ -204,6 +212,9 @@ def background_dump_task(
             task_status = dump_tasks[task_id]["status"]
             task_error = dump_tasks[task_id].get("error", "Unknown error")
         _persist_task_result(task_id, task_status, created_files, case_extract_dir, task_error)
+        if task_status == "completed":
+            refresh_evidence(os.path.basename(case_extract_dir))
+            submit_artifact_hashing(scan["uuid"])
 
 
 @dump_bp.route("/scans/<scan_id>/dump-file", methods=["POST"])
@@ -214,9 +225,9 @@ def dump_file_from_memory(scan_id: str) -> Response:
     c = conn.cursor()
     c.execute("SELECT * FROM scans WHERE uuid = ?", (scan_id,))
     scan = c.fetchone()
+    conn.close()
 
     if not scan:
-        conn.close()
         return jsonify({"error": "Scan not found"}), 404
 
     data = request.get_json() or {}
@@ -231,16 +242,16 @@ def dump_file_from_memory(scan_id: str) -> Response:
     file_path = data.get("file_path")
 
     if not virt_addr and not file_path:
-        conn.close()
         return jsonify({"error": "Virtual address or File Path required"}), 400
 
     task_id = str(uuid.uuid4())
-    c.execute(
-        "INSERT INTO dump_tasks (task_id, scan_id, status, created_at) VALUES (?, ?, ?, ?)",
-        (task_id, scan_id, "pending", time.time()),
+    # Wait for the insert so the task is visible to the client's first status poll
+    run_write(
+        lambda c: c.execute(
+            "INSERT INTO dump_tasks (task_id, scan_id, status, created_at) VALUES (?, ?, ?, ?)",
+            (task_id, scan_id, "pending", time.time()),
+        )
     )
-    conn.commit()
-    conn.close()
 
     scan_dict = dict(scan)
 
@@ -290,4 +301,6 @@ def download_dump_result(task_id: str) -> Response:
     if not file_path or not os.path.exists(file_path):
         return jsonify({"error": "File not found on server"}), 404
 
-    return send_file(file_path, as_attachment=True, download_name=os.path.basename(file_path))
+    return send_cached_file(
+        file_path, task_id, as_attachment=True, download_name=os.path.basename(file_path)
+    )
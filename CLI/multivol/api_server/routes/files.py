@@ -1,8 +1,10 @@
 """Evidence file upload, symbol management, and file listing routes."""
 
 import io
+import lzma
 import os
 import sqlite3
+import struct
 import subprocess
 import tarfile
 import time
@@ -11,12 +13,34 @@ import logging
 import threading
 import uuid
 import zipfile
-from typing import Any
-from flask import Blueprint, request, jsonify, send_from_directory, Response
+import zlib
+from collections import Counter
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Callable, Optional
+from flask import Blueprint, request, jsonify, Response
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 from multivol.api_server.config import STORAGE_DIR, BASE_DIR
-from multivol.api_server.utils import get_file_hash
 from multivol.api_server.database import get_db_connection
+from multivol.api_server.artifacts import deduplicate, prune_store
+from multivol.api_server.evidence import (
+    EXTRACTED_SUFFIX,
+    ensure_reconciled,
+    evidence_hashes,
+    refresh_evidence,
+    submit_evidence_hashing,
+    top_level,
+)
+from multivol.api_server.http_cache import send_cached_file
+from multivol.api_server.utils import partial_path, replace_file
+from multivol.api_server.uploads import (
+    DEFAULT_CHUNK_SIZE,
+    abort_session,
+    create_session,
+    finalize_session,
+    get_session,
+    write_chunk,
+)
 
 files_bp = Blueprint("files_bp", __name__)
 
@@ -25,6 +49,15 @@ _extraction_tasks: dict[str, dict] = {}
 _extraction_lock = threading.Lock()
 
 _ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+_TAR_SUFFIXES = _ARCHIVE_SUFFIXES[1:]
+_STREAM_CHUNK = 8 * 1024 * 1024
+# Minimum seconds between two progress updates of an extraction
+_PROGRESS_INTERVAL = 0.25
+# Threads inflating the members of one zip upload concurrently
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+# Stored zip members at least this large are copied with copy_file_range
+_COPY_RANGE_MIN = 16 * 1024 * 1024
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
 # Dump file extensions — used to pick the "primary" file after extraction
 _DUMP_EXTENSIONS = (".raw", ".mem", ".vmem", ".dd", ".img", ".bin", ".dmp", ".lime", ".E01", ".e01")
 
@@ -34,6 +67,11 @@ def _is_archive(filename: str) -> bool:
     return any(lower.endswith(s) for s in _ARCHIVE_SUFFIXES)
 
 
+def _is_tar(filename: str) -> bool:
+    lower = filename.lower()
+    return any(lower.endswith(s) for s in _TAR_SUFFIXES)
+
+
 def _safe_extract_path(dest_dir: str, member_path: str) -> str | None:
     """Return the absolute destination path for *member_path* or None if unsafe."""
     member_path = member_path.lstrip("/")
@@ -45,6 +83,270 @@ def _safe_extract_path(dest_dir: str, member_path: str) -> str | None:
     return full
 
 
+def _move_extracted(tmp_dir: str, dest_dir: str) -> list[str]:
+    """Move everything extracted into *tmp_dir* to *dest_dir* (same FS = instant rename).
+
+    Existing files are replaced, never overwritten in place.
+    """
+    extracted = []
+    for root, _, fnames in os.walk(tmp_dir):
+        for fname in fnames:
+            src_path = os.path.join(root, fname)
+            rel = os.path.relpath(src_path, tmp_dir)
+            dst_path = os.path.join(dest_dir, rel)
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            replace_file(src_path, dst_path)
+            extracted.append(dst_path)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    return extracted
+
+
+def _primary_first(extracted: list[str]) -> None:
+    """Sort in place: prefer known dump extensions, then largest file."""
+
+    def _rank(p: str) -> tuple[int, int]:
+        ext = os.path.splitext(p)[1].lower()
+        pref = 0 if ext in _DUMP_EXTENSIONS else 1
+        size = -os.path.getsize(p) if os.path.exists(p) else 0
+        return (pref, size)
+
+    extracted.sort(key=_rank)
+
+
+class _CountingReader:
+    """Read-only file wrapper counting the bytes consumed, for progress reporting."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.count += len(data)
+        return data
+
+
+def _extract_tar_stream(
+    stream: BinaryIO, dest_dir: str, on_progress: Callable[[int], None]
+) -> list[str]:
+    """Extract a tar, tar.gz, tar.bz2 or tar.xz read front to back from *stream*.
+
+    Nothing is written but the regular members, each checked with
+    ``_safe_extract_path``, so the archive itself never touches the disk.
+    *on_progress* receives the number of archive bytes read, at most
+    a few times per second.  Returns the extracted paths, primary dump first.
+    """
+    reader = _CountingReader(stream)
+    tmp_dir = os.path.join(dest_dir, f".extract_{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir, exist_ok=True)
+    last_report = 0.0
+    try:
+        with tarfile.open(fileobj=reader, mode="r|*") as tf:  # type: ignore[call-overload]
+            for member in tf:
+                if not member.isfile():
+                    continue
+                dest = _safe_extract_path(tmp_dir, member.name)
+                if dest is None:
+                    logging.warning("Skipping unsafe tar entry: %s", member.name)
+                    continue
+                src = tf.extractfile(member)
+                if src is None:
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as dst:
+                    while chunk := src.read(_STREAM_CHUNK):
+                        dst.write(chunk)
+                        if time.monotonic() - last_report > _PROGRESS_INTERVAL:
+                            last_report = time.monotonic()
+                            on_progress(reader.count)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    extracted = _move_extracted(tmp_dir, dest_dir)
+    _primary_first(extracted)
+    return extracted
+
+
+def _extract_tar_upload(task_id: str, stream: BinaryIO, dest_dir: str, total: int) -> None:
+    """Background thread: stream-extract an uploaded tar archive, updating _extraction_tasks."""
+
+    def _set(progress: int, status: str, files: list[str] | None = None, error: str = "") -> None:
+        with _extraction_lock:
+            _extraction_tasks[task_id].update(
+                {"progress": progress, "status": status, "files": files or [], "error": error}
+            )
+
+    try:
+        with stream:
+            extracted = _extract_tar_stream(
+                stream,
+                dest_dir,
+                lambda done: _set(min(int(done / max(total, 1) * 100), 99), "extracting"),
+            )
+        refresh_evidence(*(top_level(p) for p in extracted))
+        _set(100, "done", extracted)
+        logging.info("Extraction complete, %d files: %s", len(extracted), extracted)
+    except Exception as exc:  # pylint: disable=broad-except
+        logging.exception("Extraction failed for task %s", task_id)
+        _set(0, "error", error=str(exc))
+
+
+def _detach_upload(stream: Any) -> BinaryIO:
+    """An independent handle on an uploaded file, still readable after the request ends.
+
+    Werkzeug spools uploads to an unlinked temp file and closes it at the end
+    of the request; a duplicated descriptor keeps it alive without a copy.
+    """
+    try:
+        detached = os.fdopen(os.dup(stream.fileno()), "rb")
+    except (AttributeError, io.UnsupportedOperation, OSError):
+        stream.seek(0)
+        return io.BytesIO(stream.read())
+    detached.seek(0)
+    return detached
+
+
+def _copy_stored_member(archive_path: str, member: zipfile.ZipInfo, dest: str) -> bool:
+    """Copy an uncompressed zip member with ``copy_file_range``, in the kernel.
+
+    Returns False when the kernel or filesystem cannot, leaving the caller
+    to go through zipfile.  The CRC is not checked on this path.
+    """
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None:
+        return False
+    with open(archive_path, "rb") as src:
+        src.seek(member.header_offset)
+        signature, name_len, extra_len = _ZIP_LOCAL_HEADER.unpack(
+            src.read(_ZIP_LOCAL_HEADER.size)
+        )
+        if signature != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Bad local header for {member.filename}")
+        offset = member.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
+        with open(dest, "wb") as dst:
+            remaining = member.file_size
+            try:
+                while remaining:
+                    n = copy_range(src.fileno(), dst.fileno(), remaining, offset)
+                    if n == 0:
+                        raise zipfile.BadZipFile(f"{member.filename} is truncated")
+                    offset += n
+                    remaining -= n
+            except OSError as e:
+                if remaining != member.file_size:
+                    raise
+                logging.debug("copy_file_range unavailable (%s); using zipfile", e)
+                return False
+    return True
+
+
+def _extract_zip_batch(
+    archive_path: str,
+    batch: list[tuple[zipfile.ZipInfo, str]],
+    done: list[int],
+    slot: int,
+    stop: threading.Event,
+) -> None:
+    """Worker: extract *batch* through one ZipFile, adding the bytes written to ``done[slot]``.
+
+    Each worker opens the archive once: members of a shared ZipFile are read
+    under its lock, and opening one per member re-parses the central directory.
+    Members are written under a partial name and then replace their destination.
+    """
+    with zipfile.ZipFile(archive_path, "r") as zf:
+        for member, dest in batch:
+            if stop.is_set():
+                return
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = partial_path(dest)
+            try:
+                _extract_zip_member(zf, archive_path, member, tmp, done, slot)
+                replace_file(tmp, dest)
+            except BaseException:
+                _remove_quietly(tmp)
+                raise
+
+
+def _extract_zip_member(
+    zf: zipfile.ZipFile,
+    archive_path: str,
+    member: zipfile.ZipInfo,
+    dest: str,
+    done: list[int],
+    slot: int,
+) -> None:
+    if (
+        member.compress_type == zipfile.ZIP_STORED
+        and member.file_size >= _COPY_RANGE_MIN
+        and not member.flag_bits & 0x1  # encrypted
+        and _copy_stored_member(archive_path, member, dest)
+    ):
+        done[slot] += member.file_size
+        return
+    with zf.open(member) as src, open(dest, "wb") as dst:
+        while chunk := src.read(_STREAM_CHUNK):
+            dst.write(chunk)
+            done[slot] += len(chunk)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _extract_zip(
+    archive_path: str, dest_dir: str, on_progress: Callable[[int], None]
+) -> list[str]:
+    """Extract the members of a zip concurrently in EXTRACT_WORKERS threads.
+
+    zlib releases the GIL while inflating, so members decompress in parallel.
+    Members are dealt out largest first into one batch per worker.  Each
+    worker counts its own bytes in a slot of ``done``; only this thread sums
+    them and calls *on_progress* (a percentage), at most every
+    ``_PROGRESS_INTERVAL`` seconds.
+    """
+    with zipfile.ZipFile(archive_path, "r") as zf:
+        by_dest: dict[str, zipfile.ZipInfo] = {}
+        for member in zf.infolist():
+            if member.is_dir():
+                continue
+            dest = _safe_extract_path(dest_dir, member.filename)
+            if dest is None:
+                logging.warning("Skipping unsafe zip entry: %s", member.filename)
+                continue
+            # A name stored twice keeps its last copy, as a sequential extraction would
+            by_dest.pop(dest, None)
+            by_dest[dest] = member
+    members = [(member, dest) for dest, member in by_dest.items()]
+    total = max(sum(m.file_size for m, _ in members), 1)
+    workers = max(min(EXTRACT_WORKERS, len(members)), 1)
+    batches: list[list[tuple[zipfile.ZipInfo, str]]] = [[] for _ in range(workers)]
+    for i, item in enumerate(sorted(members, key=lambda m: -m[0].file_size)):
+        batches[i % workers].append(item)
+    done = [0] * workers
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {
+            pool.submit(_extract_zip_batch, archive_path, batch, done, slot, stop)
+            for slot, batch in enumerate(batches)
+        }
+        try:
+            while pending:
+                finished, pending = wait(
+                    pending, timeout=_PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION
+                )
+                for future in finished:
+                    future.result()
+                on_progress(min(int(sum(done) / total * 100), 99))
+        except BaseException:
+            stop.set()
+            raise
+    # Archive order, so the primary-dump sort is stable across runs
+    return [dest for _, dest in members]
+
+
 def _extract_archive(task_id: str, archive_path: str, dest_dir: str) -> None:
     """Extract *archive_path* into *dest_dir*, updating progress in _extraction_tasks."""
     def _set(progress: int, status: str, files: list[str] | None = None, error: str = "") -> None:
@@ -59,26 +361,7 @@ def _extract_archive(task_id: str, archive_path: str, dest_dir: str) -> None:
         extracted: list[str] = []
 
         if lower.endswith(".zip"):
-            with zipfile.ZipFile(archive_path, "r") as zf:
-                members = [m for m in zf.infolist() if not m.is_dir()]
-                total = max(sum(m.file_size for m in members), 1)
-                done = 0
-                CHUNK = 8 * 1024 * 1024
-                for member in members:
-                    dest = _safe_extract_path(dest_dir, member.filename)
-                    if dest is None:
-                        logging.warning("Skipping unsafe zip entry: %s", member.filename)
-                        continue
-                    os.makedirs(os.path.dirname(dest), exist_ok=True)
-                    with zf.open(member) as src, open(dest, "wb") as dst:
-                        while True:
-                            chunk = src.read(CHUNK)
-                            if not chunk:
-                                break
-                            dst.write(chunk)
-                            done += len(chunk)
-                            _set(int(done / total * 100), "extracting")
-                    extracted.append(dest)
+            extracted = _extract_zip(archive_path, dest_dir, lambda pct: _set(pct, "extracting"))
 
         else:  # tar family
             # ── Use native `tar` for ~10× faster extraction (C vs Python) ──
@@ -139,16 +422,7 @@ def _extract_archive(task_id: str, archive_path: str, dest_dir: str) -> None:
                         except (AttributeError, OSError):
                             pass
 
-            # Move extracted files from tmp_dir → dest_dir (same FS = instant rename)
-            for root, _, fnames in os.walk(tmp_dir):
-                for fname in fnames:
-                    src_path = os.path.join(root, fname)
-                    rel = os.path.relpath(src_path, tmp_dir)
-                    dst_path = os.path.join(dest_dir, rel)
-                    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                    shutil.move(src_path, dst_path)
-                    extracted.append(dst_path)
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+            extracted = _move_extracted(tmp_dir, dest_dir)
 
         # Delete the archive itself after successful extraction
         try:
@@ -156,14 +430,8 @@ def _extract_archive(task_id: str, archive_path: str, dest_dir: str) -> None:
         except OSError:
             pass
 
-        # Sort: prefer known dump extensions, then largest file
-        def _rank(p: str) -> tuple[int, int]:
-            ext = os.path.splitext(p)[1].lower()
-            pref = 0 if ext in _DUMP_EXTENSIONS else 1
-            size = -os.path.getsize(p) if os.path.exists(p) else 0
-            return (pref, size)
-
-        extracted.sort(key=_rank)
+        _primary_first(extracted)
+        refresh_evidence(top_level(archive_path), *(top_level(p) for p in extracted))
         _set(100, "done", extracted)
         logging.info("Extraction complete, %d files: %s", len(extracted), extracted)
 
@@ -178,7 +446,20 @@ def _save_stream(stream, save_path: str) -> None:
     Priority:
     1. os.sendfile (Linux zero-copy, data stays in kernel buffers)
     2. shutil.copyfileobj with a 64 MiB buffer (userspace fallback)
+
+    The data goes to a partial name first, then replaces *save_path*: an
+    existing file may share its inode with other copies in the artifact store.
     """
+    tmp = partial_path(save_path)
+    try:
+        _write_stream(stream, tmp)
+        replace_file(tmp, save_path)
+    except BaseException:
+        _remove_quietly(tmp)
+        raise
+
+
+def _write_stream(stream, save_path: str) -> None:
     try:
         stream.seek(0)
     except (AttributeError, io.UnsupportedOperation):
@@ -217,8 +498,9 @@ def _save_stream(stream, save_path: str) -> None:
 def upload_file() -> Response:
     """Upload a memory dump or evidence file to the storage directory.
 
-    Archives (.zip, .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz) are saved then
-    extracted asynchronously.  The response includes a ``task_id`` which the
+    Archives (.zip, .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz) are extracted
+    asynchronously; tar archives straight from the uploaded stream, without
+    saving the archive first.  The response includes a ``task_id`` which the
     client polls via GET /upload/progress/<task_id>.
     """
     if "file" not in request.files:
@@ -231,6 +513,17 @@ def upload_file() -> Response:
         filename = secure_filename(file.filename)
         save_path = os.path.join(STORAGE_DIR, filename)
 
+        if _is_tar(filename):
+            stream = _detach_upload(file.stream)
+            total = os.fstat(stream.fileno()).st_size if hasattr(stream, "fileno") else 0
+            task_id = str(uuid.uuid4())
+            with _extraction_lock:
+                _extraction_tasks[task_id] = {"progress": 0, "status": "extracting", "files": [], "error": ""}
+            threading.Thread(
+                target=_extract_tar_upload, args=(task_id, stream, STORAGE_DIR, total), daemon=True
+            ).start()
+            return jsonify({"status": "extracting", "task_id": task_id})
+
         try:
             logging.debug("Saving upload to %s", save_path)
             _save_stream(file.stream, save_path)
@@ -239,23 +532,134 @@ def upload_file() -> Response:
             logging.exception("Failed to save file")
             return jsonify({"error": str(e)}), 500
 
-        if _is_archive(filename):
-            task_id = str(uuid.uuid4())
-            extract_dir = STORAGE_DIR  # extract flat into storage root
-            with _extraction_lock:
-                _extraction_tasks[task_id] = {"progress": 0, "status": "extracting", "files": [], "error": ""}
-            threading.Thread(
-                target=_extract_archive, args=(task_id, save_path, extract_dir), daemon=True
-            ).start()
-            return jsonify({"status": "extracting", "task_id": task_id, "path": save_path})
-
-        # Plain file — background hash, immediate success
-        threading.Thread(target=get_file_hash, args=(save_path,), daemon=True).start()
-        return jsonify({"status": "success", "path": save_path, "server_path": save_path})
+        return _uploaded(save_path)
 
     return jsonify({"error": "No file content"}), 400
 
 
+def _uploaded(save_path: str, sha256: Optional[str] = None) -> Response:
+    """Response for a stored upload: start archive extraction, or hash a plain file.
+
+    *sha256* is the digest of a chunked upload, already known and cached.
+    """
+    extra = {"sha256": sha256} if sha256 else {}
+    if _is_archive(os.path.basename(save_path)):
+        task_id = str(uuid.uuid4())
+        extract_dir = STORAGE_DIR  # extract flat into storage root
+        with _extraction_lock:
+            _extraction_tasks[task_id] = {"progress": 0, "status": "extracting", "files": [], "error": ""}
+        threading.Thread(
+            target=_extract_archive, args=(task_id, save_path, extract_dir), daemon=True
+        ).start()
+        return jsonify({"status": "extracting", "task_id": task_id, "path": save_path, **extra})
+
+    if sha256:
+        # Hashed while the chunks arrived: an identical dump collapses right away
+        deduplicate(save_path, sha256)
+    refresh_evidence(top_level(save_path))
+    if not sha256:
+        submit_evidence_hashing([save_path])
+    return jsonify({"status": "success", "path": save_path, "server_path": save_path, **extra})
+
+
+@files_bp.route("/upload/sessions", methods=["POST"])
+def create_upload_session() -> Response:
+    """Start a resumable chunked upload.
+
+    JSON body: ``filename``, ``size`` in bytes, optional ``chunk_size``
+    (1-64 MiB, default 8 MiB) and ``sha256`` of the whole file.  Chunks are
+    then sent with ``PUT /upload/sessions/<id>/chunks/<n>``, in any order
+    and in parallel, and the upload is finished with ``POST .../complete``.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        session = create_session(
+            data.get("filename", ""),
+            int(data.get("size") or 0),
+            int(data.get("chunk_size") or DEFAULT_CHUNK_SIZE),
+            data.get("sha256"),
+        )
+    except (TypeError, ValueError) as e:
+        message, status = e.args if len(e.args) == 2 else ("Invalid size or chunk_size", 400)
+        return jsonify({"error": message}), status
+    return jsonify(session), 201
+
+
+@files_bp.route("/upload/sessions/<upload_id>", methods=["GET"])
+def upload_session_status(upload_id: str) -> Response:
+    """Return an upload session with the indexes of the chunks still missing."""
+    try:
+        session = get_session(upload_id)
+    except ValueError as e:
+        return jsonify({"error": e.args[0]}), e.args[1]
+    with session.lock:
+        return jsonify(session.describe())
+
+
+@files_bp.route("/upload/sessions/<upload_id>/chunks/<int:index>", methods=["PUT"])
+def upload_chunk(upload_id: str, index: int) -> Response:
+    """Store one chunk (raw request body), verified against ``X-Chunk-SHA256`` when sent."""
+    try:
+        result = write_chunk(
+            upload_id, index, request.get_data(cache=False), request.headers.get("X-Chunk-SHA256")
+        )
+    except ValueError as e:
+        return jsonify({"error": e.args[0]}), e.args[1]
+    except OSError as e:
+        logging.exception("Failed to write chunk %d of upload %s", index, upload_id)
+        return jsonify({"error": str(e)}), 500
+    return jsonify(result)
+
+
+@files_bp.route("/upload/sessions/<upload_id>/complete", methods=["POST"])
+def complete_upload_session(upload_id: str) -> Response:
+    """Finish a chunked upload: same response as ``POST /upload``, plus the file's SHA-256."""
+    try:
+        save_path, digest = finalize_session(upload_id)
+    except ValueError as e:
+        return jsonify({"error": e.args[0]}), e.args[1]
+    except OSError as e:
+        logging.exception("Failed to finalise upload %s", upload_id)
+        return jsonify({"error": str(e)}), 500
+    return _uploaded(save_path, digest)
+
+
+@files_bp.route("/upload/sessions/<upload_id>", methods=["DELETE"])
+def abort_upload_session(upload_id: str) -> Response:
+    """Cancel a chunked upload and delete the chunks received so far."""
+    try:
+        abort_session(upload_id)
+    except ValueError as e:
+        return jsonify({"error": e.args[0]}), e.args[1]
+    return jsonify({"status": "aborted"})
+
+
+@files_bp.route("/upload/stream/<filename>", methods=["PUT"])
+def upload_tar_stream(filename: str) -> Response:
+    """Upload a tar-family archive as the raw request body, extracting it as it arrives.
+
+    The archive is never stored: members are written while the body is read,
+    so the dump is ready as soon as the last byte is received (under the async
+    server, which hands this route the body while it is still uploading).
+    Responds with the extracted paths, primary dump first, once done.
+    """
+    name = secure_filename(filename)
+    if not _is_tar(name):
+        return jsonify({"error": f"Not a tar archive; use one of {list(_TAR_SUFFIXES)}"}), 400
+    try:
+        extracted = _extract_tar_stream(request.stream, STORAGE_DIR, lambda done: None)
+    except (tarfile.TarError, EOFError, zlib.error, lzma.LZMAError) as e:
+        logging.warning("Rejected streamed archive %s: %s", name, e)
+        return jsonify({"error": f"Invalid archive: {e}"}), 400
+    except OSError as e:
+        logging.exception("Streaming extraction of %s failed", name)
+        return jsonify({"error": str(e)}), 500
+    refresh_evidence(*(top_level(p) for p in extracted))
+    submit_evidence_hashing(extracted)
+    logging.info("Streamed extraction of %s complete, %d files", name, len(extracted))
+    return jsonify({"status": "done", "files": extracted})
+
+
 @files_bp.route("/upload/progress/<task_id>", methods=["GET"])
 def upload_progress(task_id: str) -> Response:
     """Return extraction progress for an archive upload task."""
@@ -266,9 +670,8 @@ def upload_progress(task_id: str) -> Response:
 
     resp = dict(task)
     if task["status"] == "done":
-        # Start background hash for each extracted file
-        for f in task.get("files", []):
-            threading.Thread(target=get_file_hash, args=(f,), daemon=True).start()
+        # Start background hash for the extracted files
+        submit_evidence_hashing(task.get("files", []))
         # Clean up completed task after client retrieves it
         with _extraction_lock:
             _extraction_tasks.pop(task_id, None)
@@ -342,162 +745,139 @@ def delete_symbol() -> Response:
     return jsonify({"error": "Not found"}), 404
 
 
-def _get_dir_size(start_path: str) -> int:
-    """Return total byte size of all files under start_path."""
-    total = 0
-    for dirpath, _, filenames in os.walk(start_path):
-        for f in filenames:
-            total += os.path.getsize(os.path.join(dirpath, f))
-    return total
+def _case_names(c: sqlite3.Cursor) -> tuple[dict[str, str], dict[str, str]]:
+    """Map dump filename → case name, and case name → its latest dump filename."""
+    case_map: dict[str, str] = {}
+    latest_dump: dict[str, str] = {}
+    c.execute("SELECT name, dump_path FROM scans ORDER BY created_at ASC")
+    for row in c.fetchall():
+        if row["name"] and row["dump_path"]:
+            case_map[os.path.basename(row["dump_path"])] = row["name"]
+            latest_dump[row["name"]] = os.path.basename(row["dump_path"])
+    return case_map, latest_dump
 
 
-def _load_case_name_map() -> dict[str, str]:
-    """Return a dict mapping dump filename → case name from the scans table."""
-    case_map: dict[str, str] = {}
-    try:
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT name, dump_path FROM scans ORDER BY created_at ASC")
-        for row in c.fetchall():
-            if row["name"] and row["dump_path"]:
-                case_map[os.path.basename(row["dump_path"])] = row["name"]
-        conn.close()
-    except Exception:  # pylint: disable=broad-except
-        logging.warning("Failed to load case names from DB for evidence listing.", exc_info=True)
-    return case_map
-
-
-def _resolve_source_dump_name(dump_base: str) -> str:
-    """Return the dump filename for a case name (dump_base), or dump_base as fallback."""
-    try:
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute(
-            "SELECT dump_path FROM scans WHERE name = ? ORDER BY created_at DESC LIMIT 1",
-            (dump_base,),
-        )
-        row = c.fetchone()
-        conn.close()
-        if row:
-            return os.path.basename(row["dump_path"])
-    except Exception:  # pylint: disable=broad-except
-        logging.warning(
-            "Failed to resolve source dump from DB; falling back to folder name.",
-            exc_info=True,
-        )
-    return dump_base
+def _uploaded_date(mtime: Optional[float]) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(mtime or 0))
 
 
-def _build_extracted_group(item: str, path: str, processed_dumps: set[str]) -> dict[str, Any]:
+def _build_extracted_group(
+    group: sqlite3.Row,
+    children: list[sqlite3.Row],
+    dumps: dict[str, sqlite3.Row],
+    source_dump: str,
+) -> dict[str, Any]:
     """Build an evidence-group dict for a *_extracted directory."""
-    dump_base = item[:-10]  # strip _extracted
-    files = []
-    try:
-        for sub in os.listdir(path):
-            if sub.endswith(".sha256"):
-                continue
-            subpath = os.path.join(path, sub)
-            if os.path.isfile(subpath):
-                files.append(
-                    {
-                        "id": os.path.join(item, sub),
-                        "name": sub,
-                        "size": os.path.getsize(subpath),
-                        "type": "Extracted File",
-                    }
-                )
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("Error reading subdir %s", path)
-
-    source_dump = _resolve_source_dump_name(dump_base)
-    if source_dump and source_dump != "Unknown Source":
-        dump_path = os.path.join(STORAGE_DIR, source_dump)
-        if os.path.exists(dump_path):
-            processed_dumps.add(source_dump)
-            files.insert(
-                0,
-                {
-                    "id": source_dump,
-                    "name": source_dump,
-                    "size": os.path.getsize(dump_path),
-                    "type": "Memory Dump",
-                    "is_source": True,
-                },
-            )
-
+    files: list[dict[str, Any]] = [
+        {
+            "id": row["name"],
+            "name": row["name"].split("/", 1)[1],
+            "size": row["size"],
+            "type": "Extracted File",
+        }
+        for row in children
+    ]
+    source = dumps.get(source_dump)
+    if source is not None:
+        files.insert(
+            0,
+            {
+                "id": source_dump,
+                "name": source_dump,
+                "size": source["size"],
+                "type": "Memory Dump",
+                "is_source": True,
+            },
+        )
     return {
-        "id": item,
-        "name": dump_base,
+        "id": group["name"],
+        "name": group["name"][: -len(EXTRACTED_SUFFIX)],
         "type": "Evidence Group",
-        "size": _get_dir_size(path),
+        "size": group["size"],
         "hash": source_dump,
-        "source_id": source_dump
-        if os.path.exists(os.path.join(STORAGE_DIR, source_dump))
-        else None,
+        "source_id": source_dump if source is not None else None,
         "uploaded": "Extracted group",
         "children": files,
     }
 
 
-def _build_dump_group(item: str, path: str, case_map: dict[str, str]) -> dict[str, Any]:
-    """Build an evidence-group dict for a standalone dump file."""
-    display_name = case_map.get(item, "Unassigned Evidence")
+def _build_dump_group(
+    row: sqlite3.Row, case_map: dict[str, str], copies: Counter[str]
+) -> dict[str, Any]:
+    """Build an evidence-group dict for a standalone dump file.
+
+    ``copies`` counts the evidence files with the same content, stored once.
+    """
+    item = row["name"]
     child_file = {
         "id": item,
         "name": item,
-        "size": os.path.getsize(path),
+        "size": row["size"],
         "type": "Memory Dump",
-        "hash": get_file_hash(path),
-        "uploaded": time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(path))),
+        "hash": row["sha256"],
+        "copies": copies[row["sha256"]] if row["sha256"] else 1,
+        "uploaded": _uploaded_date(row["mtime"]),
         "is_source": True,
     }
     return {
         "id": f"group_{item}",
-        "name": display_name,
-        "size": os.path.getsize(path),
+        "name": case_map.get(item, "Unassigned Evidence"),
+        "size": row["size"],
         "type": "Evidence Group",
         "hash": item,
         "source_id": item,
-        "uploaded": time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(path))),
+        "uploaded": _uploaded_date(row["mtime"]),
         "children": [child_file],
     }
 
 
 @files_bp.route("/evidences", methods=["GET"])
 def list_evidences() -> Response:
-    """List all evidence files grouped by dump and extracted data."""
-    try:
-        all_items = [
-            i
-            for i in os.listdir(STORAGE_DIR)
-            if not (i.startswith("scans.db") or i.endswith(".sha256"))
-        ]
-    except FileNotFoundError:
-        logging.error("Storage dir not found: %s", STORAGE_DIR)
-        all_items = []
-
-    case_map = _load_case_name_map()
-    evidences: list[dict[str, Any]] = []
-    processed_dumps: set[str] = set()
+    """List all evidence files grouped by dump and extracted data, from the evidence catalog.
 
-    for item in all_items:
-        path = os.path.join(STORAGE_DIR, item)
-        if os.path.isdir(path) and item.endswith("_extracted"):
-            evidences.append(_build_extracted_group(item, path, processed_dumps))
+    A dump's ``hash`` is null until its background hashing completes.
+    """
+    ensure_reconciled()
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute("SELECT name, parent, kind, size, mtime, sha256 FROM evidence ORDER BY parent, name")
+    rows = c.fetchall()
+    case_map, latest_dump = _case_names(c)
+    conn.close()
+
+    dumps = {row["name"]: row for row in rows if row["kind"] == "dump"}
+    copies = Counter(row["sha256"] for row in rows if row["sha256"])
+    children: dict[str, list[sqlite3.Row]] = {}
+    for row in rows:
+        if row["kind"] == "extracted":
+            children.setdefault(row["parent"], []).append(row)
 
-    for item in all_items:
-        path = os.path.join(STORAGE_DIR, item)
-        if os.path.isfile(path) and not item.endswith(".sha256") and item not in processed_dumps:
-            evidences.append(_build_dump_group(item, path, case_map))
+    evidences: list[dict[str, Any]] = []
+    processed_dumps: set[str] = set()
+    for row in rows:
+        if row["kind"] == "group":
+            dump_base = row["name"][: -len(EXTRACTED_SUFFIX)]
+            source_dump = latest_dump.get(dump_base, dump_base)
+            if source_dump in dumps:
+                processed_dumps.add(source_dump)
+            evidences.append(
+                _build_extracted_group(row, children.get(row["name"], []), dumps, source_dump)
+            )
+    for name, row in dumps.items():
+        if name not in processed_dumps:
+            evidences.append(_build_dump_group(row, case_map, copies))
 
     return jsonify(evidences)
 
 
 @files_bp.route("/evidence/<filename>", methods=["DELETE"])
 def delete_evidence(filename: str) -> Response:
-    """Delete an evidence file and its associated extracted directory."""
+    """Delete an evidence file and its associated extracted directory.
+
+    Evidence is stored by content: the data itself is only removed from the
+    store once no other filename references it.
+    """
     # Strip virtual group prefix if present
     if filename.startswith("group_"):
         filename = filename[6:]
@@ -505,6 +885,8 @@ def delete_evidence(filename: str) -> Response:
     filename = secure_filename(filename)
     path = os.path.join(STORAGE_DIR, filename)
     if os.path.exists(path):
+        extracted_dir = os.path.join(STORAGE_DIR, f"{filename}_extracted")
+        hashes = evidence_hashes(path) | evidence_hashes(extracted_dir)
         try:
             if os.path.isdir(path):
                 shutil.rmtree(path)
@@ -516,10 +898,11 @@ def delete_evidence(filename: str) -> Response:
 
                 # Also remove extracted directory (if this was a dump file)
                 # Checks for standard <filename>_extracted pattern
-                extracted_dir = os.path.join(STORAGE_DIR, f"{filename}_extracted")
                 if os.path.exists(extracted_dir):
                     shutil.rmtree(extracted_dir)
 
+            refresh_evidence(filename, f"{filename}_extracted")
+            prune_store(hashes)
             return jsonify({"status": "deleted"})
         except OSError as e:
             logging.exception("Failed to delete %s", path)
@@ -531,6 +914,9 @@ def delete_evidence(filename: str) -> Response:
 def download_evidence(filename: str) -> Response:
     """Download an evidence file or extracted sub-file by path."""
     # Allow nested paths for extracted files.
-    # send_from_directory handles traversal attacks; don't use
+    # safe_join rejects traversal attacks; don't use
     # secure_filename on the whole path.
-    return send_from_directory(STORAGE_DIR, filename, as_attachment=True)
+    path = safe_join(STORAGE_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({"error": "File not found"}), 404
+    return send_cached_file(path, "evidence", filename, as_attachment=True)
@@ -0,0 +1,81 @@
+"""Cross-case indicator (IOC) lookup routes."""
+
+import sqlite3
+from typing import Any
+from flask import Blueprint, request, jsonify, Response
+from multivol.api_server.database import get_db_connection
+from multivol.api_server.ioc import IOC_KINDS, normalize_query
+
+ioc_bp = Blueprint("ioc_bp", __name__)
+
+
+@ioc_bp.route("/ioc/search", methods=["GET"])
+def search_iocs() -> Response:
+    """Return every scan and row that contains an indicator.
+
+    Query parameters: ``q`` (required), ``kind`` (one of IOC_KINDS),
+    ``prefix=1`` to match indicators starting with ``q``, and
+    ``limit``/``offset`` paging over the individual row hits.
+    """
+    q = request.args.get("q", "")
+    if not q.strip():
+        return jsonify({"error": "Missing 'q' query parameter"}), 400
+    kind = request.args.get("kind")
+    if kind and kind not in IOC_KINDS:
+        return jsonify({"error": f"Unknown kind {kind!r}; use one of {list(IOC_KINDS)}"}), 400
+    limit = max(request.args.get("limit", 100, type=int), 1)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    indicator = normalize_query(q)
+
+    if request.args.get("prefix") in ("1", "true"):
+        where = "i.indicator >= ? AND i.indicator < ?"
+        params: list[Any] = [indicator, indicator + "\U0010ffff"]
+    else:
+        where = "i.indicator = ?"
+        params = [indicator]
+    if kind:
+        where += " AND i.kind = ?"
+        params.append(kind)
+
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(
+        f"SELECT COUNT(*), COUNT(DISTINCT i.scan_id) FROM ioc_index i WHERE {where}",  # nosec B608
+        params,
+    )
+    total, scan_count = c.fetchone()
+    c.execute(
+        "SELECT i.indicator, i.kind, i.scan_id, i.module, i.row_idx, s.name"
+        f" FROM ioc_index i LEFT JOIN scans s ON s.uuid = i.scan_id WHERE {where}"  # nosec B608
+        " ORDER BY i.scan_id, i.module, i.row_idx LIMIT ? OFFSET ?",
+        [*params, limit, offset],
+    )
+    rows = c.fetchall()
+    conn.close()
+
+    scans: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        entry = scans.setdefault(
+            row["scan_id"], {"scan_id": row["scan_id"], "name": row["name"], "hits": []}
+        )
+        entry["hits"].append(
+            {
+                "indicator": row["indicator"],
+                "kind": row["kind"],
+                "module": row["module"],
+                "row": row["row_idx"],
+            }
+        )
+
+    return jsonify(
+        {
+            "query": indicator,
+            "total": total,
+            "scan_count": scan_count,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + limit < total,
+            "scans": list(scans.values()),
+        }
+    )
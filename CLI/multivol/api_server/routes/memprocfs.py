@@ -10,13 +10,20 @@ when a different dump is requested.
 import os
 import time
 import json
+import functools
 import sqlite3
 import threading
 import logging
 from typing import Optional
 from flask import Blueprint, request, jsonify, Response
 import requests as http_requests
-from multivol.api_server.database import get_db_connection
+from multivol.api_server.compression import load_result
+from multivol.api_server.database import get_db_connection, submit_write
+from multivol.api_server.result_store import (
+    prepare_module_result,
+    store_prepared_result,
+    upsert_module_status,
+)
 
 # Fixed URL for the compose sidecar service (Docker DNS resolves the service name)
 SIDECAR_URL: str = os.environ.get("MEMPROCFS_SIDECAR_URL", "http://memprocfs:5002")
@@ -58,32 +65,12 @@ def _lookup_scan(uuid: str) -> sqlite3.Row:
 
 
 def _set_module_status(uuid: str, status: str, error_msg: str = "") -> None:
-    """Upsert the scan_module_status row for MODULE_NAME."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    try:
-        c.execute(
-            "SELECT id FROM scan_module_status WHERE scan_id = ? AND module = ?",
-            (uuid, MODULE_NAME),
+    """Queue an upsert of the scan_module_status row for MODULE_NAME."""
+    submit_write(
+        functools.partial(
+            upsert_module_status, scan_id=uuid, module=MODULE_NAME, status=status, error=error_msg
         )
-        exists = c.fetchone()
-        if exists:
-            c.execute(
-                "UPDATE scan_module_status SET status = ?, error_message = ?,"
-                " updated_at = ? WHERE scan_id = ? AND module = ?",
-                (status, error_msg, time.time(), uuid, MODULE_NAME),
-            )
-        else:
-            c.execute(
-                "INSERT INTO scan_module_status"
-                " (scan_id, module, status, error_message, updated_at) VALUES (?,?,?,?,?)",
-                (uuid, MODULE_NAME, status, error_msg, time.time()),
-            )
-        conn.commit()
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("Failed to update module status for %s", uuid)
-    finally:
-        conn.close()
+    )
 
 
 # ──────────────────────────────────────────────
@@ -122,7 +109,7 @@ def _load_cached_files(uuid: str) -> Optional[list]:
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute(
-        "SELECT content FROM scan_results WHERE scan_id = ? AND module = ?",
+        "SELECT content, encoding, dict_id FROM scan_results WHERE scan_id = ? AND module = ?",
         (uuid, MODULE_NAME),
     )
     row = c.fetchone()
@@ -130,7 +117,7 @@ def _load_cached_files(uuid: str) -> Optional[list]:
     if not row:
         return None
     try:
-        return json.loads(row["content"])
+        return json.loads(load_result(row))
     except json.JSONDecodeError:
         return None
 
@@ -154,23 +141,10 @@ def _fetch_and_cache_files(uuid: str) -> tuple[Optional[list], Optional[tuple]]:
 
     all_files = resp.json()
 
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute(
-            "SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
-            (uuid, MODULE_NAME),
-        )
-        if not c.fetchone():
-            c.execute(
-                "INSERT INTO scan_results (scan_id, module, content, created_at)"
-                " VALUES (?, ?, ?, ?)",
-                (uuid, MODULE_NAME, json.dumps(all_files), time.time()),
-            )
-        conn.commit()
-        conn.close()
-    except Exception:  # pylint: disable=broad-except
-        logging.warning("Failed to cache MemProcFS results for scan %s", uuid, exc_info=True)
+    # Serialised, compressed and indexed here; the writer only inserts, and
+    # caching is best-effort, so the response does not wait for it
+    prepared = prepare_module_result(uuid, MODULE_NAME, all_files)
+    submit_write(functools.partial(store_prepared_result, prepared=prepared))
 
     return all_files, None
 
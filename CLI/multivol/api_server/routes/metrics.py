@@ -0,0 +1,18 @@
+"""Runtime metrics of the in-process caches."""
+
+from flask import Blueprint, jsonify, Response
+from multivol.api_server.http_compression import cache_stats as compression_cache_stats
+from multivol.api_server.response_cache import result_cache
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics() -> Response:
+    """Return size and hit-ratio counters of the result and compressed-response caches."""
+    return jsonify(
+        {
+            "result_cache": result_cache.stats(),
+            "compressed_response_cache": compression_cache_stats(),
+        }
+    )
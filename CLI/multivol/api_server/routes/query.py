@@ -0,0 +1,63 @@
+"""Read-only analytical SQL over the columnar export of module outputs."""
+
+from typing import Optional
+from flask import Blueprint, request, jsonify, Response
+from multivol.api_server.analytics import (
+    QueryError,
+    ensure_exported,
+    list_tables,
+    query_available,
+    run_query,
+)
+
+query_bp = Blueprint("query_bp", __name__)
+
+_UNAVAILABLE = "Analytical queries need the optional pyarrow and duckdb packages"
+
+
+def _scan_ids(value: object) -> Optional[list[str]]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = [s for s in value.split(",") if s]
+    if not isinstance(value, list) or not all(isinstance(s, str) for s in value):
+        raise QueryError("'scans' must be a list of scan ids")
+    return value or None
+
+
+@query_bp.route("/query", methods=["POST"])
+def query() -> Response:
+    """Run one read-only SQL statement over module outputs.
+
+    JSON body: ``sql`` (required), ``scans`` (optional list of scan ids the
+    views are restricted to) and ``limit`` (rows returned, default 1000).
+    Each module is a view named after its plugin, e.g.
+    ``SELECT n.* FROM netscan n JOIN malfind m USING (scan_id, PID)``.
+    """
+    if not query_available():
+        return jsonify({"error": _UNAVAILABLE}), 501
+    data = request.get_json(silent=True) or {}
+    sql = data.get("sql")
+    if not isinstance(sql, str) or not sql.strip():
+        return jsonify({"error": "Missing 'sql'"}), 400
+    limit = data.get("limit", 1000)
+    if not isinstance(limit, int):
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    try:
+        return jsonify(run_query(sql, _scan_ids(data.get("scans")), limit))
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@query_bp.route("/query/tables", methods=["GET"])
+def query_tables() -> Response:
+    """List the module views /query can use and the scans each one covers."""
+    if not query_available():
+        return jsonify({"error": _UNAVAILABLE}), 501
+    try:
+        scans = _scan_ids(request.args.get("scans"))
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+    if scans:
+        ensure_exported(scans)
+    return jsonify([{"module": m, "scans": s} for m, s in list_tables(scans).items()])
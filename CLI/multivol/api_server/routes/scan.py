@@ -1,6 +1,8 @@
 """Scan orchestration routes: start, status, results, and module execution."""
 
 # pylint: disable=duplicate-code,redefined-outer-name,too-many-lines
+import csv
+import io
 import os
 import re
 import time
@@ -8,20 +10,59 @@ import json
 import sqlite3
 import argparse
 import dataclasses
+import functools
 import threading
 import subprocess
+import zlib
 import shutil
-import tempfile
-import zipfile
 import glob
 import logging
 import uuid as uuid_mod
-from typing import Any, Callable, Optional, TypedDict
+from typing import Any, BinaryIO, Callable, Iterator, Optional, TypedDict
 import yaml
 import docker
-from flask import Blueprint, request, jsonify, send_file, Response
-from multivol.api_server.database import get_db_connection
-from multivol.api_server.utils import clean_and_parse_json, process_recover_fs
+from flask import Blueprint, request, jsonify, make_response, Response
+from multivol.api_server.analytics import delete_scan_exports
+from multivol.api_server.compression import load_result
+from multivol.api_server.http_cache import (
+    cacheable,
+    etag_matches,
+    not_modified,
+    request_args_key,
+    send_cached_file,
+    send_cached_stream,
+    strong_etag,
+)
+from multivol.api_server.database import get_db_connection, run_write, submit_write
+from multivol.api_server.fs_index import (
+    ensure_indexed,
+    get_entry,
+    get_member,
+    index_recovered_fs,
+    list_directory,
+    nested_tree,
+    normalise_path,
+    search_files,
+)
+from multivol.api_server.utils import clean_and_parse_json, iter_tree_rows, process_recover_fs
+from multivol.api_server.result_store import (
+    backfill_fts,
+    delete_scan_index,
+    upsert_module_status,
+)
+from multivol.api_server.ingest import submit_ingest
+from multivol.api_server.artifacts import prune_store, submit_artifact_hashing
+from multivol.api_server.recovered_archive import ARCHIVE_NAME, COPY_BUFFER, MemberReader
+from multivol.api_server.response_cache import result_cache
+from multivol.api_server.zipstream import iter_zip
+from multivol.api_server.result_query import (
+    ResultQuery,
+    apply_in_memory,
+    iter_module_rows,
+    module_columns,
+    parse_result_query,
+    query_module_rows,
+)
 from multivol.api_server.config import STORAGE_DIR, BASE_DIR
 from multivol.multi_volatility_base import ApiScanConfig
 
@@ -130,48 +171,20 @@ def ingest_results_to_db(scan_id: str, output_dir: str) -> None:
 
     conn = get_db_connection()
     c = conn.cursor()
+    c.execute("SELECT module FROM scan_results WHERE scan_id = ?", (scan_id,))
+    stored = {r[0] for r in c.fetchall()}
+    conn.close()
 
-    json_files = glob.glob(os.path.join(output_dir, "*_output.json"))
-    for f in json_files:
-        try:
-            filename = os.path.basename(f)
-            if filename.endswith("_output.json"):
-                module_name = filename[:-12]
-
-                # Check if result already exists to avoid duplicates (idempotency)
-                c.execute(
-                    "SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
-                    (scan_id, module_name),
-                )
-                if c.fetchone():
-                    continue
-
-                # Parse or read content
-                parsed_data = clean_and_parse_json(f)
-                if parsed_data is None:
-                    continue
-                content_str = json.dumps(parsed_data)
-
-                c.execute(
-                    "INSERT INTO scan_results (scan_id, module, content, created_at)"
-                    " VALUES (?, ?, ?, ?)",
-                    (scan_id, module_name, content_str, time.time()),
-                )
-
-                c.execute(
-                    """
-                    UPDATE scan_module_status
-                    SET status = 'COMPLETED',
-                        updated_at = ?
-                    WHERE scan_id = ? AND module = ?
-                    """,
-                    (time.time(), scan_id, module_name),
-                )
-        except Exception:  # pylint: disable=broad-except
-            logging.exception("Failed to ingest %s", f)
+    # Parsing runs in the ingestion worker processes; this thread only waits
+    pending = []
+    for f in glob.glob(os.path.join(output_dir, "*_output.json")):
+        module_name = os.path.basename(f)[: -len("_output.json")]
+        if module_name not in stored:
+            pending.append(submit_ingest(scan_id, module_name, f, mark_completed=True))
 
-    conn.commit()
-    conn.close()
+    for future in pending:
+        if future.exception():
+            logging.error("Failed to ingest a module for %s: %s", scan_id, future.exception())
     logging.debug("Ingestion complete for %s", scan_id)
 
 
@@ -320,79 +333,81 @@ def _insert_scan_record(  # pylint: disable=too-many-arguments,too-many-position
     data: dict[str, Any],
 ) -> None:
     """Insert the scan row and pre-populate per-module status rows."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO scans"
-        " (uuid, status, mode, os, volatility_version, dump_path, output_dir,"
-        " created_at, image, name, config_json)"
-        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (
-            scan_id,
-            "pending",
-            "light" if args_obj.light else "full",
-            target_os,
-            vol_version,
-            args_obj.dump,
-            args_obj.output_dir,
-            time.time(),
-            args_obj.image,
-            case_name,
-            json.dumps(data),
-        ),
-    )
 
-    if command_list:
-        for cmd in command_list:
-            c.execute(
-                "INSERT INTO scan_module_status"
-                " (scan_id, module, status, updated_at) VALUES (?, ?, 'PENDING', ?)",
-                (scan_id, cmd, time.time()),
-            )
+    def _insert(c: sqlite3.Cursor) -> None:
+        c.execute(
+            "INSERT INTO scans"
+            " (uuid, status, mode, os, volatility_version, dump_path, output_dir,"
+            " created_at, image, name, config_json)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                scan_id,
+                "pending",
+                "light" if args_obj.light else "full",
+                target_os,
+                vol_version,
+                args_obj.dump,
+                args_obj.output_dir,
+                time.time(),
+                args_obj.image,
+                case_name,
+                json.dumps(data),
+            ),
+        )
 
-    conn.commit()
-    conn.close()
+        if command_list:
+            for cmd in command_list:
+                c.execute(
+                    "INSERT INTO scan_module_status"
+                    " (scan_id, module, status, updated_at) VALUES (?, ?, 'PENDING', ?)",
+                    (scan_id, cmd, time.time()),
+                )
+
+    # Waited on so the scan is visible as soon as its id is returned
+    run_write(_insert)
 
 
 def _run_scan_background(s_id: str, config: ApiScanConfig) -> None:
     """Background thread body: run the scan, ingest results, and update DB status."""
-    conn = get_db_connection()
-    c = conn.cursor()
-
     try:
-        c.execute("UPDATE scans SET status = 'running' WHERE uuid = ?", (s_id,))
-        conn.commit()
+        submit_write(
+            lambda c: c.execute("UPDATE scans SET status = 'running' WHERE uuid = ?", (s_id,))
+        )
 
         if _require_runner():
             args = argparse.Namespace(**dataclasses.asdict(config))
             runner_func(args)
 
-        # Process RecoverFs if present (extract tarball)
+        # Process RecoverFs if present (extract tarball, index the tree)
         process_recover_fs(config.output_dir)
+        index_recovered_fs(s_id, config.output_dir)
 
         # Ingest results to DB
         ingest_results_to_db(s_id, config.output_dir)
 
-        # Sweep: mark any still-pending modules as FAILED (container crash / no output)
-        c.execute(
-            "UPDATE scan_module_status SET status = 'FAILED',"
-            " error_message = 'Module failed to produce output',"
-            " updated_at = ? WHERE scan_id = ? AND status IN ('PENDING', 'RUNNING')",
-            (time.time(), s_id),
-        )
-        conn.commit()
-
-        c.execute("UPDATE scans SET status = 'completed' WHERE uuid = ?", (s_id,))
-        conn.commit()
+        run_write(functools.partial(_finish_scan, s_id=s_id))
+        submit_artifact_hashing(s_id)
     except Exception as e:  # pylint: disable=broad-except
         logging.exception("Scan failed for %s", s_id)
-        c.execute(
-            "UPDATE scans SET status = 'failed', error = ? WHERE uuid = ?",
-            (str(e), s_id),
+        error = str(e)
+        run_write(
+            lambda c: c.execute(
+                "UPDATE scans SET status = 'failed', error = ? WHERE uuid = ?",
+                (error, s_id),
+            )
         )
-        conn.commit()
-    finally:
-        conn.close()
+
+
+def _finish_scan(c: sqlite3.Cursor, s_id: str) -> None:
+    """Queued write: fail modules that produced no output and mark the scan completed."""
+    # Sweep: mark any still-pending modules as FAILED (container crash / no output)
+    c.execute(
+        "UPDATE scan_module_status SET status = 'FAILED',"
+        " error_message = 'Module failed to produce output',"
+        " updated_at = ? WHERE scan_id = ? AND status IN ('PENDING', 'RUNNING')",
+        (time.time(), s_id),
+    )
+    c.execute("UPDATE scans SET status = 'completed' WHERE uuid = ?", (s_id,))
 
 
 @scan_bp.route("/scan", methods=["POST"])
@@ -468,37 +483,13 @@ def update_scan_module_status(uuid: str) -> Response:
     if not module or not status:
         return jsonify({"error": "Missing module or status"}), 400
 
-    conn = get_db_connection()
-    c = conn.cursor()
-    try:
-        c.execute(
-            "SELECT 1 FROM scan_module_status WHERE scan_id = ? AND module = ?",
-            (uuid, module),
+    # Applied by the writer thread; the reporting container never waits on the lock
+    submit_write(
+        functools.partial(
+            upsert_module_status, scan_id=uuid, module=module, status=status, error=error
         )
-        exists = c.fetchone()
-
-        if exists:
-            c.execute(
-                "UPDATE scan_module_status"
-                " SET status = ?, error_message = ?, updated_at = ?"
-                " WHERE scan_id = ? AND module = ?",
-                (status, error, time.time(), uuid, module),
-            )
-        else:
-            c.execute(
-                "INSERT INTO scan_module_status"
-                " (scan_id, module, status, error_message, updated_at)"
-                " VALUES (?, ?, ?, ?, ?)",
-                (uuid, module, status, error, time.time()),
-            )
-
-        conn.commit()
-        return jsonify({"status": "success"})
-    except Exception as e:  # pylint: disable=broad-except
-        logging.exception("Failed to log module status")
-        return jsonify({"error": str(e)}), 500
-    finally:
-        conn.close()
+    )
+    return jsonify({"status": "success"})
 
 
 def _find_container(docker_client: Any, uuid: str, module_name: str) -> Optional[Any]:
@@ -516,33 +507,6 @@ def _find_container(docker_client: Any, uuid: str, module_name: str) -> Optional
     return None
 
 
-def _ingest_module_output(c: sqlite3.Cursor, uuid: str, module_name: str, output_dir: str) -> None:
-    """Persist a single module's output into scan_results, skipping duplicates.
-
-    Reads ``<module>_output.json``, parses it, and writes to the DB only when
-    no existing row for (scan_id, module) exists, keeping ingestion idempotent.
-    """
-    output_file = os.path.join(output_dir, f"{module_name}_output.json")
-    if not os.path.exists(output_file):
-        return
-    try:
-        parsed_data = clean_and_parse_json(output_file)
-        content_str = json.dumps(parsed_data) if parsed_data is not None else "{}"
-        c.execute(
-            "SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
-            (uuid, module_name),
-        )
-        if not c.fetchone():
-            c.execute(
-                "INSERT INTO scan_results (scan_id, module, content, created_at)"
-                " VALUES (?, ?, ?, ?)",
-                (uuid, module_name, content_str, time.time()),
-            )
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("Failed to ingest %s for scan %s", module_name, uuid)
-
-
-
 def _refresh_module_from_docker(
     docker_client: Any,
     uuid: str,
@@ -551,8 +515,8 @@ def _refresh_module_from_docker(
 ) -> None:
     """Update mod_dict status by inspecting the corresponding Docker container.
 
-    DB writes are best-effort: if the DB is locked (background scan thread is writing),
-    the in-memory mod_dict is still updated so the HTTP response is correct.
+    The matching DB writes are queued on the writer thread, so the request
+    never waits for the write lock and no status change is dropped.
     """
     module_name = mod_dict["module"]
     try:
@@ -561,41 +525,58 @@ def _refresh_module_from_docker(
             return
         if container.status == "running":
             mod_dict["status"] = "RUNNING"
-            try:
-                with get_db_connection() as _conn:
-                    _conn.execute(
-                        "UPDATE scan_module_status SET status = 'RUNNING',"
-                        " updated_at = ? WHERE scan_id = ? AND module = ?",
-                        (time.time(), uuid, module_name),
-                    )
-            except sqlite3.OperationalError:
-                pass  # locked — background thread will reconcile
+            submit_write(
+                lambda c: c.execute(
+                    "UPDATE scan_module_status SET status = 'RUNNING',"
+                    " updated_at = ? WHERE scan_id = ? AND module = ?",
+                    (time.time(), uuid, module_name),
+                )
+            )
         elif container.status == "exited":
             mod_dict["status"] = "COMPLETED"
+            if module_name == "linux.pagecache.RecoverFs" and output_dir:
+                # Repacking a multi-GB tarball must not hold up the poll
+                threading.Thread(
+                    target=_process_recover_fs_module,
+                    args=(uuid, module_name, output_dir),
+                    daemon=True,
+                ).start()
+            else:
+                _ingest_exited_module(uuid, module_name, output_dir)
             try:
-                with get_db_connection() as _conn:
-                    c2 = _conn.cursor()
-                    if module_name == "linux.pagecache.RecoverFs" and output_dir:
-                        process_recover_fs(output_dir)
-                    if output_dir:
-                        _ingest_module_output(c2, uuid, module_name, output_dir)
-                    c2.execute(
-                        "UPDATE scan_module_status SET status = 'COMPLETED',"
-                        " updated_at = ? WHERE scan_id = ? AND module = ?",
-                        (time.time(), uuid, module_name),
-                    )
-                    try:
-                        container.remove()
-                    except docker.errors.APIError as rm_err:
-                        logging.debug(
-                            "Container removal skipped (already gone or API error): %s", rm_err
-                        )
-            except sqlite3.OperationalError:
-                pass  # locked — background thread will reconcile
+                container.remove()
+            except docker.errors.APIError as rm_err:
+                logging.debug("Container removal skipped (already gone or API error): %s", rm_err)
     except Exception:  # pylint: disable=broad-except
         logging.exception("Exception checking container for module %s", module_name)
 
 
+def _ingest_exited_module(uuid: str, module_name: str, output_dir: Optional[str]) -> None:
+    """Queue the output of a finished module container and mark it COMPLETED."""
+    output_file = os.path.join(output_dir or "", f"{module_name}_output.json")
+    if output_dir and os.path.exists(output_file):
+        # Parsed off-thread; stored (idempotently) and marked COMPLETED by the writer
+        submit_ingest(uuid, module_name, output_file, keep_invalid=True, mark_completed=True)
+    else:
+        submit_write(
+            lambda c: c.execute(
+                "UPDATE scan_module_status SET status = 'COMPLETED',"
+                " updated_at = ? WHERE scan_id = ? AND module = ?",
+                (time.time(), uuid, module_name),
+            )
+        )
+
+
+def _process_recover_fs_module(uuid: str, module_name: str, output_dir: str) -> None:
+    """Background thread: repack and index the RecoverFs output, then ingest its tree."""
+    try:
+        process_recover_fs(output_dir)
+        index_recovered_fs(uuid, output_dir)
+        _ingest_exited_module(uuid, module_name, output_dir)
+    except Exception:  # pylint: disable=broad-except
+        logging.exception("RecoverFs post-processing failed for %s", uuid)
+
+
 def _status_list_from_results(c: sqlite3.Cursor, uuid: str) -> list[dict]:
     """Build a status list from scan_results when no scan_module_status rows exist."""
     c.execute("SELECT module FROM scan_results WHERE scan_id = ?", (uuid,))
@@ -631,9 +612,8 @@ def _append_strings_module(status_list: list[dict], output_dir: str) -> None:
 def get_scan_modules_status(uuid: str) -> Response:
     """Get status of all modules for a scan, with live Docker refresh.
 
-    This handler is read-only against the DB.  Docker-refresh writes happen on
-    short-lived connections inside _refresh_module_from_docker and are silently
-    skipped when the DB is locked (the background scan thread reconciles state).
+    This handler is read-only against the DB.  Docker-refresh writes are queued
+    by _refresh_module_from_docker for the writer thread.
     """
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
@@ -700,9 +680,8 @@ def _get_recoverfs_result(c: sqlite3.Cursor, uuid: str) -> Response:
     scan = c.fetchone()
     if not scan:
         return jsonify({"error": "Scan not found"}), 404
-    extract_dir = os.path.join(scan["output_dir"], "recovered_fs")
-    if os.path.exists(extract_dir):
-        return jsonify(build_fs_tree(extract_dir))
+    if ensure_indexed(c, uuid, scan["output_dir"]):
+        return jsonify(nested_tree(c, uuid))
     return jsonify({"error": "RecoverFs output directory not found"}), 404
 
 
@@ -729,21 +708,114 @@ def _get_single_module_result(
     parsed_data = clean_and_parse_json(target_file)
     if parsed_data is None:
         return jsonify({"error": f"Failed to parse JSON for {module_param}"}), 500
-    return jsonify(paginate_data(parsed_data))
+    return paginate_data(parsed_data)
+
+
+def _parse_query_from_request() -> ResultQuery:
+    """Read filter/sort/fields query parameters; raises ValueError when malformed."""
+    return parse_result_query(
+        request.args.getlist("filter"), request.args.get("sort"), request.args.get("fields")
+    )
+
+
+def _rows_response(rows: list[str], total: int) -> Response:
+    """Return pre-serialised JSON rows as a JSON array with the match count in a header."""
+    resp = Response("[" + ",".join(rows) + "]", mimetype="application/json")
+    resp.headers["X-Total-Count"] = str(total)
+    return resp
 
 
 @scan_bp.route("/results/<uuid>", methods=["GET"])
-def get_scan_results(uuid: str) -> Response:  # pylint: disable=too-many-return-statements
-    """Return parsed results for a module in a scan."""
+def get_scan_results(uuid: str) -> Response:
+    """Return parsed results for a module in a scan.
+
+    Supports ``limit``/``offset`` pagination plus server-side ``filter``,
+    ``sort`` and ``fields`` parameters (see ``result_query``).  When any of the
+    latter are given, the total number of matching rows is returned in the
+    ``X-Total-Count`` header; they are rejected for ``module=all``, whose
+    modules share no columns.  Single-module responses carry a strong ETag
+    (``If-None-Match`` yields 304) and accept ``Range``.
+    """
     module_param = request.args.get("module")
     if not module_param:
         return jsonify({"error": "Missing 'module' query parameter"}), 400
 
     limit = _parse_int_param(request.args.get("limit"), 0)
     offset = _parse_int_param(request.args.get("offset"), 0)
+    try:
+        query = _parse_query_from_request()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if module_param == "all" and not query.is_empty():
+        return jsonify({"error": "filter, sort and fields need a single module"}), 400
+
+    etag = _result_etag(uuid, module_param)
+    if not etag:
+        return _scan_results_response(uuid, module_param, query, limit, offset)
+    if etag_matches(etag):
+        return not_modified(etag)
+    cached = result_cache.get(etag)
+    if cached is not None:
+        return cacheable(cached.to_response(), etag)
+    resp = make_response(_scan_results_response(uuid, module_param, query, limit, offset))
+    result_cache.put(etag, uuid, resp)
+    return cacheable(resp, etag)
+
+
+def _result_etag(uuid: str, module: str) -> Optional[str]:
+    """Strong ETag for a stored module result (or its output files) and the current query.
+
+    Also keys the response cache.  None for the RecoverFs tree, which is not cached.
+    """
+    if module == "linux.pagecache.RecoverFs":
+        return None
+    if module == "all":
+        return _all_results_etag(uuid)
+    conn = get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT id, created_at, size FROM scan_results WHERE scan_id = ? AND module = ?",
+            (uuid, module),
+        ).fetchone()
+        if row:
+            return strong_etag(uuid, module, *row, request_args_key())
+        scan = conn.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,)).fetchone()
+    finally:
+        conn.close()
+    if not scan or not scan[0]:
+        return None
+    try:
+        st = os.stat(os.path.join(scan[0], f"{module}_output.json"))
+    except OSError:
+        return None
+    return strong_etag(uuid, module, st.st_mtime_ns, st.st_size, request_args_key())
+
+
+def _all_results_etag(uuid: str) -> Optional[str]:
+    """ETag of ``module=all``: the name, mtime and size of every module output file."""
+    conn = get_db_connection()
+    scan = conn.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,)).fetchone()
+    conn.close()
+    if not scan or not scan[0] or not os.path.isdir(scan[0]):
+        return None
+    outputs = sorted(
+        (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+        for entry in os.scandir(scan[0])
+        if entry.name.endswith("_output.json") and entry.is_file()
+    )
+    return strong_etag(uuid, "all", outputs, request_args_key())
 
-    def paginate(data: list[Any] | dict[str, Any]) -> list[Any] | dict[str, Any]:
-        return _paginate_data(data, limit, offset)
+
+def _scan_results_response(  # pylint: disable=too-many-return-statements
+    uuid: str, module_param: str, query: ResultQuery, limit: int, offset: int
+) -> Response:
+    """Build the /results/<uuid> response for one module (or ``all``)."""
+
+    def paginate(data: list[Any] | dict[str, Any]) -> Response:
+        if query.is_empty() or not isinstance(data, list):
+            return jsonify(_paginate_data(data, limit, offset))
+        rows, total = apply_in_memory(data, query, limit, offset)
+        return _rows_response([json.dumps(r) for r in rows], total)
 
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
@@ -754,18 +826,34 @@ def get_scan_results(uuid: str) -> Response:  # pylint: disable=too-many-return-
         conn.close()
         return result
 
+    if not query.is_empty() and module_param != "all":
+        # Compressed arrays store their row count; plain JSON is checked in SQL
+        c.execute(
+            "SELECT CASE WHEN encoding IS NOT NULL THEN"
+            " CASE WHEN row_count > 0 THEN 'array' END"
+            " WHEN json_valid(content) THEN json_type(content) END AS kind"
+            " FROM scan_results WHERE scan_id = ? AND module = ?",
+            (uuid, module_param),
+        )
+        row = c.fetchone()
+        if row and row["kind"] == "array":
+            rows, total = query_module_rows(c, uuid, module_param, query, limit, offset)
+            conn.close()
+            return _rows_response(rows, total)
+
     c.execute(
-        "SELECT content FROM scan_results WHERE scan_id = ? AND module = ?",
+        "SELECT content, encoding, dict_id FROM scan_results WHERE scan_id = ? AND module = ?",
         (uuid, module_param),
     )
     row = c.fetchone()
     if row:
         conn.close()
+        content = load_result(row)
         try:
-            data = json.loads(row["content"])
-            return jsonify(paginate(data))
-        except (json.JSONDecodeError, KeyError):
-            return jsonify({"error": "Failed to parse stored content", "raw": row["content"]}), 500
+            data = json.loads(content)
+            return paginate(data)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return jsonify({"error": "Failed to parse stored content", "raw": content}), 500
 
     c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
     scan = c.fetchone()
@@ -779,42 +867,256 @@ def get_scan_results(uuid: str) -> Response:  # pylint: disable=too-many-return-
         return jsonify({"error": "Output directory not found"}), 404
 
     if module_param == "all":
-        return _get_all_module_results(output_dir, paginate)
+        return _get_all_module_results(output_dir, lambda d: _paginate_data(d, limit, offset))
     return _get_single_module_result(output_dir, module_param, paginate)
 
 
+_STREAM_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+_STREAM_BATCH = 500
+
+
+def _batched_lines(lines: Iterator[str]) -> Iterator[str]:
+    """Join NDJSON lines into chunks of _STREAM_BATCH rows."""
+    batch: list[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= _STREAM_BATCH:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+def _csv_value(value: Any) -> Any:
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _iter_csv(columns: list[str], lines: Iterator[str]) -> Iterator[str]:
+    """Render JSON row texts as CSV (tree children become rows of their own)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    count = 0
+    for line in lines:
+        for row in iter_tree_rows([json.loads(line)]):
+            writer.writerow([_csv_value(row.get(col)) for col in columns])
+            count += 1
+        if count >= _STREAM_BATCH:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            count = 0
+    yield buf.getvalue()
+
+
+@scan_bp.route("/results/<uuid>/stream", methods=["GET"])
+def stream_scan_results(uuid: str) -> Response:
+    """Stream every row of a module result as NDJSON (default) or CSV.
+
+    Rows go from SQLite to the socket in batches, so memory stays bounded
+    however large the result.  Accepts ``filter``/``sort``/``fields`` like
+    ``/results/<uuid>``; ``download=1`` sends it as an attachment.
+    """
+    module = request.args.get("module")
+    if not module:
+        return jsonify({"error": "Missing 'module' query parameter"}), 400
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in _STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported format {fmt!r}; use ndjson or csv"}), 400
+    try:
+        query = _parse_query_from_request()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute("SELECT 1 FROM scan_results WHERE scan_id = ? AND module = ?", (uuid, module))
+    if c.fetchone():
+        columns = query.fields or [k for k in module_columns(c, uuid, module) if k != "__children"]
+        lines = iter_module_rows(c, uuid, module, query, _STREAM_BATCH)
+        release: Optional[Callable[[], None]] = conn.close
+    else:
+        # Not ingested yet: fall back to the output file (parsed in memory)
+        c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
+        scan = c.fetchone()
+        conn.close()
+        target = os.path.join(scan[0] or "", f"{module}_output.json") if scan else ""
+        data = clean_and_parse_json(target) if target and os.path.exists(target) else None
+        if not isinstance(data, list):
+            return jsonify({"error": f"Module {module} output not found"}), 404
+        rows, _ = apply_in_memory(data, query, 0, 0)
+        columns = query.fields or list(dict.fromkeys(k for r in iter_tree_rows(rows) for k in r))
+        lines = (json.dumps(r) for r in rows)
+        # Closed above: the pool may already have handed it to another request
+        release = None
+
+    body = _iter_csv(columns, lines) if fmt == "csv" else _batched_lines(lines)
+    resp = Response(body, mimetype=_STREAM_FORMATS[fmt])
+    if release is not None:
+        resp.call_on_close(release)  # keeps the pooled connection until the stream ends
+    if request.args.get("download") in ("1", "true"):
+        resp.headers["Content-Disposition"] = f'attachment; filename="{uuid}-{module}.{fmt}"'
+    return resp
+
+
+def _fts_match_expression(q: str) -> str:
+    """Turn free text into an FTS5 query: every whitespace-separated term is a quoted phrase.
+
+    Quoting keeps user input (dots, dashes, colons in paths and IPs) from being
+    parsed as FTS5 operators; terms are implicitly AND-ed.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+@scan_bp.route("/scans/<uuid>/search", methods=["GET"])
+def search_scan(uuid: str) -> Response:
+    """Full-text search across every module result of a scan.
+
+    Hits are grouped by module and identify the matching row index, which can
+    be fetched with ``/results/<uuid>?module=<module>&offset=<row>&limit=1``.
+    """
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "Missing 'q' query parameter"}), 400
+    limit = max(_parse_int_param(request.args.get("limit"), 100), 1)
+    offset = max(_parse_int_param(request.args.get("offset"), 0), 0)
+    module = request.args.get("module")
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    try:
+        c.execute(
+            "SELECT 1 FROM scan_results WHERE scan_id = ? AND fts_indexed = 0 LIMIT 1", (uuid,)
+        )
+        if c.fetchone():
+            backfill_fts(uuid)
+
+        where = "result_fts MATCH ? AND scan_id = ?"
+        params: list[Any] = [_fts_match_expression(q), uuid]
+        if module:
+            where += " AND module = ?"
+            params.append(module)
+
+        c.execute(f"SELECT COUNT(*) FROM result_fts WHERE {where}", params)  # nosec B608
+        total = c.fetchone()[0]
+        c.execute(
+            "SELECT module, row_idx, snippet(result_fts, 0, '[', ']', '...', 16)"
+            f" FROM result_fts WHERE {where}"  # nosec B608
+            " ORDER BY module, row_idx LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        )
+        hits: dict[str, list[dict[str, Any]]] = {}
+        for hit_module, row_idx, snippet in c.fetchall():
+            hits.setdefault(hit_module, []).append({"row": row_idx, "snippet": snippet})
+    except sqlite3.OperationalError as e:
+        logging.warning("Search failed for scan %s: %s", uuid, e)
+        return jsonify({"error": f"Invalid search query: {e}"}), 400
+    finally:
+        conn.close()
+
+    return jsonify(
+        {
+            "query": q,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + limit < total,
+            "results": hits,
+        }
+    )
+
+
+# A completed scan that produced no usable result is reported as failed.
+_EFFECTIVE_STATUS_SQL = (
+    "CASE WHEN status = 'completed' AND result_count = 0 THEN 'failed' ELSE status END"
+)
+
+
+def _encode_scan_cursor(row: sqlite3.Row) -> str:
+    """Build the opaque keyset cursor pointing just after *row*."""
+    return f"{row['created_at']!r}|{row['uuid']}"
+
+
+def _decode_scan_cursor(cursor: str) -> tuple[float, str]:
+    """Split a cursor from _encode_scan_cursor; raises ValueError when malformed."""
+    created_at, sep, scan_uuid = cursor.partition("|")
+    if not sep or not scan_uuid:
+        raise ValueError("Invalid cursor")
+    return float(created_at), scan_uuid
+
+
 @scan_bp.route("/scans", methods=["GET"])
 def list_scans() -> Response:
-    """List all scans ordered by creation time."""
+    """List scans newest first, read from the materialised summary columns.
+
+    Optional query parameters: ``status``, ``os`` and ``name`` (substring)
+    filters, and ``limit``/``cursor`` keyset pagination.  When more scans
+    remain, the cursor for the next page is returned in ``X-Next-Cursor``.
+    """
+    where: list[str] = []
+    params: list[Any] = []
+    status = request.args.get("status")
+    if status:
+        where.append(f"({_EFFECTIVE_STATUS_SQL}) = ?")
+        params.append(status)
+    os_name = request.args.get("os")
+    if os_name:
+        where.append("os = ?")
+        params.append(os_name)
+    name = request.args.get("name")
+    if name:
+        where.append("instr(lower(name), lower(?)) > 0")
+        params.append(name)
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, cursor_uuid = _decode_scan_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        where.append("(created_at < ? OR (created_at = ? AND uuid < ?))")
+        params.extend([created_at, created_at, cursor_uuid])
+    limit = max(request.args.get("limit", 0, type=int), 0)
+
+    sql = f"SELECT *, {_EFFECTIVE_STATUS_SQL} AS effective_status FROM scans"  # nosec B608
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, uuid DESC"
+    if limit:
+        # Fetch one extra row to learn whether another page exists
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
-    c.execute("SELECT * FROM scans ORDER BY created_at DESC")
+    c.execute(sql, params)
     rows = c.fetchall()
+    conn.close()
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_scan_cursor(rows[-1])
 
     scans_list = []
     for row in rows:
         scan_dict = dict(row)
-        scan_uuid = scan_dict["uuid"]
-
-        c.execute(
-            "SELECT COUNT(*) FROM scan_results WHERE scan_id = ?"
-            " AND content NOT LIKE '%\"error\": \"Invalid JSON output\"%'",
-            (scan_uuid,),
-        )
-        db_count = c.fetchone()[0]
-
-        scan_dict["modules"] = db_count
-
-        if scan_dict["status"] == "completed" and db_count == 0:
-            scan_dict["status"] = "failed"
+        scan_dict["status"] = scan_dict.pop("effective_status")
+        if scan_dict["status"] != row["status"]:
             scan_dict["error"] = "No valid JSON results parsed"
-
+        scan_dict["modules"] = scan_dict["result_count"]
+        scan_dict["duration"] = (
+            scan_dict["finished_at"] - scan_dict["created_at"]
+            if scan_dict["finished_at"] and scan_dict["created_at"]
+            else None
+        )
         scan_dict["findings"] = 0
         scans_list.append(scan_dict)
 
-    conn.close()
-    return jsonify(scans_list)
+    resp = jsonify(scans_list)
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
+    return resp
 
 
 @scan_bp.route("/scans/<uuid>", methods=["PUT"])
@@ -825,11 +1127,7 @@ def rename_scan(uuid: str) -> Response:
     if not new_name:
         return jsonify({"error": "Name is required"}), 400
 
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("UPDATE scans SET name = ? WHERE uuid = ?", (new_name, uuid))
-    conn.commit()
-    conn.close()
+    run_write(lambda c: c.execute("UPDATE scans SET name = ? WHERE uuid = ?", (new_name, uuid)))
     return jsonify({"status": "updated"})
 
 
@@ -843,6 +1141,9 @@ def delete_scan(uuid: str) -> Response:
     # Get output dir to cleanup
     c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
     row = c.fetchone()
+    c.execute("SELECT DISTINCT sha256 FROM artifacts WHERE scan_id = ? AND stored = 1", (uuid,))
+    stored_hashes = [r[0] for r in c.fetchall()]
+    conn.close()
 
     if row and row["output_dir"] and os.path.exists(row["output_dir"]):
         try:
@@ -850,18 +1151,62 @@ def delete_scan(uuid: str) -> Response:
         except Exception:  # pylint: disable=broad-except
             logging.exception("Error deleting output dir %s", row["output_dir"])
 
+    delete_scan_exports(uuid)
+    run_write(functools.partial(_delete_scan_rows, uuid=uuid))
+    prune_store(stored_hashes)
+    result_cache.invalidate_scan(uuid)
+    return jsonify({"status": "deleted"})
+
+
+def _delete_scan_rows(c: sqlite3.Cursor, uuid: str) -> None:
+    """Queued write: remove a scan and everything derived from it."""
     # Delete related records first (foreign key constraints)
     c.execute("DELETE FROM scan_module_status WHERE scan_id = ?", (uuid,))
     c.execute("DELETE FROM scan_results WHERE scan_id = ?", (uuid,))
+    delete_scan_index(c, uuid)
     c.execute("DELETE FROM scans WHERE uuid = ?", (uuid,))
-    conn.commit()
-    conn.close()
-    return jsonify({"status": "deleted"})
+
+
+# Output files that belong to a module without being named <module>_output.*
+_MODULE_ARTIFACTS = {
+    "strings_output.txt": "strings",
+    "recovered_fs.tar.gz": "linux.pagecache.RecoverFs",
+    "recovered_fs.zip": "linux.pagecache.RecoverFs",
+    "recovered_fs": "linux.pagecache.RecoverFs",
+}
+
+
+def _artifact_module(relpath: str) -> Optional[str]:
+    """Return the module that produced *relpath* (relative to the output dir), if known."""
+    top = relpath.split(os.sep, 1)[0]
+    if top in _MODULE_ARTIFACTS:
+        return _MODULE_ARTIFACTS[top]
+    match = re.match(r"^(.+)_output\.[^.]+$", top)
+    return match.group(1) if match else None
+
+
+def _iter_zip_entries(output_dir: str, modules: Optional[set[str]]) -> Iterator[tuple[str, str]]:
+    """Yield ``(path, arcname)`` for every file of the scan, optionally only *modules*."""
+    parent = os.path.dirname(output_dir)
+    for root, dirs, files in os.walk(output_dir):
+        dirs.sort()
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            if modules is not None:
+                module = _artifact_module(os.path.relpath(file_path, output_dir))
+                if module not in modules:
+                    continue
+            # Relative path to avoid absolute paths inside the zip
+            yield file_path, os.path.relpath(file_path, parent)
 
 
 @scan_bp.route("/scans/<uuid>/download", methods=["GET"])
-def download_scan_zip(uuid: str) -> Response:  # pylint: disable=too-many-locals
-    """Download all scan results as a ZIP archive."""
+def download_scan_zip(uuid: str) -> Response:
+    """Stream scan results as a ZIP archive.
+
+    ``modules`` (comma-separated, repeatable) limits the archive to the output
+    of those modules.  The archive is produced while it is sent.
+    """
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
@@ -878,25 +1223,21 @@ def download_scan_zip(uuid: str) -> Response:  # pylint: disable=too-many-locals
     if not output_dir or not os.path.exists(output_dir):
         return jsonify({"error": "Output directory not found or empty"}), 404
 
-    # Create temp zip file
-    tmp_dir = tempfile.gettempdir()
-    zip_filename = f"{scan_name.replace(' ', '_')}_{uuid[:8]}_results.zip"
-    zip_filepath = os.path.join(tmp_dir, zip_filename)
-
-    try:
-        with zipfile.ZipFile(zip_filepath, "w", zipfile.ZIP_DEFLATED) as zipf:
-            # Walk output directory
-            for root, _, files in os.walk(output_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # Add file to zip archive with relative path to avoid absolute paths inside zip
-                    arcname = os.path.relpath(file_path, os.path.dirname(output_dir))
-                    zipf.write(file_path, arcname)
-
-        return send_file(zip_filepath, as_attachment=True, download_name=zip_filename)
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("ZIP creation failed for scan %s", uuid)
-        return jsonify({"error": "Failed to generate ZIP archive"}), 500
+    selected = {m for value in request.args.getlist("modules") for m in value.split(",") if m}
+    entries = list(_iter_zip_entries(output_dir, selected or None))
+    if not entries:
+        return jsonify({"error": "No output files for the selected modules"}), 404
+
+    suffix = "results" if not selected else f"{len(selected)}_modules"
+    zip_filename = f"{scan_name.replace(' ', '_')}_{uuid[:8]}_{suffix}.zip"
+    return Response(
+        iter_zip(entries),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{zip_filename}"',
+            "X-Accel-Buffering": "no",  # let reverse proxies forward chunks as they come
+        },
+    )
 
 
 def _store_plugin_result(scan_id: str, module: str, output_dir: str) -> None:
@@ -904,21 +1245,7 @@ def _store_plugin_result(scan_id: str, module: str, output_dir: str) -> None:
     fpath = os.path.join(output_dir, f"{module}_output.json")
     if not os.path.exists(fpath):
         return
-    parsed_data = clean_and_parse_json(fpath)
-    content_str = json.dumps(parsed_data) if parsed_data is not None else "{}"
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute(
-        "SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
-        (scan_id, module),
-    )
-    if not c.fetchone():
-        c.execute(
-            "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?, ?, ?, ?)",
-            (scan_id, module, content_str, time.time()),
-        )
-    conn.commit()
-    conn.close()
+    submit_ingest(scan_id, module, fpath, keep_invalid=True).result()
 
 
 def _fetch_scan(uuid: str) -> Optional[sqlite3.Row]:
@@ -933,30 +1260,10 @@ def _fetch_scan(uuid: str) -> Optional[sqlite3.Row]:
 
 
 def _upsert_module_status(uuid: str, module: str, status: str) -> None:
-    """Insert or update a scan_module_status row for the given scan and module."""
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute(
-            "SELECT id FROM scan_module_status WHERE scan_id = ? AND module = ?",
-            (uuid, module),
-        )
-        if c.fetchone():
-            c.execute(
-                "UPDATE scan_module_status"
-                " SET status = ?, updated_at = ? WHERE scan_id = ? AND module = ?",
-                (status, time.time(), uuid, module),
-            )
-        else:
-            c.execute(
-                "INSERT INTO scan_module_status"
-                " (scan_id, module, status, updated_at) VALUES (?, ?, ?, ?)",
-                (uuid, module, status, time.time()),
-            )
-        conn.commit()
-        conn.close()
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("Failed to upsert module status for scan %s, module %s", uuid, module)
+    """Queue an insert-or-update of the scan_module_status row for the given scan and module."""
+    submit_write(
+        functools.partial(upsert_module_status, scan_id=uuid, module=module, status=status)
+    )
 
 
 def _background_single_plugin(s_id: str, cfg: ApiScanConfig) -> None:
@@ -966,21 +1273,20 @@ def _background_single_plugin(s_id: str, cfg: ApiScanConfig) -> None:
             args = argparse.Namespace(**dataclasses.asdict(cfg))
             runner_func(args)  # type: ignore[misc]
         _store_plugin_result(s_id, cfg.commands, cfg.output_dir)
+        result_cache.invalidate_scan(s_id)
+        submit_artifact_hashing(s_id)
     except Exception:  # pylint: disable=broad-except
         logging.exception(
             "Manual plugin execution failed for scan %s, module %s", s_id, cfg.commands
         )
-        conn_err = get_db_connection()
-        try:
-            conn_err.execute(
+        submit_write(
+            lambda c: c.execute(
                 "UPDATE scan_module_status SET status = 'FAILED',"
                 " error_message = 'Execution error',"
                 " updated_at = ? WHERE scan_id = ? AND module = ?",
                 (time.time(), s_id, cfg.commands),
             )
-            conn_err.commit()
-        finally:
-            conn_err.close()
+        )
 
 
 @scan_bp.route("/scans/<uuid>/execute", methods=["POST"])
@@ -1020,6 +1326,7 @@ def execute_plugin(uuid: str) -> Response:
     )
 
     _upsert_module_status(uuid, module, "RUNNING")
+    result_cache.invalidate_scan(uuid)
 
     thread = threading.Thread(target=_background_single_plugin, args=(uuid, config))
     thread.daemon = True
@@ -1062,147 +1369,199 @@ def get_stats() -> Response:
 
 @scan_bp.route("/results/<uuid>/fs/list", methods=["GET"])
 def list_fs_files(uuid: str) -> Response:
-    """List all recovered filesystem files for a scan."""
+    """List recovered filesystem files for a scan, filtered and paged from the path index.
+
+    ``search`` matches a path substring, or a path prefix when it starts with
+    "/"; ``ext`` takes one or more comma-separated extensions and
+    ``min_size`` a size in bytes.  ``total`` counts every match, while
+    ``limit``/``offset`` page through them (all of them by default).
+    """
+    search = request.args.get("search", "").strip()
+    exts = tuple(
+        "." + ext.strip().lstrip(".").lower()
+        for ext in request.args.get("ext", "").split(",")
+        if ext.strip()
+    )
+    min_size = _parse_int_param(request.args.get("min_size"), 0)
+    limit = _parse_int_param(request.args.get("limit"), -1)
+    offset = max(_parse_int_param(request.args.get("offset"), 0), 0)
+
     conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
     c = conn.cursor()
-    c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
-    scan = c.fetchone()
-    conn.close()
-
-    if not scan:
-        return jsonify({"error": "Scan not found"}), 404
+    try:
+        c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
+        scan = c.fetchone()
+        if not scan:
+            return jsonify({"error": "Scan not found"}), 404
+        total, files = 0, []
+        if ensure_indexed(c, uuid, scan[0]):
+            total, files = search_files(c, uuid, search, exts, min_size, limit, offset)
+    finally:
+        conn.close()
+    return jsonify(
+        {
+            "files": files,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(files) < total,
+        }
+    )
 
-    output_dir = scan["output_dir"]
-    extract_dir = os.path.join(output_dir, "recovered_fs")
 
-    if not os.path.exists(extract_dir):
-        return jsonify({"files": []}), 200
+@scan_bp.route("/results/<uuid>/fs/tree", methods=["GET"])
+def get_fs_tree_level(uuid: str) -> Response:
+    """Return one directory level of the recovered filesystem from the path index.
 
-    file_list = []
-    for root, _, files in os.walk(extract_dir):
-        for f in files:
-            # We want the relative path from the `recovered_fs` root
-            full_path = os.path.join(root, f)
-            rel_path = os.path.relpath(full_path, extract_dir)
-            file_list.append(rel_path)
+    ``path`` (default ``/``) selects the directory; ``limit``/``offset`` page
+    through very large directories.  Each child carries its size (recursive
+    for directories) and, for directories, a child count so the UI can
+    expand them lazily.
+    """
+    path = normalise_path(request.args.get("path"))
+    limit = _parse_int_param(request.args.get("limit"), -1)
+    offset = max(_parse_int_param(request.args.get("offset"), 0), 0)
 
-    return jsonify({"files": file_list})
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    try:
+        c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
+        scan = c.fetchone()
+        if not scan:
+            return jsonify({"error": "Scan not found"}), 404
+        if not ensure_indexed(c, uuid, scan["output_dir"]):
+            return jsonify({"error": "RecoverFs output directory not found"}), 404
+        entry = get_entry(c, uuid, path)
+        if entry is None:
+            return jsonify({"error": "Path not found"}), 404
+        if entry["type"] != "directory":
+            return jsonify({"error": "Not a directory"}), 400
+        entry["children"] = list_directory(c, uuid, path, limit, offset)
+    finally:
+        conn.close()
+    return jsonify(entry)
 
 
-@scan_bp.route("/results/<uuid>/fs/view", methods=["GET"])
-def view_fs_file(uuid: str) -> Response:  # pylint: disable=too-many-locals,too-many-return-statements
-    """View contents of a recovered filesystem file with pagination and search."""
-    key_path = request.args.get("path")
-    page = request.args.get("page", 1, type=int)
-    limit = request.args.get("limit", 1000, type=int)
-    query = request.args.get("q", "")
+def _recovered_file(
+    uuid: str, key_path: Optional[str]
+) -> tuple[Optional[tuple[Response, int]], Optional[sqlite3.Row], str]:
+    """Look up a recovered file in the path index.
 
+    Returns ``(error, row, output_dir)``; *error* is a ready response when the
+    path is missing, unknown or not a file.  Only indexed paths can be opened,
+    so a crafted path cannot reach outside the recovered tree.
+    """
     if not key_path:
-        return jsonify({"error": "Missing path"}), 400
-    key_path = key_path.lstrip("/")
-
+        return (jsonify({"error": "Missing path"}), 400), None, ""
     conn = get_db_connection()
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
-    c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
-    scan = c.fetchone()
-    conn.close()
-
-    if not scan:
-        return jsonify({"error": "Scan not found"}), 404
-
-    output_dir = scan["output_dir"]
-    extract_dir = os.path.join(output_dir, "recovered_fs")
-
-    safe_path = os.path.normpath(os.path.join(extract_dir, key_path))
-    if not safe_path.startswith(extract_dir):
-        return jsonify({"error": "Invalid path"}), 403
+    try:
+        c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
+        scan = c.fetchone()
+        if not scan:
+            return (jsonify({"error": "Scan not found"}), 404), None, ""
+        row = None
+        if ensure_indexed(c, uuid, scan["output_dir"]):
+            row = get_member(c, uuid, normalise_path(key_path))
+    finally:
+        conn.close()
+    if row is None or row["type"] != "file":
+        return (jsonify({"error": "File not found"}), 404), None, ""
+    return None, row, scan["output_dir"]
+
+
+def _open_recovered_file(output_dir: str, row: sqlite3.Row) -> BinaryIO:
+    """Open an indexed file: seek into recovered_fs.zip, or the extracted copy of older scans."""
+    if row["archive_offset"] is not None:
+        return MemberReader(
+            os.path.join(output_dir, ARCHIVE_NAME),
+            row["archive_offset"],
+            row["archive_size"],
+            row["size"],
+            row["archive_method"],
+        )
+    return open(os.path.join(output_dir, "recovered_fs", row["path"].lstrip("/")), "rb")
 
-    if not os.path.exists(safe_path):
-        return jsonify({"error": "File not found"}), 404
 
-    content = []
-    total_lines = 0
+def _read_lines(stream: BinaryIO, page: int, limit: int, query: str) -> tuple[list[str], int]:
+    """Return one page of lines of *stream* and the file's line count.
 
+    With *query*, the page holds matching lines as ``"<line number>:<text>"``
+    (like ``grep -n``) and the count is the number of matches returned.
+    *query* is matched as literal text, case-insensitively: a user-supplied
+    regex could backtrack for as long as it likes on a request thread.
+    """
+    skip = (max(page, 1) - 1) * limit
+    content: list[str] = []
+    reader = io.BufferedReader(stream, COPY_BUFFER)  # type: ignore[arg-type]
     if query:
-        try:
-            cmd = ["grep", "-i", "-n", "-m", str(limit), query, safe_path]
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                errors="replace",
-                timeout=30,
-                check=False,
-            )  # nosec B603 B607
-            content = result.stdout.splitlines()
-            total_lines = len(content)
-        except Exception as e:  # pylint: disable=broad-except
-            return jsonify({"error": f"Search failed: {str(e)}"}), 500
-    else:
-        try:
-            wc_cmd = ["wc", "-l", safe_path]
-            wc_res = subprocess.run(
-                wc_cmd,
-                stdout=subprocess.PIPE,
-                text=True,
-                errors="replace",
-                timeout=30,
-                check=False,
-            )  # nosec B603 B607
-            if wc_res.returncode == 0 and wc_res.stdout:
-                total_lines = int(wc_res.stdout.split()[0])
+        needle = query.lower()
+        matches = 0
+        for number, raw in enumerate(reader, 1):
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if needle in line.lower():
+                matches += 1
+                if matches > skip:
+                    content.append(f"{number}:{line}")
+                    if len(content) >= limit:
+                        break
+        return content, len(content)
+
+    total = 0
+    for raw in reader:
+        if skip <= total < skip + limit:
+            content.append(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+        if not raw.endswith(b"\n"):
+            break
+        total += 1
+        if total >= skip + limit:
+            # Past the page: only newlines are counted, like `wc -l`
+            for chunk in iter(lambda: reader.read(COPY_BUFFER), b""):
+                total += chunk.count(b"\n")
+            break
+    return content, total
 
-            start_line = (page - 1) * limit + 1
-            end_line = start_line + limit - 1
 
-            sed_cmd = ["sed", "-n", f"{start_line},{end_line}p", safe_path]
-            sed_res = subprocess.run(
-                sed_cmd,
-                stdout=subprocess.PIPE,
-                text=True,
-                errors="replace",
-                timeout=30,
-                check=False,
-            )  # nosec B603 B607
-            content = sed_res.stdout.splitlines()
-        except Exception as e:  # pylint: disable=broad-except
-            return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
+@scan_bp.route("/results/<uuid>/fs/view", methods=["GET"])
+def view_fs_file(uuid: str) -> Response:
+    """View contents of a recovered filesystem file with pagination and search."""
+    page = request.args.get("page", 1, type=int)
+    limit = max(request.args.get("limit", 1000, type=int), 1)
+    query = request.args.get("q", "")
+
+    error, row, output_dir = _recovered_file(uuid, request.args.get("path"))
+    if error:
+        return error
+    try:
+        with _open_recovered_file(output_dir, row) as stream:
+            content, total_lines = _read_lines(stream, page, limit, query)
+    except (OSError, ValueError, zlib.error) as e:
+        return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
 
     return jsonify({"content": content, "total": total_lines, "page": page, "limit": limit})
 
 
 @scan_bp.route("/results/<uuid>/fs/download", methods=["GET"])
 def download_fs_file(uuid: str) -> Response:
-    """Download a recovered filesystem file by path."""
-    key_path = request.args.get("path")
-    if not key_path:
-        return jsonify({"error": "Missing path"}), 400
-    key_path = key_path.lstrip("/")
-
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT output_dir FROM scans WHERE uuid = ?", (uuid,))
-    scan = c.fetchone()
-    conn.close()
-
-    if not scan:
-        return jsonify({"error": "Scan not found"}), 404
-
-    output_dir = scan["output_dir"]
-    extract_dir = os.path.join(output_dir, "recovered_fs")
-
-    safe_path = os.path.normpath(os.path.join(extract_dir, key_path))
-    if not safe_path.startswith(extract_dir):
-        return jsonify({"error": "Invalid path"}), 403
-
-    if not os.path.exists(safe_path):
-        return jsonify({"error": "File not found"}), 404
-
-    return send_file(safe_path, as_attachment=True)
+    """Download a recovered filesystem file by path (Range and If-None-Match supported)."""
+    error, row, output_dir = _recovered_file(uuid, request.args.get("path"))
+    if error:
+        return error
+    if row["archive_offset"] is None:
+        path = os.path.join(output_dir, "recovered_fs", row["path"].lstrip("/"))
+        return send_cached_file(path, uuid, "fs", row["path"], as_attachment=True)
+    return send_cached_stream(
+        _open_recovered_file(output_dir, row),
+        row["size"],
+        row["mtime"],
+        row["name"],
+        uuid,
+        "fs",
+        row["path"],
+        as_attachment=True,
+    )
 
 
 @scan_bp.route("/results/<uuid>/strings", methods=["GET"])
@@ -1307,4 +1666,6 @@ def download_strings(uuid: str) -> Response:
     if not os.path.exists(strings_file):
         return jsonify({"error": "Strings output not found"}), 404
 
-    return send_file(strings_file, as_attachment=True, download_name=f"strings_{uuid}.txt")
+    return send_cached_file(
+        strings_file, uuid, "strings", as_attachment=True, download_name=f"strings_{uuid}.txt"
+    )
@@ -0,0 +1,336 @@
+"""Resumable, parallel chunked uploads of evidence files.
+
+A client creates a session for a file of known size, then ``PUT``s its
+fixed-size chunks in any order and over several connections.  Each chunk is
+checked against its SHA-256 and written at its offset (``os.pwrite``) into a
+file preallocated at session creation.  Received chunks are recorded in
+``upload_chunks``, so after a dropped connection or a server restart the
+client asks which chunks are missing and sends only those.
+
+The file's SHA-256 is computed while the upload progresses: whenever the
+chunk at the hashed offset arrives it is hashed from memory, followed by the
+contiguous chunks already on disk.  Finalising then only hashes what the
+out-of-order tail left behind, instead of re-reading the whole file.
+"""
+
+import errno
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+from werkzeug.utils import secure_filename
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.database import get_db_connection, run_write
+
+SESSION_DIR = os.path.join(STORAGE_DIR, ".uploads")
+DEFAULT_CHUNK_SIZE = 8 << 20
+MIN_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 64 << 20
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", str(1 << 40)))
+# Sessions untouched for this long are deleted with their partial file
+SESSION_TTL = int(os.environ.get("UPLOAD_SESSION_TTL", str(2 * 24 * 3600)))
+# Chunks read back from disk per request to advance the running hash
+_DRAIN_CHUNKS = 4
+
+
+class _Session:
+    """In-memory state of an upload session: received chunks and the running hash."""
+
+    def __init__(
+        self,
+        upload_id: str,
+        filename: str,
+        size: int,
+        chunk_size: int,
+        sha256: Optional[str],
+        received: set[int],
+    ) -> None:
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.chunk_size = chunk_size
+        self.expected_sha256 = sha256
+        self.received = received
+        self.path = os.path.join(SESSION_DIR, f"{upload_id}.part")
+        self.lock = threading.Lock()
+        self.hasher = hashlib.sha256()
+        self.hashed = 0  # bytes of the file fed to hasher so far
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def missing(self) -> list[int]:
+        return [i for i in range(self.chunk_count) if i not in self.received]
+
+    def describe(self) -> dict[str, Any]:
+        missing = self.missing()
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "chunk_count": self.chunk_count,
+            "received": self.chunk_count - len(missing),
+            "missing": missing,
+        }
+
+    def advance_hash(self, limit: Optional[int] = _DRAIN_CHUNKS) -> None:
+        """Hash contiguous received chunks from disk (at most *limit*); call with lock held."""
+        if self.hashed >= self.size or self.hashed // self.chunk_size not in self.received:
+            return
+        done = 0
+        with open(self.path, "rb") as f:
+            while self.hashed < self.size and (limit is None or done < limit):
+                index = self.hashed // self.chunk_size
+                if index not in self.received:
+                    break
+                f.seek(self.hashed)
+                self.hasher.update(f.read(self.chunk_length(index)))
+                self.hashed += self.chunk_length(index)
+                done += 1
+
+
+_sessions: dict[str, _Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _insert_session(c: sqlite3.Cursor, session: _Session) -> None:
+    """Queued write: record a new upload session."""
+    now = time.time()
+    c.execute(
+        "INSERT INTO upload_sessions"
+        " (upload_id, filename, size, chunk_size, sha256, created_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            session.upload_id,
+            session.filename,
+            session.size,
+            session.chunk_size,
+            session.expected_sha256,
+            now,
+            now,
+        ),
+    )
+
+
+def _record_chunk(c: sqlite3.Cursor, upload_id: str, index: int, sha256: str) -> None:
+    """Queued write: mark one chunk as received."""
+    c.execute(
+        "INSERT OR REPLACE INTO upload_chunks (upload_id, idx, sha256) VALUES (?, ?, ?)",
+        (upload_id, index, sha256),
+    )
+    c.execute(
+        "UPDATE upload_sessions SET updated_at = ? WHERE upload_id = ?", (time.time(), upload_id)
+    )
+
+
+def _delete_sessions(c: sqlite3.Cursor, upload_ids: list[str]) -> None:
+    """Queued write: forget upload sessions and their chunks."""
+    for upload_id in upload_ids:
+        c.execute("DELETE FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+        c.execute("DELETE FROM upload_sessions WHERE upload_id = ?", (upload_id,))
+
+
+def _discard(upload_ids: list[str]) -> None:
+    """Delete sessions, their partial files and their cached state."""
+    if not upload_ids:
+        return
+    run_write(functools.partial(_delete_sessions, upload_ids=upload_ids))
+    with _sessions_lock:
+        for upload_id in upload_ids:
+            _sessions.pop(upload_id, None)
+    for upload_id in upload_ids:
+        try:
+            os.remove(os.path.join(SESSION_DIR, f"{upload_id}.part"))
+        except FileNotFoundError:
+            pass
+
+
+def expire_sessions() -> int:
+    """Remove sessions idle for longer than SESSION_TTL; returns how many."""
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "SELECT upload_id FROM upload_sessions WHERE updated_at < ?",
+            (time.time() - SESSION_TTL,),
+        )
+        stale = [row[0] for row in c.fetchall()]
+    finally:
+        conn.close()
+    _discard(stale)
+    return len(stale)
+
+
+def _preallocate(path: str, size: int) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError) as e:
+            if isinstance(e, OSError) and e.errno == errno.ENOSPC:
+                raise
+            # Filesystem without fallocate: a sparse file still takes pwrite at any offset
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def create_session(
+    filename: str, size: int, chunk_size: int = DEFAULT_CHUNK_SIZE, sha256: Optional[str] = None
+) -> dict[str, Any]:
+    """Open an upload session and preallocate its file.
+
+    Raises ValueError(message, status) on invalid parameters or a full disk.
+    """
+    name = secure_filename(filename or "")
+    if not name:
+        raise ValueError("A filename is required", 400)
+    if not 0 < size <= MAX_UPLOAD_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_UPLOAD_SIZE} bytes", 400)
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(
+            f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes", 400
+        )
+    if sha256 is not None:
+        sha256 = sha256.lower()
+        if len(sha256) != 64 or any(ch not in "0123456789abcdef" for ch in sha256):
+            raise ValueError("sha256 must be a hex digest", 400)
+    expire_sessions()
+
+    session = _Session(uuid.uuid4().hex, name, size, chunk_size, sha256, set())
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    try:
+        _preallocate(session.path, size)
+    except OSError as e:
+        logging.error("Cannot preallocate %d bytes for upload %s: %s", size, name, e)
+        if os.path.exists(session.path):
+            os.remove(session.path)
+        raise ValueError(f"Cannot allocate {size} bytes: {e.strerror}", 507) from e
+    run_write(functools.partial(_insert_session, session=session))
+    with _sessions_lock:
+        _sessions[session.upload_id] = session
+    logging.info("Upload session %s: %s, %d bytes", session.upload_id, name, size)
+    return session.describe()
+
+
+def get_session(upload_id: str) -> _Session:
+    """The session *upload_id*, loaded from the database after a restart.
+
+    Raises ValueError(message, 404) when it does not exist.
+    """
+    with _sessions_lock:
+        session = _sessions.get(upload_id)
+        if session is not None:
+            return session
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(
+                "SELECT filename, size, chunk_size, sha256 FROM upload_sessions"
+                " WHERE upload_id = ?",
+                (upload_id,),
+            )
+            row = c.fetchone()
+            c.execute("SELECT idx FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+            received = {r[0] for r in c.fetchall()}
+        finally:
+            conn.close()
+        if row is None or not os.path.exists(os.path.join(SESSION_DIR, f"{upload_id}.part")):
+            raise ValueError("Unknown upload session", 404)
+        session = _sessions[upload_id] = _Session(upload_id, *row, received=received)
+        return session
+
+
+def write_chunk(
+    upload_id: str, index: int, data: bytes, sha256: Optional[str] = None
+) -> dict[str, Any]:
+    """Verify chunk *index* against *sha256* (when given) and write it at its offset.
+
+    Re-sending a chunk is harmless.  Raises ValueError(message, status).
+    """
+    session = get_session(upload_id)
+    if not 0 <= index < session.chunk_count:
+        raise ValueError(f"Chunk index must be between 0 and {session.chunk_count - 1}", 400)
+    expected = session.chunk_length(index)
+    if len(data) != expected:
+        raise ValueError(f"Chunk {index} must be {expected} bytes, got {len(data)}", 400)
+    digest = hashlib.sha256(data).hexdigest()
+    if sha256 and sha256.lower() != digest:
+        raise ValueError(f"Chunk {index} does not match its SHA-256", 400)
+
+    offset = index * session.chunk_size
+    try:
+        fd = os.open(session.path, os.O_WRONLY)
+    except FileNotFoundError as e:  # finalised or aborted meanwhile
+        raise ValueError("Unknown upload session", 404) from e
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    finally:
+        os.close(fd)
+    run_write(functools.partial(_record_chunk, upload_id=upload_id, index=index, sha256=digest))
+
+    with session.lock:
+        session.received.add(index)
+        if session.hashed == index * session.chunk_size:
+            session.hasher.update(data)
+            session.hashed += len(data)
+        session.advance_hash()
+        received = len(session.received)
+    return {
+        "index": index,
+        "sha256": digest,
+        "received": received,
+        "chunk_count": session.chunk_count,
+    }
+
+
+def finalize_session(upload_id: str) -> tuple[str, str]:
+    """Move the completed upload into the storage directory.
+
+    Returns ``(path, sha256)``; the digest is also written to the ``.sha256``
+    sidecar read by ``get_file_hash``.  Raises ValueError(message, status)
+    when chunks are missing or the file does not match the announced hash.
+    """
+    session = get_session(upload_id)
+    with session.lock:
+        missing = session.missing()
+        if missing:
+            raise ValueError(f"{len(missing)} chunks are missing", 409)
+        session.advance_hash(limit=None)
+        digest = session.hasher.hexdigest()
+        if session.expected_sha256 and session.expected_sha256 != digest:
+            raise ValueError(
+                f"SHA-256 mismatch: expected {session.expected_sha256}, got {digest}", 422
+            )
+        with open(session.path, "rb") as f:
+            os.fsync(f.fileno())
+        dest = os.path.join(STORAGE_DIR, session.filename)
+        os.replace(session.path, dest)
+    try:
+        with open(dest + ".sha256", "w", encoding="utf-8") as f:
+            f.write(digest)
+    except OSError as e:
+        logging.warning("Could not write hash cache for %s: %s", dest, e)
+    _discard([upload_id])
+    logging.info("Upload %s complete: %s (%s)", upload_id, dest, digest)
+    return dest, digest
+
+
+def abort_session(upload_id: str) -> None:
+    """Cancel an upload and delete what was received.  Raises ValueError(message, 404)."""
+    get_session(upload_id)
+    _discard([upload_id])
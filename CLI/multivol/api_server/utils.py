@@ -5,10 +5,13 @@ import hashlib
 import time
 import json
 import logging
-import subprocess
-from typing import Any, Optional
+import tempfile
+import uuid
+from typing import Any, Iterator, Optional
 import multivol.api_server.config as _config
 from multivol.api_server.database import get_db_connection
+from multivol.api_server.fs_trie import build_recoverfs_trie
+from multivol.api_server.recovered_archive import output_dir_lock, repack_tarball
 
 
 def resolve_host_path(container_path: str, host_path_override: Optional[str] = None) -> str:
@@ -75,6 +78,50 @@ def get_file_hash(filepath: str) -> Optional[str]:
     return file_hash
 
 
+# Suffix of files still being written into STORAGE_DIR
+PART_SUFFIX = ".part"
+
+
+def partial_path(path: str) -> str:
+    """A hidden, unique name next to *path* to write it under before ``replace_file``."""
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.{uuid.uuid4().hex[:8]}{PART_SUFFIX}")
+
+
+# (st_ino, st_size, st_mtime): changes whenever a file is replaced or rewritten
+StatKey = tuple[int, int, float]
+
+
+def stat_key(path: str) -> Optional[StatKey]:
+    """*path*'s ``StatKey``, or None when it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime
+
+
+def is_partial(name: str) -> bool:
+    """Whether *name* is a file still being written (see ``partial_path``)."""
+    return name.startswith(".") and name.endswith(PART_SUFFIX)
+
+
+def replace_file(tmp_path: str, path: str) -> None:
+    """Atomically move the finished *tmp_path* over *path* and drop its stale ``.sha256``.
+
+    *path* is never written in place: its inode may be shared with other
+    names through the artifact store.
+    """
+    os.replace(tmp_path, path)
+    try:
+        os.remove(path + ".sha256")
+    except FileNotFoundError:
+        pass
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
 def clean_and_parse_json(filepath: str) -> list[Any] | dict[str, Any] | None:
     """Parse JSON from a Volatility output file.
 
@@ -97,8 +144,10 @@ def clean_and_parse_json(filepath: str) -> list[Any] | dict[str, Any] | None:
         parsed_data = None
         if start_index != -1:
             try:
-                json_content = content[start_index:]
-                parsed_data = json.loads(json_content)
+                # Decode in place rather than slicing a second copy of a large file
+                parsed_data, end = _JSON_DECODER.raw_decode(content, start_index)
+                if content[end:].strip():
+                    parsed_data = None  # trailing garbage; try fallback below
             except json.JSONDecodeError:
                 pass  # Primary parse failed; try fallback below
 
@@ -121,119 +170,98 @@ def clean_and_parse_json(filepath: str) -> list[Any] | dict[str, Any] | None:
         return None
 
 
-def _build_extracted_files_map(output_dir: str) -> dict[str, str]:
-    """Index files extracted by Volatility's RecoverFs by their decimal inode number.
+def iter_row_strings(value: Any) -> Iterator[str]:
+    """Yield every string leaf of a result row, descending into nested children."""
+    if isinstance(value, str):
+        if value:
+            yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from iter_row_strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from iter_row_strings(v)
 
-    Returns a mapping of ``str(inode)`` → filename so tree nodes can link to
-    downloadable files without iterating the directory on every request.
-    """
-    result = {}
-    for filename in os.listdir(output_dir):
-        if filename.startswith("file."):
-            parts = filename.split(".")
-            if len(parts) >= 2 and parts[1].isdigit():
-                result[str(int(parts[1]))] = filename
-    return result
+
+def iter_tree_rows(rows: Any) -> Iterator[dict[str, Any]]:
+    """Yield the rows of a Volatility tree, children (``__children``) after their parent."""
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict):
+            continue
+        children = row.get("__children")
+        yield {k: v for k, v in row.items() if k != "__children"}
+        yield from iter_tree_rows(children)
 
 
-def _build_fs_tree(
-    data: list[Any], output_dir: str, extracted_files: dict[str, str]
-) -> dict[str, Any]:  # pylint: disable=too-many-locals
-    """Convert a flat RecoverFs node list into a nested JSON-serialisable directory tree.
+def _build_extracted_files_map(output_dir: str) -> dict[str, tuple[str, Optional[int]]]:
+    """Index files extracted by Volatility's RecoverFs by their decimal inode number.
 
-    Each node in *data* is a Volatility output row with ``FilePath`` and
-    ``Inode`` fields. Nodes are inserted in path order; the returned root dict
-    is suitable for direct serialisation in the ``/results/<uuid>/fs/list`` endpoint.
+    Returns a mapping of ``str(inode)`` → ``(filename, size)`` from a single
+    directory scan, so tree nodes can link to downloadable files without a
+    stat per node.
     """
-    tree: dict[str, Any] = {
-        "name": "/",
-        "path": "/",
-        "type": "directory",
-        "children": [],
-    }
-
-    for item in data:
-        file_path = item.get("FilePath")
-        if not file_path or file_path == "/":
-            continue
+    result: dict[str, tuple[str, Optional[int]]] = {}
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            parts = entry.name.split(".")
+            if entry.name.startswith("file.") and parts[1].isdigit():
+                try:
+                    size: Optional[int] = entry.stat().st_size
+                except OSError:
+                    size = None
+                result[str(int(parts[1]))] = (entry.name, size)
+    return result
 
-        parts = file_path.strip("/").split("/")
-        current_node = tree
-        current_path = ""
-
-        for i, part in enumerate(parts):
-            current_path = f"{current_path}/{part}" if current_path else f"/{part}"
-
-            found = next((c for c in current_node.get("children", []) if c["name"] == part), None)
-            if found:
-                current_node = found
-                continue
-
-            is_leaf = i == len(parts) - 1
-            new_node: dict[str, Any] = {
-                "name": part,
-                "path": current_path,
-                "type": "file" if is_leaf else "directory",
-            }
-
-            if is_leaf:
-                inode_id = str(item.get("Inode"))
-                new_node["inode"] = item.get("Inode")
-                if inode_id in extracted_files:
-                    fname = extracted_files[inode_id]
-                    new_node["extracted_file"] = fname
-                    full_path = os.path.join(output_dir, fname)
-                    if os.path.exists(full_path):
-                        new_node["size"] = os.path.getsize(full_path)
-            else:
-                new_node["children"] = []
-
-            current_node.setdefault("children", []).append(new_node)
-            current_node = new_node
-
-    return tree
-
-
-def _extract_recoverfs_tarball(output_dir: str) -> None:
-    """Extract recovered_fs.tar.gz so the APIs can serve its contents."""
-    tar_path = os.path.join(output_dir, "recovered_fs.tar.gz")
-    extract_dir = os.path.join(output_dir, "recovered_fs")
-    if not os.path.exists(tar_path) or os.path.exists(extract_dir):
-        return
-    try:
-        os.makedirs(extract_dir, exist_ok=True)
-        subprocess.run(["tar", "-xzf", tar_path, "-C", extract_dir], check=True, timeout=120)
-    except Exception:  # pylint: disable=broad-except
-        logging.exception("Failed to extract recovered_fs.tar.gz in %s", output_dir)
+
+def _is_built_tree(data: list[Any]) -> bool:
+    """True when *data* is a tree already written by process_recover_fs."""
+    return len(data) == 1 and isinstance(data[0], dict) and data[0].get("path") == "/"
 
 
 def process_recover_fs(output_dir: str) -> None:
     """
     Reads the unstructured output of linux.pagecache.RecoverFs and
     builds a structured JSON tree representing the file system.
-    Also extracts recovered_fs.tar.gz so files are readable by MCP.
+    Also repacks recovered_fs.tar.gz into a seekable zip so files can be
+    served without extracting the archive.
     """
     json_path = os.path.join(output_dir, "linux.pagecache.RecoverFs_output.json")
     if not os.path.exists(json_path):
         return
 
-    _extract_recoverfs_tarball(output_dir)
+    # Scan completion and status polls both get here; the second caller finds a built tree
+    with output_dir_lock(output_dir):
+        repack_tarball(output_dir)
+        _build_recover_fs_tree(output_dir, json_path)
+
 
+def _build_recover_fs_tree(output_dir: str, json_path: str) -> None:
+    tmp_path = None
     try:
         data = clean_and_parse_json(json_path)
-        if data is None or not isinstance(data, list):
+        if data is None or not isinstance(data, list) or _is_built_tree(data):
             return
 
-        extracted_files = _build_extracted_files_map(output_dir)
-        tree = _build_fs_tree(data, output_dir, extracted_files)
-
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump([tree], f, indent=2)
+        trie = build_recoverfs_trie(data, _build_extracted_files_map(output_dir))
+        del data
+        # Written beside the output and swapped in, so readers never see a partial tree
+        fd, tmp_path = tempfile.mkstemp(prefix=".RecoverFs_output.", suffix=".tmp", dir=output_dir)
+        os.fchmod(fd, 0o644)
+        with open(fd, "w", encoding="utf-8") as f:
+            trie.write_json(f)
+        os.replace(tmp_path, json_path)
+        tmp_path = None
 
         logging.debug("process_recover_fs completed for %s", output_dir)
 
     except Exception:  # pylint: disable=broad-except
         logging.exception("Failed to process RecoverFs for %s", output_dir)
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
 
 def cleanup_timeouts() -> None:
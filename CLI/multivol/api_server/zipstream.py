@@ -0,0 +1,260 @@
+"""Streaming ZIP writer for scan downloads.
+
+``iter_zip`` yields the archive as it is produced, so the first bytes leave
+the server immediately and nothing is spooled to a temp file.  Entries are
+written with data descriptors (CRC and sizes follow the data) and Zip64
+records where sizes or offsets need them.  Large members are deflated in
+parallel, pigz-style: the file is cut into chunks that worker threads
+compress independently (zlib releases the GIL), each primed with the
+previous chunk's last 32 KiB and ended with a sync flush, and the pieces are
+concatenated into one valid deflate stream.  Files that are already
+compressed are stored as-is.
+"""
+
+import dataclasses
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+ZIP_WORKERS = int(os.environ.get("ZIP_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+COMPRESSION_LEVEL = 6
+CHUNK_SIZE = 1 << 20
+WINDOW_SIZE = 32768  # deflate back-reference window primed into each chunk
+# Chunks in flight per download; bounds memory at about 2 * workers * CHUNK_SIZE
+IN_FLIGHT = 2 * ZIP_WORKERS
+
+# Extensions whose content is already compressed; deflating them again only burns CPU
+PRECOMPRESSED = frozenset(
+    {
+        ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".lz4", ".7z", ".rar", ".cab",
+        ".jar", ".apk", ".docx", ".xlsx", ".pptx", ".parquet",
+        ".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp3", ".mp4", ".mkv", ".avi",
+    }
+)  # fmt: skip
+
+_ZIP32_MAX = 0xFFFFFFFF
+# Members at least this large get Zip64 local headers (margin for deflate expansion)
+_ZIP64_THRESHOLD = _ZIP32_MAX - (1 << 22)
+_FLAGS = 0x0808  # bit 3: data descriptor follows, bit 11: UTF-8 names
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@dataclasses.dataclass
+class _Member:
+    arcname: bytes
+    method: int
+    dos_time: int
+    dos_date: int
+    mode: int
+    offset: int
+    zip64: bool
+    crc: int = 0
+    compressed_size: int = 0
+    size: int = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ZIP_WORKERS, thread_name_prefix="zip")
+        return _executor
+
+
+def _dos_datetime(mtime: float) -> tuple[int, int]:
+    t = time.localtime(max(mtime, 315532800))  # DOS dates start in 1980
+    return (
+        (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+        ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday,
+    )
+
+
+def _deflate_chunk(data: bytes, zdict: bytes, last: bool) -> bytes:
+    """Raw-deflate one chunk; non-final chunks end on a byte boundary (sync flush)."""
+    if zdict:
+        cobj = zlib.compressobj(
+            COMPRESSION_LEVEL, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict
+        )
+    else:
+        cobj = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, 9)
+    return cobj.compress(data) + cobj.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _iter_deflated(f: BinaryIO, member: _Member) -> Iterator[bytes]:
+    chunk = f.read(CHUNK_SIZE)
+    nxt = f.read(CHUNK_SIZE) if chunk else b""
+    if not nxt:  # small file: not worth a round trip through the pool
+        member.crc = zlib.crc32(chunk)
+        member.size = len(chunk)
+        yield _deflate_chunk(chunk, b"", True)
+        return
+    executor = _get_executor()
+    inflight: deque = deque()
+    zdict = b""
+    while chunk:
+        member.crc = zlib.crc32(chunk, member.crc)
+        member.size += len(chunk)
+        inflight.append(executor.submit(_deflate_chunk, chunk, zdict, not nxt))
+        zdict = chunk[-WINDOW_SIZE:]
+        chunk, nxt = nxt, (f.read(CHUNK_SIZE) if nxt else b"")
+        while len(inflight) >= IN_FLIGHT or (inflight and inflight[0].done()):
+            yield inflight.popleft().result()
+    while inflight:
+        yield inflight.popleft().result()
+
+
+def _iter_stored(f: BinaryIO, member: _Member) -> Iterator[bytes]:
+    while chunk := f.read(CHUNK_SIZE):
+        member.crc = zlib.crc32(chunk, member.crc)
+        member.size += len(chunk)
+        yield chunk
+
+
+def _local_header(member: _Member) -> bytes:
+    extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0) if member.zip64 else b""
+    size_field = _ZIP32_MAX if member.zip64 else 0
+    return (
+        struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            45 if member.zip64 else 20,
+            _FLAGS,
+            member.method,
+            member.dos_time,
+            member.dos_date,
+            0,
+            size_field,
+            size_field,
+            len(member.arcname),
+            len(extra),
+        )
+        + member.arcname
+        + extra
+    )
+
+
+def _data_descriptor(member: _Member) -> bytes:
+    if member.zip64:
+        return struct.pack("<IIQQ", 0x08074B50, member.crc, member.compressed_size, member.size)
+    if member.compressed_size > _ZIP32_MAX or member.size > _ZIP32_MAX:
+        raise OSError(f"{member.arcname!r} grew past 4 GiB while being archived")
+    return struct.pack("<IIII", 0x08074B50, member.crc, member.compressed_size, member.size)
+
+
+def _central_header(member: _Member) -> bytes:
+    zip64_fields = []
+    size, compressed_size, offset = member.size, member.compressed_size, member.offset
+    if size >= _ZIP32_MAX:
+        zip64_fields.append(size)
+        size = _ZIP32_MAX
+    if compressed_size >= _ZIP32_MAX:
+        zip64_fields.append(compressed_size)
+        compressed_size = _ZIP32_MAX
+    if offset >= _ZIP32_MAX:
+        zip64_fields.append(offset)
+        offset = _ZIP32_MAX
+    extra = b""
+    if zip64_fields:
+        extra = struct.pack(
+            f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields
+        )
+    version = 45 if zip64_fields or member.zip64 else 20
+    return (
+        struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50,
+            (3 << 8) | version,  # made by: Unix
+            version,
+            _FLAGS,
+            member.method,
+            member.dos_time,
+            member.dos_date,
+            member.crc,
+            compressed_size,
+            size,
+            len(member.arcname),
+            len(extra),
+            0,
+            0,
+            0,
+            member.mode << 16,
+            offset,
+        )
+        + member.arcname
+        + extra
+    )
+
+
+def _end_records(count: int, cd_offset: int, cd_size: int) -> bytes:
+    records = b""
+    if count >= 0xFFFF or cd_offset >= _ZIP32_MAX or cd_size >= _ZIP32_MAX:
+        zip64_end = cd_offset + cd_size
+        records += struct.pack(
+            "<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, cd_size, cd_offset
+        )
+        records += struct.pack("<IIQI", 0x07064B50, 0, zip64_end, 1)
+    records += struct.pack(
+        "<IHHHHIIH",
+        0x06054B50,
+        0,
+        0,
+        min(count, 0xFFFF),
+        min(count, 0xFFFF),
+        min(cd_size, _ZIP32_MAX),
+        min(cd_offset, _ZIP32_MAX),
+        0,
+    )
+    return records
+
+
+def iter_zip(entries: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of *entries*, ``(path, arcname)`` pairs, as it is built.
+
+    Files that disappear or cannot be opened before they are started are skipped.
+    """
+    members: list[_Member] = []
+    offset = 0
+    for path, arcname in entries:
+        try:
+            f = open(path, "rb")  # pylint: disable=consider-using-with
+        except OSError:
+            continue
+        with f:
+            st = os.fstat(f.fileno())
+            dos_time, dos_date = _dos_datetime(st.st_mtime)
+            stored = os.path.splitext(path)[1].lower() in PRECOMPRESSED or st.st_size == 0
+            member = _Member(
+                arcname=arcname.replace(os.sep, "/").encode("utf-8"),
+                method=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED,
+                dos_time=dos_time,
+                dos_date=dos_date,
+                mode=st.st_mode & 0xFFFF,
+                offset=offset,
+                zip64=st.st_size >= _ZIP64_THRESHOLD,
+            )
+            header = _local_header(member)
+            yield header
+            body = _iter_stored(f, member) if stored else _iter_deflated(f, member)
+            for piece in body:
+                member.compressed_size += len(piece)
+                yield piece
+            descriptor = _data_descriptor(member)
+            yield descriptor
+        offset += len(header) + member.compressed_size + len(descriptor)
+        members.append(member)
+
+    cd_offset = offset
+    cd_size = 0
+    for member in members:
+        record = _central_header(member)
+        cd_size += len(record)
+        yield record
+    yield _end_records(len(members), cd_offset, cd_size)
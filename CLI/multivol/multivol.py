@@ -297,6 +297,12 @@ def main():
     parser = argparse.ArgumentParser("multivol")
     parser.add_argument("--api", action="store_true", help="Start API server")
     parser.add_argument("--dev", action="store_true", help="Enable developer mode (hot reload)")
+    parser.add_argument(
+        "--server",
+        choices=["waitress", "async"],
+        default=None,
+        help="API server: waitress (threaded, default) or async (uvicorn, for long transfers)",
+    )
     parser.add_argument(
         "--host-path",
         type=str,
@@ -424,7 +430,7 @@ def main():
             from .api_server import run_api  # pylint: disable=import-outside-toplevel
         except ImportError:
             from api_server import run_api  # pylint: disable=import-outside-toplevel
-        run_api(run_analysis, debug_mode=args.dev)
+        run_api(run_analysis, debug_mode=args.dev, server=args.server)
         return
 
     _validate_args(parser, args)
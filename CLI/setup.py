@@ -23,6 +23,12 @@ setup(
         "multivol": ["plugins_list/*.yaml"],
     },
     install_requires=required,
+    extras_require={
+        # Columnar export of module outputs and the /query endpoint
+        "analytics": ["pyarrow", "duckdb>=1.1"],
+        # --server async: long uploads and downloads without pinning threads
+        "async": ["uvicorn"],
+    },
     entry_points={
         "console_scripts": [
             "multivol=multivol.multivol:main",
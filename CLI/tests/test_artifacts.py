@@ -0,0 +1,137 @@
+"""Tests for artifact hashing, hardlink deduplication and the /artifacts routes."""
+
+import hashlib
+import os
+import time
+import zipfile
+
+from multivol.api_server.artifacts import deduplicate, hash_scan_artifacts, store_path
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.utils import stat_key
+
+PAYLOAD = b"MZ" + os.urandom(4096)
+SHA = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def _scan(db_conn, uuid, output_dir, name=None):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, name, status, created_at, output_dir)"
+        " VALUES (?, ?, 'completed', ?, ?)",
+        (uuid, name, time.time(), str(output_dir)),
+    )
+    db_conn.commit()
+
+
+def _output_dir(tmp_path, name):
+    output_dir = tmp_path / name
+    output_dir.mkdir()
+    (output_dir / "file.0x1.0xffff.DataSectionObject.svchost.exe.dat").write_bytes(PAYLOAD)
+    (output_dir / "windows.pslist.PsList_output.json").write_text("[]")
+    (output_dir / "scan.log").write_text("log")
+    return output_dir
+
+
+def test_hashes_and_links_duplicates(db_conn, tmp_path):
+    first = _output_dir(tmp_path, "a")
+    with zipfile.ZipFile(first / "recovered_fs.zip", "w") as zf:
+        zf.writestr("usr/bin/svchost.exe", PAYLOAD)
+        zf.writestr("etc/hostname", b"victim\n")
+    second = _output_dir(tmp_path, "b")
+    dumps = os.path.join(STORAGE_DIR, "art-case_extracted")
+    os.makedirs(dumps, exist_ok=True)
+    for name in ("svchost.exe.img", "pid.4.svchost.exe.img"):
+        with open(os.path.join(dumps, name), "wb") as f:
+            f.write(PAYLOAD)
+    _scan(db_conn, "art-1", first)
+    _scan(db_conn, "art-2", second, name="art-case")
+
+    assert hash_scan_artifacts("art-1") == 3
+    assert hash_scan_artifacts("art-2") == 3
+    rows = db_conn.execute(
+        "SELECT scan_id, source, member, stored FROM artifacts WHERE sha256 = ? ORDER BY 1, 2",
+        (SHA,),
+    ).fetchall()
+    assert rows == [
+        ("art-1", "output", "", 0),
+        ("art-1", "recovered_fs", "usr/bin/svchost.exe", 0),
+        ("art-2", "dump", "", 1),
+        ("art-2", "dump", "", 1),
+        ("art-2", "output", "", 0),
+    ]
+    store = os.stat(store_path(SHA))
+    for name in ("svchost.exe.img", "pid.4.svchost.exe.img"):
+        assert os.stat(os.path.join(dumps, name)).st_ino == store.st_ino
+        with open(os.path.join(dumps, f"{name}.sha256"), encoding="utf-8") as f:
+            assert f.read() == SHA
+    assert (store.st_nlink, store.st_mode & 0o777) == (3, 0o444)
+    # Written in place by the containers: hashed, never linked
+    output_file = second / "file.0x1.0xffff.DataSectionObject.svchost.exe.dat"
+    assert os.stat(output_file).st_nlink == 1
+
+    # Unchanged files are skipped; changed ones are hashed again
+    assert hash_scan_artifacts("art-1") == 0
+    (first / "notes.bin").write_bytes(b"new")
+    assert hash_scan_artifacts("art-1") == 1
+
+
+def test_files_replaced_after_hashing_are_not_linked(tmp_path):
+    old = os.urandom(512)
+    path = tmp_path / "pid.8.img"
+    path.write_bytes(old)
+    hashed = stat_key(str(path))
+    replacement = tmp_path / "new.img"
+    replacement.write_bytes(os.urandom(512))
+    os.replace(replacement, path)
+
+    assert deduplicate(str(path), hashlib.sha256(old).hexdigest(), hashed) is False
+    assert not os.path.exists(store_path(hashlib.sha256(old).hexdigest()))
+    assert os.listdir(tmp_path) == ["pid.8.img"]  # no partial name left behind
+
+
+class TestArtifactRoutes:
+    def test_lookup_and_listing(self, client, auth_headers, db_conn, tmp_path):
+        _scan(db_conn, "art-3", _output_dir(tmp_path, "c"))
+        _scan(db_conn, "art-4", _output_dir(tmp_path, "d"))
+        hash_scan_artifacts("art-3")
+        hash_scan_artifacts("art-4")
+
+        body = client.get(f"/artifacts/{SHA.upper()}", headers=auth_headers).get_json()
+        names = {(a["scan_id"], a["name"]) for a in body["artifacts"]}
+        assert ("art-3", "file.0x1.0xffff.DataSectionObject.svchost.exe.dat") in names
+        assert ("art-4", "file.0x1.0xffff.DataSectionObject.svchost.exe.dat") in names
+        assert body["size"] == len(PAYLOAD)
+
+        listing = client.get("/scans/art-3/artifacts", headers=auth_headers).get_json()
+        assert (listing["total"], listing["unique"]) == (1, 1)
+        assert listing["artifacts"][0]["copies"] >= 2
+        assert listing["artifacts"][0]["deduplicated"] is False
+
+    def test_errors_and_queueing(self, client, auth_headers, db_conn, tmp_path):
+        assert client.get("/artifacts/xyz", headers=auth_headers).status_code == 400
+        assert client.get(f"/artifacts/{'0' * 64}", headers=auth_headers).status_code == 404
+        assert client.get("/scans/nope/artifacts", headers=auth_headers).status_code == 404
+        assert client.post("/scans/nope/artifacts/hash", headers=auth_headers).status_code == 404
+        _scan(db_conn, "art-5", tmp_path)
+        resp = client.post("/scans/art-5/artifacts/hash", headers=auth_headers)
+        assert resp.status_code in (200, 202)
+
+    def test_last_copy_releases_store_objects(self, client, auth_headers, db_conn, tmp_path):
+        content = os.urandom(64)
+        sha = hashlib.sha256(content).hexdigest()
+        for uuid in ("art-6", "art-7"):
+            dumps = os.path.join(STORAGE_DIR, f"{uuid}-case_extracted")
+            os.makedirs(dumps, exist_ok=True)
+            with open(os.path.join(dumps, "file.dat"), "wb") as f:
+                f.write(content)
+            output_dir = tmp_path / uuid
+            output_dir.mkdir()
+            _scan(db_conn, uuid, output_dir, name=f"{uuid}-case")
+            hash_scan_artifacts(uuid)
+
+        client.delete("/scans/art-6", headers=auth_headers)
+        client.delete("/scans/art-7", headers=auth_headers)
+        assert os.path.exists(store_path(sha))  # the dumps are evidence of their own
+        client.delete("/evidence/art-6-case_extracted", headers=auth_headers)
+        assert os.path.exists(store_path(sha))
+        client.delete("/evidence/art-7-case_extracted", headers=auth_headers)
+        assert not os.path.exists(store_path(sha))
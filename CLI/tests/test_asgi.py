@@ -0,0 +1,155 @@
+"""Tests for the async (ASGI) server adapter."""
+
+import asyncio
+import threading
+
+from multivol.api_server import asgi
+
+
+def _scope(path, method="GET", headers=(), query=b""):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+        "server": ("testserver", 5001),
+        "client": ("127.0.0.1", 40000),
+    }
+
+
+async def _request(adapter, scope, body_chunks=(b"",)):
+    """Run one request through the adapter; returns the messages it sent."""
+    incoming = [
+        {"type": "http.request", "body": c, "more_body": i < len(body_chunks) - 1}
+        for i, c in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await adapter(scope, receive, send)
+    return sent
+
+
+def _call(adapter, scope, body_chunks=(b"",)):
+    """Run one request through the adapter; returns (status, headers, body, sends)."""
+    sent = asyncio.run(_request(adapter, scope, body_chunks))
+    start = sent[0]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], dict(start["headers"]), body, sent
+
+
+def test_flask_route_through_adapter(app, auth_headers):
+    adapter = asgi.AsyncWSGIAdapter(app)
+    status, headers, body, _ = _call(adapter, _scope("/health"))
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    assert b'"status":"ok"' in body.replace(b" ", b"")
+    assert b'"streaming_uploads":true' in body.replace(b" ", b"")
+
+    hdrs = [(k.lower().encode(), v.encode()) for k, v in auth_headers.items()]
+    status, _, _, _ = _call(adapter, _scope("/scans", headers=hdrs))
+    assert status == 200
+
+
+def test_streamed_body_is_sent_chunk_by_chunk_and_closed():
+    closed = []
+
+    class Body:
+        def __iter__(self):
+            yield b"one\n"
+            yield b""
+            yield b"two\n"
+
+        def close(self):
+            closed.append(threading.current_thread().name)
+
+    def wsgi_app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "application/x-ndjson")])
+        return Body()
+
+    status, _, body, sent = _call(asgi.AsyncWSGIAdapter(wsgi_app, workers=2), _scope("/stream"))
+    assert status == 200
+    assert body == b"one\ntwo\n"
+    assert [m.get("more_body", False) for m in sent[1:]] == [True, True, False]
+    assert closed and closed[0].startswith("wsgi")
+
+
+def test_large_body_is_spooled_before_dispatch(tmp_path, monkeypatch):
+    monkeypatch.setattr(asgi, "SPOOL_THRESHOLD", 1024)
+    seen = {}
+
+    def wsgi_app(environ, start_response):
+        stream = environ["wsgi.input"]
+        seen["spooled"] = not hasattr(stream, "getvalue")
+        seen["data"] = stream.read(int(environ["CONTENT_LENGTH"]))
+        seen["query"] = environ["QUERY_STRING"]
+        start_response("201 Created", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    chunks = [b"a" * 1000, b"b" * 1000, b"c" * 1000]
+    scope = _scope("/upload", "POST", [(b"content-length", b"3000")], query=b"name=mem.raw")
+    adapter = asgi.AsyncWSGIAdapter(wsgi_app, spool_dir=str(tmp_path))
+    status, _, body, _ = _call(adapter, scope, chunks)
+    assert (status, body) == (201, b"ok")
+    assert seen == {"spooled": True, "data": b"".join(chunks), "query": "name=mem.raw"}
+
+
+def test_streamed_paths_read_the_body_while_it_arrives():
+    seen = {}
+
+    def wsgi_app(environ, start_response):
+        seen["terminated"] = environ.get("wsgi.input_terminated")
+        seen["data"] = environ["wsgi.input"].read()
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    scope = _scope("/upload/stream/mem.tar", "PUT")
+    status, _, body, _ = _call(asgi.AsyncWSGIAdapter(wsgi_app), scope, [b"abc", b"def"])
+    assert (status, body) == (200, b"ok")
+    assert seen == {"terminated": True, "data": b"abcdef"}
+
+
+def test_oversized_body_is_rejected_without_calling_the_app():
+    def wsgi_app(environ, start_response):
+        raise AssertionError("app must not run")
+
+    adapter = asgi.AsyncWSGIAdapter(wsgi_app, max_body=10)
+    scope = _scope("/upload", "POST", [(b"content-length", b"11")])
+    assert _call(adapter, scope, [b"x" * 11])[0] == 413
+    chunked = _scope("/upload", "POST")
+    assert _call(adapter, chunked, [b"x" * 6, b"x" * 6])[0] == 413
+
+
+def test_app_error_becomes_500():
+    def wsgi_app(environ, start_response):
+        raise RuntimeError("boom")
+
+    assert _call(asgi.AsyncWSGIAdapter(wsgi_app), _scope("/x"))[0] == 500
+
+
+def test_fast_routes_are_served_while_bulk_threads_are_busy():
+    release = threading.Event()
+
+    def wsgi_app(environ, start_response):
+        if environ["PATH_INFO"].endswith("/download"):
+            release.wait(5)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [environ["PATH_INFO"].encode()]
+
+    async def main():
+        adapter = asgi.AsyncWSGIAdapter(wsgi_app, workers=1, fast_workers=1)
+        download = asyncio.create_task(_request(adapter, _scope("/evidence/mem.raw/download")))
+        await asyncio.sleep(0.05)  # the download holds the only bulk thread
+        health = await asyncio.wait_for(_request(adapter, _scope("/health")), 2)
+        release.set()
+        return health, await download
+
+    health, download = asyncio.run(main())
+    assert health[0]["status"] == download[0]["status"] == 200
+    assert health[1]["body"] == b"/health"
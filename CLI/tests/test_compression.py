@@ -0,0 +1,85 @@
+"""Tests for zstd-compressed result storage."""
+
+import json
+import time
+
+import pytest
+
+from multivol.api_server import compression
+from multivol.api_server.result_store import store_module_result
+
+pytest.importorskip("zstandard")
+
+PLUGIN = "windows.pslist.PsList"
+
+
+def _rows(count, offset=0):
+    return [
+        {"PID": offset + i, "ImageFileName": f"proc{i % 7}.exe", "Offset(V)": 0x8000 + i}
+        for i in range(count)
+    ]
+
+
+def _stored(conn, uuid):
+    return conn.execute(
+        "SELECT content, encoding, dict_id, size FROM scan_results WHERE scan_id = ?", (uuid,)
+    ).fetchone()
+
+
+class TestEncoding:
+    def test_small_results_stay_plain(self):
+        assert compression.encode_content(PLUGIN, "[]") == ("[]", None, None)
+
+    def test_round_trip(self):
+        text = json.dumps(_rows(200))
+        value, encoding, dict_id = compression.encode_content(PLUGIN, text)
+        assert encoding == compression.ENCODING_ZSTD
+        assert len(value) < len(text)
+        assert compression.decode_content(value, encoding, dict_id) == text
+
+    def test_unknown_encoding_rejected(self):
+        with pytest.raises(ValueError):
+            compression.decode_content(b"x", "brotli", None)
+
+
+class TestCompressedResults:
+    def test_stored_result_is_readable_and_filterable(self, client, auth_headers, db_conn):
+        db_conn.execute(
+            "INSERT INTO scans (uuid, status, created_at) VALUES ('zstd-1', 'completed', ?)",
+            (time.time(),),
+        )
+        store_module_result(db_conn.cursor(), "zstd-1", PLUGIN, _rows(300))
+        db_conn.commit()
+
+        content, encoding, _, size = _stored(db_conn, "zstd-1")
+        assert encoding == compression.ENCODING_ZSTD
+        assert size > len(content)
+
+        resp = client.get(f"/results/zstd-1?module={PLUGIN}", headers=auth_headers)
+        assert len(resp.get_json()) == 300
+
+        resp = client.get(
+            f"/results/zstd-1?module={PLUGIN}&filter=PID:lt:3&sort=-PID", headers=auth_headers
+        )
+        assert [r["PID"] for r in resp.get_json()] == [2, 1, 0]
+
+    def test_recompress_trains_dictionary(self, db_conn):
+        for i in range(20):
+            uuid = f"zstd-train-{i}"
+            db_conn.execute(
+                "INSERT INTO scans (uuid, status, created_at) VALUES (?, 'completed', ?)",
+                (uuid, time.time()),
+            )
+            db_conn.execute(
+                "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?, ?, ?, ?)",
+                (uuid, "windows.train.Train", json.dumps(_rows(60, offset=i * 100)), time.time()),
+            )
+        db_conn.commit()
+
+        report = compression.recompress_database()
+
+        content, encoding, dict_id, _ = _stored(db_conn, "zstd-train-0")
+        assert encoding == compression.ENCODING_ZSTD
+        assert dict_id is not None
+        assert json.loads(compression.decode_content(content, encoding, dict_id))[0]["PID"] == 0
+        assert report["windows.train.Train"]["ratio"] > 1
@@ -54,3 +54,103 @@ def test_init_db_idempotent(isolated_storage):
     tables = {row[0] for row in cursor.fetchall()}
     conn.close()
     assert "scans" in tables
+
+
+def test_init_db_records_schema_version(isolated_storage):
+    from multivol.api_server.database import MIGRATIONS, init_db, get_db_connection
+
+    init_db()
+    conn = get_db_connection()
+    versions = [r[0] for r in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    conn.close()
+    assert versions == [m[0] for m in MIGRATIONS]
+    assert {
+        "idx_scan_results_scan_module",
+        "idx_dump_tasks_scan",
+        "idx_scans_status_created",
+    } <= indexes
+
+
+def test_init_db_upgrades_legacy_database(isolated_storage):
+    from multivol.api_server.database import init_db, get_db_connection
+
+    # Database from before versioned migrations: old column names, no schema_version
+    conn = get_db_connection()
+    conn.execute(
+        "CREATE TABLE scans"
+        " (uuid TEXT PRIMARY KEY, case_name TEXT, status TEXT, filepath TEXT, created_at REAL)"
+    )
+    conn.execute(
+        "INSERT INTO scans (uuid, case_name, status) VALUES ('legacy', 'Old case', 'completed')"
+    )
+    conn.commit()
+    conn.close()
+
+    init_db()
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT name, mode, result_count FROM scans WHERE uuid = 'legacy'"
+    ).fetchone()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM scan_results WHERE scan_id = ? AND module = ?",
+        ("legacy", "m"),
+    ).fetchall()
+    conn.close()
+    assert row == ("Old case", "full", 0)
+    assert any("idx_scan_results_scan_module" in r[-1] for r in plan)
+
+
+def test_closed_connections_are_reused_and_reset(isolated_storage):
+    from multivol.api_server.database import get_db_connection
+
+    conn = get_db_connection()
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")  # left uncommitted
+    conn.close()
+    conn.close()  # double close must not put it in the pool twice
+
+    again = get_db_connection()
+    other = get_db_connection()
+    assert again is conn
+    assert other is not conn
+    assert again.row_factory is None
+    assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    assert again.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    again.close()
+    other.close()
+
+
+def test_queued_writes_apply_in_order_and_isolate_failures(isolated_storage):
+    from multivol.api_server.database import (
+        flush_writes,
+        get_db_connection,
+        run_write,
+        submit_write,
+    )
+
+    run_write(lambda c: c.execute("CREATE TABLE w (x INTEGER UNIQUE)"))
+    ok = [
+        submit_write(lambda c, i=i: c.execute("INSERT INTO w VALUES (?)", (i,))) for i in range(5)
+    ]
+    bad = submit_write(lambda c: c.execute("INSERT INTO w VALUES (0)"))
+    flush_writes(5)
+
+    assert all(f.exception() is None for f in ok)
+    assert isinstance(bad.exception(), sqlite3.IntegrityError)
+    conn = get_db_connection()
+    assert [r[0] for r in conn.execute("SELECT x FROM w ORDER BY rowid")] == [0, 1, 2, 3, 4]
+    conn.close()
+
+
+def test_non_busy_errors_fail_the_batch_instead_of_retrying(isolated_storage, monkeypatch):
+    import multivol.api_server.database as db_mod
+
+    def failing(conn, batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(db_mod._Writer, "_apply_once", staticmethod(failing))
+    future = db_mod.submit_write(lambda c: None)
+    with pytest.raises(sqlite3.OperationalError, match="disk I/O"):
+        future.result(timeout=5)
@@ -0,0 +1,177 @@
+"""Tests for the evidence catalog behind GET /evidences and content-addressed storage."""
+
+import functools
+import io
+import os
+import time
+
+from multivol.api_server import evidence
+from multivol.api_server.artifacts import store_path
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.database import run_write
+from multivol.api_server.evidence import (
+    _cached_hash,
+    _hash_and_refresh,
+    ensure_reconciled,
+    reconcile_evidence,
+)
+
+
+def _groups(client, auth_headers):
+    resp = client.get("/evidences", headers=auth_headers)
+    assert resp.status_code == 200
+    return {group["id"]: group for group in resp.get_json()}
+
+
+def test_reconcile_catalogs_dumps_and_extracted_groups(client, auth_headers, db_conn):
+    ensure_reconciled()
+    with open(os.path.join(STORAGE_DIR, "cat-src.raw"), "wb") as f:
+        f.write(b"\0" * 1000)
+    with open(os.path.join(STORAGE_DIR, "cat-src.raw.sha256"), "w", encoding="utf-8") as f:
+        f.write("ab" * 32)
+    with open(os.path.join(STORAGE_DIR, "cat-lone.raw"), "wb") as f:
+        f.write(b"\0" * 10)
+    extracted = os.path.join(STORAGE_DIR, "cat-case_extracted")
+    os.makedirs(extracted, exist_ok=True)
+    with open(os.path.join(extracted, "pid.123.dmp"), "wb") as f:
+        f.write(b"x" * 30)
+    db_conn.execute(
+        "INSERT INTO scans (uuid, name, status, created_at, dump_path)"
+        " VALUES ('cat-1', 'cat-case', 'completed', ?, ?)",
+        (time.time(), os.path.join(STORAGE_DIR, "cat-src.raw")),
+    )
+    db_conn.commit()
+
+    # Copied in by hand: invisible until the catalog is reconciled
+    assert "cat-case_extracted" not in _groups(client, auth_headers)
+    reconcile_evidence()
+    groups = _groups(client, auth_headers)
+
+    group = groups["cat-case_extracted"]
+    assert (group["name"], group["size"], group["source_id"]) == ("cat-case", 30, "cat-src.raw")
+    assert [(c["id"], c["size"]) for c in group["children"]] == [
+        ("cat-src.raw", 1000),
+        ("cat-case_extracted/pid.123.dmp", 30),
+    ]
+    assert "group_cat-src.raw" not in groups  # listed under its case instead
+    lone = groups["group_cat-lone.raw"]
+    assert (lone["name"], lone["size"]) == ("Unassigned Evidence", 10)
+
+
+def test_upload_and_delete_update_the_catalog(client, auth_headers):
+    ensure_reconciled()
+    resp = client.post(
+        "/upload",
+        data={"file": (io.BytesIO(b"MEMORY" * 100), "cat-upload.raw")},
+        headers=auth_headers,
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    group = _groups(client, auth_headers)["group_cat-upload.raw"]
+    assert group["children"][0]["size"] == 600
+
+    assert client.delete("/evidence/cat-upload.raw", headers=auth_headers).status_code == 200
+    assert "group_cat-upload.raw" not in _groups(client, auth_headers)
+
+
+def _chunked_upload(client, auth_headers, filename, data):
+    body = {"filename": filename, "size": len(data), "chunk_size": 1 << 20}
+    session = client.post("/upload/sessions", json=body, headers=auth_headers).get_json()
+    upload_id = session["upload_id"]
+    client.put(f"/upload/sessions/{upload_id}/chunks/0", data=data, headers=auth_headers)
+    resp = client.post(f"/upload/sessions/{upload_id}/complete", headers=auth_headers)
+    assert resp.status_code == 200
+    return resp.get_json()["sha256"]
+
+
+def test_identical_dumps_are_stored_once(client, auth_headers):
+    data = os.urandom(4096)
+    sha = _chunked_upload(client, auth_headers, "cas-first.raw", data)
+    assert _chunked_upload(client, auth_headers, "cas-again.raw", data) == sha
+    first = os.path.join(STORAGE_DIR, "cas-first.raw")
+    again = os.path.join(STORAGE_DIR, "cas-again.raw")
+    assert os.stat(first).st_ino == os.stat(again).st_ino == os.stat(store_path(sha)).st_ino
+    assert _groups(client, auth_headers)["group_cas-again.raw"]["children"][0]["copies"] == 2
+
+    client.delete("/evidence/cas-first.raw", headers=auth_headers)
+    with open(again, "rb") as f:
+        assert f.read() == data
+    assert os.path.exists(store_path(sha))
+    client.delete("/evidence/cas-again.raw", headers=auth_headers)
+    assert not os.path.exists(store_path(sha))
+
+
+def test_background_hashing_collapses_copies():
+    data = os.urandom(2048)
+    paths = []
+    for name in ("cas-copy-a.raw", "cas-copy-b.raw"):
+        path = os.path.join(STORAGE_DIR, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    _hash_and_refresh(paths)
+    assert os.stat(paths[0]).st_ino == os.stat(paths[1]).st_ino
+    assert os.stat(paths[0]).st_nlink == 3  # both names and the store object
+
+
+def test_uploading_over_a_linked_copy_leaves_the_others_intact(client, auth_headers):
+    data = os.urandom(2048)
+    paths = []
+    for name in ("cas-keep-a.raw", "cas-keep-b.raw"):
+        path = os.path.join(STORAGE_DIR, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    _hash_and_refresh(paths)
+    sha = _cached_hash(paths[0])
+    assert os.stat(store_path(sha)).st_mode & 0o777 == 0o444
+
+    resp = client.post(
+        "/upload",
+        data={"file": (io.BytesIO(b"other"), "cas-keep-b.raw")},
+        headers=auth_headers,
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    for path, expected in ((paths[0], data), (store_path(sha), data), (paths[1], b"other")):
+        with open(path, "rb") as f:
+            assert f.read() == expected
+    assert _cached_hash(paths[1]) != sha
+
+
+def test_reconcile_skips_files_still_being_written(client, auth_headers, monkeypatch):
+    queued = []
+    monkeypatch.setattr(evidence, "submit_evidence_hashing", lambda paths: queued.extend(paths))
+    partial = os.path.join(STORAGE_DIR, ".cat-busy.raw.0a1b2c3d.part")
+    copying = os.path.join(STORAGE_DIR, "cat-copying.raw")
+    settled = os.path.join(STORAGE_DIR, "cat-settled.raw")
+    for path in (partial, copying, settled):
+        with open(path, "wb") as f:
+            f.write(b"\0" * 10)
+    old = time.time() - evidence.HASH_SETTLE - 1
+    os.utime(settled, (old, old))
+
+    reconcile_evidence()
+    groups = _groups(client, auth_headers)
+    assert "group_cat-copying.raw" in groups
+    assert not any("cat-busy" in group_id for group_id in groups)
+    assert settled in queued
+    assert copying not in queued and partial not in queued
+
+
+def test_rows_read_before_a_later_refresh_are_dropped(client, auth_headers):
+    ensure_reconciled()
+    path = os.path.join(STORAGE_DIR, "cat-stale.raw")
+    with open(path, "wb") as f:
+        f.write(b"\0" * 10)
+    old = next(evidence._generations)
+    stale_rows = evidence._item_rows("cat-stale.raw")
+    os.remove(path)
+    evidence.refresh_evidence("cat-stale.raw")  # the delete, read after the rows above
+
+    run_write(
+        functools.partial(
+            evidence._replace_items, names=["cat-stale.raw"], rows=stale_rows, generation=old
+        )
+    )
+    assert "group_cat-stale.raw" not in _groups(client, auth_headers)
@@ -0,0 +1,128 @@
+"""Tests for the RecoverFs path index and the lazy /fs/tree endpoint."""
+
+import time
+
+from multivol.api_server.fs_index import index_recovered_fs, normalise_path, scan_tree
+
+MODULE = "linux.pagecache.RecoverFs"
+
+
+def _recovered_fs(tmp_path):
+    root = tmp_path / "recovered_fs"
+    (root / "etc" / "ssh").mkdir(parents=True)
+    (root / "var").mkdir()
+    (root / "etc" / "passwd").write_bytes(b"x" * 10)
+    (root / "etc" / "hosts").write_bytes(b"x" * 5)
+    (root / "etc" / "ssh" / "sshd_config").write_bytes(b"x" * 7)
+    (root / "vmlinuz").write_bytes(b"x" * 100)
+    return tmp_path
+
+
+def _scan(db_conn, uuid, output_dir):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at, output_dir) VALUES (?, 'completed', ?, ?)",
+        (uuid, time.time(), str(output_dir)),
+    )
+    db_conn.commit()
+
+
+def test_scan_tree_sizes_and_counts(tmp_path):
+    rows = {r[0]: r for r in scan_tree(str(_recovered_fs(tmp_path) / "recovered_fs"))}
+    assert rows["/"][4:6] == (122, 3)
+    assert rows["/etc"][1:6] == ("/", "etc", "directory", 22, 3)
+    assert rows["/etc/ssh/sshd_config"][1:5] == ("/etc/ssh", "sshd_config", "file", 7)
+    assert rows["/var"][4:6] == (0, 0)
+
+
+def test_normalise_path():
+    assert normalise_path(None) == "/"
+    assert normalise_path("etc//ssh/") == "/etc/ssh"
+    assert normalise_path("\\etc\\ssh") == "/etc/ssh"
+
+
+class TestFsTreeRoute:
+    def test_lists_one_level_directories_first(self, client, auth_headers, db_conn, tmp_path):
+        _scan(db_conn, "fs-1", _recovered_fs(tmp_path))
+        resp = client.get("/results/fs-1/fs/tree", headers=auth_headers)
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert (body["path"], body["child_count"], body["size"]) == ("/", 3, 122)
+        assert [(c["name"], c["type"]) for c in body["children"]] == [
+            ("etc", "directory"),
+            ("var", "directory"),
+            ("vmlinuz", "file"),
+        ]
+        assert "children" not in body["children"][0]
+
+        sub = client.get("/results/fs-1/fs/tree?path=/etc", headers=auth_headers).get_json()
+        assert [c["path"] for c in sub["children"]] == ["/etc/ssh", "/etc/hosts", "/etc/passwd"]
+        assert sub["children"][0]["child_count"] == 1
+
+        paged = client.get("/results/fs-1/fs/tree?path=/etc&limit=1&offset=1", headers=auth_headers)
+        assert [c["name"] for c in paged.get_json()["children"]] == ["hosts"]
+
+    def test_errors(self, client, auth_headers, db_conn, tmp_path):
+        def status(url):
+            return client.get(url, headers=auth_headers).status_code
+
+        _scan(db_conn, "fs-2", _recovered_fs(tmp_path))
+        assert status("/results/fs-2/fs/tree?path=/nope") == 404
+        assert status("/results/fs-2/fs/tree?path=/vmlinuz") == 400
+        assert status("/results/missing/fs/tree") == 404
+        _scan(db_conn, "fs-3", tmp_path / "empty")
+        assert status("/results/fs-3/fs/tree") == 404
+
+    def test_index_is_reused_and_feeds_the_full_tree(self, client, auth_headers, db_conn, tmp_path):
+        output_dir = _recovered_fs(tmp_path)
+        _scan(db_conn, "fs-4", output_dir)
+        assert index_recovered_fs("fs-4", str(output_dir))
+        # A file added after indexing is not walked again
+        (output_dir / "recovered_fs" / "late").write_bytes(b"x")
+        resp = client.get(f"/results/fs-4?module={MODULE}", headers=auth_headers)
+        root = resp.get_json()[0]
+        assert [c["name"] for c in root["children"]] == ["etc", "var", "vmlinuz"]
+        etc = root["children"][0]
+        assert [c["name"] for c in etc["children"]] == ["ssh", "hosts", "passwd"]
+        assert etc["children"][1]["size"] == 5
+
+
+class TestFsListRoute:
+    def _list(self, client, auth_headers, query="", uuid="fs-5"):
+        resp = client.get(f"/results/{uuid}/fs/list?{query}", headers=auth_headers)
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    def test_filters_and_pages(self, client, auth_headers, db_conn, tmp_path):
+        output_dir = _recovered_fs(tmp_path)
+        (output_dir / "recovered_fs" / "var" / "Auth.LOG").write_bytes(b"x" * 50)
+        (output_dir / "recovered_fs" / "var" / "50%_done").write_bytes(b"")
+        _scan(db_conn, "fs-5", output_dir)
+
+        body = self._list(client, auth_headers)
+        assert body["total"] == 6
+        assert body["files"][0] == "etc/hosts"
+        assert not body["has_more"]
+
+        body = self._list(client, auth_headers, "limit=2&offset=1")
+        assert body["files"] == ["etc/passwd", "etc/ssh/sshd_config"]
+        assert (body["total"], body["has_more"]) == (6, True)
+
+        def files(query):
+            return self._list(client, auth_headers, query)["files"]
+
+        assert files("search=SSHD") == ["etc/ssh/sshd_config"]
+        assert files("search=/etc/ss") == ["etc/ssh/sshd_config"]
+        assert files("search=/ETC") == []
+        assert files("search=%_") == ["var/50%_done"]
+        assert files("search=s") == ["etc/hosts", "etc/passwd", "etc/ssh/sshd_config"]
+        assert files("ext=log,.TXT") == ["var/Auth.LOG"]
+        assert files("min_size=10") == ["etc/passwd", "var/Auth.LOG", "vmlinuz"]
+        assert files("search=/etc&min_size=6&limit=1") == ["etc/passwd"]
+
+    def test_reindexing_replaces_search_entries(self, client, auth_headers, db_conn, tmp_path):
+        output_dir = _recovered_fs(tmp_path)
+        _scan(db_conn, "fs-6", output_dir)
+        assert index_recovered_fs("fs-6", str(output_dir))
+        (output_dir / "recovered_fs" / "etc" / "passwd").unlink()
+        assert index_recovered_fs("fs-6", str(output_dir))
+        assert self._list(client, auth_headers, "search=passwd", "fs-6")["total"] == 0
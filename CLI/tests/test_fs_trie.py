@@ -0,0 +1,104 @@
+"""Tests for the compact RecoverFs trie and process_recover_fs."""
+
+import io
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from multivol.api_server.fs_trie import build_recoverfs_trie
+from multivol.api_server.utils import process_recover_fs
+
+OUTPUT = "linux.pagecache.RecoverFs_output.json"
+
+
+def _reference_tree(rows, extracted):
+    """The nested tree the original dict-based builder produced."""
+    tree = {"name": "/", "path": "/", "type": "directory", "children": []}
+    for item in rows:
+        file_path = item.get("FilePath")
+        if not file_path or file_path == "/":
+            continue
+        parts = file_path.strip("/").split("/")
+        node, path = tree, ""
+        for i, part in enumerate(parts):
+            path = f"{path}/{part}"
+            found = next((c for c in node.get("children", []) if c["name"] == part), None)
+            if found:
+                node = found
+                continue
+            new = {
+                "name": part,
+                "path": path,
+                "type": "file" if i == len(parts) - 1 else "directory",
+            }
+            if i == len(parts) - 1:
+                new["inode"] = item.get("Inode")
+                if str(item.get("Inode")) in extracted:
+                    new["extracted_file"], new["size"] = extracted[str(item.get("Inode"))]
+            else:
+                new["children"] = []
+            node.setdefault("children", []).append(new)
+            node = new
+    return [tree]
+
+
+def _dump(trie):
+    out = io.StringIO()
+    trie.write_json(out)
+    return out.getvalue()
+
+
+def test_matches_reference_builder():
+    rnd = random.Random(7)
+    names = ["etc", "usr", "lib", "bin", 'we"ird', "ünï", "a b", "x"]
+    rows = [
+        {
+            "FilePath": "/" + "/".join(rnd.choice(names) for _ in range(rnd.randint(1, 5))),
+            "Inode": i,
+        }
+        for i in range(3000)
+    ]
+    rows += [{"FilePath": "/"}, {"FilePath": None}, {"FilePath": "/etc/none", "Inode": None}]
+    extracted = {str(i): (f"file.{i}.0xffff.dat", i * 3) for i in range(0, 3000, 7)}
+    text = _dump(build_recoverfs_trie(rows, extracted))
+    assert json.loads(text) == _reference_tree(rows, extracted)
+    assert "\n" not in text and ", " not in text
+
+
+def test_empty_input_is_a_bare_root():
+    assert json.loads(_dump(build_recoverfs_trie([], {}))) == [
+        {"name": "/", "path": "/", "type": "directory", "children": []}
+    ]
+
+
+def test_process_recover_fs_rewrites_once(tmp_path):
+    rows = [{"FilePath": "/etc/passwd", "Inode": 12}, {"FilePath": "/etc/ssh/key", "Inode": 13}]
+    (tmp_path / OUTPUT).write_text(json.dumps(rows))
+    (tmp_path / "file.12.0xffff9a.dat").write_bytes(b"root:x:0:0")
+
+    process_recover_fs(str(tmp_path))
+    tree = json.loads((tmp_path / OUTPUT).read_text())
+    passwd = tree[0]["children"][0]["children"][0]
+    assert passwd == {
+        "name": "passwd",
+        "path": "/etc/passwd",
+        "type": "file",
+        "inode": 12,
+        "extracted_file": "file.12.0xffff9a.dat",
+        "size": 10,
+    }
+    # A second pass (module re-polled) leaves the built tree alone
+    process_recover_fs(str(tmp_path))
+    assert json.loads((tmp_path / OUTPUT).read_text()) == tree
+
+
+def test_concurrent_processing_writes_one_tree(tmp_path):
+    rows = [{"FilePath": f"/var/log/{i}.log", "Inode": i} for i in range(2000)]
+    (tmp_path / OUTPUT).write_text(json.dumps(rows))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(process_recover_fs, [str(tmp_path)] * 4))
+    tree = json.loads((tmp_path / OUTPUT).read_text())
+    assert len(tree[0]["children"][0]["children"][0]["children"]) == 2000
+    assert os.listdir(tmp_path) == [OUTPUT]
@@ -0,0 +1,76 @@
+"""Tests for ETag / conditional GET / Range handling on results and downloads."""
+
+import json
+import time
+
+from multivol.api_server.config import STORAGE_DIR
+from multivol.api_server.result_store import store_module_result
+
+MODULE = "windows.pslist.PsList"
+
+
+def _scan_with_result(db_conn, uuid, output_dir=""):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at, output_dir) VALUES (?, 'completed', ?, ?)",
+        (uuid, time.time(), output_dir),
+    )
+    store_module_result(db_conn.cursor(), uuid, MODULE, [{"PID": i} for i in range(10)])
+    db_conn.commit()
+
+
+class TestResultsConditionalGet:
+    def test_etag_and_304(self, client, auth_headers, db_conn):
+        _scan_with_result(db_conn, "etag-1")
+        url = f"/results/etag-1?module={MODULE}"
+        resp = client.get(url, headers=auth_headers)
+        etag = resp.headers["ETag"]
+        assert resp.status_code == 200 and not etag.startswith("W/")
+
+        resp = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.data == b""
+
+        # A different query is a different representation
+        resp = client.get(f"{url}&limit=2", headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_range_on_results(self, client, auth_headers, db_conn):
+        _scan_with_result(db_conn, "etag-2")
+        url = f"/results/etag-2?module={MODULE}"
+        full = client.get(url, headers=auth_headers).data
+        resp = client.get(url, headers={**auth_headers, "Range": "bytes=0-9"})
+        assert resp.status_code == 206
+        assert resp.data == full[:10]
+        assert resp.headers["Content-Range"] == f"bytes 0-9/{len(full)}"
+        assert json.loads(full)[0] == {"PID": 0}
+
+
+class TestDownloads:
+    def test_strings_download_resumes(self, client, auth_headers, db_conn, tmp_path):
+        (tmp_path / "strings_output.txt").write_bytes(b"0123456789" * 100)
+        _scan_with_result(db_conn, "etag-3", str(tmp_path))
+        url = "/results/etag-3/strings/download"
+        resp = client.get(url, headers=auth_headers)
+        etag = resp.headers["ETag"]
+        assert resp.headers["Accept-Ranges"] == "bytes"
+
+        resp = client.get(url, headers={**auth_headers, "Range": "bytes=995-", "If-Range": etag})
+        assert resp.status_code == 206
+        assert resp.data == b"56789"
+
+        resp = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == 304
+
+    def test_evidence_download(self, client, auth_headers):
+        with open(f"{STORAGE_DIR}/etag-evidence.bin", "wb") as f:
+            f.write(b"abcdef")
+        resp = client.get("/evidence/etag-evidence.bin/download", headers=auth_headers)
+        assert resp.status_code == 200 and resp.headers["ETag"]
+        resp = client.get(
+            "/evidence/etag-evidence.bin/download", headers={**auth_headers, "Range": "bytes=2-3"}
+        )
+        assert resp.data == b"cd"
+
+        resp = client.get("/evidence/..%2Fetc%2Fpasswd/download", headers=auth_headers)
+        assert resp.status_code == 404
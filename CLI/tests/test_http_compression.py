@@ -0,0 +1,74 @@
+"""Tests for negotiated JSON response compression."""
+
+import gzip
+import json
+import time
+
+import pytest
+
+from multivol.api_server import http_compression
+from multivol.api_server.result_store import store_module_result
+
+MODULE = "windows.pslist.PsList"
+
+
+@pytest.fixture()
+def big_result(db_conn):
+    uuid = f"gz-{time.monotonic_ns()}"
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at) VALUES (?, 'completed', ?)",
+        (uuid, time.time()),
+    )
+    rows = [{"PID": i, "ImageFileName": f"proc{i}.exe"} for i in range(2000)]
+    store_module_result(db_conn.cursor(), uuid, MODULE, rows)
+    db_conn.commit()
+    return f"/results/{uuid}?module={MODULE}", rows
+
+
+class TestResponseCompression:
+    def test_gzip_and_cache(self, client, auth_headers, big_result):
+        url, rows = big_result
+        headers = {**auth_headers, "Accept-Encoding": "gzip"}
+        before = http_compression.cache_stats()["entries"]
+        resp = client.get(url, headers=headers)
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert json.loads(gzip.decompress(resp.data)) == rows
+        etag = resp.headers["ETag"]
+        assert etag.endswith('-gzip"')
+        assert http_compression.cache_stats()["entries"] == before + 1
+
+        resp = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+
+    def test_zstd_preferred_when_available(self, client, auth_headers, big_result):
+        zstandard = pytest.importorskip("zstandard")
+        url, rows = big_result
+        resp = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip, zstd"})
+        assert resp.headers["Content-Encoding"] == "zstd"
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(resp.data)
+        assert json.loads(body) == rows
+
+    def test_identity_small_and_range_untouched(self, client, auth_headers, big_result):
+        url, _ = big_result
+        assert "Content-Encoding" not in client.get(url, headers=auth_headers).headers
+        resp = client.get(f"{url}&limit=1", headers={**auth_headers, "Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+        resp = client.get(
+            url, headers={**auth_headers, "Accept-Encoding": "gzip", "Range": "bytes=0-9"}
+        )
+        assert resp.status_code == 206
+        assert "Content-Encoding" not in resp.headers
+
+    def test_streamed_json_is_compressed_incrementally(self, app):
+        from flask import Response
+
+        with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+            resp = Response(
+                (b'{"n": %d}\n' % i for i in range(1000)), mimetype="application/x-ndjson"
+            )
+            resp = http_compression.compress_response(resp)
+            assert resp.headers["Content-Encoding"] == "gzip"
+            body = gzip.decompress(b"".join(resp.response))
+        assert body.count(b"\n") == 1000
@@ -0,0 +1,69 @@
+"""Tests for out-of-process ingestion of module output files."""
+
+import json
+
+from multivol.api_server.database import flush_writes
+from multivol.api_server.ingest import submit_ingest
+from multivol.api_server.routes.scan import ingest_results_to_db
+
+
+def test_ingest_results_to_db_stores_parsed_modules(tmp_path, db_conn):
+    rows = [{"PID": 4, "ImageFileName": "System"}, {"PID": 8, "ImageFileName": "smss.exe"}]
+    (tmp_path / "windows.pslist.PsList_output.json").write_text(
+        "Volatility 3 Framework\n" + json.dumps(rows), encoding="utf-8"
+    )
+    (tmp_path / "windows.info.Info_output.json").write_text("not json", encoding="utf-8")
+    db_conn.execute(
+        "INSERT INTO scan_module_status (scan_id, module, status) VALUES (?, ?, 'RUNNING')",
+        ("ingest-1", "windows.pslist.PsList"),
+    )
+    db_conn.commit()
+
+    ingest_results_to_db("ingest-1", str(tmp_path))
+    ingest_results_to_db("ingest-1", str(tmp_path))  # idempotent
+
+    stored = db_conn.execute(
+        "SELECT module, content, row_count FROM scan_results WHERE scan_id = 'ingest-1'"
+    ).fetchall()
+    assert [(m, json.loads(c), n) for m, c, n in stored] == [("windows.pslist.PsList", rows, 2)]
+    status = db_conn.execute(
+        "SELECT status FROM scan_module_status WHERE scan_id = 'ingest-1'"
+    ).fetchone()
+    assert status == ("COMPLETED",)
+    fts = db_conn.execute(
+        "SELECT COUNT(*) FROM result_fts WHERE result_fts MATCH 'smss' AND scan_id = 'ingest-1'"
+    ).fetchone()
+    assert fts == (1,)
+
+
+def test_submit_ingest_keeps_invalid_output_as_empty(tmp_path, db_conn):
+    path = tmp_path / "windows.malfind.Malfind_output.json"
+    path.write_text("garbage", encoding="utf-8")
+
+    assert submit_ingest("ingest-2", "windows.malfind.Malfind", str(path)).result(30) is False
+    assert submit_ingest(
+        "ingest-2", "windows.malfind.Malfind", str(path), keep_invalid=True
+    ).result(30)
+    flush_writes(5)
+    row = db_conn.execute("SELECT content FROM scan_results WHERE scan_id = 'ingest-2'").fetchone()
+    assert row == ("{}",)
+
+
+def test_submit_ingest_replaces_a_pool_that_broke_before_submit(tmp_path, monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    from multivol.api_server import ingest
+
+    class DeadPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker killed")
+
+        def shutdown(self, wait=True):
+            pass
+
+    dead = DeadPool()
+    monkeypatch.setattr(ingest, "_executor", dead)
+    path = tmp_path / "windows.info.Info_output.json"
+    path.write_text("[]", encoding="utf-8")
+    assert submit_ingest("ingest-3", "windows.info.Info", str(path)).result(30) is True
+    assert ingest._executor is not dead
@@ -0,0 +1,85 @@
+"""Tests for indicator extraction and the cross-case /ioc/search route."""
+
+import json
+
+from multivol.api_server.ioc import (
+    backfill_iocs,
+    extract_indicators,
+    extract_row_indicators,
+    should_index_module,
+)
+from multivol.api_server.result_store import store_module_result
+
+SHA256 = "a" * 64
+
+
+def test_extract_indicators_types():
+    found = extract_indicators(
+        f"C:\\Windows\\evil.exe -c 10.0.0.5 fe80::1 https://bad.example.com/x {SHA256}"
+    )
+    assert ("ipv4", "10.0.0.5") in found
+    assert ("ipv6", "fe80::1") in found
+    assert ("domain", "bad.example.com") in found
+    assert ("sha256", SHA256) in found
+    assert ("path", "c:\\windows\\evil.exe") in found
+    # File names are not mistaken for domains
+    assert ("domain", "evil.exe") not in found
+
+
+def test_extract_indicators_unix_paths_keep_case():
+    assert ("path", "/tmp/.X11/Payload") in extract_indicators("exec /tmp/.X11/Payload")
+
+
+def test_extract_row_indicators_process_column():
+    found = extract_row_indicators({"ImageFileName": "Evil.exe", "PID": 4})
+    assert ("process", "evil.exe") in found
+
+
+def test_extract_row_indicators_path_columns_keep_spaces():
+    found = extract_row_indicators(
+        {
+            "Name": "\\Device\\HarddiskVolume3\\Program Files\\Evil Corp\\evil.exe",
+            "Path": "C:\\Program Files (x86)\\foo\\bar.dll",
+            "Offset": 4096,
+        }
+    )
+    assert ("path", "\\device\\harddiskvolume3\\program files\\evil corp\\evil.exe") in found
+    assert ("path", "c:\\program files (x86)\\foo\\bar.dll") in found
+
+
+def test_should_index_module():
+    assert should_index_module("windows.netscan.NetScan")
+    assert not should_index_module("windows.info.Info")
+
+
+class TestIocSearchRoute:
+    def test_matches_across_scans(self, client, auth_headers, db_conn):
+        c = db_conn.cursor()
+        rows = [{"ForeignAddr": "203.0.113.9", "Owner": "beacon.exe"}]
+        store_module_result(c, "ioc-scan-a", "windows.netscan.NetScan", rows)
+        store_module_result(c, "ioc-scan-b", "windows.netstat.NetStat", rows)
+        store_module_result(c, "ioc-scan-c", "windows.info.Info", rows)
+        db_conn.commit()
+
+        resp = client.get("/ioc/search?q=203.0.113.9", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["total"] == 2
+        assert {s["scan_id"] for s in data["scans"]} == {"ioc-scan-a", "ioc-scan-b"}
+
+        resp = client.get("/ioc/search?q=BEACON&kind=process&prefix=1", headers=auth_headers)
+        assert resp.get_json()["scan_count"] == 2
+
+    def test_unknown_kind_returns_400(self, client, auth_headers):
+        resp = client.get("/ioc/search?q=x&kind=bogus", headers=auth_headers)
+        assert resp.status_code == 400
+
+    def test_backfill_indexes_legacy_results(self, client, auth_headers, db_conn):
+        db_conn.execute(
+            "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?,?,?,?)",
+            ("ioc-legacy", "windows.cmdline.CmdLine", json.dumps([{"Args": "198.51.100.7"}]), 0),
+        )
+        db_conn.commit()
+        backfill_iocs()
+        resp = client.get("/ioc/search?q=198.51.100.7", headers=auth_headers)
+        assert resp.get_json()["total"] == 1
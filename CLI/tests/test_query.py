@@ -0,0 +1,105 @@
+"""Tests for the Parquet export of module outputs and the /query endpoint."""
+
+import json
+import time
+
+import pytest
+
+from multivol.api_server import analytics
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+NETSCAN = "windows.netscan.NetScan"
+MALFIND = "windows.malfind.Malfind"
+
+
+def _add_scan(db_conn, uuid, results):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at) VALUES (?, 'completed', ?)",
+        (uuid, time.time()),
+    )
+    for module, data in results.items():
+        db_conn.execute(
+            "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?, ?, ?, ?)",
+            (uuid, module, json.dumps(data), time.time()),
+        )
+    db_conn.commit()
+
+
+class TestBuildTable:
+    def test_types_are_inferred_from_volatility_json(self):
+        table = analytics.build_table(
+            [
+                {
+                    "PID": 4,
+                    "Offset": 0xFFFF800000000000,
+                    "Wow64": False,
+                    "CreateTime": "2024-01-02T03:04:05+00:00",
+                    "Args": None,
+                    "__children": [
+                        {"PID": 100, "Offset": 1, "Wow64": True, "CreateTime": None, "Args": ["a"]}
+                    ],
+                }
+            ]
+        )
+        types = {f.name: str(f.type) for f in table.schema}
+        assert types == {
+            "PID": "int64",
+            "Offset": "uint64",
+            "Wow64": "bool",
+            "CreateTime": "timestamp[us, tz=UTC]",
+            "Args": "string",
+        }
+        assert table.num_rows == 2
+        assert table.column("Args").to_pylist() == [None, '["a"]']
+
+    def test_non_list_output_is_not_exported(self):
+        assert analytics.build_table({"error": "Invalid JSON output"}) is None
+
+
+class TestQueryEndpoint:
+    def test_join_across_modules(self, client, auth_headers, db_conn):
+        _add_scan(
+            db_conn,
+            "hunt-1",
+            {
+                NETSCAN: [
+                    {"PID": 10, "ForeignAddr": "203.0.113.7"},
+                    {"PID": 20, "ForeignAddr": "198.51.100.1"},
+                ],
+                MALFIND: [{"PID": 10, "Protection": "PAGE_EXECUTE_READWRITE"}],
+            },
+        )
+        resp = client.post(
+            "/query",
+            json={
+                "sql": "SELECT n.scan_id, n.ForeignAddr FROM netscan n"
+                " JOIN malfind m USING (scan_id, PID)",
+                "scans": ["hunt-1"],
+            },
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body["columns"] == ["scan_id", "ForeignAddr"]
+        assert body["rows"] == [["hunt-1", "203.0.113.7"]]
+
+        resp = client.get("/query/tables?scans=hunt-1", headers=auth_headers)
+        assert {t["module"] for t in resp.get_json()} == {NETSCAN, MALFIND}
+
+    def test_only_read_only_statements(self, client, auth_headers):
+        for sql in ("COPY (SELECT 1) TO 'x.csv'", "SELECT 1; SELECT 2", "ATTACH 'x.db'"):
+            resp = client.post("/query", json={"sql": sql}, headers=auth_headers)
+            assert resp.status_code == 400, sql
+
+    def test_files_outside_the_export_are_unreadable(self, client, auth_headers):
+        resp = client.post(
+            "/query", json={"sql": "SELECT * FROM read_text('/etc/hostname')"}, headers=auth_headers
+        )
+        assert resp.status_code == 400
+
+    def test_export_disabled_returns_501(self, client, auth_headers, monkeypatch):
+        monkeypatch.setenv("ANALYTICS_EXPORT", "0")
+        resp = client.post("/query", json={"sql": "SELECT 1"}, headers=auth_headers)
+        assert resp.status_code == 501
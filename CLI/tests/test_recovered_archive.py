@@ -0,0 +1,152 @@
+"""Tests for the seekable RecoverFs archive and the /fs routes that read it."""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from multivol.api_server.recovered_archive import ARCHIVE_NAME, MemberReader, repack_tarball
+
+LOG = "".join(f"line {i} {'error' if i % 10 == 0 else 'ok'}\n" for i in range(1, 5001)).encode()
+BLOB = os.urandom(300_000)
+
+
+def _add(tar, name, data=None, kind=tarfile.REGTYPE):
+    info = tarfile.TarInfo(name)
+    info.type = kind
+    info.mtime = 1_700_000_000
+    if data is not None:
+        info.size = len(data)
+    tar.addfile(info, io.BytesIO(data) if data is not None else None)
+
+
+def _write_tarball(directory):
+    with tarfile.open(directory / "recovered_fs.tar.gz", "w:gz") as tar:
+        _add(tar, "./var", kind=tarfile.DIRTYPE)
+        _add(tar, "./var/log/syslog", LOG)
+        _add(tar, "./var/lib/blob.gz", BLOB)
+        _add(tar, "./etc/hostname", b"victim\n")
+        _add(tar, "./etc/hostname", b"duplicate\n")
+        _add(tar, "../escape", b"x")
+        link = tarfile.TarInfo("./etc/link")
+        link.type, link.linkname = tarfile.SYMTYPE, "/etc/hostname"
+        tar.addfile(link)
+
+
+@pytest.fixture()
+def output_dir(tmp_path):
+    _write_tarball(tmp_path)
+    assert repack_tarball(str(tmp_path)) == str(tmp_path / ARCHIVE_NAME)
+    return tmp_path
+
+
+def _reader(output_dir, name):
+    with zipfile.ZipFile(output_dir / ARCHIVE_NAME) as zf:
+        info = zf.getinfo(name)
+    return MemberReader(
+        str(output_dir / ARCHIVE_NAME),
+        info.header_offset,
+        info.compress_size,
+        info.file_size,
+        info.compress_type,
+    )
+
+
+def test_repack_keeps_regular_files_once(output_dir):
+    assert not (output_dir / "recovered_fs.tar.gz").exists()  # stored once, as the zip
+    with zipfile.ZipFile(output_dir / ARCHIVE_NAME) as zf:
+        assert zf.testzip() is None
+        assert sorted(zf.namelist()) == [
+            "etc/hostname",
+            "var/",
+            "var/lib/blob.gz",
+            "var/log/syslog",
+        ]
+        assert zf.read("etc/hostname") == b"victim\n"
+        assert zf.getinfo("var/log/syslog").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("var/lib/blob.gz").compress_type == zipfile.ZIP_STORED
+
+
+def test_concurrent_repacks_share_one_archive(output_dir):
+    os.remove(output_dir / ARCHIVE_NAME)
+    _write_tarball(output_dir)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: repack_tarball(str(output_dir)), range(4)))
+    assert results == [str(output_dir / ARCHIVE_NAME)] * 4
+    assert os.listdir(output_dir) == [ARCHIVE_NAME]
+
+
+def test_failed_repack_keeps_the_tarball(tmp_path):
+    (tmp_path / "recovered_fs.tar.gz").write_bytes(b"\x1f\x8b truncated")
+    assert repack_tarball(str(tmp_path)) is None
+    assert os.listdir(tmp_path) == ["recovered_fs.tar.gz"]
+
+
+@pytest.mark.parametrize("name,data", [("var/log/syslog", LOG), ("var/lib/blob.gz", BLOB)])
+def test_member_reader_reads_and_seeks(output_dir, name, data):
+    with _reader(output_dir, name) as reader:
+        assert reader.read() == data
+        assert reader.seek(-100, io.SEEK_END) == len(data) - 100
+        assert reader.read(40) == data[-100:-60]
+        reader.seek(1234)
+        assert reader.read(10) == data[1234:1244]
+
+
+def _scan(db_conn, uuid, output_dir):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at, output_dir) VALUES (?, 'completed', ?, ?)",
+        (uuid, time.time(), str(output_dir)),
+    )
+    db_conn.commit()
+
+
+class TestRecoveredFileRoutes:
+    def test_list_and_tree_come_from_the_archive(self, client, auth_headers, db_conn, output_dir):
+        _scan(db_conn, "arc-1", output_dir)
+        resp = client.get("/results/arc-1/fs/list", headers=auth_headers)
+        assert resp.get_json()["files"] == ["etc/hostname", "var/lib/blob.gz", "var/log/syslog"]
+        root = client.get("/results/arc-1/fs/tree", headers=auth_headers).get_json()
+        assert root["size"] == len(LOG) + len(BLOB) + 7
+        assert [c["name"] for c in root["children"]] == ["etc", "var"]
+        assert not (output_dir / "recovered_fs").exists()
+
+    def test_view_pages_and_searches(self, client, auth_headers, db_conn, output_dir):
+        _scan(db_conn, "arc-2", output_dir)
+        url = "/results/arc-2/fs/view?path=/var/log/syslog"
+        body = client.get(f"{url}&page=2&limit=3", headers=auth_headers).get_json()
+        assert body["content"] == ["line 4 ok", "line 5 ok", "line 6 ok"]
+        assert body["total"] == 5000
+
+        body = client.get(f"{url}&q=ERR&limit=2&page=2", headers=auth_headers).get_json()
+        assert body["content"] == ["30:line 30 error", "40:line 40 error"]
+        body = client.get(f"{url}&q=LINE 20 E", headers=auth_headers).get_json()
+        assert body["content"] == ["20:line 20 error"]
+        # Searched as text, never compiled as a pattern
+        body = client.get(f"{url}&q=(a%2B)%2B$", headers=auth_headers).get_json()
+        assert body["content"] == []
+
+    def test_download_supports_ranges(self, client, auth_headers, db_conn, output_dir):
+        _scan(db_conn, "arc-3", output_dir)
+        url = "/results/arc-3/fs/download?path=var/log/syslog"
+        resp = client.get(url, headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.data == LOG
+        assert "attachment" in resp.headers["Content-Disposition"]
+        etag = resp.headers["ETag"]
+
+        partial = client.get(url, headers={**auth_headers, "Range": "bytes=100-199"})
+        assert partial.status_code == 206
+        assert partial.data == LOG[100:200]
+        cached = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+    def test_unknown_paths_are_rejected(self, client, auth_headers, db_conn, output_dir):
+        _scan(db_conn, "arc-4", output_dir)
+        for path in ("../escape", "/var", "/nope", "../../etc/passwd"):
+            resp = client.get(f"/results/arc-4/fs/download?path={path}", headers=auth_headers)
+            assert resp.status_code == 404, path
+        assert client.get("/results/arc-4/fs/view", headers=auth_headers).status_code == 400
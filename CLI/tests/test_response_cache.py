@@ -0,0 +1,60 @@
+"""Tests for the byte-bounded result response cache."""
+
+import json
+import time
+
+from flask import Response
+
+from multivol.api_server.response_cache import ResponseCache, result_cache
+from multivol.api_server.result_store import store_module_result
+
+MODULE = "windows.pslist.PsList"
+
+
+class TestResponseCache:
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=400)
+        for key in ("a", "b", "c"):
+            cache.put(key, "scan", Response(b"x" * 100))
+        assert cache.get("a") is not None  # a is now most recently used
+        cache.put("d", "scan", Response(b"x" * 100))
+        cache.put("e", "scan", Response(b"x" * 100))
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert stats["bytes"] <= 400 and stats["evictions"] == 1
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_oversized_and_failed_responses_are_not_stored(self):
+        cache = ResponseCache(max_bytes=400)
+        cache.put("big", "scan", Response(b"x" * 200))
+        cache.put("err", "scan", Response(b"{}", status=500))
+        assert cache.stats()["entries"] == 0
+
+
+class TestResultsCaching:
+    def test_hits_and_invalidation(self, client, auth_headers, db_conn, tmp_path):
+        db_conn.execute(
+            "INSERT INTO scans (uuid, status, created_at, output_dir)"
+            " VALUES ('rc-1', 'completed', ?, ?)",
+            (time.time(), str(tmp_path)),
+        )
+        store_module_result(db_conn.cursor(), "rc-1", MODULE, [{"PID": 1}, {"PID": 2}])
+        db_conn.commit()
+        (tmp_path / f"{MODULE}_output.json").write_text(json.dumps([{"PID": 1}]))
+
+        url = f"/results/rc-1?module={MODULE}&limit=1"
+        hits = result_cache.stats()["hits"]
+        first = client.get(url, headers=auth_headers)
+        second = client.get(url, headers=auth_headers)
+        assert second.get_json() == first.get_json() == [{"PID": 1}]
+        assert result_cache.stats()["hits"] == hits + 1
+
+        client.get("/results/rc-1?module=all", headers=auth_headers)
+        cached = client.get("/results/rc-1?module=all", headers=auth_headers)
+        assert cached.get_json() == {MODULE: [{"PID": 1}]}
+        assert result_cache.stats()["hits"] == hits + 2
+
+        assert result_cache.invalidate_scan("rc-1") == 2
+
+        metrics = client.get("/metrics", headers=auth_headers).get_json()
+        assert metrics["result_cache"]["hit_ratio"] > 0
@@ -0,0 +1,101 @@
+"""Tests for server-side result filtering (multivol/api_server/result_query.py)."""
+
+import json
+import pytest
+
+from multivol.api_server.result_query import apply_in_memory, parse_result_query
+
+ROWS = [
+    {"PID": 4, "ImageFileName": "System", "Threads": 120},
+    {"PID": 812, "ImageFileName": "svchost.exe", "Threads": 14},
+    {"PID": 1337, "ImageFileName": "evil.exe", "Threads": 3},
+    {"PID": 900, "ImageFileName": "svchost.exe", "Threads": 22},
+]
+
+
+def _seed_result(db_conn, scan_id, module, data):
+    db_conn.execute(
+        "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?,?,?,?)",
+        (scan_id, module, json.dumps(data), 0),
+    )
+    db_conn.commit()
+
+
+class TestParseResultQuery:
+    def test_empty(self):
+        assert parse_result_query([], None, None).is_empty()
+
+    def test_numeric_values_are_coerced(self):
+        query = parse_result_query(["PID:gte:100"], "-PID", "PID,ImageFileName")
+        assert query.filters == [("PID", "gte", 100)]
+        assert query.sort == [("PID", True)]
+        assert query.fields == ["PID", "ImageFileName"]
+
+    @pytest.mark.parametrize(
+        ("raw", "value"),
+        [("-12", -12), ("0x1F", 31), ("2.5", 2.5), ("nan", "nan"), ("inf", "inf"), ("1e5", "1e5")],
+    )
+    def test_only_plain_numbers_are_coerced(self, raw, value):
+        query = parse_result_query([f"Name:eq:{raw}"], None, None)
+        assert query.filters == [("Name", "eq", value)]
+
+    def test_contains_keeps_string(self):
+        query = parse_result_query(["ImageFileName:contains:123"], None, None)
+        assert query.filters == [("ImageFileName", "contains", "123")]
+
+    @pytest.mark.parametrize("raw", ["PID", "PID:like:4", 'P"ID:eq:4'])
+    def test_malformed_filter_raises(self, raw):
+        with pytest.raises(ValueError):
+            parse_result_query([raw], None, None)
+
+
+def test_apply_in_memory_filters_sorts_and_projects():
+    query = parse_result_query(["ImageFileName:contains:SVC"], "-Threads", "PID")
+    rows, total = apply_in_memory(ROWS, query, limit=1, offset=0)
+    assert total == 2
+    assert rows == [{"PID": 900}]
+
+
+class TestResultsRoute:
+    def test_filter_sort_and_fields(self, client, auth_headers, db_conn):
+        _seed_result(db_conn, "query-scan", "windows.pslist.PsList", ROWS)
+        resp = client.get(
+            "/results/query-scan?module=windows.pslist.PsList"
+            "&filter=PID:gt:100&sort=-PID&fields=PID,ImageFileName&limit=2",
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200
+        assert resp.headers["X-Total-Count"] == "3"
+        assert resp.get_json() == [
+            {"PID": 1337, "ImageFileName": "evil.exe"},
+            {"PID": 900, "ImageFileName": "svchost.exe"},
+        ]
+
+    def test_eq_and_offset(self, client, auth_headers, db_conn):
+        _seed_result(db_conn, "query-scan-eq", "windows.pslist.PsList", ROWS)
+        resp = client.get(
+            "/results/query-scan-eq?module=windows.pslist.PsList"
+            "&filter=ImageFileName:eq:svchost.exe&offset=1",
+            headers=auth_headers,
+        )
+        assert resp.headers["X-Total-Count"] == "2"
+        assert resp.get_json() == [ROWS[3]]
+
+    def test_invalid_filter_returns_400(self, client, auth_headers):
+        resp = client.get(
+            "/results/any-scan?module=windows.pslist.PsList&filter=PID", headers=auth_headers
+        )
+        assert resp.status_code == 400
+
+    def test_query_with_all_modules_returns_400(self, client, auth_headers):
+        resp = client.get("/results/any-scan?module=all&sort=PID", headers=auth_headers)
+        assert resp.status_code == 400
+
+    def test_plain_request_unchanged(self, client, auth_headers, db_conn):
+        _seed_result(db_conn, "query-scan-plain", "windows.pslist.PsList", ROWS)
+        resp = client.get(
+            "/results/query-scan-plain?module=windows.pslist.PsList&limit=2",
+            headers=auth_headers,
+        )
+        assert resp.get_json() == ROWS[:2]
+        assert "X-Total-Count" not in resp.headers
@@ -0,0 +1,78 @@
+"""Tests for the /results/<uuid>/stream NDJSON and CSV export."""
+
+import csv
+import io
+import json
+import time
+
+from multivol.api_server.result_store import store_module_result
+
+MODULE = "windows.pstree.PsTree"
+
+
+def _store(db_conn, uuid, rows, output_dir=""):
+    db_conn.execute(
+        "INSERT INTO scans (uuid, status, created_at, output_dir) VALUES (?, 'completed', ?, ?)",
+        (uuid, time.time(), output_dir),
+    )
+    if rows is not None:
+        store_module_result(db_conn.cursor(), uuid, MODULE, rows)
+    db_conn.commit()
+
+
+ROWS = [
+    {"PID": i, "Name": f"p{i}.exe", "__children": [{"PID": 1000 + i, "Name": "child.exe"}]}
+    for i in range(1200)
+]
+
+
+class TestResultStream:
+    def test_ndjson_streams_every_row(self, client, auth_headers, db_conn):
+        _store(db_conn, "stream-1", ROWS)
+        resp = client.get(f"/results/stream-1/stream?module={MODULE}", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.mimetype == "application/x-ndjson"
+        lines = resp.data.decode().splitlines()
+        assert [json.loads(line) for line in lines] == ROWS
+
+    def test_ndjson_with_filter_and_projection(self, client, auth_headers, db_conn):
+        _store(db_conn, "stream-2", ROWS)
+        resp = client.get(
+            f"/results/stream-2/stream?module={MODULE}&filter=PID:lt:3&sort=-PID&fields=PID",
+            headers=auth_headers,
+        )
+        assert [json.loads(x) for x in resp.data.decode().splitlines()] == [
+            {"PID": 2},
+            {"PID": 1},
+            {"PID": 0},
+        ]
+
+    def test_csv_flattens_children(self, client, auth_headers, db_conn):
+        _store(db_conn, "stream-3", ROWS[:2])
+        resp = client.get(
+            f"/results/stream-3/stream?module={MODULE}&format=csv&download=1",
+            headers=auth_headers,
+        )
+        assert resp.mimetype == "text/csv"
+        assert "attachment" in resp.headers["Content-Disposition"]
+        assert list(csv.reader(io.StringIO(resp.data.decode()))) == [
+            ["PID", "Name"],
+            ["0", "p0.exe"],
+            ["1000", "child.exe"],
+            ["1", "p1.exe"],
+            ["1001", "child.exe"],
+        ]
+
+    def test_falls_back_to_output_file(self, client, auth_headers, db_conn, tmp_path):
+        (tmp_path / f"{MODULE}_output.json").write_text(json.dumps(ROWS[:3]))
+        _store(db_conn, "stream-4", None, str(tmp_path))
+        resp = client.get(f"/results/stream-4/stream?module={MODULE}", headers=auth_headers)
+        assert len(resp.data.decode().splitlines()) == 3
+
+    def test_errors(self, client, auth_headers):
+        assert client.get("/results/x/stream", headers=auth_headers).status_code == 400
+        resp = client.get(f"/results/x/stream?module={MODULE}&format=xml", headers=auth_headers)
+        assert resp.status_code == 400
+        resp = client.get(f"/results/none/stream?module={MODULE}", headers=auth_headers)
+        assert resp.status_code == 404
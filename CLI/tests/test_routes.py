@@ -120,6 +120,25 @@ class TestListScans:
         assert scan_id in uuids
 
 
+class TestModuleStatusReport:
+    def test_reported_status_is_persisted(self, client, auth_headers, db_conn):
+        from multivol.api_server.database import flush_writes
+
+        for status in ("RUNNING", "COMPLETED"):
+            resp = client.post(
+                "/scans/test-scan-uuid-003/modules",
+                json={"module": "windows.pslist.PsList", "status": status},
+                headers=auth_headers,
+            )
+            assert resp.status_code == 200
+        flush_writes(5)
+        row = db_conn.execute(
+            "SELECT status FROM scan_module_status WHERE scan_id = ? AND module = ?",
+            ("test-scan-uuid-003", "windows.pslist.PsList"),
+        ).fetchone()
+        assert row == ("COMPLETED",)
+
+
 # ---------------------------------------------------------------------------
 # GET /health — no auth required
 # ---------------------------------------------------------------------------
@@ -130,6 +149,9 @@ class TestHealth:
         resp = client.get("/health")
         assert resp.status_code == 200
 
+    def test_health_reports_no_streaming_uploads_outside_the_async_server(self, client):
+        assert client.get("/health").get_json()["streaming_uploads"] is False
+
 
 # ---------------------------------------------------------------------------
 # POST /scan — returns scan_id on valid input
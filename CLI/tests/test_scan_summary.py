@@ -0,0 +1,115 @@
+"""Tests for the trigger-maintained scan summaries and the paginated /scans listing."""
+
+import time
+
+from multivol.api_server.database import _backfill_scan_created_at, refresh_scan_summaries
+from multivol.api_server.result_store import store_module_result
+
+
+def _insert_scan(conn, uuid, created_at, status="pending", os_name="windows", name=None):
+    conn.execute(
+        "INSERT INTO scans (uuid, status, os, created_at, name) VALUES (?, ?, ?, ?, ?)",
+        (uuid, status, os_name, created_at, name or uuid),
+    )
+
+
+def _summary(conn, uuid):
+    return conn.execute(
+        "SELECT modules_pending, modules_running, modules_completed, modules_failed,"
+        " result_count, result_rows FROM scans WHERE uuid = ?",
+        (uuid,),
+    ).fetchone()
+
+
+class TestSummaryTriggers:
+    def test_status_changes_move_module_counters(self, db_conn):
+        _insert_scan(db_conn, "sum-1", time.time())
+        for module in ("a", "b"):
+            db_conn.execute(
+                "INSERT INTO scan_module_status (scan_id, module, status) VALUES (?, ?, 'PENDING')",
+                ("sum-1", module),
+            )
+        assert _summary(db_conn, "sum-1")[:4] == (2, 0, 0, 0)
+
+        db_conn.execute(
+            "UPDATE scan_module_status SET status = 'COMPLETED'"
+            " WHERE scan_id = 'sum-1' AND module = 'a'"
+        )
+        db_conn.execute(
+            "UPDATE scan_module_status SET status = 'FAILED'"
+            " WHERE scan_id = 'sum-1' AND module = 'b'"
+        )
+        assert _summary(db_conn, "sum-1")[:4] == (0, 0, 1, 1)
+
+        db_conn.execute("DELETE FROM scan_module_status WHERE scan_id = 'sum-1'")
+        assert _summary(db_conn, "sum-1")[:4] == (0, 0, 0, 0)
+
+    def test_results_update_counts_and_refresh_agrees(self, db_conn):
+        _insert_scan(db_conn, "sum-2", time.time())
+        c = db_conn.cursor()
+        store_module_result(c, "sum-2", "windows.pslist.PsList", [{"PID": 1}, {"PID": 2}])
+        store_module_result(c, "sum-2", "windows.info.Info", {"error": "Invalid JSON output"})
+        assert _summary(db_conn, "sum-2")[4:] == (1, 2)
+
+        refresh_scan_summaries(c, "sum-2")
+        assert _summary(db_conn, "sum-2")[4:] == (1, 2)
+
+    def test_finished_at_set_on_completion(self, db_conn):
+        _insert_scan(db_conn, "sum-3", time.time(), status="running")
+        db_conn.execute("UPDATE scans SET status = 'completed' WHERE uuid = 'sum-3'")
+        finished = db_conn.execute("SELECT finished_at FROM scans WHERE uuid = 'sum-3'").fetchone()
+        assert finished[0] is not None
+
+
+class TestListScans:
+    def test_keyset_pagination_and_filters(self, client, auth_headers, db_conn):
+        base = 4_000_000_000.0  # newer than any other test scan
+        for i in range(5):
+            _insert_scan(
+                db_conn,
+                f"page-{i}",
+                base + i,
+                status="running",
+                os_name="linux" if i % 2 else "windows",
+                name=f"Paging case {i}",
+            )
+        db_conn.commit()
+
+        resp = client.get("/scans?limit=2&name=paging case", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["page-4", "page-3"]
+        cursor = resp.headers["X-Next-Cursor"]
+
+        resp = client.get(f"/scans?limit=2&name=paging case&cursor={cursor}", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["page-2", "page-1"]
+        cursor = resp.headers["X-Next-Cursor"]
+
+        resp = client.get(f"/scans?limit=2&name=paging case&cursor={cursor}", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["page-0"]
+        assert "X-Next-Cursor" not in resp.headers
+
+        resp = client.get("/scans?os=linux&name=paging", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["page-3", "page-1"]
+
+    def test_pagination_reaches_backfilled_legacy_scans(self, client, auth_headers, db_conn):
+        _insert_scan(db_conn, "legacy-new", time.time(), name="Legacy case new")
+        _insert_scan(db_conn, "legacy-old", None, name="Legacy case old")
+        _backfill_scan_created_at(db_conn.cursor())
+        db_conn.commit()
+
+        resp = client.get("/scans?limit=1&name=legacy case", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["legacy-new"]
+        cursor = resp.headers["X-Next-Cursor"]
+        resp = client.get(f"/scans?limit=1&name=legacy case&cursor={cursor}", headers=auth_headers)
+        assert [s["uuid"] for s in resp.get_json()] == ["legacy-old"]
+
+    def test_completed_without_results_is_reported_failed(self, client, auth_headers, db_conn):
+        _insert_scan(db_conn, "empty-done", time.time(), status="completed", name="Empty done")
+        db_conn.commit()
+        resp = client.get("/scans?status=failed&name=empty done", headers=auth_headers)
+        data = resp.get_json()
+        assert [s["uuid"] for s in data] == ["empty-done"]
+        assert data[0]["error"] == "No valid JSON results parsed"
+
+    def test_invalid_cursor_returns_400(self, client, auth_headers):
+        resp = client.get("/scans?cursor=garbage", headers=auth_headers)
+        assert resp.status_code == 400
@@ -0,0 +1,71 @@
+"""Tests for the per-scan full-text search index and /scans/<uuid>/search."""
+
+import json
+
+from multivol.api_server.result_store import iter_row_strings, store_module_result
+
+
+def test_iter_row_strings_descends_into_children():
+    row = {"Name": "explorer.exe", "PID": 4, "__children": [{"Name": "evil.exe"}]}
+    assert list(iter_row_strings(row)) == ["explorer.exe", "evil.exe"]
+
+
+def test_store_module_result_is_idempotent(app, db_conn):
+    c = db_conn.cursor()
+    assert store_module_result(c, "fts-idem", "windows.pslist.PsList", [{"Name": "a"}])
+    assert not store_module_result(c, "fts-idem", "windows.pslist.PsList", [{"Name": "b"}])
+    db_conn.commit()
+    c.execute("SELECT COUNT(*) FROM result_fts WHERE scan_id = 'fts-idem'")
+    assert c.fetchone()[0] == 1
+
+
+class TestSearchRoute:
+    def test_hits_grouped_by_module(self, client, auth_headers, db_conn):
+        c = db_conn.cursor()
+        store_module_result(
+            c,
+            "fts-scan",
+            "windows.pslist.PsList",
+            [{"ImageFileName": "System"}, {"ImageFileName": "evil.exe"}],
+        )
+        store_module_result(
+            c,
+            "fts-scan",
+            "windows.cmdline.CmdLine",
+            [{"Args": "C:\\Users\\bob\\evil.exe -connect 10.0.0.5"}],
+        )
+        db_conn.commit()
+
+        resp = client.get("/scans/fts-scan/search?q=evil.exe", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["total"] == 2
+        assert data["results"]["windows.pslist.PsList"][0]["row"] == 1
+        assert data["results"]["windows.cmdline.CmdLine"][0]["row"] == 0
+
+    def test_legacy_results_are_backfilled(self, client, auth_headers, db_conn):
+        db_conn.execute(
+            "INSERT INTO scan_results (scan_id, module, content, created_at) VALUES (?,?,?,?)",
+            ("fts-legacy", "windows.netscan.NetScan", json.dumps([{"ForeignAddr": "6.6.6.6"}]), 0),
+        )
+        db_conn.commit()
+        resp = client.get("/scans/fts-legacy/search?q=6.6.6.6", headers=auth_headers)
+        assert resp.get_json()["total"] == 1
+
+    def test_corrupt_compressed_results_are_skipped(self, client, auth_headers, db_conn):
+        db_conn.execute(
+            "INSERT INTO scan_results (scan_id, module, content, encoding, created_at)"
+            " VALUES (?,?,?,?,?)",
+            ("fts-corrupt", "windows.pslist.PsList", b"not zstd", "zstd", 0),
+        )
+        db_conn.commit()
+        resp = client.get("/scans/fts-corrupt/search?q=anything", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.get_json()["total"] == 0
+        c = db_conn.cursor()
+        c.execute("SELECT fts_indexed FROM scan_results WHERE scan_id = 'fts-corrupt'")
+        assert c.fetchone()[0] == 1
+
+    def test_missing_query_returns_400(self, client, auth_headers):
+        resp = client.get("/scans/fts-scan/search", headers=auth_headers)
+        assert resp.status_code == 400
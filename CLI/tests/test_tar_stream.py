@@ -0,0 +1,62 @@
+"""Tests for extracting tar uploads straight from the request stream."""
+
+import io
+import os
+import tarfile
+import time
+
+from multivol.api_server.config import STORAGE_DIR
+
+DUMP = os.urandom(300_000)
+
+
+def _tar(mode, members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tf:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def test_put_stream_extracts_and_skips_unsafe_members(client, auth_headers):
+    body = _tar(
+        "w:gz",
+        [("notes.txt", b"hi"), ("stream/mem.raw", DUMP), ("../escape.raw", b"x")],
+    )
+    resp = client.put("/upload/stream/case.tar.gz", data=body, headers=auth_headers)
+    assert resp.status_code == 200
+    files = resp.get_json()["files"]
+    assert files[0] == os.path.join(STORAGE_DIR, "stream", "mem.raw")
+    assert os.path.join(STORAGE_DIR, "notes.txt") in files
+    assert not os.path.exists(os.path.join(os.path.dirname(STORAGE_DIR), "escape.raw"))
+    with open(files[0], "rb") as f:
+        assert f.read() == DUMP
+    assert not os.path.exists(os.path.join(STORAGE_DIR, "case.tar.gz"))
+
+
+def test_put_stream_rejects_bad_input(client, auth_headers):
+    resp = client.put("/upload/stream/mem.raw", data=b"x", headers=auth_headers)
+    assert resp.status_code == 400
+    resp = client.put("/upload/stream/bad.tar.gz", data=b"not a tarball", headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_multipart_tar_is_extracted_without_saving_the_archive(client, auth_headers):
+    body = _tar("w", [("multipart/mem.vmem", DUMP)])
+    resp = client.post(
+        "/upload",
+        data={"file": (io.BytesIO(body), "multipart.tar")},
+        headers=auth_headers,
+        content_type="multipart/form-data",
+    )
+    task_id = resp.get_json()["task_id"]
+    for _ in range(100):
+        progress = client.get(f"/upload/progress/{task_id}", headers=auth_headers).get_json()
+        if progress["status"] != "extracting":
+            break
+        time.sleep(0.05)
+    assert progress["status"] == "done", progress
+    assert progress["files"] == [os.path.join(STORAGE_DIR, "multipart", "mem.vmem")]
+    assert not os.path.exists(os.path.join(STORAGE_DIR, "multipart.tar"))
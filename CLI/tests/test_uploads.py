@@ -0,0 +1,96 @@
+"""Tests for the resumable chunked upload protocol."""
+
+import hashlib
+import os
+
+from multivol.api_server import uploads
+from multivol.api_server.config import STORAGE_DIR
+
+MIB = 1 << 20
+DATA = os.urandom(2 * MIB + MIB // 2)
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+def _chunk(index):
+    return DATA[index * MIB : (index + 1) * MIB]
+
+
+def _create(client, auth_headers, filename, **extra):
+    body = {"filename": filename, "size": len(DATA), "chunk_size": MIB, **extra}
+    resp = client.post("/upload/sessions", json=body, headers=auth_headers)
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def _put(client, auth_headers, upload_id, index, data=None, digest=None):
+    data = _chunk(index) if data is None else data
+    headers = {**auth_headers, "X-Chunk-SHA256": digest or hashlib.sha256(data).hexdigest()}
+    return client.put(f"/upload/sessions/{upload_id}/chunks/{index}", data=data, headers=headers)
+
+
+def test_out_of_order_chunks_assemble_the_file(client, auth_headers):
+    session = _create(client, auth_headers, "chunked.raw", sha256=SHA.upper())
+    upload_id = session["upload_id"]
+    assert (session["chunk_count"], session["missing"]) == (3, [0, 1, 2])
+
+    assert _put(client, auth_headers, upload_id, 2).status_code == 200
+    assert _put(client, auth_headers, upload_id, 0).status_code == 200
+    assert _put(client, auth_headers, upload_id, 0).status_code == 200  # resent
+    assert _put(client, auth_headers, upload_id, 1, digest="0" * 64).status_code == 400
+    assert _put(client, auth_headers, upload_id, 1, data=b"short").status_code == 400
+    assert _put(client, auth_headers, upload_id, 3, data=b"x").status_code == 400
+
+    status = client.get(f"/upload/sessions/{upload_id}", headers=auth_headers).get_json()
+    assert (status["received"], status["missing"]) == (2, [1])
+    url = f"/upload/sessions/{upload_id}/complete"
+    assert client.post(url, headers=auth_headers).status_code == 409
+
+    assert _put(client, auth_headers, upload_id, 1).status_code == 200
+    resp = client.post(url, headers=auth_headers)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body["status"], body["sha256"]) == ("success", SHA)
+    path = os.path.join(STORAGE_DIR, "chunked.raw")
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    with open(path + ".sha256", encoding="utf-8") as f:
+        assert f.read() == SHA
+    assert client.get(f"/upload/sessions/{upload_id}", headers=auth_headers).status_code == 404
+
+
+def test_resumes_after_restart(client, auth_headers):
+    upload_id = _create(client, auth_headers, "resumed.raw")["upload_id"]
+    _put(client, auth_headers, upload_id, 1)
+    uploads._sessions.clear()  # what a restart loses
+
+    status = client.get(f"/upload/sessions/{upload_id}", headers=auth_headers).get_json()
+    assert status["missing"] == [0, 2]
+    _put(client, auth_headers, upload_id, 0)
+    _put(client, auth_headers, upload_id, 2)
+    resp = client.post(f"/upload/sessions/{upload_id}/complete", headers=auth_headers)
+    assert resp.get_json()["sha256"] == SHA
+
+
+def test_hash_mismatch_and_abort(client, auth_headers):
+    upload_id = _create(client, auth_headers, "bad.raw", sha256="0" * 64)["upload_id"]
+    for index in range(3):
+        _put(client, auth_headers, upload_id, index)
+    resp = client.post(f"/upload/sessions/{upload_id}/complete", headers=auth_headers)
+    assert resp.status_code == 422
+    assert not os.path.exists(os.path.join(STORAGE_DIR, "bad.raw"))
+
+    assert client.delete(f"/upload/sessions/{upload_id}", headers=auth_headers).status_code == 200
+    assert not os.path.exists(os.path.join(uploads.SESSION_DIR, f"{upload_id}.part"))
+    assert client.delete(f"/upload/sessions/{upload_id}", headers=auth_headers).status_code == 404
+
+
+def test_rejects_invalid_sessions(client, auth_headers):
+    for body in (
+        {"filename": "", "size": 10},
+        {"filename": "a.raw", "size": 0},
+        {"filename": "a.raw", "size": "big"},
+        {"filename": "a.raw", "size": 10, "chunk_size": 10},
+        {"filename": "a.raw", "size": 10, "sha256": "abc"},
+    ):
+        resp = client.post("/upload/sessions", json=body, headers=auth_headers)
+        assert resp.status_code == 400, body
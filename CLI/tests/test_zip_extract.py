@@ -0,0 +1,77 @@
+"""Tests for concurrent zip extraction of uploaded archives."""
+
+import io
+import os
+import time
+import warnings
+import zipfile
+
+from multivol.api_server.routes import files
+
+STORED = os.urandom(200_000)
+TEXT = b"volatility " * 50_000
+
+
+def _zip(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("dump/mem.raw", STORED, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("notes.txt", TEXT, compress_type=zipfile.ZIP_DEFLATED)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # duplicate name, on purpose
+            zf.writestr("dup.txt", b"old", compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr("dup.txt", b"new", compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("../outside.txt", b"x")
+        zf.writestr("empty/", b"")
+
+
+def test_extracts_members_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "_COPY_RANGE_MIN", 1024)
+    monkeypatch.setattr(files, "EXTRACT_WORKERS", 3)
+    archive = tmp_path / "bundle.zip"
+    _zip(archive)
+    dest = tmp_path / "out"
+    dest.mkdir()
+    progress = []
+
+    extracted = files._extract_zip(str(archive), str(dest), progress.append)
+    assert sorted(os.path.relpath(p, dest) for p in extracted) == [
+        "dump/mem.raw",
+        "dup.txt",
+        "notes.txt",
+    ]
+    assert (dest / "dump" / "mem.raw").read_bytes() == STORED
+    assert (dest / "notes.txt").read_bytes() == TEXT
+    assert (dest / "dup.txt").read_bytes() == b"new"
+    assert not (tmp_path / "outside.txt").exists()
+    assert progress and progress == sorted(progress) and progress[-1] == 99
+
+
+def test_stored_member_falls_back_without_copy_file_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "_COPY_RANGE_MIN", 1024)
+    monkeypatch.delattr(os, "copy_file_range", raising=False)
+    archive = tmp_path / "bundle.zip"
+    _zip(archive)
+    extracted = files._extract_zip(str(archive), str(tmp_path), lambda pct: None)
+    assert len(extracted) == 3
+    assert (tmp_path / "dump" / "mem.raw").read_bytes() == STORED
+
+
+def test_zip_upload_reports_primary_dump(client, auth_headers):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("zipcase/readme.txt", b"hello")
+        zf.writestr("zipcase/mem.vmem", STORED)
+    resp = client.post(
+        "/upload",
+        data={"file": (io.BytesIO(buf.getvalue()), "zipcase.zip")},
+        headers=auth_headers,
+        content_type="multipart/form-data",
+    )
+    task_id = resp.get_json()["task_id"]
+    for _ in range(100):
+        progress = client.get(f"/upload/progress/{task_id}", headers=auth_headers).get_json()
+        if progress["status"] != "extracting":
+            break
+        time.sleep(0.05)
+    assert progress["status"] == "done", progress
+    assert os.path.basename(progress["files"][0]) == "mem.vmem"
@@ -0,0 +1,86 @@
+"""Tests for the streaming ZIP writer and the scan download route."""
+
+import io
+import os
+import time
+import zipfile
+
+from multivol.api_server import zipstream
+
+
+def _read_zip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+class TestIterZip:
+    def test_parallel_chunks_form_one_deflate_stream(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(zipstream, "CHUNK_SIZE", 4096)
+        data = b"".join(b"row %d: 0xfffff80000%06x\n" % (i, i * 7) for i in range(5000))
+        (tmp_path / "big.json").write_bytes(data)
+        (tmp_path / "empty.txt").write_bytes(b"")
+        (tmp_path / "small.txt").write_bytes(b"hello")
+
+        zf = _read_zip(
+            zipstream.iter_zip(
+                (str(tmp_path / n), f"scan/{n}") for n in ("big.json", "empty.txt", "small.txt")
+            )
+        )
+        assert zf.testzip() is None
+        assert zf.read("scan/big.json") == data
+        assert zf.read("scan/empty.txt") == b""
+        assert zf.read("scan/small.txt") == b"hello"
+        assert zf.getinfo("scan/big.json").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("scan/big.json").compress_size < len(data) // 4
+
+    def test_precompressed_files_are_stored(self, tmp_path):
+        (tmp_path / "recovered_fs.tar.gz").write_bytes(os.urandom(2048))
+        zf = _read_zip(zipstream.iter_zip([(str(tmp_path / "recovered_fs.tar.gz"), "fs.tar.gz")]))
+        assert zf.getinfo("fs.tar.gz").compress_type == zipfile.ZIP_STORED
+        assert zf.read("fs.tar.gz") == (tmp_path / "recovered_fs.tar.gz").read_bytes()
+
+    def test_missing_files_are_skipped(self, tmp_path):
+        (tmp_path / "a.txt").write_bytes(b"a")
+        zf = _read_zip(
+            zipstream.iter_zip(
+                [(str(tmp_path / "gone.txt"), "gone"), (str(tmp_path / "a.txt"), "a")]
+            )
+        )
+        assert zf.namelist() == ["a"]
+
+    def test_zip64_end_records(self):
+        records = zipstream._end_records(70000, 5 << 30, 100)
+        assert records.startswith(b"PK\x06\x06")
+        assert b"PK\x06\x07" in records and b"PK\x05\x06" in records
+
+
+class TestDownloadRoute:
+    def test_module_selection(self, client, auth_headers, db_conn, tmp_path):
+        out = tmp_path / "zipcase"
+        (out / "recovered_fs" / "etc").mkdir(parents=True)
+        (out / "windows.pslist.PsList_output.json").write_text("[]")
+        (out / "windows.netscan.NetScan_output.json").write_text("[]")
+        (out / "strings_output.txt").write_text("abc")
+        (out / "recovered_fs" / "etc" / "passwd").write_text("root:x:0:0")
+        db_conn.execute(
+            "INSERT INTO scans (uuid, status, created_at, output_dir, name)"
+            " VALUES ('zip-1', 'completed', ?, ?, 'Zip case')",
+            (time.time(), str(out)),
+        )
+        db_conn.commit()
+
+        resp = client.get("/scans/zip-1/download", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert len(_read_zip([resp.data]).namelist()) == 4
+
+        resp = client.get(
+            "/scans/zip-1/download?modules=windows.pslist.PsList,linux.pagecache.RecoverFs",
+            headers=auth_headers,
+        )
+        assert sorted(_read_zip([resp.data]).namelist()) == [
+            "zipcase/recovered_fs/etc/passwd",
+            "zipcase/windows.pslist.PsList_output.json",
+        ]
+
+        resp = client.get("/scans/zip-1/download?modules=nope", headers=auth_headers)
+        assert resp.status_code == 404
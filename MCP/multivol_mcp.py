@@ -52,6 +52,27 @@ async def safe_request(method: str, url: str, **kwargs) -> dict:
         return {"error": "Backend API returned invalid JSON."}
 
 
+async def stream_result_rows(uuid: str, module: str, fields: str = "") -> list[dict] | dict:
+    """Read every row of a module result from the NDJSON stream endpoint (no giant JSON blob)."""
+    params = {"module": module, "format": "ndjson"}
+    if fields:
+        params["fields"] = fields
+    rows = []
+    try:
+        async with _get_client().stream(
+            "GET", f"{API_BASE}/results/{uuid}/stream", params=params
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    rows.append(json.loads(line))
+    except httpx.HTTPError as e:
+        return {"error": f"Backend API request failed: {str(e)}"}
+    except json.JSONDecodeError:
+        return {"error": "Backend API returned invalid JSON."}
+    return rows
+
+
 mcp = FastMCP("MultiVol MCP", auth=StaticTokenAuth(), list_page_size=50)
 
 
@@ -138,9 +159,53 @@ async def search_multivol_results(
 
 
 @mcp.tool()
-async def get_multivol_scans() -> dict:
-    """Get all scans from the server. Returns UUIDs, OS, image names, and status."""
-    return {"scans": await safe_request("GET", f"{API_BASE}/scans")}
+async def search_multivol_scan(
+    uuid: str, query: str, module: str = "", limit: int = 50, offset: int = 0
+) -> dict:
+    """
+    Full-text search across ALL module results of a scan at once (server-side index).
+
+    CRITICAL INSTRUCTIONS FOR AI:
+    - Use this tool FIRST to find where a term (e.g. 'evil.exe', '10.0.0.5') appears in a scan.
+    - Terms are matched as words/phrases, not regexes; use search_multivol_results for regexes.
+    - Hits are grouped by module with a row index; fetch a row with
+      get_multivol_results(uuid, module, limit=1, offset=row).
+    """
+    params = {"q": query, "limit": limit, "offset": offset}
+    if module:
+        params["module"] = module
+    return await safe_request("GET", f"{API_BASE}/scans/{uuid}/search", params=params)
+
+
+@mcp.tool()
+async def search_multivol_ioc(
+    indicator: str, kind: str = "", prefix: bool = False, limit: int = 100, offset: int = 0
+) -> dict:
+    """
+    Find every scan (case) containing an indicator: IP, domain, hash, file path or process name.
+
+    - kind (optional): one of ipv4, ipv6, domain, md5, sha1, sha256, path, process.
+    - prefix=True matches indicators starting with the given value (e.g. a directory path).
+    Returns matching scans with the module and row index of each hit.
+    """
+    params = {"q": indicator, "limit": limit, "offset": offset}
+    if kind:
+        params["kind"] = kind
+    if prefix:
+        params["prefix"] = "1"
+    return await safe_request("GET", f"{API_BASE}/ioc/search", params=params)
+
+
+@mcp.tool()
+async def get_multivol_scans(status: str = "", os: str = "", name: str = "") -> dict:
+    """
+    Get scans from the server. Returns UUIDs, OS, image names, status and result summaries.
+
+    Optional filters: status (pending, running, completed, failed), os (windows, linux)
+    and name (case-insensitive substring of the case name).
+    """
+    params = {k: v for k, v in {"status": status, "os": os, "name": name}.items() if v}
+    return {"scans": await safe_request("GET", f"{API_BASE}/scans", params=params)}
 
 
 @mcp.tool()
@@ -151,14 +216,27 @@ async def get_multivol_scan_modules(uuid: str) -> dict:
 
 @mcp.tool()
 async def get_multivol_results(
-    uuid: str, module: str, limit: int = 50, offset: int = 0
+    uuid: str,
+    module: str,
+    limit: int = 50,
+    offset: int = 0,
+    filters: list[str] | None = None,
+    sort: str = "",
+    fields: str = "",
 ) -> dict:
     """
     Get the results of a module of a specific scan.
 
+    Filtering, sorting and column selection run on the server:
+    - filters: list of "<column>:<op>:<value>" with op in eq, ne, contains, gt, gte, lt, lte
+      (e.g. ["ImageFileName:contains:svchost", "PID:gt:1000"]).
+    - sort: comma-separated columns, prefix with '-' for descending (e.g. "-PID").
+    - fields: comma-separated columns to return (e.g. "PID,PPID,ImageFileName").
+
     CRITICAL INSTRUCTIONS FOR AI:
     If you pass limit=0, it defaults to 50.
     If 'has_more' is true in metadata, call this tool again with 'next_offset'.
+    Prefer filters/fields over paging through whole modules.
     """
     if limit <= 0 or limit > 100:
         limit = 50
@@ -171,11 +249,14 @@ async def get_multivol_results(
             params={"limit": limit, "page": page},
         )
     else:
-        data = await safe_request(
-            "GET",
-            f"{API_BASE}/results/{uuid}",
-            params={"module": module, "limit": limit, "offset": offset},
-        )
+        params = {"module": module, "limit": limit, "offset": offset}
+        if filters:
+            params["filter"] = filters
+        if sort:
+            params["sort"] = sort
+        if fields:
+            params["fields"] = fields
+        data = await safe_request("GET", f"{API_BASE}/results/{uuid}", params=params)
 
     if isinstance(data, dict) and "error" in data:
         return data
@@ -197,35 +278,47 @@ async def get_multivol_results(
 
 @mcp.tool()
 async def list_multivol_linux_recovered_files(
-    uuid: str, offset: int = 0, limit: int = 100, search: str = ""
+    uuid: str,
+    offset: int = 0,
+    limit: int = 100,
+    search: str = "",
+    ext: str = "",
+    min_size: int = 0,
 ) -> dict:
     """
     Lists files that were successfully extracted by the recoverFS module (LINUX ONLY).
     Use `offset` and `limit` to paginate through the list.
-    Use `search` to filter files matching a specific string or extension (e.g. search=".txt" or search="passwd").
+    Use `search` to filter files whose path contains a string (e.g. search="passwd"),
+    or starts with a path when it begins with "/" (e.g. search="/etc/ssh").
+    Use `ext` to keep only some extensions (e.g. ext="log,conf") and `min_size` for a minimum size in bytes.
     """
-    data = await safe_request("GET", f"{API_BASE}/results/{uuid}/fs/list")
+    params = {"offset": offset, "limit": limit}
+    if search:
+        params["search"] = search
+    if ext:
+        params["ext"] = ext
+    if min_size:
+        params["min_size"] = min_size
+    data = await safe_request("GET", f"{API_BASE}/results/{uuid}/fs/list", params=params)
     if "error" in data:
         return data
 
     files = data.get("files", [])
-    if search:
-        search_lower = search.lower()
-        files = [f for f in files if search_lower in f.lower()]
-
-    paginated = files[offset : offset + limit]
-    has_more = (offset + limit) < len(files)
+    total = data.get("total", len(files))
+    has_more = data.get("has_more", (offset + len(files)) < total)
 
     return {
         "metadata": {
-            "total_files": len(files),
+            "total_files": total,
             "current_offset": offset,
             "limit": limit,
             "has_more": has_more,
             "next_offset": offset + limit if has_more else None,
             "search_filter": search,
+            "ext_filter": ext,
+            "min_size": min_size,
         },
-        "files": paginated,
+        "files": files,
     }
 
 
@@ -259,18 +352,10 @@ async def list_multivol_windows_recovered_files(
             }
 
     # 2. Try windows.filescan.FileScan results
-    filescan_data = await safe_request(
-        "GET",
-        f"{API_BASE}/results/{uuid}",
-        params={"module": "windows.filescan.FileScan", "limit": 0},
-    )
-    filescan_results = (
-        filescan_data
-        if isinstance(filescan_data, list)
-        else filescan_data.get("results", [])
-        if isinstance(filescan_data, dict)
-        else []
+    filescan_data = await stream_result_rows(
+        uuid, "windows.filescan.FileScan", fields="Name,Offset"
     )
+    filescan_results = filescan_data if isinstance(filescan_data, list) else []
 
     for f in filescan_results:
         name = f.get("Name", "UNKNOWN")
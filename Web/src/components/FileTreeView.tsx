@@ -18,6 +18,7 @@ interface TreeNode {
     children?: TreeNode[];
     data?: Record<string, unknown>;
     isFolder?: boolean;
+    loaded?: boolean;
 }
 
 interface FileTreeViewProps {
@@ -26,6 +27,8 @@ interface FileTreeViewProps {
     viewMode: 'table' | 'tree';
     onDownload?: (node: Record<string, unknown>) => void;
     isPrebuilt?: boolean;
+    // Lazy mode: fetch one directory level (by path) when a folder is first opened
+    loadChildren?: (path: string) => Promise<Record<string, unknown>[]>;
 }
 
 const buildFileTree = (data: Record<string, unknown>[]): TreeNode[] => {
@@ -116,6 +119,27 @@ const mapPrebuiltTree = (nodes: Record<string, unknown>[]): TreeNode[] => {
     });
 };
 
+// Folders get an empty child list so they render as expandable until their level is loaded
+const mapLazyLevel = (entries: Record<string, unknown>[]): TreeNode[] =>
+    entries.map((entry) => {
+        const isFolder = entry.type === 'directory';
+        return {
+            id: entry.path as string,
+            name: entry.name as string,
+            isFolder,
+            children: isFolder ? [] : undefined,
+            loaded: false,
+            data: entry
+        };
+    });
+
+const replaceChildren = (nodes: TreeNode[], id: string, children: TreeNode[]): TreeNode[] =>
+    nodes.map((node) => {
+        if (node.id === id) return { ...node, children, loaded: true };
+        if (node.children?.length) return { ...node, children: replaceChildren(node.children, id, children) };
+        return node;
+    });
+
 const TreeContext = React.createContext<{ onContextMenu: (e: React.MouseEvent, node: Record<string, unknown>) => void }>({ onContextMenu: () => { } });
 
 const NodeRenderer = ({ node, style, dragHandle }: NodeRendererProps<TreeNode>) => {
@@ -152,18 +176,39 @@ const NodeRenderer = ({ node, style, dragHandle }: NodeRendererProps<TreeNode>)
     );
 };
 
-export const FileTreeView: React.FC<FileTreeViewProps> = ({ data, onToggleView, viewMode, onDownload, isPrebuilt }) => {
-    const treeData = React.useMemo(() => {
+export const FileTreeView: React.FC<FileTreeViewProps> = ({ data, onToggleView, viewMode, onDownload, isPrebuilt, loadChildren }) => {
+    const staticData = React.useMemo(() => {
+        if (loadChildren) return [];
         if (isPrebuilt) {
             return mapPrebuiltTree(data);
         }
         return buildFileTree(data);
-    }, [data, isPrebuilt]);
+    }, [data, isPrebuilt, loadChildren]);
+    const [lazyData, setLazyData] = React.useState<TreeNode[]>([]);
+    const treeData = loadChildren ? lazyData : staticData;
     const [containerRef, setContainerRef] = React.useState<HTMLDivElement | null>(null);
     const [dims, setDims] = React.useState({ width: 0, height: 0 });
     const treeRef = React.useRef<TreeApi<TreeNode> | null>(null);
     const [searchTerm, setSearchTerm] = React.useState('');
 
+    React.useEffect(() => {
+        if (!loadChildren) return;
+        let cancelled = false;
+        setLazyData([]);
+        loadChildren('/').then((entries) => {
+            if (!cancelled) setLazyData(mapLazyLevel(entries));
+        });
+        return () => { cancelled = true; };
+    }, [loadChildren]);
+
+    const handleToggle = React.useCallback((id: string) => {
+        const node = treeRef.current?.get(id)?.data;
+        if (!loadChildren || !node?.isFolder || node.loaded) return;
+        loadChildren(id).then((entries) => {
+            setLazyData((prev) => replaceChildren(prev, id, mapLazyLevel(entries)));
+        });
+    }, [loadChildren]);
+
     // Context Menu State
     const [contextMenu, setContextMenu] = React.useState<{ x: number, y: number, node: Record<string, unknown> } | null>(null);
 
@@ -222,16 +267,18 @@ export const FileTreeView: React.FC<FileTreeViewProps> = ({ data, onToggleView,
                         </button>
                     </div>
 
-                    {/* Expand/Collapse All Buttons */}
+                    {/* Expand/Collapse All Buttons (expanding everything is not offered when loading lazily) */}
                     <div className="flex bg-white/5 p-1 rounded-lg border border-white/5">
-                        <button
-                            onClick={() => treeRef.current?.openAll()}
-                            className="flex items-center px-3 py-1.5 rounded-md text-xs font-medium transition-all text-slate-400 hover:text-white hover:bg-white/5"
-                            title="Expand All Folders"
-                        >
-                            <ChevronsUpDown size={14} className="mr-2" />
-                            Expand All
-                        </button>
+                        {!loadChildren && (
+                            <button
+                                onClick={() => treeRef.current?.openAll()}
+                                className="flex items-center px-3 py-1.5 rounded-md text-xs font-medium transition-all text-slate-400 hover:text-white hover:bg-white/5"
+                                title="Expand All Folders"
+                            >
+                                <ChevronsUpDown size={14} className="mr-2" />
+                                Expand All
+                            </button>
+                        )}
                         <button
                             onClick={() => treeRef.current?.closeAll()}
                             className="flex items-center px-3 py-1.5 rounded-md text-xs font-medium transition-all text-slate-400 hover:text-white hover:bg-white/5"
@@ -268,6 +315,7 @@ export const FileTreeView: React.FC<FileTreeViewProps> = ({ data, onToggleView,
                             searchTerm={searchTerm}
                             searchMatch={(node, term) => node.data.name.toLowerCase().includes(term.toLowerCase())}
                             openByDefault={false}
+                            onToggle={handleToggle}
                             width={dims.width}
                             height={dims.height}
                             indent={24}
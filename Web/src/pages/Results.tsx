@@ -134,6 +134,12 @@ export const Results: React.FC<{ onBack?: () => void; caseId?: string | null }>
         }
     }, [caseId]);
 
+    const loadFsLevel = React.useCallback(async (path: string) => {
+        if (!caseId) return [];
+        const level = await api.fetchFsTreeLevel(caseId, path);
+        return (level?.children ?? []) as unknown as Record<string, unknown>[];
+    }, [caseId]);
+
     const loadResults = React.useCallback(async () => {
         if (!caseId || !activeModule) return;
         setLoading(true);
@@ -159,6 +165,10 @@ export const Results: React.FC<{ onBack?: () => void; caseId?: string | null }>
                 } finally {
                     setStringsLoading(false);
                 }
+            } else if (activeModule === 'linux.pagecache.RecoverFs') {
+                // The tree view loads directory levels itself (loadFsLevel)
+                setResults([]);
+                setStringsContent(null);
             } else if (activeModule === 'MemProcFS.FileList') {
                 const data = await api.fetchMemProcFSFiles(caseId as string, 500, 0, searchTerm);
                 if (data && data.results) {
@@ -236,16 +246,9 @@ export const Results: React.FC<{ onBack?: () => void; caseId?: string | null }>
     }, [searchTerm, activeModule, loadResults]);
 
     const handleDownload = () => {
-        if (!results || !activeModule || !caseId) return;
-        const blob = new Blob([JSON.stringify(results, null, 2)], { type: 'application/json' });
-        const url = window.URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `${caseId}-${activeModule}.json`;
-        document.body.appendChild(a);
-        a.click();
-        window.URL.revokeObjectURL(url);
-        a.remove();
+        if (!activeModule || !caseId) return;
+        // Streamed by the server row by row; nothing is assembled in the browser
+        api.downloadModuleResults(caseId, activeModule, 'ndjson');
     };
 
     const handleDownloadFile = async (nodeData: ModuleResult) => {
@@ -458,12 +461,12 @@ export const Results: React.FC<{ onBack?: () => void; caseId?: string | null }>
             );
         }
 
-        // Special View for RecoverFs
+        // Special View for RecoverFs: directories are listed from the server-side index on expand
         if (activeModule === 'linux.pagecache.RecoverFs') {
             return (
                 <FileTreeView
-                    data={results}
-                    isPrebuilt={true}
+                    data={[]}
+                    loadChildren={loadFsLevel}
                     viewMode="tree"
                     onToggleView={() => { }}
                     onDownload={(nodeData) => {
@@ -5,6 +5,8 @@ import type {
     StringsResponse,
     ModuleStatus,
     ModuleResult,
+    FsEntry,
+    ScanListQuery,
     Stats,
     Evidence,
     PluginListResponse,
@@ -36,6 +38,157 @@ const fetchJson = async <T>(url: string, options: RequestInit = {}, fallback: T)
     }
 };
 
+// JSON responses carrying a strong ETag, replayed when the server answers 304 Not Modified.
+// Bounded; the least recently used entry is evicted first.
+const ETAG_CACHE_LIMIT = 64;
+const etagCache = new Map<string, { etag: string; data: unknown; total: string | null }>();
+
+const fetchCachedJson = async <T>(url: string): Promise<{ data: T; total: string | null } | null> => {
+    const cached = etagCache.get(url);
+    const headers: HeadersInit = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetchWithAuth(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        etagCache.delete(url);
+        etagCache.set(url, cached);
+        return { data: cached.data as T, total: cached.total };
+    }
+    if (!response.ok) return null;
+    const data = await response.json() as T;
+    const total = response.headers.get('X-Total-Count');
+    const etag = response.headers.get('ETag');
+    etagCache.delete(url);
+    if (etag) {
+        etagCache.set(url, { etag, data, total });
+        if (etagCache.size > ETAG_CACHE_LIMIT) etagCache.delete(etagCache.keys().next().value as string);
+    }
+    return { data, total };
+};
+
+// Chunked uploads: the file is sent as fixed-size chunks over several concurrent requests.
+// The session id is remembered per file, so a failed upload resumes with its missing chunks.
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const UPLOAD_CONCURRENCY = 4;
+const UPLOAD_RETRIES = 5;
+
+interface UploadSession {
+    upload_id: string;
+    chunk_size: number;
+    chunk_count: number;
+    missing: number[];
+}
+
+const uploadSessionKey = (file: File) => `upload:${file.name}:${file.size}:${file.lastModified}`;
+
+const uploadError = async (response: Response, fallback: string): Promise<Error> => {
+    const err = await response.json().catch(() => ({}));
+    return new Error(err.error || `${fallback} (status ${response.status})`);
+};
+
+// Hex SHA-256 of a chunk; WebCrypto only exists in secure contexts, elsewhere the server hashes alone
+const chunkDigest = async (data: ArrayBuffer): Promise<string | null> => {
+    if (!globalThis.crypto?.subtle) return null;
+    const digest = await crypto.subtle.digest('SHA-256', data);
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+};
+
+const openUploadSession = async (file: File): Promise<UploadSession> => {
+    const key = uploadSessionKey(file);
+    const previous = localStorage.getItem(key);
+    if (previous) {
+        const response = await fetchWithAuth(`${API_BASE_URL}/upload/sessions/${previous}`);
+        if (response.ok) return response.json();
+        localStorage.removeItem(key);
+    }
+    const response = await fetchWithAuth(`${API_BASE_URL}/upload/sessions`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size, chunk_size: UPLOAD_CHUNK_SIZE }),
+    });
+    if (!response.ok) throw await uploadError(response, 'Upload failed');
+    const session = await response.json() as UploadSession;
+    localStorage.setItem(key, session.upload_id);
+    return session;
+};
+
+const uploadChunk = async (file: File, session: UploadSession, index: number): Promise<void> => {
+    const start = index * session.chunk_size;
+    const data = await file.slice(start, Math.min(start + session.chunk_size, file.size)).arrayBuffer();
+    const digest = await chunkDigest(data);
+    for (let attempt = 1; ; attempt++) {
+        try {
+            const response = await fetchWithAuth(`${API_BASE_URL}/upload/sessions/${session.upload_id}/chunks/${index}`, {
+                method: 'PUT',
+                headers: digest ? { 'X-Chunk-SHA256': digest } : {},
+                body: data,
+            });
+            if (response.ok) return;
+            // Client errors will not go away by retrying
+            if (response.status < 500 || attempt >= UPLOAD_RETRIES) throw await uploadError(response, `Chunk ${index} failed`);
+        } catch (e) {
+            if (!(e instanceof TypeError) || attempt >= UPLOAD_RETRIES) throw e;
+        }
+        await new Promise(r => setTimeout(r, 500 * 2 ** attempt));
+    }
+};
+
+const uploadInChunks = async (file: File, onSent: (bytes: number) => void): Promise<Record<string, string>> => {
+    const session = await openUploadSession(file);
+    const queue = [...session.missing];
+    const chunkLength = (index: number) => Math.min(session.chunk_size, file.size - index * session.chunk_size);
+    let sent = file.size - queue.reduce((total, index) => total + chunkLength(index), 0);
+    onSent(sent);
+
+    const worker = async () => {
+        for (let index = queue.shift(); index !== undefined; index = queue.shift()) {
+            await uploadChunk(file, session, index);
+            sent += chunkLength(index);
+            onSent(sent);
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(UPLOAD_CONCURRENCY, queue.length) }, worker));
+
+    const response = await fetchWithAuth(`${API_BASE_URL}/upload/sessions/${session.upload_id}/complete`, { method: 'POST' });
+    if (!response.ok) throw await uploadError(response, 'Upload failed');
+    localStorage.removeItem(uploadSessionKey(file));
+    return response.json();
+};
+
+// Only the async server hands /upload/stream the body while it arrives; elsewhere the
+// whole archive is buffered first, and the resumable chunked upload is the better path
+let streamingUploads: Promise<boolean> | null = null;
+const supportsStreamingUploads = (): Promise<boolean> => {
+    streamingUploads ??= fetchWithAuth(`${API_BASE_URL}/health`)
+        .then(r => (r.ok ? r.json() : {}))
+        .then((body: { streaming_uploads?: boolean }) => body.streaming_uploads === true)
+        .catch(() => {
+            streamingUploads = null;
+            return false;
+        });
+    return streamingUploads;
+};
+
+// Tar archives are extracted by the server while the body is still arriving
+const streamTarUpload = (file: File, onSent: (bytes: number) => void): Promise<string[]> =>
+    new Promise((resolve, reject) => {
+        const xhr = new XMLHttpRequest();
+        xhr.open('PUT', `${API_BASE_URL}/upload/stream/${encodeURIComponent(file.name)}`, true);
+        xhr.setRequestHeader('Authorization', `Bearer ${getApiToken()}`);
+        xhr.setRequestHeader('Content-Type', 'application/octet-stream');
+        xhr.upload.onprogress = (e) => onSent(e.loaded);
+        xhr.onload = () => {
+            let body: { files?: string[]; error?: string } = {};
+            try {
+                body = JSON.parse(xhr.responseText);
+            } catch {
+                // keep the status-based message below
+            }
+            if (xhr.status >= 200 && xhr.status < 300) resolve(body.files ?? []);
+            else reject(new Error(body.error || `Upload failed with status: ${xhr.status}`));
+        };
+        xhr.onerror = () => reject(new Error("Network Error during upload"));
+        xhr.send(file);
+    });
+
 export const api = {
     getStrings: async (uuid: string, queryParams: URLSearchParams): Promise<StringsResponse> => {
         const response = await fetchWithAuth(`${API_BASE_URL}/results/${uuid}/strings?${queryParams}`);
@@ -46,14 +199,27 @@ export const api = {
         return response.json();
     },
 
-    fetchScans: async (): Promise<Scan[]> => {
+    fetchScans: async (query: ScanListQuery = {}): Promise<Scan[]> => {
+        const page = await api.fetchScansPage(query);
+        return page.scans;
+    },
+
+    // Keyset-paginated case list; pass the returned nextCursor back as query.cursor
+    fetchScansPage: async (query: ScanListQuery = {}): Promise<{ scans: Scan[]; nextCursor: string | null }> => {
+        const params = new URLSearchParams();
+        if (query.status) params.set('status', query.status);
+        if (query.os) params.set('os', query.os);
+        if (query.name) params.set('name', query.name);
+        if (query.limit !== undefined) params.set('limit', String(query.limit));
+        if (query.cursor) params.set('cursor', query.cursor);
         try {
-            const response = await fetchWithAuth(`${API_BASE_URL}/scans`);
+            const qs = params.toString();
+            const response = await fetchWithAuth(`${API_BASE_URL}/scans${qs ? `?${qs}` : ''}`);
             if (!response.ok) throw new Error('Failed to fetch scans');
             const data = await response.json();
 
             // Map backend data to frontend model if necessary
-            return data.map((item: Record<string, unknown>) => ({
+            const scans = data.map((item: Record<string, unknown>) => ({
                 id: item.uuid,
                 name: item.name || `Scan ${(item.uuid as string).substring(0, 8)}`, // Use name from DB or fallback
                 status: item.status,
@@ -62,11 +228,15 @@ export const api = {
                 image: item.image,
                 os: item.os,
                 modules: item.modules || 0,
+                result_rows: item.result_rows,
+                result_bytes: item.result_bytes,
+                duration: item.duration,
                 findings: 0 // Backend doesn't return findings count yet
             }));
+            return { scans, nextCursor: response.headers.get('X-Next-Cursor') };
         } catch (error) {
             console.error(error);
-            return [];
+            return { scans: [], nextCursor: null };
         }
     },
 
@@ -137,44 +307,28 @@ export const api = {
     fetchScanModulesStatus: (uuid: string): Promise<ModuleStatus[]> =>
         fetchJson<ModuleStatus[]>(`${API_BASE_URL}/scans/${uuid}/modules`, {}, []),
 
-    fetchScanResults: (uuid: string, module: string): Promise<ModuleResult[] | null> =>
-        fetchJson<ModuleResult[] | null>(`${API_BASE_URL}/results/${uuid}?module=${module}`, {}, null),
+    fetchScanResults: async (uuid: string, module: string): Promise<ModuleResult[] | null> => {
+        try {
+            const result = await fetchCachedJson<ModuleResult[]>(`${API_BASE_URL}/results/${uuid}?module=${module}`);
+            return result ? result.data : null;
+        } catch (e) {
+            console.error(e);
+            return null;
+        }
+    },
 
     uploadDump: async (file: File, onProgress?: (progress: number) => void): Promise<string> => {
         // Phase 1 — transfer bytes (0 → 70 % of total progress for archives, 0 → 100 % for plain files)
         const isArchive = /\.(zip|tar|tar\.gz|tgz|tar\.bz2|tar\.xz)$/i.test(file.name);
+        if (/\.(tar|tar\.gz|tgz|tar\.bz2|tar\.xz)$/i.test(file.name) && await supportsStreamingUploads()) {
+            // Extraction runs alongside the transfer, so the body's progress is the whole job
+            const files = await streamTarUpload(file, (sent) => onProgress?.((sent / file.size) * 100));
+            const primary = files[0] ?? '';
+            return primary.split('/').pop() ?? primary;
+        }
         const uploadCeiling = isArchive ? 70 : 100;
 
-        const result = await new Promise<Record<string, string>>((resolve, reject) => {
-            const formData = new FormData();
-            formData.append('file', file);
-
-            const xhr = new XMLHttpRequest();
-            xhr.open('POST', `${API_BASE_URL}/upload`, true);
-            xhr.setRequestHeader('Authorization', `Bearer ${getApiToken()}`);
-
-            if (xhr.upload && onProgress) {
-                xhr.upload.onprogress = (e) => {
-                    if (e.lengthComputable) {
-                        onProgress((e.loaded / e.total) * uploadCeiling);
-                    }
-                };
-            }
-
-            xhr.onload = () => {
-                if (xhr.status >= 200 && xhr.status < 300) {
-                    try {
-                        resolve(JSON.parse(xhr.responseText));
-                    } catch (e: unknown) {
-                        reject(new Error(e instanceof Error ? e.message : 'Invalid response'));
-                    }
-                } else {
-                    reject(new Error(`Upload failed with status: ${xhr.status}`));
-                }
-            };
-            xhr.onerror = () => reject(new Error('Network Error during upload'));
-            xhr.send(formData);
-        });
+        const result = await uploadInChunks(file, (sent) => onProgress?.((sent / file.size) * uploadCeiling));
 
         // Phase 2 — poll extraction progress (70 → 100 %)
         if (result.status === 'extracting' && result.task_id) {
@@ -239,9 +393,19 @@ export const api = {
         }
     },
 
-    downloadScanResults: (uuid: string) => {
+    // One directory level of the recovered filesystem; `children` holds its entries.
+    fetchFsTreeLevel: (uuid: string, path = '/'): Promise<FsEntry | null> =>
+        fetchJson<FsEntry | null>(`${API_BASE_URL}/results/${uuid}/fs/tree?path=${encodeURIComponent(path)}`, {}, null),
+
+    downloadScanResults: (uuid: string, modules?: string[]) => {
         // Trigger browser download by opening window or creating anchor
-        window.open(`${API_BASE_URL}/scans/${uuid}/download?token=${getApiToken()}`, '_blank');
+        const selection = modules?.length ? `&modules=${encodeURIComponent(modules.join(','))}` : '';
+        window.open(`${API_BASE_URL}/scans/${uuid}/download?token=${getApiToken()}${selection}`, '_blank');
+    },
+
+    downloadModuleResults: (uuid: string, module: string, format: 'ndjson' | 'csv' = 'ndjson') => {
+        const params = new URLSearchParams({ module, format, download: '1', token: getApiToken() });
+        window.open(`${API_BASE_URL}/results/${uuid}/stream?${params}`, '_blank');
     },
 
     startDumpTask: async (scanId: string, virtAddr: string, image: string, filePath?: string): Promise<{ task_id: string, status: string }> => {
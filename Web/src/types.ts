@@ -13,6 +13,17 @@ export interface Scan {
     // Frontend augmented props (optional or computed in api.ts)
     modules?: number;
     findings?: number;
+    result_rows?: number;
+    result_bytes?: number;
+    duration?: number | null; // seconds between creation and completion
+}
+
+export interface ScanListQuery {
+    status?: Scan['status'];
+    os?: string;
+    name?: string; // case-insensitive substring
+    limit?: number;
+    cursor?: string; // X-Next-Cursor from the previous page
 }
 
 export interface ScanConfig {
@@ -52,6 +63,17 @@ export interface ModuleResult {
     __children?: ModuleResult[];
 }
 
+// One entry of the recovered filesystem index (/results/<uuid>/fs/tree)
+export interface FsEntry {
+    name: string;
+    path: string;
+    type: 'directory' | 'file';
+    size: number;
+    child_count?: number;
+    mtime?: number;
+    children?: FsEntry[];
+}
+
 export interface Stats {
     total_evidences: number;
     total_evidences_progress: number;